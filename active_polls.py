@@ -0,0 +1,194 @@
+# active_polls.py
+"""
+Модуль реестра активных опросов-викторин.
+Обеспечивает:
+- Хранение правильного ответа для каждого опроса (poll_id -> индекс варианта)
+- Вытеснение опросов после закрытия или по истечении срока жизни
+- Журнал на диске в формате JSON Lines (только дозапись), который читается при запуске,
+  поэтому ответы после перезапуска бота продолжают засчитываться
+- Периодическое сжатие журнала до актуальных записей
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Срок жизни опроса по умолчанию: неделя, как и период звёздного рейтинга
+DEFAULT_POLL_TTL = 7 * 24 * 3600
+
+# Журнал сжимается, когда в нём больше строк, чем 2 * активных опросов + COMPACT_SLACK
+COMPACT_SLACK = 64
+
+
+class ActivePollRegistry:
+    """
+    Реестр опросов вида { poll_id: (correct_index, expires_at) }.
+
+    Поддерживает операции словаря (in, [], get, len, clear), поэтому
+    обработчики работают с ним так же, как раньше с обычным dict.
+
+    Строки журнала:
+    - {"poll": id, "correct": индекс, "expires": unix-время} — опрос опубликован;
+    - {"poll": id, "closed": true} — опрос закрыт.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_POLL_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._polls = None
+        self._lines = 0
+
+    def add(self, poll_id, correct_index, ttl=None):
+        """Регистрирует опрос и дописывает его в журнал."""
+        polls = self._load()
+        self._evict_expired()
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        # Повторная регистрация переносит опрос в конец, чтобы порядок совпадал со сроками
+        polls.pop(poll_id, None)
+        polls[poll_id] = (correct_index, expires_at)
+        self._append({"poll": poll_id, "correct": correct_index, "expires": expires_at})
+
+    def close(self, poll_id) -> bool:
+        """
+        Удаляет закрытый опрос из реестра.
+
+        Returns:
+            bool: True, если опрос был в реестре
+        """
+        if self._load().pop(poll_id, None) is None:
+            return False
+        self._append({"poll": poll_id, "closed": True})
+        return True
+
+    def get(self, poll_id, default=None):
+        entry = self._load().get(poll_id)
+        if entry is None:
+            return default
+        correct_index, expires_at = entry
+        if expires_at <= time.time():
+            self.close(poll_id)
+            return default
+        return correct_index
+
+    def prune(self) -> int:
+        """
+        Удаляет опросы с истёкшим сроком жизни.
+
+        Returns:
+            int: Количество удалённых опросов
+        """
+        self._load()
+        removed = self._evict_expired()
+        if removed:
+            self._maybe_compact()
+        return removed
+
+    def clear(self):
+        """Удаляет все опросы и журнал."""
+        self._polls = {}
+        self._lines = 0
+        try:
+            self.path.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Ошибка удаления журнала {self.path}: {e}")
+
+    def __setitem__(self, poll_id, correct_index):
+        self.add(poll_id, correct_index)
+
+    def __getitem__(self, poll_id):
+        correct_index = self.get(poll_id)
+        if correct_index is None:
+            raise KeyError(poll_id)
+        return correct_index
+
+    def __contains__(self, poll_id):
+        return self.get(poll_id) is not None
+
+    def __len__(self):
+        return len(self._load())
+
+    def _evict_expired(self) -> int:
+        # Опросы лежат в порядке регистрации, поэтому истёкшие — в начале словаря
+        now = time.time()
+        expired = []
+        for poll_id, (_, expires_at) in self._polls.items():
+            if expires_at > now:
+                break
+            expired.append(poll_id)
+        for poll_id in expired:
+            del self._polls[poll_id]
+        if expired:
+            self._append(*({"poll": poll_id, "closed": True} for poll_id in expired))
+        return len(expired)
+
+    def _load(self) -> dict:
+        if self._polls is not None:
+            return self._polls
+        polls = {}
+        lines = 0
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        lines += 1
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Недописанная строка после аварийного завершения
+                            logger.warning(f"Пропущена повреждённая строка журнала {self.path}")
+                            continue
+                        poll_id = entry.get("poll")
+                        polls.pop(poll_id, None)
+                        if not entry.get("closed"):
+                            polls[poll_id] = (entry["correct"], entry["expires"])
+            except Exception as e:
+                logger.error(f"Ошибка чтения журнала {self.path}: {e}")
+                polls = {}
+        now = time.time()
+        self._polls = {poll_id: entry for poll_id, entry in polls.items() if entry[1] > now}
+        self._lines = lines
+        if lines:
+            logger.info(f"Восстановлено активных опросов: {len(self._polls)}")
+        if lines != len(self._polls):
+            self._compact()
+        return self._polls
+
+    def _append(self, *entries):
+        try:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._lines += len(entries)
+        except Exception as e:
+            logger.error(f"Ошибка записи журнала {self.path}: {e}")
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._lines > 2 * len(self._polls) + COMPACT_SLACK:
+            self._compact()
+
+    def _compact(self):
+        """Переписывает журнал, оставляя только активные опросы."""
+        if not self._polls:
+            self.clear()
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for poll_id, (correct_index, expires_at) in self._polls.items():
+                    entry = {"poll": poll_id, "correct": correct_index, "expires": expires_at}
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._lines = len(self._polls)
+        except Exception as e:
+            logger.error(f"Ошибка сжатия журнала {self.path}: {e}")
@@ -0,0 +1,167 @@
+# animations.py
+"""
+Модуль покадровых анимаций в чате (/logout, /roll и т.п.).
+Обеспечивает:
+- Выполнение последовательности кадров через JobQueue вместо asyncio.sleep в обработчике,
+  поэтому обработчик сразу возвращает управление и не задерживает другие команды
+- Соблюдение минимального интервала между кадрами в одном чате
+  (ограничение Telegram на частоту редактирования сообщений)
+- Повтор кадра после RetryAfter с паузой, которую запросил Telegram
+- Отмену анимации с выполнением завершающих кадров (например, удаления сообщений)
+"""
+
+import logging
+import time
+from typing import NamedTuple, Callable, Awaitable, Any
+
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Минимальный интервал между кадрами в одном чате, секунд
+MIN_FRAME_INTERVAL = 1.0
+
+
+class Frame(NamedTuple):
+    """Кадр анимации: корутина-функция без аргументов и пауза перед ней."""
+    action: Callable[[], Awaitable[Any]]
+    delay: float = 0.0
+
+
+class Animation:
+    """Состояние запущенной анимации."""
+
+    __slots__ = ('key', 'chat_id', 'frames', 'finale', 'position', 'in_finale', 'cancelled', 'job')
+
+    def __init__(self, key, chat_id, frames, finale):
+        self.key = key
+        self.chat_id = chat_id
+        self.frames = list(frames)
+        self.finale = list(finale)
+        self.position = 0
+        self.in_finale = False
+        self.cancelled = False
+        self.job = None
+
+    def current(self):
+        frames = self.finale if self.in_finale else self.frames
+        return frames[self.position] if self.position < len(frames) else None
+
+    def skip_to_finale(self):
+        self.in_finale = True
+        self.position = 0
+
+    @property
+    def done(self) -> bool:
+        return self.in_finale and self.position >= len(self.finale)
+
+
+class FrameScheduler:
+    """
+    Планировщик кадров. Каждый кадр — отдельная задача JobQueue.
+
+    Если кадр основной части падает с ошибкой, анимация переходит к завершающим
+    кадрам (finale). Ошибки завершающих кадров логируются, остальные кадры выполняются.
+    """
+
+    def __init__(self, min_interval=MIN_FRAME_INTERVAL):
+        self.min_interval = min_interval
+        self._animations = {}
+        self._last_frame_at = {}
+
+    def start(self, job_queue, key, chat_id, frames, finale=()) -> Animation:
+        """
+        Запускает анимацию. Анимация с тем же ключом отменяется.
+
+        Args:
+            job_queue: JobQueue приложения (context.job_queue)
+            key: Уникальный ключ анимации, например f"logout:{chat_id}"
+            chat_id: Чат, в котором соблюдается интервал между кадрами
+            frames: Основные кадры
+            finale: Завершающие кадры, выполняются и при ошибке, и при отмене
+        """
+        self.cancel(key)
+        animation = Animation(key, chat_id, frames, finale)
+        self._animations[key] = animation
+        if animation.current() is None:
+            animation.skip_to_finale()
+        self._schedule(job_queue, animation)
+        return animation
+
+    def cancel(self, key) -> bool:
+        """
+        Отменяет анимацию: оставшиеся основные кадры пропускаются,
+        завершающие выполняются в своё время.
+
+        Returns:
+            bool: True, если анимация с таким ключом выполнялась
+        """
+        animation = self._animations.get(key)
+        if animation is None or animation.cancelled:
+            return False
+        animation.cancelled = True
+        if not animation.in_finale:
+            animation.skip_to_finale()
+        return True
+
+    def __contains__(self, key):
+        return key in self._animations
+
+    def _schedule(self, job_queue, animation, delay=None):
+        if animation.done:
+            if self._animations.get(animation.key) is animation:
+                del self._animations[animation.key]
+            # Последняя анимация чата закончилась: интервал кадров больше не нужен
+            if not any(other.chat_id == animation.chat_id for other in self._animations.values()):
+                self._last_frame_at.pop(animation.chat_id, None)
+            return
+        if delay is None:
+            delay = animation.current().delay
+            # Не чаще одного кадра в min_interval секунд в одном чате
+            last = self._last_frame_at.get(animation.chat_id)
+            if last is not None:
+                delay = max(delay, last + self.min_interval - time.monotonic())
+        animation.job = job_queue.run_once(
+            self._run_frame,
+            when=max(delay, 0),
+            data=(job_queue, animation),
+            name=f"animation:{animation.key}"
+        )
+
+    async def _run_frame(self, context):
+        job_queue, animation = context.job.data
+        frame = animation.current()
+        if frame is None:
+            self._schedule(job_queue, animation)
+            return
+        # cancel() во время кадра переносит позицию на первый завершающий кадр
+        position, in_finale = animation.position, animation.in_finale
+        try:
+            await frame.action()
+        except RetryAfter as e:
+            # Telegram просит подождать: повторяем тот же кадр позже
+            logger.warning(f"Анимация {animation.key}: RetryAfter {e.retry_after} с")
+            self._schedule(job_queue, animation, delay=_seconds(e.retry_after))
+            return
+        except Exception as e:
+            logger.error(f"Ошибка кадра анимации {animation.key}: {e}")
+            if not animation.in_finale:
+                self._last_frame_at[animation.chat_id] = time.monotonic()
+                animation.skip_to_finale()
+                self._schedule(job_queue, animation)
+                return
+        self._last_frame_at[animation.chat_id] = time.monotonic()
+        if (animation.position, animation.in_finale) == (position, in_finale):
+            animation.position = position + 1
+        if not animation.in_finale and animation.current() is None:
+            animation.skip_to_finale()
+        self._schedule(job_queue, animation)
+
+
+def _seconds(value) -> float:
+    # В новых версиях PTB retry_after может быть timedelta
+    return value.total_seconds() if hasattr(value, 'total_seconds') else float(value)
+
+
+# Общий планировщик анимаций бота
+frame_scheduler = FrameScheduler()
@@ -0,0 +1,230 @@
+# audio_pipeline.py
+"""
+Модуль подготовки звуков к отправке.
+Обеспечивает:
+- Перекодирование звуков (.mp3, .m4a, .wav, .ogg, .mp4) в компактный MP3
+  с выравниванием громкости через локальный ffmpeg
+- Запасной вариант без ffmpeg на чистом Python для WAV: сведение в моно,
+  понижение частоты дискретизации, 16 бит и выравнивание громкости по RMS
+- Кэш результатов по хэшу содержимого: каждый файл перекодируется один раз
+
+ffmpeg необязателен: без него WAV обрабатываются запасным вариантом,
+остальные форматы отправляются как есть.
+Заранее подготовить всю папку: python audio_pipeline.py
+"""
+
+import argparse
+import hashlib
+import logging
+import math
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import wave
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Меняется при изменении параметров обработки, чтобы кэш пересобрался
+PIPELINE_VERSION = 1
+
+# Параметры ffmpeg: громкость по EBU R128 и MP3 с постоянным битрейтом
+LOUDNESS_TARGET = -16      # LUFS
+TRUE_PEAK = -1.5           # dBTP
+FFMPEG_BITRATE = "96k"
+FFMPEG_TIMEOUT = 120
+
+# Параметры запасного варианта для WAV
+FALLBACK_RATE = 24000      # частота, не ниже которой понижается дискретизация
+FALLBACK_RMS_DB = -18      # целевой RMS, dBFS
+FALLBACK_PEAK_DB = -1      # потолок пика после усиления, dBFS
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def file_digest(path) -> str:
+    """SHA-1 содержимого файла."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_wav(path):
+    """
+    Читает WAV в формате PCM (8/16/24/32 бит) или IEEE float (32/64 бит).
+    Модуль wave читает только PCM, а в папке со звуками встречается float.
+
+    Returns:
+        tuple: (частота, число каналов, сэмплы от -1 до 1 с чередованием каналов)
+
+    Raises:
+        ValueError: Файл не WAV или формат не поддерживается
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("не WAV-файл")
+    fmt = raw = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, pos)
+        body = data[pos + 8:pos + 8 + size]
+        if chunk_id == b"fmt ":
+            fmt = body
+        elif chunk_id == b"data":
+            raw = body
+        pos += 8 + size + (size & 1)
+    if fmt is None or raw is None:
+        raise ValueError("нет блоков fmt или data")
+
+    audio_format, channels, rate, _, block_align, bits = struct.unpack_from("<HHIIHH", fmt)
+    if audio_format == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        audio_format = struct.unpack_from("<H", fmt, 24)[0]
+    raw = raw[:len(raw) - len(raw) % block_align]
+
+    if audio_format == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        samples = _native(array("f" if bits == 32 else "d", raw))
+    elif audio_format == WAVE_FORMAT_PCM and bits == 8:
+        samples = [(b - 128) / 128 for b in raw]
+    elif audio_format == WAVE_FORMAT_PCM and bits in (16, 32):
+        ints = _native(array("h" if bits == 16 else "i", raw))
+        scale = float(1 << (bits - 1))
+        samples = [s / scale for s in ints]
+    elif audio_format == WAVE_FORMAT_PCM and bits == 24:
+        samples = [
+            int.from_bytes(raw[i:i + 3], "little", signed=True) / 8388608.0
+            for i in range(0, len(raw), 3)
+        ]
+    else:
+        raise ValueError(f"неподдерживаемый формат {audio_format}, {bits} бит")
+    return rate, channels, samples
+
+
+def _native(samples):
+    """Массив из данных little-endian в порядке байт платформы."""
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def compact_wav(src, dst):
+    """
+    Запасной вариант без ffmpeg: WAV -> моно, 16 бит, частота не ниже FALLBACK_RATE,
+    громкость по RMS с ограничением пика.
+    """
+    rate, channels, samples = read_wav(src)
+    factor = max(1, rate // FALLBACK_RATE)
+    # Сведение в моно и понижение частоты одним усреднением по блоку из factor кадров
+    step = channels * factor
+    mono = [sum(samples[i:i + step]) / step for i in range(0, len(samples) - step + 1, step)]
+
+    gain = 1.0
+    if mono:
+        rms = math.sqrt(sum(s * s for s in mono) / len(mono))
+        peak = max(abs(s) for s in mono)
+        if rms > 0:
+            gain = min(10 ** (FALLBACK_RMS_DB / 20) / rms, 10 ** (FALLBACK_PEAK_DB / 20) / peak)
+
+    pcm = _native(array("h", (int(max(-1.0, min(1.0, s * gain)) * 32767) for s in mono)))
+    with wave.open(dst, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate // factor)
+        out.writeframes(pcm.tobytes())
+
+
+class AudioPipeline:
+    """
+    Подготовка звуков с кэшем в cache_dir. Имя файла в кэше — хэш содержимого
+    исходника, версии обработки и способа обработки, поэтому появление ffmpeg
+    или смена параметров приводят к повторной обработке.
+    """
+
+    def __init__(self, cache_dir, ffmpeg=None):
+        # ffmpeg=None — найти в PATH, пустая строка — не использовать
+        self.cache_dir = cache_dir
+        self.ffmpeg = ffmpeg if ffmpeg is not None else shutil.which("ffmpeg")
+
+    def prepare(self, path) -> str:
+        """
+        Возвращает путь к подготовленному звуку. Если обработать файл нельзя
+        или не удалось, возвращается исходный путь.
+        """
+        is_wav = path.lower().endswith(".wav")
+        if self.ffmpeg:
+            backend, ext = "ffmpeg", ".mp3"
+        elif is_wav:
+            backend, ext = "wav", ".wav"
+        else:
+            return path
+
+        try:
+            key = hashlib.sha1(f"{PIPELINE_VERSION}:{backend}:{file_digest(path)}".encode("ascii")).hexdigest()
+        except OSError as e:
+            logger.error(f"Ошибка чтения звука {path}: {e}")
+            return path
+        cached = os.path.join(self.cache_dir, key + ext)
+        if os.path.exists(cached):
+            return cached
+
+        tmp_path = cached + ".tmp" + ext
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if backend == "ffmpeg":
+                self._transcode(path, tmp_path)
+            else:
+                compact_wav(path, tmp_path)
+            os.replace(tmp_path, cached)
+        except (OSError, ValueError, wave.Error, subprocess.SubprocessError) as e:
+            logger.error(f"Не удалось обработать звук {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return path
+        logger.info(f"Звук {path} подготовлен: {os.path.getsize(path)} -> {os.path.getsize(cached)} байт")
+        return cached
+
+    def _transcode(self, src, dst):
+        subprocess.run(
+            [
+                self.ffmpeg, "-nostdin", "-y", "-loglevel", "error",
+                "-i", src,
+                "-vn",
+                "-af", f"loudnorm=I={LOUDNESS_TARGET}:TP={TRUE_PEAK}:LRA=11",
+                "-c:a", "libmp3lame", "-b:a", FFMPEG_BITRATE,
+                "-f", "mp3", dst,
+            ],
+            check=True,
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Подготовка звуков звуковой панели")
+    parser.add_argument("--sounds-dir", default="sound_panel")
+    parser.add_argument("--cache-dir", default="state_data/audio_cache")
+    args = parser.parse_args(argv)
+
+    pipeline = AudioPipeline(args.cache_dir)
+    if not pipeline.ffmpeg:
+        print("ffmpeg не найден: обрабатываются только WAV")
+    before = after = 0
+    for name in sorted(os.listdir(args.sounds_dir)):
+        path = os.path.join(args.sounds_dir, name)
+        if not os.path.isfile(path):
+            continue
+        prepared = pipeline.prepare(path)
+        before += os.path.getsize(path)
+        after += os.path.getsize(prepared)
+        print(f"{name}: {os.path.getsize(path)} -> {os.path.getsize(prepared)} байт")
+    print(f"Итого: {before} -> {after} байт")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ import logging
 from telegram import InputMediaPhoto, InputMediaVideo
 from telegram.ext import ContextTypes
 
-from config import POST_CHAT_ID, TIMEZONE_OFFSET
+from config import get_config
 from utils import random_time_in_range
 from utils_autopost import (
     get_top_anecdote_and_remove,
@@ -44,33 +44,8 @@ def _get_folder_by_category(category: str):
     Returns:
         Путь к директории с соответствующим контентом или None если категория не найдена
     """
-    from config import (
-        ERO_ANIME_DIR,
-        ERO_REAL_DIR,
-        SINGLE_MEME_DIR,
-        STANDART_ART_DIR,
-        STANDART_MEME_DIR,
-        VIDEO_MEME_DIR,
-        VIDEO_ERO_DIR,
-        VIDEO_AUTO_DIR
-    )
-    if category == "ero-anime":
-        return ERO_ANIME_DIR
-    elif category == "ero-real":
-        return ERO_REAL_DIR
-    elif category == "single-meme":
-        return SINGLE_MEME_DIR
-    elif category == "standart-art":
-        return STANDART_ART_DIR
-    elif category == "standart-meme":
-        return STANDART_MEME_DIR
-    elif category == "video-meme":
-        return VIDEO_MEME_DIR
-    elif category == "video-ero":
-        return VIDEO_ERO_DIR
-    elif category == "video-auto":
-        return VIDEO_AUTO_DIR
-    return None
+    # Категории в командах пишутся через дефис, а в paths_config — через подчёркивание
+    return get_config().content_dirs.get(category.replace("-", "_"))
 
 
 async def autopost_10_pics_callback(context: ContextTypes.DEFAULT_TYPE):
@@ -83,6 +58,7 @@ async def autopost_10_pics_callback(context: ContextTypes.DEFAULT_TYPE):
     """
     if not state.autopost_enabled:
         return
+    post_chat_id = get_config().post_chat_id
     categories = [
         "ero-real",
         "standart-art/standart-meme",
@@ -98,7 +74,7 @@ async def autopost_10_pics_callback(context: ContextTypes.DEFAULT_TYPE):
 
     anecdote = get_top_anecdote_and_remove()
     if not anecdote:
-        await context.bot.send_message(chat_id=POST_CHAT_ID, text="Анекдоты закончились 😭")
+        await context.bot.send_message(chat_id=post_chat_id, text="Анекдоты закончились 😭")
         return
 
     media = []
@@ -120,7 +96,7 @@ async def autopost_10_pics_callback(context: ContextTypes.DEFAULT_TYPE):
 
         if file_path is None:
             await context.bot.send_message(
-                chat_id=POST_CHAT_ID,
+                chat_id=post_chat_id,
                 text=f"У нас закончились {cat} 😭"
             )
             return
@@ -132,7 +108,7 @@ async def autopost_10_pics_callback(context: ContextTypes.DEFAULT_TYPE):
         if not is_valid_file(file_path):
             logger.error(f"Файл не прошел проверку: {file_path}")
             await context.bot.send_message(
-                chat_id=POST_CHAT_ID,
+                chat_id=post_chat_id,
                 text=f"Файл для категории {real_cat} не прошел проверку: {file_path}"
             )
             return
@@ -143,21 +119,19 @@ async def autopost_10_pics_callback(context: ContextTypes.DEFAULT_TYPE):
     try:
         # Отправляем медиагруппу из 10 изображений
         await context.bot.send_media_group(
-            chat_id=POST_CHAT_ID,
-            media=media,
-            read_timeout=180
+            chat_id=post_chat_id,
+            media=media
         )
         # Отправляем анекдот отдельным сообщением
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
-            text=anecdote,
-            read_timeout=180
+            chat_id=post_chat_id,
+            text=anecdote
         )
     except Exception as e:
         # Логируем список файлов, с которыми произошла ошибка
         logger.error(f"Ошибка при отправке поста. Файлы: {used_files}. Ошибка: {e}")
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=post_chat_id,
             text=f"Ошибка при отправке поста: {e}"
         )
         return
@@ -179,10 +153,11 @@ async def autopost_4_videos_callback(context: ContextTypes.DEFAULT_TYPE):
     """
     if not state.autopost_enabled:
         return
+    post_chat_id = get_config().post_chat_id
 
     anecdote = get_top_anecdote_and_remove()
     if not anecdote:
-        await context.bot.send_message(chat_id=POST_CHAT_ID, text="Анекдоты закончились 😭")
+        await context.bot.send_message(chat_id=post_chat_id, text="Анекдоты закончились 😭")
         return
 
     media = []
@@ -192,7 +167,7 @@ async def autopost_4_videos_callback(context: ContextTypes.DEFAULT_TYPE):
     file_meme = get_random_file_from_folder(_get_folder_by_category("video-meme"))
     if file_meme is None:
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=post_chat_id,
             text="Не хватает видео video-meme 😭"
         )
         return
@@ -206,7 +181,7 @@ async def autopost_4_videos_callback(context: ContextTypes.DEFAULT_TYPE):
         category_ero = "video-meme" # меняем категорию для перемещения в архив
         if file_ero is None:
             await context.bot.send_message(
-                chat_id=POST_CHAT_ID,
+                chat_id=post_chat_id,
                 text="Не хватает видео video-meme для замены video-ero 😭"
             )
             return
@@ -220,7 +195,7 @@ async def autopost_4_videos_callback(context: ContextTypes.DEFAULT_TYPE):
         category_auto1 = "video-meme" # меняем категорию для перемещения в архив
         if file_auto1 is None:
             await context.bot.send_message(
-                chat_id=POST_CHAT_ID,
+                chat_id=post_chat_id,
                 text="Не хватает видео video-meme для замены video-auto 😭"
             )
             return
@@ -234,7 +209,7 @@ async def autopost_4_videos_callback(context: ContextTypes.DEFAULT_TYPE):
         category_auto2 = "video-meme" # меняем категорию для перемещения в архив
         if file_auto2 is None:
             await context.bot.send_message(
-                chat_id=POST_CHAT_ID,
+                chat_id=post_chat_id,
                 text="Не хватает видео video-meme для замены второго video-auto 😭"
             )
             return
@@ -250,7 +225,7 @@ async def autopost_4_videos_callback(context: ContextTypes.DEFAULT_TYPE):
         if not is_valid_file(file_path):
             logger.error(f"Видео не прошло проверку: {file_path}")
             await context.bot.send_message(
-                chat_id=POST_CHAT_ID,
+                chat_id=post_chat_id,
                 text=f"Видео из категории {category} не прошло проверку: {file_path}"
             )
             return
@@ -262,20 +237,18 @@ async def autopost_4_videos_callback(context: ContextTypes.DEFAULT_TYPE):
     try:
         # Увеличиваем таймаут до 180 секунд
         await context.bot.send_media_group(
-            chat_id=POST_CHAT_ID,
-            media=media,
-            read_timeout=180
+            chat_id=post_chat_id,
+            media=media
         )
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
-            text=anecdote,
-            read_timeout=180
+            chat_id=post_chat_id,
+            text=anecdote
         )
     except Exception as e:
         # Логируем подробности об ошибке вместе с информацией о файлах
         logger.error(f"Ошибка при отправке видео. Файлы: {used_files}. Ошибка: {e}")
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=post_chat_id,
             text=f"Ошибка при отправке видео: {e}\nИспользуемые файлы: {used_files}"
         )
         return
@@ -483,7 +456,7 @@ async def next_posts_command(update, context):
     """
     Показывает время следующего запуска постов
     и сколько до них осталось (в часах и минутах).
-    Отображает время в локальном часовом поясе согласно настройке TIMEZONE_OFFSET.
+    Отображает время в локальном часовом поясе согласно настройке timezone_offset.
     """
     # Получаем текущее время в UTC
     now_utc = datetime.datetime.now(datetime.timezone.utc)
@@ -495,6 +468,7 @@ async def next_posts_command(update, context):
         await context.bot.send_message(chat_id=update.effective_chat.id, text="Нет запланированных задач.")
         return
 
+    timezone_offset = get_config().timezone_offset
     lines = []
     for job in all_jobs:
         if job.next_run_time is None:
@@ -508,13 +482,13 @@ async def next_posts_command(update, context):
             continue
 
         # Конвертируем время запуска в локальный часовой пояс
-        local_timezone = datetime.timezone(datetime.timedelta(hours=TIMEZONE_OFFSET))
+        local_timezone = datetime.timezone(datetime.timedelta(hours=timezone_offset))
         job_next_local = job_next_utc.astimezone(local_timezone)
         
         hours = int(total_seconds // 3600)
         minutes = int((total_seconds % 3600) // 60)
         lines.append(f"Задача: {job.name}")
-        lines.append(f"  Следующий запуск: {job_next_local.strftime('%Y-%m-%d %H:%M:%S')} (UTC+{TIMEZONE_OFFSET})")
+        lines.append(f"  Следующий запуск: {job_next_local.strftime('%Y-%m-%d %H:%M:%S')} (UTC+{timezone_offset})")
         lines.append(f"  До запуска осталось: {hours} ч {minutes} мин\n")
 
     if not lines:
@@ -8,9 +8,23 @@
 import os
 import json
 import logging
+from contextlib import contextmanager
 
 BALANCE_FILE = "state_data/balance.json"
 
+# Балансы, загруженные на время balance_batch(); None — пакет не открыт
+_batch_balances = None
+_batch_dirty = False
+# Номер изменения балансов: растёт при каждом save_balances
+_version = 0
+
+def balances_version() -> int:
+    """
+    Номер последнего изменения балансов. Если он не изменился,
+    ранее прочитанные балансы актуальны и файл можно не перечитывать.
+    """
+    return _version
+
 def load_balances() -> dict:
     """
     Загружает словарь балансов пользователей из файла.
@@ -19,6 +33,8 @@ def load_balances() -> dict:
         dict: Словарь вида { str(user_id): { 'balance': int, 'name': str } }
         Если файл пуст или не существует, возвращается пустой словарь.
     """
+    if _batch_balances is not None:
+        return _batch_balances
     if not os.path.exists(BALANCE_FILE):
         return {}
     try:
@@ -36,7 +52,16 @@ def save_balances(balances: dict):
     
     Args:
         balances: Словарь вида { str(user_id): { 'balance': int, 'name': str } }
+
+    Note:
+        Внутри balance_batch() запись откладывается до конца пакета.
     """
+    global _batch_balances, _batch_dirty, _version
+    _version += 1
+    if _batch_balances is not None:
+        _batch_balances = balances
+        _batch_dirty = True
+        return
     try:
         with open(BALANCE_FILE, "w", encoding="utf-8") as f:
             json.dump(balances, f, ensure_ascii=False, indent=4)
@@ -90,3 +115,26 @@ def update_balance(user_id: int, delta: int):
         logging.debug(f"Создание баланса для {user_id}: новый баланс {data[user_id_str]}")
     
     save_balances(data)  # Сохраняем изменения
+
+
+@contextmanager
+def balance_batch():
+    """
+    Объединяет изменения балансов в пакет: файл читается при входе
+    и записывается один раз при выходе (если что-то изменилось).
+    Вложенные пакеты присоединяются к внешнему.
+    """
+    global _batch_balances, _batch_dirty
+    if _batch_balances is not None:
+        yield
+        return
+    _batch_balances = load_balances()
+    _batch_dirty = False
+    try:
+        yield
+    finally:
+        data, dirty = _batch_balances, _batch_dirty
+        _batch_balances = None
+        _batch_dirty = False
+        if dirty:
+            save_balances(data)
@@ -9,6 +9,8 @@ import json
 import logging
 import datetime
 from balance import load_balances, update_balance, get_balance
+from member_directory import member_directory
+from casino.session import casino_sessions
 
 # Константы для хранения путей к файлам
 BETTING_EVENTS_FILE = "post_materials/betting_events.json"
@@ -173,6 +175,10 @@ def place_bet(user_id, user_name, event_id, option_id, amount):
     Returns:
         bool: True, если ставка успешно размещена, False в противном случае
     """
+    # Спины казино копятся в памяти сессии: записываем их до проверки,
+    # чтобы не поставить уже проигранные монеты
+    casino_sessions.flush(user_id)
+
     # Проверяем баланс пользователя
     user_balance = get_balance(user_id)
     if user_balance < amount:
@@ -300,7 +306,7 @@ def process_event_results(event_id, winner_option_id):
         losers = []  # Создаем список проигравших
         for user_id_str, user_data in betting_data["active_bets"][event_id_str].items():
             user_id = int(user_id_str)
-            user_name = user_data.get("user_name", "Unknown")
+            user_name = member_directory.display_name(user_id, user_data.get("user_name"), "Unknown")
             total_bet = sum(bet.get("amount", 0) for bet in user_data.get("bets", []))
             
             # При проигрыше не возвращаем ставку, но добавляем пользователя в список проигравших
@@ -357,7 +363,7 @@ def process_event_results(event_id, winner_option_id):
     
     for user_id_str, user_data in betting_data["active_bets"][event_id_str].items():
         user_id = int(user_id_str)
-        user_name = user_data.get("user_name", "Unknown")
+        user_name = member_directory.display_name(user_id, user_data.get("user_name"), "Unknown")
         
         # Обрабатываем все ставки пользователя
         total_win = 0
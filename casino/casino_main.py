@@ -5,7 +5,7 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 import logging
-from balance import get_balance
+from casino.session import casino_sessions
 from casino.slots import handle_slots_callback, handle_slots_bet_callback
 from casino.roulette import handle_roulette_bet, handle_roulette_bet_callback, handle_change_bet
 
@@ -26,7 +26,8 @@ async def casino_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     try:
-        bal = get_balance(user_id)  # Получаем актуальный баланс для этого user_id
+        # Вход в меню открывает сессию казино и перечитывает актуальный баланс
+        bal = casino_sessions.open(user_id).balance
         logging.debug(f"Баланс пользователя {user_id}: {bal}")
 
         # Отправляем меню казино с актуальным балансом
@@ -130,7 +131,7 @@ async def casino_callback_handler(update: Update, context: ContextTypes.DEFAULT_
             # Обработка ставки в рулетке
             bet_type = data.split(":")[1]
             bet_amount = int(data.split(":")[2])
-            context.user_data['bet_amount'] = bet_amount
+            casino_sessions.set_game_bet(query.from_user.id, 'roulette', bet_amount)
             await handle_roulette_bet_callback(query, context, bet_type)
         elif data.startswith("slots_bet:"):
             # Обработка ставки для слотов
@@ -139,7 +140,8 @@ async def casino_callback_handler(update: Update, context: ContextTypes.DEFAULT_
             # Возврат в главное меню казино
             await casino_command(update, context)
         elif data == "casino:exit":
-            # Выход из казино
+            # Выход из казино: записываем результаты сессии
+            casino_sessions.close(query.from_user.id)
             await query.message.delete()
             await query.answer("Вы покинули казино. До встречи! 👋")
         else:
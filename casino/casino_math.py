@@ -0,0 +1,221 @@
+# casino/casino_math.py
+"""
+Математика казино: исходы, выплаты и симулятор.
+Обеспечивает:
+- Таблицы исходов с заранее посчитанными накопленными весами: один вызов генератора
+  и двоичный поиск на спин вместо построения списка вероятностей каждый раз
+- Правила выплат рулетки и слотов в одном месте
+- Точный расчёт RTP (доля возвращаемых ставок) по таблицам
+- Векторизованный симулятор Монте-Карло на NumPy: RTP, дисперсия, кривые разорения
+  и скорость расчёта спинов
+
+Симулятору нужен NumPy (необязательная зависимость): pip install numpy.
+Запуск: python -m casino.casino_math --spins 1000000
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+import time
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class OutcomeTable:
+    """
+    Таблица исходов с весами. Накопленные веса считаются один раз при создании.
+    """
+
+    __slots__ = ('outcomes', 'weights', 'cumulative', 'total')
+
+    def __init__(self, outcomes, weights):
+        if len(outcomes) != len(weights) or not outcomes:
+            raise ValueError("Число исходов и весов должно совпадать и быть больше нуля")
+        self.outcomes = tuple(outcomes)
+        self.weights = tuple(weights)
+        self.cumulative = tuple(itertools.accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def probability(self, outcome) -> float:
+        return sum(w for o, w in zip(self.outcomes, self.weights) if o == outcome) / self.total
+
+    def draw(self, rng=random):
+        """Один исход: одно случайное число и двоичный поиск по накопленным весам."""
+        return self.outcomes[bisect.bisect_right(self.cumulative, rng.random() * self.total)]
+
+    def draw_indices(self, generator, size):
+        """Индексы исходов для массива размера size (NumPy Generator)."""
+        cumulative = np.asarray(self.cumulative, dtype=float)
+        return np.searchsorted(cumulative, generator.random(size) * self.total, side='right')
+
+
+# --- Рулетка ---
+
+# 1/36 на зеро, оставшееся поровну между чёрным и красным
+ROULETTE_TABLE = OutcomeTable(('black', 'red', 'zero'), (17.5, 17.5, 1))
+
+# Во сколько раз ставка умножается при выигрыше
+ROULETTE_MULTIPLIERS = {'black': 2, 'red': 2, 'zero': 36}
+
+
+def roulette_payout(bet_type: str, result: str, bet: int) -> int:
+    """Выигрыш по ставке на bet_type при выпавшем result (0 при проигрыше)."""
+    return bet * ROULETTE_MULTIPLIERS[bet_type] if result == bet_type else 0
+
+
+# --- Слоты ---
+
+SLOT_SYMBOLS = ("🍒", "🍋", "🔔", "🍀", "💎", "7️⃣")
+SLOT_REELS = 3
+
+# Все комбинации барабанов равновероятны: один выбор вместо выбора символа на каждый барабан
+SLOT_COMBINATIONS = tuple(itertools.product(SLOT_SYMBOLS, repeat=SLOT_REELS))
+
+# Во сколько раз ставка умножается при выигрыше
+SLOTS_MULTIPLIERS = {'jackpot': 5, 'pair': 2, 'none': 0}
+
+
+def spin_reels(rng=random) -> list:
+    """Результат спина слотов: символы трёх барабанов."""
+    return list(SLOT_COMBINATIONS[int(rng.random() * len(SLOT_COMBINATIONS))])
+
+
+def slots_outcome(reel) -> str:
+    """'jackpot' — три одинаковых, 'pair' — два одинаковых, иначе 'none'."""
+    distinct = len(set(reel))
+    if distinct == 1:
+        return 'jackpot'
+    if distinct < len(reel):
+        return 'pair'
+    return 'none'
+
+
+def slots_payout(reel, bet: int) -> int:
+    """Выигрыш по ставке bet для комбинации reel (0 при проигрыше)."""
+    return bet * SLOTS_MULTIPLIERS[slots_outcome(reel)]
+
+
+# --- Точный RTP ---
+
+def roulette_rtp(bet_type: str) -> float:
+    """Ожидаемая доля возврата ставки в рулетке."""
+    return ROULETTE_TABLE.probability(bet_type) * ROULETTE_MULTIPLIERS[bet_type]
+
+
+def slots_rtp() -> float:
+    """Ожидаемая доля возврата ставки в слотах."""
+    counts = Counter(slots_outcome(reel) for reel in SLOT_COMBINATIONS)
+    return sum(SLOTS_MULTIPLIERS[kind] * count for kind, count in counts.items()) / len(SLOT_COMBINATIONS)
+
+
+# --- Симулятор ---
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Для симулятора установите numpy: pip install numpy")
+
+
+def simulate_roulette_multipliers(generator, size, bet_type='red'):
+    """Массив множителей выплат для size спинов рулетки со ставкой на bet_type."""
+    _require_numpy()
+    results = ROULETTE_TABLE.draw_indices(generator, size)
+    hit = results == ROULETTE_TABLE.outcomes.index(bet_type)
+    return np.where(hit, ROULETTE_MULTIPLIERS[bet_type], 0)
+
+
+def simulate_slots_multipliers(generator, size):
+    """Массив множителей выплат для size спинов слотов."""
+    _require_numpy()
+    # Множители считаются по тем же правилам, что и в игре, один раз на комбинацию
+    multipliers = np.array([slots_payout(reel, 1) for reel in SLOT_COMBINATIONS])
+    return multipliers[generator.integers(0, len(SLOT_COMBINATIONS), size=size)]
+
+
+GAMES = {
+    'roulette': simulate_roulette_multipliers,
+    'slots': simulate_slots_multipliers,
+}
+
+
+def simulate(game, spins, seed=None, chunk=1_000_000, **kwargs) -> dict:
+    """
+    Симулирует spins спинов с единичной ставкой.
+
+    Returns:
+        dict: rtp — средний возврат ставки, variance — дисперсия выигрыша за спин
+        (в ставках), hit_rate — доля выигрышных спинов, spins_per_second — скорость
+    """
+    _require_numpy()
+    generator = np.random.default_rng(seed)
+    simulate_chunk = GAMES[game]
+    total = total_sq = hits = 0.0
+    started = time.perf_counter()
+    done = 0
+    while done < spins:
+        size = min(chunk, spins - done)
+        multipliers = simulate_chunk(generator, size, **kwargs)
+        net = multipliers - 1
+        total += float(multipliers.sum())
+        total_sq += float((net.astype(float) ** 2).sum())
+        hits += float((multipliers > 0).sum())
+        done += size
+    elapsed = time.perf_counter() - started
+    rtp = total / spins
+    mean_net = rtp - 1
+    return {
+        'spins': spins,
+        'rtp': rtp,
+        'variance': total_sq / spins - mean_net ** 2,
+        'hit_rate': hits / spins,
+        'spins_per_second': spins / elapsed if elapsed > 0 else float('inf'),
+    }
+
+
+def ruin_curve(game, bankroll, bet, spins, players=1000, checkpoints=10, seed=None, **kwargs) -> list:
+    """
+    Доля игроков, которые не могут сделать очередную ставку, по ходу игры.
+
+    Каждый из players игроков начинает с bankroll и ставит bet каждый спин.
+
+    Returns:
+        list: Пары (номер спина, доля разорившихся)
+    """
+    _require_numpy()
+    generator = np.random.default_rng(seed)
+    multipliers = GAMES[game](generator, (players, spins), **kwargs)
+    balances = bankroll + np.cumsum((multipliers - 1) * bet, axis=1)
+    # Игрок разорён к спину t, если до этого баланс хоть раз опускался ниже ставки
+    ruined = np.minimum.accumulate(balances, axis=1) < bet
+    steps = np.unique(np.linspace(1, spins, checkpoints, dtype=int))
+    return [(int(step), float(ruined[:, step - 1].mean())) for step in steps]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Симулятор выплат казино")
+    parser.add_argument('--spins', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--bankroll', type=int, default=100)
+    parser.add_argument('--bet', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    runs = [('slots', {}, slots_rtp())] + [
+        ('roulette', {'bet_type': bet_type}, roulette_rtp(bet_type)) for bet_type in ('red', 'zero')
+    ]
+    for game, kwargs, expected in runs:
+        stats = simulate(game, args.spins, seed=args.seed, **kwargs)
+        label = f"{game} {kwargs.get('bet_type', '')}".strip()
+        print(
+            f"{label}: RTP {stats['rtp']:.4f} (точно {expected:.4f}), дисперсия {stats['variance']:.3f}, "
+            f"выигрышных {stats['hit_rate']:.2%}, {stats['spins_per_second']:,.0f} спинов/с"
+        )
+        curve = ruin_curve(game, args.bankroll, args.bet, 1000, seed=args.seed, **kwargs)
+        print("  разорение: " + ", ".join(f"{step}: {share:.1%}" for step, share in curve))
+
+
+if __name__ == "__main__":
+    main()
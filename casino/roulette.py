@@ -6,24 +6,31 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 import asyncio
-import random
-from balance import get_balance, update_balance
+from rng import rng
+from casino.session import casino_sessions
 from casino.roulette_utils import get_roulette_result
+from casino.casino_math import roulette_payout, ROULETTE_MULTIPLIERS
 from telegram.error import TimedOut
 import time
-import json
-import os
+from config import get_config
+from animations import Frame, frame_scheduler
+
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('casino')
+
+# Сколько секунд крутится гифка рулетки перед показом результата
+SPIN_DURATION = 5.5
 
 def load_file_ids():
     """
-    Загрузка ID файлов анимаций из конфигурации.
+    Возвращает ID файлов анимаций из текущего снимка конфигурации.
+    Файл file_ids.json не перечитывается: он загружается при старте
+    и при /reload_config.
     
     Returns:
-        dict: Словарь с идентификаторами файлов для разных типов анимаций
+        Mapping: Словарь с идентификаторами файлов для разных типов анимаций
     """
-    config_path = os.path.join('config', 'file_ids.json')
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return get_config().file_ids
 
 async def safe_delete_message(gif_message, retries=3, delay=1):
     """
@@ -43,10 +50,22 @@ async def safe_delete_message(gif_message, retries=3, delay=1):
             await asyncio.sleep(delay)
     print("Не удалось удалить сообщение после нескольких попыток.")
 
+async def _set_reply_markup(query, reply_markup):
+    """Меняет кнопки сообщения; ошибка (например, кнопки уже сняты) не прерывает игру."""
+    try:
+        await query.edit_message_reply_markup(reply_markup=reply_markup)
+    except Exception as e:
+        print(f"Ошибка при обновлении кнопок сообщения: {e}")
+
 async def handle_roulette_bet_callback(query, context: ContextTypes.DEFAULT_TYPE, bet_type: str):
     """
-    Обработчик ставки в рулетке. Вычитает ставку из баланса, 
-    запускает анимацию, определяет результат и обновляет баланс в случае выигрыша.
+    Обработчик ставки в рулетке. Определяет результат, одной операцией
+    списывает ставку и начисляет выигрыш, отправляет анимацию и планирует
+    показ результата через JobQueue.
+
+    Кнопки ставок снимаются до списания, чтобы повторное нажатие на то же
+    сообщение не запустило второй спин. Показ результата — завершающий кадр
+    анимации, поэтому он выполняется, даже если анимацию отменят.
     
     Args:
         query: Объект callback-запроса от кнопки
@@ -55,49 +74,38 @@ async def handle_roulette_bet_callback(query, context: ContextTypes.DEFAULT_TYPE
     """
     bet_amount = int(query.data.split(":")[-1])  
     user_id = query.from_user.id
-    bal = get_balance(user_id)
+    result = get_roulette_result()
+    winnings = roulette_payout(bet_type, result, bet_amount)
+    win = winnings > 0
 
-    if bal < bet_amount:
+    bet_markup = query.message.reply_markup
+    await _set_reply_markup(query, None)
+
+    # Проверка баланса, списание ставки и выигрыш — в памяти сессии казино
+    new_balance = casino_sessions.settle(user_id, bet_amount, winnings, game='roulette')
+    if new_balance is None:
+        # Ставка не принята: возвращаем кнопки ставок
+        await _set_reply_markup(query, bet_markup)
         await query.answer("💸 У вас недостаточно средств для ставки.", show_alert=True)
         return
 
-    update_balance(user_id, -bet_amount)
-    result = get_roulette_result()
-
     # Загружаем ID гифок из конфига
     file_ids = load_file_ids()
     gif_ids = file_ids['animations']['roulette']
 
     if result == 'black':
-        gif_id = random.choice(gif_ids['black'])
+        gif_id = _random.choice(gif_ids['black'])
     elif result == 'red':
-        gif_id = random.choice(gif_ids['red'])
+        gif_id = _random.choice(gif_ids['red'])
     else:
-        gif_id = random.choice(gif_ids['zero'])
-
-    try:
-        gif_message = await query.message.chat.send_animation(gif_id)
-    except Exception as e:
-        print(f"Ошибка при отправке гифки: {e}")
-        return
-
-    await asyncio.sleep(5.5)
-    await safe_delete_message(gif_message)
-
-    win = result == bet_type
+        gif_id = _random.choice(gif_ids['zero'])
 
     if win:
-        base_winnings = 100 if bet_type != 'zero' else 1800
-        winnings = int(base_winnings * (bet_amount / 50))
-        if bet_type == 'zero':
-            winnings = int(winnings)
-        update_balance(user_id, winnings)
         message = f"🎉 *Поздравляем!* Вы выиграли {winnings} монет! 🎉"
     else:
         result_emoji = "⚫" if result == "black" else "🔴" if result == "red" else "🟢"
         message = f"😔 *Вы проиграли.* Выпало: {result_emoji}"
 
-    new_balance = get_balance(user_id)
     message += f"\n\n💰 *Ваш текущий баланс*: {new_balance} монет."
 
     keyboard = [
@@ -107,9 +115,32 @@ async def handle_roulette_bet_callback(query, context: ContextTypes.DEFAULT_TYPE
     markup = InlineKeyboardMarkup(keyboard)
 
     try:
-        await query.message.edit_text(message, reply_markup=markup, parse_mode='Markdown')
+        gif_message = await query.message.chat.send_animation(gif_id)
     except Exception as e:
-        print(f"Ошибка при обновлении текста сообщения: {e}")
+        print(f"Ошибка при отправке гифки: {e}")
+        # Ставка уже рассчитана: показываем результат без анимации
+        await query.answer()
+        try:
+            await query.message.edit_text(message, reply_markup=markup, parse_mode='Markdown')
+        except Exception as e:
+            print(f"Ошибка при обновлении текста сообщения: {e}")
+        return
+
+    async def reveal():
+        await safe_delete_message(gif_message)
+        try:
+            await query.message.edit_text(message, reply_markup=markup, parse_mode='Markdown')
+        except Exception as e:
+            print(f"Ошибка при обновлении текста сообщения: {e}")
+
+    # Результат уже рассчитан; показываем его, когда гифка докрутится, обработчик не ждёт
+    frame_scheduler.start(
+        context.job_queue,
+        f"roulette:{query.message.chat_id}:{query.message.message_id}",
+        query.message.chat_id,
+        [],
+        finale=[Frame(reveal, delay=SPIN_DURATION)]
+    )
 
     await query.answer()
 
@@ -126,11 +157,11 @@ async def handle_roulette_bet(update: Update, context: ContextTypes.DEFAULT_TYPE
         context: Контекст обработчика
     """
     user_id = update.effective_user.id
-    bal = get_balance(user_id)
+    bal = casino_sessions.balance(user_id)
     min_bet = 5
     max_bet = bal
 
-    bet_amount = context.user_data.get('bet_amount', min_bet)
+    bet_amount = casino_sessions.game_bet(user_id, 'roulette', min_bet)
     bet_amount = max(min_bet, min(bet_amount, max_bet))
 
     keyboard = [
@@ -153,8 +184,8 @@ async def handle_roulette_bet(update: Update, context: ContextTypes.DEFAULT_TYPE
         "🎰 **Рулетка**\n\n"
         f"💰 **Ставка**: {bet_amount} монет\n"
         "🎁 **Выигрыш**:\n"
-        f"- **Чёрное / Красное**: {int(100 * (bet_amount / 50))} монет\n"
-        f"- **Зеро**: {int(1800 * (bet_amount / 50))} монет\n\n"
+        f"- **Чёрное / Красное**: {bet_amount * ROULETTE_MULTIPLIERS['red']} монет\n"
+        f"- **Зеро**: {bet_amount * ROULETTE_MULTIPLIERS['zero']} монет\n\n"
         "Выберите ставку или измените сумму ставки:"
     )
 
@@ -168,7 +199,7 @@ async def handle_roulette_bet(update: Update, context: ContextTypes.DEFAULT_TYPE
     except Exception as e:
         print(f"Ошибка при обновлении текста сообщения с меню ставок: {e}")
 
-    context.user_data['bet_amount'] = bet_amount
+    casino_sessions.set_game_bet(user_id, 'roulette', bet_amount)
     await update.callback_query.answer()
 
 
@@ -182,11 +213,11 @@ async def handle_change_bet(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context: Контекст обработчика
     """
     user_id = update.effective_user.id
-    bal = get_balance(user_id)
+    bal = casino_sessions.balance(user_id)
     min_bet = 5
     max_bet = bal
 
-    bet_amount = context.user_data.get('bet_amount', min_bet)
+    bet_amount = casino_sessions.game_bet(user_id, 'roulette', min_bet)
 
     if update.callback_query.data == "change_bet:+5":
         bet_amount += 5
@@ -195,6 +226,6 @@ async def handle_change_bet(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     bet_amount = max(min_bet, min(bet_amount, max_bet))
 
-    context.user_data['bet_amount'] = bet_amount
+    casino_sessions.set_game_bet(user_id, 'roulette', bet_amount)
 
     await handle_roulette_bet(update, context)
@@ -3,7 +3,11 @@
 Вспомогательные функции для игры в рулетку.
 Содержит функционал для определения результатов спина рулетки.
 """
-import random
+from rng import rng
+from casino.casino_math import ROULETTE_TABLE
+
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('casino')
 
 def get_roulette_result():
     """
@@ -17,8 +21,4 @@ def get_roulette_result():
     Returns:
         str: Результат спина - 'black', 'red' или 'zero'
     """
-    outcomes = ['black', 'red', 'zero']
-    probabilities = [17.5 / 36, 17.5 / 36, 1 / 36]  # 1/36 на zero, оставшееся равномерно между black и red
-    
-    result = random.choices(outcomes, probabilities)[0]
-    return result
+    return ROULETTE_TABLE.draw(_random)
@@ -0,0 +1,230 @@
+# casino/session.py
+"""
+Модуль игровых сессий казино.
+Обеспечивает:
+- Сессию пользователя, которая открывается в меню казино и живёт в памяти между спинами:
+  снимок баланса, выбранные ставки игр и история игр
+- Расчёт спина одной операцией в памяти, без чтения и записи balance.json
+- Отложенную запись: изменения всех сессий за flush_delay секунд попадают в файл одной записью
+- Закрытие сессии после простоя с записью накопленных изменений; число сессий
+  ограничено, самые давние вытесняются (хранилище session_store)
+"""
+
+import asyncio
+import atexit
+import logging
+import time
+from collections import deque
+
+from balance import get_balance, update_balance, balance_batch, balances_version
+from session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+# Через сколько секунд простоя сессия закрывается
+SESSION_IDLE_TIMEOUT = 15 * 60
+# Сколько последних игр хранится в истории сессии
+HISTORY_SIZE = 20
+# Больше сессий одновременно не хранится
+MAX_SESSIONS = 1000
+
+
+class CasinoSession:
+    """
+    Состояние пользователя в казино.
+
+    balance — баланс с учётом спинов этой сессии, pending — изменение баланса,
+    ещё не записанное в balance.json, bets — ставка, выбранная в каждой игре,
+    synced — номер изменения балансов (balances_version), с которым сверен balance.
+    """
+
+    __slots__ = ('user_id', 'balance', 'bet', 'bets', 'history', 'pending', 'synced', 'last_active')
+
+    def __init__(self, user_id, balance, history_size=HISTORY_SIZE):
+        self.user_id = user_id
+        self.balance = balance
+        self.bet = None
+        self.bets = {}
+        self.history = deque(maxlen=history_size)
+        self.pending = 0
+        self.synced = balances_version()
+        self.last_active = time.monotonic()
+
+
+class CasinoSessionManager:
+    """
+    Сессии казино по user_id в хранилище с вытеснением по простою и по размеру.
+    Перед вытеснением сессии её незаписанные спины сохраняются.
+    """
+
+    def __init__(self, idle_timeout=SESSION_IDLE_TIMEOUT, history_size=HISTORY_SIZE, flush_delay=1.0,
+                 max_sessions=MAX_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.history_size = history_size
+        self.flush_delay = flush_delay
+        self._sessions = SessionStore(
+            ttl=idle_timeout, max_entries=max_sessions, on_evict=self._on_evict, clock=time.monotonic,
+        )
+        self._dirty = set()
+        self._flush_handle = None
+
+    def open(self, user_id) -> CasinoSession:
+        """
+        Открывает сессию (вход в меню казино). Баланс перечитывается из файла,
+        чтобы учесть начисления вне казино; незаписанные спины сначала сохраняются.
+        """
+        self.expire()
+        session = self._sessions.get(user_id)
+        if session is not None and session.pending:
+            self.flush()
+        balance = get_balance(user_id)
+        if session is None:
+            session = CasinoSession(user_id, balance, self.history_size)
+            self._sessions.put(user_id, session)
+        else:
+            session.balance = balance
+            session.synced = balances_version()
+        return session
+
+    def get(self, user_id) -> CasinoSession:
+        """Возвращает сессию пользователя, открывая её при необходимости."""
+        self.expire()
+        session = self._sessions.get(user_id)
+        if session is None:
+            return self.open(user_id)
+        return session
+
+    def balance(self, user_id) -> int:
+        """Баланс пользователя с учётом ещё не записанных спинов."""
+        return self._sync(self.get(user_id)).balance
+
+    def game_bet(self, user_id, game, default=None):
+        """Ставка, выбранная пользователем в игре game."""
+        return self.get(user_id).bets.get(game, default)
+
+    def set_game_bet(self, user_id, game, bet):
+        """Запоминает ставку, выбранную в игре game."""
+        self.get(user_id).bets[game] = bet
+
+    def settle(self, user_id, stake, payout, game=None) -> int | None:
+        """
+        Списывает ставку и начисляет выигрыш в памяти сессии.
+
+        Args:
+            user_id: ID пользователя Telegram
+            stake: Размер ставки
+            payout: Выигрыш (0 при проигрыше)
+            game: Название игры для истории
+
+        Returns:
+            int|None: Новый баланс или None, если монет на ставку не хватает
+        """
+        # Монеты могли списать вне казино (например, ставка в тотализаторе):
+        # достаточность проверяется по актуальному балансу
+        session = self._sync(self.get(user_id))
+        if session.balance < stake:
+            return None
+        delta = payout - stake
+        session.balance += delta
+        session.pending += delta
+        session.bet = stake
+        session.history.append((game, stake, payout))
+        if delta:
+            self._dirty.add(user_id)
+            self._schedule_flush()
+        return session.balance
+
+    def close(self, user_id):
+        """Закрывает сессию (выход из казино), записывая её изменения."""
+        if user_id in self._dirty:
+            self.flush()
+        self._sessions.pop(user_id, None)
+
+    def expire(self, now=None) -> int:
+        """
+        Закрывает сессии, простаивающие дольше idle_timeout.
+
+        Returns:
+            int: Количество закрытых сессий
+        """
+        return self._sessions.expire(now)
+
+    def flush(self, user_id=None):
+        """
+        Записывает изменения всех сессий одной операцией с balance.json.
+        Изменения применяются как разница, поэтому начисления вне казино не теряются.
+
+        Args:
+            user_id: Если указан, записываются только изменения этого пользователя
+                (перед списанием монет вне казино); остальные ждут отложенной записи
+        """
+        if user_id is not None:
+            if user_id not in self._dirty:
+                return
+            self._dirty.discard(user_id)
+            dirty = {user_id}
+        else:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+        flushed = []
+        with balance_batch():
+            for user_id in dirty:
+                session = self._sessions.peek(user_id)
+                if session is None or not session.pending:
+                    continue
+                update_balance(user_id, session.pending)
+                session.pending = 0
+                # Подтягиваем изменения, сделанные вне казино
+                session.balance = get_balance(user_id)
+                flushed.append(session)
+        version = balances_version()
+        for session in flushed:
+            session.synced = version
+        logger.debug(f"Записаны балансы {len(dirty)} сессий казино")
+
+    @property
+    def metrics(self) -> dict:
+        """Счётчики хранилища сессий, включая занимаемую память."""
+        return self._sessions.metrics
+
+    def __contains__(self, user_id):
+        return self._sessions.peek(user_id) is not None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _sync(self, session) -> CasinoSession:
+        """
+        Сверяет баланс сессии с balance.json, если балансы менялись после
+        последней сверки: файловый баланс плюс ещё не записанные спины.
+        """
+        version = balances_version()
+        if session.synced != version:
+            session.balance = get_balance(session.user_id) + session.pending
+            session.synced = version
+        return session
+
+    def _on_evict(self, user_id, session):
+        # Незаписанные спины вытесняемой сессии сохраняются до её удаления
+        if user_id in self._dirty:
+            self.flush()
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне цикла событий откладывать запись некому
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+
+# Общие сессии казино бота
+casino_sessions = CasinoSessionManager()
+atexit.register(casino_sessions.flush)
@@ -4,15 +4,16 @@
 - Выбор ставки в зависимости от баланса пользователя
 - Запуск игры в слоты с тремя барабанами
 - Расчет выигрыша в зависимости от комбинации символов
-- Управление балансом пользователя
+- Управление балансом пользователя через сессию казино
 """
-import random
 import logging
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-from balance import get_balance, update_balance
+from casino.session import casino_sessions
+from casino.casino_math import spin_reels, slots_outcome, slots_payout
+from rng import rng
 
-# Список символов для слотов
-SLOT_SYMBOLS = ["🍒", "🍋", "🔔", "🍀", "💎", "7️⃣"]
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('casino')
 
 async def handle_slots_callback(query, context):
     """
@@ -25,7 +26,7 @@ async def handle_slots_callback(query, context):
     """
     await query.answer()
     user_id = query.from_user.id
-    balance = get_balance(user_id)
+    balance = casino_sessions.balance(user_id)
     
     # Вычисляем ставки; минимальное значение – 1 монета
     bet_1 = max(int(balance * 0.01), 1)
@@ -33,7 +34,7 @@ async def handle_slots_callback(query, context):
     bet_10 = max(int(balance * 0.1), 1)
     
     # Сохраняем ставку по умолчанию (1%)
-    context.user_data['slots_bet'] = bet_1
+    casino_sessions.set_game_bet(user_id, 'slots', bet_1)
 
     # Создаем клавиатуру с тремя вариантами ставок
     keyboard = [
@@ -55,7 +56,7 @@ async def handle_slots_bet_callback(update, context):
         context: Контекст обработчика
     
     Note:
-        Правила выигрыша:
+        Правила выигрыша (множители — casino_math.SLOTS_MULTIPLIERS):
         - Три одинаковых символа: выигрыш = ставка * 5
         - Два одинаковых символа: выигрыш = ставка * 2
         - Нет совпадений: проигрыш ставки
@@ -72,40 +73,33 @@ async def handle_slots_bet_callback(update, context):
         return
 
     user_id = query.from_user.id
-    balance_now = get_balance(user_id)
-    
-    # Проверяем, достаточно ли монет для ставки
-    if balance_now < bet:
-        await query.edit_message_text("Недостаточно монет для этой ставки!")
-        return
-
-    # Сохраняем текущую ставку
-    context.user_data['slots_bet'] = bet
-
-    # Списываем ставку
-    update_balance(user_id, -bet)
 
-    # Генерируем результат игры (3 случайных символа)
-    reel = [random.choice(SLOT_SYMBOLS) for _ in range(3)]
+    # Генерируем результат игры (3 случайных символа) и выигрыш по таблице выплат
+    reel = spin_reels(_random)
     result_text = " | ".join(reel)
+    outcome = slots_outcome(reel)
+    win = slots_payout(reel, bet)
 
-    # Определяем выигрыш:
-    if reel[0] == reel[1] == reel[2]:
+    if outcome == 'jackpot':
         # Джекпот - три одинаковых символа
-        win = bet * 5
-        update_balance(user_id, win)
         result_message = f"🎰 {result_text} 🎰\n\nДжекпот! Вы выиграли {win} монет!"
-    elif reel[0] == reel[1] or reel[1] == reel[2] or reel[0] == reel[2]:
+    elif outcome == 'pair':
         # Две одинаковые - любая пара символов
-        win = bet * 2
-        update_balance(user_id, win)
         result_message = f"🎰 {result_text} 🎰\n\nДве одинаковые! Вы выиграли {win} монет!"
     else:
         # Нет совпадений - проигрыш
         result_message = f"🎰 {result_text} 🎰\n\nНичего не совпало. Вы проиграли {bet} монет."
 
+    # Проверка баланса, списание ставки и выигрыш — в памяти сессии казино
+    new_balance = casino_sessions.settle(user_id, bet, win, game='slots')
+    if new_balance is None:
+        await query.edit_message_text("Недостаточно монет для этой ставки!")
+        return
+
+    # Сохраняем текущую ставку
+    casino_sessions.set_game_bet(user_id, 'slots', bet)
+
     # Добавляем информацию о текущем балансе
-    new_balance = get_balance(user_id)
     result_message += f"\n\n💳 Ваш баланс: {new_balance} монет."
 
     # Клавиатура с кнопками: повторить игру и вернуться в меню казино
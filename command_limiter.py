@@ -0,0 +1,148 @@
+# command_limiter.py
+"""
+Модуль ограничения частоты команд пользователей.
+Обеспечивает:
+- Корзину токенов на пару (пользователь, класс команд): /roll, казино, звуковая
+  панель, /logout, /talk и их кнопки ограничиваются независимо друг от друга
+- Ограниченный по размеру LRU-словарь корзин: память не растёт с числом пользователей
+- Настройку классов из bot_config.rate_limits с применением после /reload_config
+
+Подключается в main.main одним обработчиком в ранней группе: лишние обновления
+останавливаются до того, как дойдут до обработчиков команд.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+
+from telegram.ext import ApplicationHandlerStop
+
+from config import get_config
+from rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def command_name(message) -> str | None:
+    """Команда из текста или подписи сообщения ("/roll@bot 20" -> "roll")."""
+    text = message.text or message.caption
+    if not text or not text.startswith("/"):
+        return None
+    return text[1:].split(maxsplit=1)[0].split("@", 1)[0].lower() or None
+
+
+class CommandLimiter:
+    """
+    Ограничитель вида { (user_id, класс): корзина } в порядке последнего обращения.
+    """
+
+    def __init__(self, settings_provider=lambda: get_config().rate_limits, clock=time.monotonic):
+        self._settings_provider = settings_provider
+        self._clock = clock
+        self._settings = None
+        self._commands = {}
+        self._callbacks = ()
+        self._buckets = OrderedDict()
+        # Корзины, владельцу которых уже ответили о превышении лимита
+        self._warned = set()
+
+    def classify(self, update) -> str | None:
+        """Класс команд обновления или None, если обновление не ограничивается."""
+        self._refresh()
+        if update.callback_query is not None:
+            data = update.callback_query.data or ""
+            for prefix, name in self._callbacks:
+                if data.startswith(prefix):
+                    return name
+            return None
+        if update.message is not None:
+            return self._commands.get(command_name(update.message))
+        return None
+
+    def acquire(self, user_id, name, now=None) -> float:
+        """
+        Списывает токен из корзины пользователя.
+
+        Returns:
+            float: 0, если команду можно выполнять, иначе сколько секунд подождать
+        """
+        self._refresh()
+        now = self._clock() if now is None else now
+        key = (user_id, name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            spec = self._settings['classes'][name]
+            bucket = self._buckets[key] = TokenBucket(1 / spec['interval'], spec['burst'], now)
+            if len(self._buckets) > self._settings['max_entries']:
+                evicted, _ = self._buckets.popitem(last=False)
+                self._warned.discard(evicted)
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.wait_time(now)
+        if wait > 0:
+            return wait
+        bucket.consume(now)
+        self._warned.discard(key)
+        return 0.0
+
+    async def __call__(self, update, context):
+        """Обработчик ранней группы: останавливает обновление, если лимит исчерпан."""
+        name = self.classify(update)
+        if name is None or update.effective_user is None:
+            return
+        wait = self.acquire(update.effective_user.id, name)
+        if not wait:
+            return
+        text = f"Слишком быстро! Подождите {wait:.1f} секунд."
+        if update.callback_query is not None:
+            # Кнопку нужно подтвердить в любом случае, иначе она останется «нажатой»
+            await update.callback_query.answer(text=text, show_alert=True)
+        else:
+            key = (update.effective_user.id, name)
+            # В чат отвечаем один раз, чтобы ответы на спам не стали спамом
+            if key not in self._warned:
+                self._warned.add(key)
+                logger.info(f"Пользователь {update.effective_user.id} превысил лимит команд '{name}'")
+                await update.message.reply_text(text)
+        raise ApplicationHandlerStop
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _refresh(self):
+        """
+        Перестраивает индекс классов, если настройки изменились. /reload_config
+        создаёт новый снимок и при неизменных лимитах, поэтому настройки
+        сравниваются по значению, а сбрасываются корзины только изменённых классов.
+        """
+        settings = self._settings_provider()
+        if settings is self._settings:
+            return
+        old, self._settings = self._settings, settings
+        if old == settings:
+            return
+        self._commands = {}
+        callbacks = []
+        for name, spec in settings['classes'].items():
+            for command in spec['commands']:
+                self._commands[command.lower()] = name
+            callbacks.extend((prefix, name) for prefix in spec['callbacks'])
+        # Длинные префиксы проверяются раньше коротких
+        self._callbacks = tuple(sorted(callbacks, key=lambda item: -len(item[0])))
+
+        old_classes = old['classes'] if old is not None else {}
+        changed = {
+            name for name in set(old_classes) | set(settings['classes'])
+            if old_classes.get(name) != settings['classes'].get(name)
+        }
+        if changed:
+            for key in [key for key in self._buckets if key[1] in changed]:
+                del self._buckets[key]
+            self._warned = {key for key in self._warned if key[1] not in changed}
+        while len(self._buckets) > settings['max_entries']:
+            evicted, _ = self._buckets.popitem(last=False)
+            self._warned.discard(evicted)
+
+
+# Общий ограничитель команд бота
+command_limiter = CommandLimiter()
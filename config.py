@@ -1,14 +1,19 @@
 # config.py
 """
 Модуль конфигурации телеграм-бота.
-Обеспечивает загрузку настроек из JSON-файлов с оптимизацией через кэширование.
-Предоставляет глобальные переменные для удобного доступа к настройкам.
+Обеспечивает загрузку настроек из JSON-файлов, их проверку по схеме
+и доступ к ним через неизменяемый снимок (get_config()).
 """
 
 import json
+import re
 import os
 import time
+import logging
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
 from functools import lru_cache
 
 # Кэш для конфигураций и время их последнего изменения
@@ -63,112 +68,574 @@ def load_config(config_file, use_cache=True):
         # Иначе пробрасываем ошибку дальше
         raise
 
-def reload_all_configs():
+# Соответствие имени конфигурации и файла, из которого она загружается
+CONFIG_FILES = {
+    'bot_config': 'bot_config.json',
+    'paths_config': 'paths_config.json',
+    'sound_config': 'sound_config.json',
+    'file_ids': 'file_ids.json',
+    'schedule_config': 'schedule_config.json',
+}
+
+# Подписчики на изменения конфигурации: список пар (ключи, callback)
+_subscribers = []
+
+logger = logging.getLogger(__name__)
+
+
+def subscribe(keys, callback):
+    """
+    Регистрирует подписчика на изменения конфигурации.
+    
+    Ключ имеет вид "<имя_конфига>" или "<имя_конфига>.<раздел>",
+    например "schedule_config.quiz" или "sound_config".
+    Подписка на имя конфига срабатывает при изменении любого его раздела.
+    
+    Args:
+        keys: Ключ или список ключей, изменения которых интересуют подписчика
+        callback: Функция вида callback(changes), где changes — словарь
+                  { "<имя_конфига>.<раздел>": (старое_значение, новое_значение) }
+                  только по интересующим подписчика ключам
+    """
+    if isinstance(keys, str):
+        keys = [keys]
+    _subscribers.append((tuple(keys), callback))
+
+
+def unsubscribe(callback):
+    """
+    Удаляет все подписки указанного callback.
+    
+    Args:
+        callback: Ранее зарегистрированная функция
+    """
+    _subscribers[:] = [(keys, cb) for keys, cb in _subscribers if cb is not callback]
+
+
+def diff_configs(old_configs: dict, new_configs: dict) -> dict:
+    """
+    Сравнивает два набора конфигураций по разделам верхнего уровня.
+    
+    Args:
+        old_configs: Словарь { имя_конфига: содержимое } до перезагрузки
+        new_configs: Словарь { имя_конфига: содержимое } после перезагрузки
+    
+    Returns:
+        dict: { "<имя_конфига>.<раздел>": (старое_значение, новое_значение) }
+              только для изменившихся разделов
+    """
+    changes = {}
+    for name in set(old_configs) | set(new_configs):
+        old = old_configs.get(name) or {}
+        new = new_configs.get(name) or {}
+        for key in set(old) | set(new):
+            if old.get(key) != new.get(key):
+                changes[f"{name}.{key}"] = (old.get(key), new.get(key))
+    return changes
+
+
+def _matches(changed_key: str, subscribed_key: str) -> bool:
+    """Проверяет, относится ли изменившийся ключ к ключу подписки."""
+    return changed_key == subscribed_key or changed_key.startswith(subscribed_key + ".")
+
+
+def notify_subscribers(changes: dict):
+    """
+    Рассылает подписчикам только те изменения, которые их интересуют.
+    Подписчики без изменений по своим ключам не вызываются.
+    Ошибка одного подписчика не мешает остальным.
+    
+    Args:
+        changes: Результат diff_configs
+    """
+    if not changes:
+        return
+    for keys, callback in list(_subscribers):
+        relevant = {
+            changed_key: values for changed_key, values in changes.items()
+            if any(_matches(changed_key, key) for key in keys)
+        }
+        if not relevant:
+            continue
+        try:
+            callback(relevant)
+        except Exception as e:
+            logger.error(f"Ошибка подписчика конфигурации {callback}: {e}")
+
+
+class ConfigError(Exception):
+    """Конфигурация не прошла проверку схемы."""
+
+
+# Категории контента: ключи content_dirs и archive_dirs в paths_config
+CONTENT_CATEGORIES = (
+    'ero_anime', 'ero_real', 'single_meme', 'standart_art',
+    'standart_meme', 'video_meme', 'video_ero', 'video_auto',
+)
+
+# Количество одновременно обрабатываемых обновлений, если в bot_config не указано иное
+DEFAULT_MAX_CONCURRENT_UPDATES = 16
+
+# Настройки HTTP-клиента Bot API по умолчанию (раздел http в bot_config).
+# api — обычные вызовы и ответы на кнопки, uploads — отправка медиа, polling — getUpdates.
+DEFAULT_HTTP_CONFIG = {
+    'http_version': '1.1',
+    'keepalive_expiry': 30.0,
+    'api': {'pool_size': 8, 'connect_timeout': 5.0, 'read_timeout': 10.0, 'write_timeout': 10.0, 'pool_timeout': 3.0},
+    'uploads': {'pool_size': 4, 'connect_timeout': 10.0, 'read_timeout': 300.0, 'write_timeout': 300.0, 'pool_timeout': 60.0},
+    'polling': {'pool_size': 1, 'connect_timeout': 5.0, 'read_timeout': 10.0, 'write_timeout': 5.0, 'pool_timeout': 1.0},
+}
+HTTP_POOLS = ('api', 'uploads', 'polling')
+
+# Режим вебхука (раздел webhook в bot_config). Без enabled бот работает через long polling.
+DEFAULT_WEBHOOK_CONFIG = {
+    'enabled': False,
+    'url': '',
+    'listen': '127.0.0.1',
+    'port': 8443,
+    'path': 'telegram',
+    'secret_token': '',
+    'max_connections': 40,
+    'cert': None,
+    'key': None,
+}
+
+# Генераторы случайных чисел (раздел rng в bot_config): зерно и режим записи/воспроизведения
+DEFAULT_RNG_CONFIG = {
+    'seed': None,
+    'mode': 'off',
+    'file': 'state_data/rng_session.json',
+}
+
+# Ограничение частоты команд пользователей (раздел rate_limits в bot_config).
+# Класс команд: interval — секунд на одну команду, burst — сколько команд можно подряд,
+# commands — команды без "/", callbacks — префиксы callback_data кнопок.
+# interval класса roll по умолчанию берётся из cooldown.
+DEFAULT_RATE_LIMITS = {
+    'max_entries': 10000,
+    'classes': {
+        'roll': {'interval': None, 'burst': 1, 'commands': ['roll'], 'callbacks': ['roll|']},
+        'casino': {
+            'interval': 1.0, 'burst': 5, 'commands': ['casino'],
+            'callbacks': ['casino:', 'slots_bet:', 'roulette_bet:', 'change_bet:'],
+        },
+        'sound': {'interval': 2.0, 'burst': 3, 'commands': ['sound'], 'callbacks': ['sound:']},
+        'logout': {'interval': 30.0, 'burst': 1, 'commands': ['logout'], 'callbacks': []},
+        'talk': {'interval': 10.0, 'burst': 2, 'commands': ['talk'], 'callbacks': []},
+    },
+}
+RATE_LIMIT_CLASS_KEYS = ('interval', 'burst', 'commands', 'callbacks')
+
+# Схема конфигураций: обязательные ключи верхнего уровня и их типы.
+# Необязательные ключи (admin_group_id, timezone_offset, max_concurrent_updates, http, webhook, rng,
+# rate_limits) проверяются отдельно.
+CONFIG_SCHEMA = {
+    'bot_config': {
+        'token': str,
+        'allowed_chat_ids': list,
+        'cooldown': (int, float),
+        'manual_usernames': list,
+        'post_chat_id': int,
+    },
+    'paths_config': {
+        'materials_dir': str,
+        'archive_dir': str,
+        'content_dirs': dict,
+        'archive_dirs': dict,
+        'anecdotes_file': str,
+    },
+    'sound_config': {},
+    'file_ids': {
+        'animations': dict,
+    },
+    'schedule_config': {},
+}
+
+
+def validate_configs(configs: dict):
+    """
+    Проверяет загруженные конфигурации по схеме CONFIG_SCHEMA.
+    Собирает все ошибки сразу, чтобы их можно было исправить за один заход.
+    
+    Args:
+        configs: Словарь { имя_конфига: содержимое }
+    
+    Raises:
+        ConfigError: Если хотя бы одна конфигурация не соответствует схеме
+    """
+    errors = []
+    for name, schema in CONFIG_SCHEMA.items():
+        data = configs.get(name)
+        if not isinstance(data, dict):
+            errors.append(f"{name}: ожидается JSON-объект")
+            continue
+        for key, expected_type in schema.items():
+            if key not in data:
+                errors.append(f"{name}.{key}: отсутствует обязательный ключ")
+            elif isinstance(data[key], bool) or not isinstance(data[key], expected_type):
+                errors.append(f"{name}.{key}: неверный тип {type(data[key]).__name__}")
+
+    bot = configs.get('bot_config')
+    if isinstance(bot, dict):
+        if isinstance(bot.get('allowed_chat_ids'), list) and not bot['allowed_chat_ids']:
+            errors.append("bot_config.allowed_chat_ids: список не должен быть пустым")
+        for key in ('admin_group_id', 'timezone_offset', 'max_concurrent_updates'):
+            if key in bot and (isinstance(bot[key], bool) or not isinstance(bot[key], int)):
+                errors.append(f"bot_config.{key}: неверный тип {type(bot[key]).__name__}")
+        if isinstance(bot.get('max_concurrent_updates'), int) and bot['max_concurrent_updates'] < 1:
+            errors.append("bot_config.max_concurrent_updates: должно быть положительным числом")
+        if 'http' in bot:
+            errors.extend(_validate_http(bot['http']))
+        if 'webhook' in bot:
+            errors.extend(_validate_webhook(bot['webhook']))
+        if 'rng' in bot:
+            errors.extend(_validate_rng(bot['rng']))
+        if 'rate_limits' in bot:
+            errors.extend(_validate_rate_limits(bot['rate_limits']))
+
+    paths = configs.get('paths_config')
+    if isinstance(paths, dict):
+        for section in ('content_dirs', 'archive_dirs'):
+            if isinstance(paths.get(section), dict):
+                for category in CONTENT_CATEGORIES:
+                    if category not in paths[section]:
+                        errors.append(f"paths_config.{section}.{category}: отсутствует обязательный ключ")
+
+    file_ids = configs.get('file_ids')
+    if isinstance(file_ids, dict) and isinstance(file_ids.get('animations'), dict):
+        if not isinstance(file_ids['animations'].get('dice'), str):
+            errors.append("file_ids.animations.dice: отсутствует или не строка")
+
+    if errors:
+        raise ConfigError("Ошибки в конфигурации:\n" + "\n".join(errors))
+
+
+def _validate_http(http) -> list:
+    """Проверяет раздел bot_config.http. Возвращает список ошибок."""
+    if not isinstance(http, dict):
+        return ["bot_config.http: ожидается JSON-объект"]
+    errors = []
+    for key, value in http.items():
+        if key == 'http_version':
+            if value not in ('1.1', '2'):
+                errors.append("bot_config.http.http_version: допустимы значения \"1.1\" и \"2\"")
+        elif key == 'keepalive_expiry':
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                errors.append("bot_config.http.keepalive_expiry: ожидается неотрицательное число")
+        elif key in HTTP_POOLS:
+            if not isinstance(value, dict):
+                errors.append(f"bot_config.http.{key}: ожидается JSON-объект")
+                continue
+            for option, number in value.items():
+                if option not in DEFAULT_HTTP_CONFIG[key]:
+                    errors.append(f"bot_config.http.{key}.{option}: неизвестный параметр")
+                elif option == 'pool_size':
+                    if isinstance(number, bool) or not isinstance(number, int) or number < 1:
+                        errors.append(f"bot_config.http.{key}.pool_size: ожидается положительное целое")
+                elif isinstance(number, bool) or not isinstance(number, (int, float)) or number <= 0:
+                    errors.append(f"bot_config.http.{key}.{option}: ожидается положительное число")
+        else:
+            errors.append(f"bot_config.http.{key}: неизвестный параметр")
+    return errors
+
+
+def _validate_webhook(webhook) -> list:
+    """Проверяет раздел bot_config.webhook. Возвращает список ошибок."""
+    if not isinstance(webhook, dict):
+        return ["bot_config.webhook: ожидается JSON-объект"]
+    errors = []
+    for key, value in webhook.items():
+        if key not in DEFAULT_WEBHOOK_CONFIG:
+            errors.append(f"bot_config.webhook.{key}: неизвестный параметр")
+        elif key == 'enabled':
+            if not isinstance(value, bool):
+                errors.append("bot_config.webhook.enabled: ожидается true или false")
+        elif key in ('port', 'max_connections'):
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                errors.append(f"bot_config.webhook.{key}: ожидается положительное целое")
+        elif key in ('cert', 'key'):
+            if value is not None and not isinstance(value, str):
+                errors.append(f"bot_config.webhook.{key}: ожидается путь к файлу")
+        elif not isinstance(value, str):
+            errors.append(f"bot_config.webhook.{key}: неверный тип {type(value).__name__}")
+    if isinstance(webhook.get('max_connections'), int) and webhook['max_connections'] > 100:
+        errors.append("bot_config.webhook.max_connections: Telegram допускает не больше 100")
+    if webhook.get('enabled') is True:
+        if not webhook.get('url'):
+            errors.append("bot_config.webhook.url: обязателен, если вебхук включён")
+        # Telegram принимает секрет из 1-256 символов A-Z, a-z, 0-9, _ и -
+        secret = webhook.get('secret_token')
+        if not isinstance(secret, str) or not re.fullmatch(r'[A-Za-z0-9_-]{1,256}', secret):
+            errors.append("bot_config.webhook.secret_token: обязателен, 1-256 символов A-Z, a-z, 0-9, _ и -")
+    return errors
+
+
+def _validate_rng(section) -> list:
+    """Проверяет раздел bot_config.rng. Возвращает список ошибок."""
+    if not isinstance(section, dict):
+        return ["bot_config.rng: ожидается JSON-объект"]
+    errors = []
+    for key, value in section.items():
+        if key not in DEFAULT_RNG_CONFIG:
+            errors.append(f"bot_config.rng.{key}: неизвестный параметр")
+        elif key == 'seed':
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+                errors.append("bot_config.rng.seed: ожидается целое число или null")
+        elif key == 'mode':
+            if value not in ('off', 'record', 'replay'):
+                errors.append("bot_config.rng.mode: допустимы значения off, record и replay")
+        elif not isinstance(value, str):
+            errors.append(f"bot_config.rng.{key}: неверный тип {type(value).__name__}")
+    return errors
+
+
+def _validate_rate_limits(section) -> list:
+    """Проверяет раздел bot_config.rate_limits. Возвращает список ошибок."""
+    if not isinstance(section, dict):
+        return ["bot_config.rate_limits: ожидается JSON-объект"]
+    errors = []
+    for key, value in section.items():
+        if key == 'max_entries':
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                errors.append("bot_config.rate_limits.max_entries: ожидается положительное целое")
+        elif key == 'classes':
+            if not isinstance(value, dict):
+                errors.append("bot_config.rate_limits.classes: ожидается JSON-объект")
+                continue
+            for name, spec in value.items():
+                errors.extend(_validate_rate_limit_class(name, spec))
+        else:
+            errors.append(f"bot_config.rate_limits.{key}: неизвестный параметр")
+    return errors
+
+
+def _validate_rate_limit_class(name, spec) -> list:
+    prefix = f"bot_config.rate_limits.classes.{name}"
+    if not isinstance(spec, dict):
+        return [f"{prefix}: ожидается JSON-объект"]
+    errors = []
+    for key, value in spec.items():
+        if key not in RATE_LIMIT_CLASS_KEYS:
+            errors.append(f"{prefix}.{key}: неизвестный параметр")
+        elif key == 'interval':
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                errors.append(f"{prefix}.interval: ожидается положительное число секунд")
+        elif key == 'burst':
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                errors.append(f"{prefix}.burst: ожидается положительное целое")
+        elif not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            errors.append(f"{prefix}.{key}: ожидается список строк")
+    return errors
+
+
+def _rate_limit_settings(bot) -> dict:
+    """Дополняет раздел bot_config.rate_limits значениями по умолчанию."""
+    section = bot.get('rate_limits', {})
+    classes = {}
+    for name, spec in {**DEFAULT_RATE_LIMITS['classes'], **section.get('classes', {})}.items():
+        spec = {**DEFAULT_RATE_LIMITS['classes'].get(name, {'commands': [], 'callbacks': []}), **spec}
+        if spec.get('interval') is None:
+            spec['interval'] = bot['cooldown']
+        spec.setdefault('burst', 1)
+        classes[name] = spec
+    return {'max_entries': section.get('max_entries', DEFAULT_RATE_LIMITS['max_entries']), 'classes': classes}
+
+
+def _http_settings(http) -> dict:
+    """Дополняет раздел bot_config.http значениями по умолчанию."""
+    settings = {}
+    for key, default in DEFAULT_HTTP_CONFIG.items():
+        if isinstance(default, dict):
+            settings[key] = {**default, **http.get(key, {})}
+        else:
+            settings[key] = http.get(key, default)
+    return settings
+
+
+def _freeze(value):
+    """Рекурсивно превращает словари и списки в неизменяемые аналоги."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Неизменяемый снимок всех настроек бота.
+    Создаётся один раз при загрузке (или перезагрузке) конфигурации,
+    после чего чтение полей не требует обращений к диску.
+    """
+    # Основные настройки
+    token: str                           # Токен бота
+    allowed_chat_ids: tuple              # Разрешенные чаты
+    chat_id: int                         # Основной чат (первый из разрешенных)
+    admin_group_id: int                  # Группа администраторов для системы ставок
+    post_chat_id: int                    # ID чата для публикаций
+    cooldown: float                      # Задержка между командами
+    manual_usernames: tuple              # Пользователи для команды @all
+    timezone_offset: int                 # Смещение часового пояса в часах
+    dice_gif_id: str                     # ID анимации кубика
+    max_concurrent_updates: int          # Сколько обновлений обрабатывается одновременно (при запуске)
+    http: Mapping[str, Any]              # Пулы соединений и таймауты Bot API (при запуске)
+    webhook: Mapping[str, Any]           # Настройки режима вебхука (при запуске)
+    rng: Mapping[str, Any]               # Зерно и режим генераторов случайных чисел (при запуске)
+    rate_limits: Mapping[str, Any]       # Ограничение частоты команд пользователей
+
+    # Пути
+    materials_dir: Path                  # Директория с материалами
+    archive_dir: Path                    # Директория с архивами
+    content_dirs: Mapping[str, Path]     # Откуда брать контент для постов
+    archive_dirs: Mapping[str, Path]     # Куда перемещать использованный контент
+    anecdotes_file: Path                 # Файл с анекдотами
+
+    # Исходные разделы конфигурации (только для чтения)
+    bot: Mapping[str, Any]
+    paths: Mapping[str, Any]
+    sound: Mapping[str, Any]
+    file_ids: Mapping[str, Any]
+    schedule: Mapping[str, Any]
+
+    def sections(self) -> dict:
+        """Возвращает разделы снимка в виде { имя_конфига: содержимое }."""
+        return {
+            'bot_config': self.bot,
+            'paths_config': self.paths,
+            'sound_config': self.sound,
+            'file_ids': self.file_ids,
+            'schedule_config': self.schedule,
+        }
+
+
+def build_snapshot(configs: dict) -> ConfigSnapshot:
+    """
+    Проверяет конфигурации по схеме и собирает из них снимок.
+    
+    Args:
+        configs: Словарь { имя_конфига: содержимое }, как в CONFIG_FILES
+    
+    Returns:
+        ConfigSnapshot: Новый неизменяемый снимок настроек
+    
+    Raises:
+        ConfigError: Если конфигурация не прошла проверку
+    """
+    validate_configs(configs)
+    bot = _freeze(configs['bot_config'])
+    paths = _freeze(configs['paths_config'])
+    file_ids = _freeze(configs['file_ids'])
+
+    chat_id = bot['allowed_chat_ids'][0]
+    return ConfigSnapshot(
+        token=bot['token'],
+        allowed_chat_ids=bot['allowed_chat_ids'],
+        chat_id=chat_id,
+        # Если не указана отдельная группа администраторов, используем основной чат
+        admin_group_id=bot.get('admin_group_id', chat_id),
+        post_chat_id=bot['post_chat_id'],
+        cooldown=bot['cooldown'],
+        manual_usernames=bot['manual_usernames'],
+        timezone_offset=bot.get('timezone_offset', 0),
+        dice_gif_id=file_ids['animations']['dice'],
+        max_concurrent_updates=bot.get('max_concurrent_updates', DEFAULT_MAX_CONCURRENT_UPDATES),
+        http=_freeze(_http_settings(configs['bot_config'].get('http', {}))),
+        webhook=_freeze({**DEFAULT_WEBHOOK_CONFIG, **configs['bot_config'].get('webhook', {})}),
+        rng=_freeze({**DEFAULT_RNG_CONFIG, **configs['bot_config'].get('rng', {})}),
+        rate_limits=_freeze(_rate_limit_settings(configs['bot_config'])),
+        materials_dir=Path(paths['materials_dir']),
+        archive_dir=Path(paths['archive_dir']),
+        content_dirs=MappingProxyType({key: Path(value) for key, value in paths['content_dirs'].items()}),
+        archive_dirs=MappingProxyType({key: Path(value) for key, value in paths['archive_dirs'].items()}),
+        anecdotes_file=Path(paths['anecdotes_file']),
+        bot=bot,
+        paths=paths,
+        sound=_freeze(configs['sound_config']),
+        file_ids=file_ids,
+        schedule=_freeze(configs['schedule_config']),
+    )
+
+
+def _load_all(use_cache=True) -> dict:
+    """Загружает все файлы из CONFIG_FILES."""
+    return {name: load_config(file_name, use_cache=use_cache) for name, file_name in CONFIG_FILES.items()}
+
+
+# Текущий снимок настроек. Заменяется целиком одним присваиванием.
+_snapshot = None
+
+
+def get_config() -> ConfigSnapshot:
+    """
+    Возвращает текущий снимок настроек.
+    Не обращается к диску: снимок обновляется только в reload_all_configs.
+    Ссылку на снимок не стоит сохранять надолго — после перезагрузки
+    конфигурации она будет указывать на старые значения.
+    
+    Returns:
+        ConfigSnapshot: Текущие настройки
+    """
+    return _snapshot
+
+
+def reload_all_configs() -> dict:
     """
     Принудительно перезагружает все конфигурации.
     Полезно вызывать при изменении конфигурационных файлов вручную.
-    Обновляет все глобальные переменные настроек.
-    """
-    global bot_config, paths_config, sound_config, file_ids, schedule_config
-    global TOKEN, ALLOWED_CHAT_IDS, DICE_GIF_ID, COOLDOWN, MANUAL_USERNAMES, POST_CHAT_ID
-    global MATERIALS_DIR, ARCHIVE_DIR
-    global ERO_ANIME_DIR, ERO_REAL_DIR, SINGLE_MEME_DIR, STANDART_ART_DIR, STANDART_MEME_DIR, VIDEO_MEME_DIR, VIDEO_ERO_DIR, VIDEO_AUTO_DIR
-    global ARCHIVE_ERO_ANIME_DIR, ARCHIVE_ERO_REAL_DIR, ARCHIVE_SINGLE_MEME_DIR, ARCHIVE_STANDART_ART_DIR, ARCHIVE_STANDART_MEME_DIR, ARCHIVE_VIDEO_MEME_DIR, ARCHIVE_VIDEO_ERO_DIR, ARCHIVE_VIDEO_AUTO_DIR
-global ANECDOTES_FILE
-global CHAT_ID, ADMIN_GROUP_ID, TIMEZONE_OFFSET
-
-# Загружаем все конфигурации, игнорируя кэш
-bot_config = load_config('bot_config.json', use_cache=False)
-paths_config = load_config('paths_config.json', use_cache=False)
-sound_config = load_config('sound_config.json', use_cache=False)
-file_ids = load_config('file_ids.json', use_cache=False)
-schedule_config = load_config('schedule_config.json', use_cache=False)
-
-# Переустанавливаем все переменные
-TOKEN = bot_config['token']
-ALLOWED_CHAT_IDS = bot_config['allowed_chat_ids']
-DICE_GIF_ID = file_ids['animations']['dice']
-COOLDOWN = bot_config['cooldown']
-MANUAL_USERNAMES = bot_config['manual_usernames']
-POST_CHAT_ID = bot_config['post_chat_id']
-
-# Настройки для системы ставок
-CHAT_ID = bot_config['allowed_chat_ids'][0]  # Используем первый разрешенный чат как основной
-ADMIN_GROUP_ID = bot_config.get('admin_group_id', CHAT_ID)  # Если не указана отдельная группа администраторов, используем основной чат
-TIMEZONE_OFFSET = bot_config.get('timezone_offset', 0)  # Смещение часового пояса в часах
-
-# Создаем базовые пути с использованием Path
-MATERIALS_DIR = Path(paths_config['materials_dir'])
-ARCHIVE_DIR = Path(paths_config['archive_dir'])
-
-# Контент директории
-ERO_ANIME_DIR = Path(paths_config['content_dirs']['ero_anime'])
-ERO_REAL_DIR = Path(paths_config['content_dirs']['ero_real'])
-SINGLE_MEME_DIR = Path(paths_config['content_dirs']['single_meme'])
-STANDART_ART_DIR = Path(paths_config['content_dirs']['standart_art'])
-STANDART_MEME_DIR = Path(paths_config['content_dirs']['standart_meme'])
-VIDEO_MEME_DIR = Path(paths_config['content_dirs']['video_meme'])
-VIDEO_ERO_DIR = Path(paths_config['content_dirs']['video_ero'])
-VIDEO_AUTO_DIR = Path(paths_config['content_dirs']['video_auto'])
-
-# Архивные директории
-ARCHIVE_ERO_ANIME_DIR = Path(paths_config['archive_dirs']['ero_anime'])
-ARCHIVE_ERO_REAL_DIR = Path(paths_config['archive_dirs']['ero_real'])
-ARCHIVE_SINGLE_MEME_DIR = Path(paths_config['archive_dirs']['single_meme'])
-ARCHIVE_STANDART_ART_DIR = Path(paths_config['archive_dirs']['standart_art'])
-ARCHIVE_STANDART_MEME_DIR = Path(paths_config['archive_dirs']['standart_meme'])
-ARCHIVE_VIDEO_MEME_DIR = Path(paths_config['archive_dirs']['video_meme'])
-ARCHIVE_VIDEO_ERO_DIR = Path(paths_config['archive_dirs']['video_ero'])
-ARCHIVE_VIDEO_AUTO_DIR = Path(paths_config['archive_dirs']['video_auto'])
-
-# Путь к файлу с анекдотами
-ANECDOTES_FILE = Path(paths_config['anecdotes_file'])
+    Новый снимок проверяется по схеме и только затем атомарно заменяет
+    текущий; подписчики (см. subscribe) уведомляются об изменившихся разделах.
+    
+    Returns:
+        dict: Изменения в формате diff_configs
+    
+    Raises:
+        ConfigError: Если новая конфигурация не прошла проверку
+                     (текущий снимок при этом остаётся прежним)
+    """
+    global _snapshot
+    new_snapshot = build_snapshot(_load_all(use_cache=False))
+    old_snapshot = _snapshot
+    _snapshot = new_snapshot
 
-# Загружаем все конфигурации при импорте модуля
-bot_config = load_config('bot_config.json')       # Основные настройки бота
-paths_config = load_config('paths_config.json')   # Пути к файлам и директориям
-sound_config = load_config('sound_config.json')   # Настройки звуковой панели
-file_ids = load_config('file_ids.json')           # ID файлов в Telegram
-schedule_config = load_config('schedule_config.json')  # Настройки расписания
-
-# Экспортируем переменные для удобного доступа из других модулей
-# Основные настройки
-TOKEN = bot_config['token']                     # Токен бота
-ALLOWED_CHAT_IDS = bot_config['allowed_chat_ids']  # Списк разрешенных чатов
-DICE_GIF_ID = file_ids['animations']['dice']    # ID анимации кубика
-COOLDOWN = bot_config['cooldown']               # Задержка между командами
-MANUAL_USERNAMES = bot_config['manual_usernames']  # Пользователи для команды @all
-POST_CHAT_ID = bot_config['post_chat_id']       # ID чата для публикаций
-
-# Настройки для системы ставок
-CHAT_ID = bot_config['allowed_chat_ids'][0]  # Используем первый разрешенный чат как основной
-ADMIN_GROUP_ID = bot_config.get('admin_group_id', CHAT_ID)  # Если не указана отдельная группа администраторов, используем основной чат
-TIMEZONE_OFFSET = bot_config.get('timezone_offset', 0)  # Смещение часового пояса в часах
-
-# Создаем базовые пути с использованием Path
-MATERIALS_DIR = Path(paths_config['materials_dir'])  # Директория с материалами
-ARCHIVE_DIR = Path(paths_config['archive_dir'])      # Директория с архивами
-
-# Контент директории - откуда брать контент для постов
-ERO_ANIME_DIR = Path(paths_config['content_dirs']['ero_anime'])
-ERO_REAL_DIR = Path(paths_config['content_dirs']['ero_real'])
-SINGLE_MEME_DIR = Path(paths_config['content_dirs']['single_meme'])
-STANDART_ART_DIR = Path(paths_config['content_dirs']['standart_art'])
-STANDART_MEME_DIR = Path(paths_config['content_dirs']['standart_meme'])
-VIDEO_MEME_DIR = Path(paths_config['content_dirs']['video_meme'])
-VIDEO_ERO_DIR = Path(paths_config['content_dirs']['video_ero'])
-VIDEO_AUTO_DIR = Path(paths_config['content_dirs']['video_auto'])
-
-# Архивные директории - куда перемещать использованный контент
-ARCHIVE_ERO_ANIME_DIR = Path(paths_config['archive_dirs']['ero_anime'])
-ARCHIVE_ERO_REAL_DIR = Path(paths_config['archive_dirs']['ero_real'])
-ARCHIVE_SINGLE_MEME_DIR = Path(paths_config['archive_dirs']['single_meme'])
-ARCHIVE_STANDART_ART_DIR = Path(paths_config['archive_dirs']['standart_art'])
-ARCHIVE_STANDART_MEME_DIR = Path(paths_config['archive_dirs']['standart_meme'])
-ARCHIVE_VIDEO_MEME_DIR = Path(paths_config['archive_dirs']['video_meme'])
-ARCHIVE_VIDEO_ERO_DIR = Path(paths_config['archive_dirs']['video_ero'])
-ARCHIVE_VIDEO_AUTO_DIR = Path(paths_config['archive_dirs']['video_auto'])
-
-# Путь к файлу с анекдотами
-ANECDOTES_FILE = Path(paths_config['anecdotes_file'])
+    changes = diff_configs(old_snapshot.sections() if old_snapshot else {}, new_snapshot.sections())
+    if changes:
+        logger.info(f"Изменены разделы конфигурации: {sorted(changes)}")
+    notify_subscribers(changes)
+    return changes
 
+
+# Старые имена переменных модуля (config.POST_CHAT_ID и т.п.).
+# Значения не копируются, а читаются из текущего снимка при обращении.
+_LEGACY_NAMES = {
+    'TOKEN': lambda s: s.token,
+    'ALLOWED_CHAT_IDS': lambda s: s.allowed_chat_ids,
+    'CHAT_ID': lambda s: s.chat_id,
+    'ADMIN_GROUP_ID': lambda s: s.admin_group_id,
+    'POST_CHAT_ID': lambda s: s.post_chat_id,
+    'COOLDOWN': lambda s: s.cooldown,
+    'MANUAL_USERNAMES': lambda s: s.manual_usernames,
+    'TIMEZONE_OFFSET': lambda s: s.timezone_offset,
+    'DICE_GIF_ID': lambda s: s.dice_gif_id,
+    'MATERIALS_DIR': lambda s: s.materials_dir,
+    'ARCHIVE_DIR': lambda s: s.archive_dir,
+    'ANECDOTES_FILE': lambda s: s.anecdotes_file,
+    'bot_config': lambda s: s.bot,
+    'paths_config': lambda s: s.paths,
+    'sound_config': lambda s: s.sound,
+    'file_ids': lambda s: s.file_ids,
+    'schedule_config': lambda s: s.schedule,
+}
+for _category in CONTENT_CATEGORIES:
+    _LEGACY_NAMES[f'{_category.upper()}_DIR'] = lambda s, c=_category: s.content_dirs[c]
+    _LEGACY_NAMES[f'ARCHIVE_{_category.upper()}_DIR'] = lambda s, c=_category: s.archive_dirs[c]
+
+
+def __getattr__(name):
+    if name in _LEGACY_NAMES:
+        return _LEGACY_NAMES[name](_snapshot)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Загружаем все конфигурации при импорте модуля
+_snapshot = build_snapshot(_load_all())
@@ -0,0 +1,202 @@
+# consumable_pool.py
+"""
+Модуль «расходуемого» пула элементов: вопросов викторины, мудрых фраз и т.п.
+Каждый элемент выдаётся один раз, в случайном порядке.
+
+Обеспечивает:
+- Случайную перестановку элементов, которая восстанавливается по seed из небольшого файла состояния
+- Журнал выданных элементов (только дозапись), по которому вычисляется курсор
+- Выдачу и подсчёт оставшихся элементов за O(1), без перезаписи файла с элементами
+- Пакетное добавление новых элементов
+- Перестроение пула, если файл с элементами изменили вручную
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+
+from rng import rng
+
+logger = logging.getLogger(__name__)
+
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('content')
+
+
+def fingerprint(item) -> str:
+    """
+    Вычисляет короткий отпечаток элемента для журнала выданных.
+    Отпечаток не зависит от позиции элемента в файле.
+    """
+    raw = json.dumps(item, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class ConsumablePool:
+    """
+    Пул элементов из JSON-файла со списком, выдаваемых без повторений.
+
+    Состояние хранится в двух файлах:
+    - state_file: {"source_mtime", "size", "seed", "log_offset"} — по ним
+      восстанавливается перестановка ещё не выданных элементов;
+    - used_log_file: отпечатки выданных элементов, по одному на строку.
+      Строки после log_offset — выданные из текущей перестановки, их число и есть курсор.
+
+    Файл с элементами при выдаче не перезаписывается. Если его изменили
+    (другие mtime или размер), перестановка строится заново без уже выданных элементов.
+    """
+
+    def __init__(self, source_file, state_file, used_log_file):
+        self.source_file = source_file
+        self.state_file = state_file
+        self.used_log_file = used_log_file
+        self._items = None
+        self._fingerprints = []
+        self._order = []
+        self._cursor = 0
+        self._source_mtime = None
+
+    def draw(self, consume: bool = True):
+        """
+        Возвращает следующий случайный элемент.
+
+        Args:
+            consume: Отметить элемент выданным (False — только посмотреть)
+
+        Returns:
+            Элемент или None, если пул исчерпан
+        """
+        self._ensure_loaded()
+        if self._cursor >= len(self._order):
+            return None
+        index = self._order[self._cursor]
+        if consume:
+            self._append_used(self._fingerprints[index])
+            self._cursor += 1
+        return self._items[index]
+
+    def count(self) -> int:
+        """Возвращает количество ещё не выданных элементов."""
+        self._ensure_loaded()
+        return len(self._order) - self._cursor
+
+    def extend(self, new_items) -> int:
+        """
+        Добавляет новые элементы в файл пула и перемешивает их с невыданными.
+
+        Args:
+            new_items: Итерируемая коллекция новых элементов
+
+        Returns:
+            int: Количество добавленных элементов
+        """
+        self._ensure_loaded()
+        new_items = list(new_items)
+        if not new_items:
+            return 0
+        items = self._items + new_items
+        with open(self.source_file, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, indent=4)
+        self._load(self._stat_source())
+        logger.info(f"В пул {self.source_file} добавлено элементов: {len(new_items)}")
+        return len(new_items)
+
+    def _stat_source(self):
+        try:
+            st = os.stat(self.source_file)
+            return st.st_mtime_ns
+        except OSError:
+            return None
+
+    def _ensure_loaded(self):
+        mtime = self._stat_source()
+        if self._items is not None and mtime == self._source_mtime:
+            return
+        self._load(mtime)
+
+    def _load(self, mtime):
+        items = self._read_json(self.source_file, list) or []
+        state = self._read_json(self.state_file, dict) or {}
+        used = self._read_used_log()
+
+        self._items = items
+        self._fingerprints = [fingerprint(item) for item in items]
+        self._source_mtime = mtime
+
+        offset = state.get("log_offset", 0)
+        if (state.get("source_mtime") == mtime and state.get("size") == len(items)
+                and isinstance(state.get("seed"), int) and 0 <= offset <= len(used)):
+            self._order = self._shuffled_order(set(used[:offset]), state["seed"])
+            self._cursor = min(len(used) - offset, len(self._order))
+            return
+        self._rebuild(used, mtime)
+
+    def _rebuild(self, used, mtime):
+        # В журнале оставляем только элементы, которые ещё есть в файле
+        present = set(self._fingerprints)
+        kept = [fp for fp in used if fp in present]
+        seed = _random.randrange(2 ** 32)
+        self._write_used_log(kept)
+        self._write_json(self.state_file, {
+            "source_mtime": mtime,
+            "size": len(self._items),
+            "seed": seed,
+            "log_offset": len(kept),
+        })
+        self._order = self._shuffled_order(set(kept), seed)
+        self._cursor = 0
+        logger.info(f"Пул {self.source_file} перестроен: доступно {len(self._order)} из {len(self._items)}")
+
+    def _shuffled_order(self, excluded, seed):
+        order = [i for i, fp in enumerate(self._fingerprints) if fp not in excluded]
+        random.Random(seed).shuffle(order)
+        return order
+
+    def _read_used_log(self) -> list:
+        if not os.path.exists(self.used_log_file):
+            return []
+        try:
+            with open(self.used_log_file, "r", encoding="utf-8") as f:
+                return [line.strip() for line in f if line.strip()]
+        except Exception as e:
+            logger.error(f"Ошибка чтения {self.used_log_file}: {e}")
+            return []
+
+    def _append_used(self, fp):
+        try:
+            with open(self.used_log_file, "a", encoding="utf-8") as f:
+                f.write(fp + "\n")
+        except Exception as e:
+            logger.error(f"Ошибка записи {self.used_log_file}: {e}")
+
+    def _write_used_log(self, fingerprints):
+        try:
+            os.makedirs(os.path.dirname(self.used_log_file) or ".", exist_ok=True)
+            with open(self.used_log_file, "w", encoding="utf-8") as f:
+                f.writelines(fp + "\n" for fp in fingerprints)
+        except Exception as e:
+            logger.error(f"Ошибка записи {self.used_log_file}: {e}")
+
+    @staticmethod
+    def _read_json(path, expected_type):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, expected_type):
+                return data
+        except Exception as e:
+            logger.error(f"Ошибка чтения {path}: {e}")
+        return None
+
+    @staticmethod
+    def _write_json(path, data):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+        except Exception as e:
+            logger.error(f"Ошибка записи {path}: {e}")
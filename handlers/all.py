@@ -7,7 +7,8 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from utils import check_chat_and_execute
-from config import MANUAL_USERNAMES
+from config import get_config
+from member_directory import member_directory
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,8 +17,9 @@ async def all_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     """
     Обработчик команды /all - упоминает всех администраторов чата.
     
-    Собирает список администраторов чата и отправляет сообщение с @username каждого
-    из них. Если username отсутствует, использует HTML-ссылку на профиль.
+    Отправляет сообщение с @username каждого администратора (или HTML-ссылкой
+    на профиль, если username отсутствует). Список администраторов берется из
+    справочника участников и запрашивается у Telegram только после истечения кэша.
     Если не удается получить список администраторов, использует список из конфигурации.
     
     Args:
@@ -26,27 +28,15 @@ async def all_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     """
     async def _all_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
-        
-        # Собираем список username для финального вывода
-        final_usernames = []
 
         try:
-            admins = await context.bot.getChatAdministrators(chat_id)
-            if admins:
-                for admin in admins:
-                    user = admin.user
-                    if user.username:
-                        final_usernames.append(f"@{user.username}")
-                    else:
-                        final_usernames.append(f'<a href="tg://user?id={user.id}">{user.first_name}</a>')
+            text_mentions = await member_directory.admin_mentions(context.bot, chat_id)
         except Exception as e:
             logger.warning(f"Не удалось получить список админов: {e}")
-            final_usernames = MANUAL_USERNAMES
+            text_mentions = ""
 
-        if not final_usernames:
-            final_usernames = MANUAL_USERNAMES
-
-        text_mentions = " ".join(final_usernames)
+        if not text_mentions:
+            text_mentions = " ".join(get_config().manual_usernames)
 
         await context.bot.send_message(
             chat_id=chat_id,
@@ -55,3 +45,10 @@ async def all_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             disable_web_page_preview=True
         )
     await check_chat_and_execute(update, context, _all_command)
+
+async def track_members(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Учитывает каждое обновление в справочнике участников: запоминает имена
+    и сбрасывает кэш администраторов при изменении состава чата.
+    """
+    member_directory.observe(update)
@@ -6,6 +6,7 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from balance import load_balances
+from member_directory import member_directory
 
 async def balance_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -31,7 +32,7 @@ async def balance_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Здесь ключи – строки с user_id, значение – словарь с name и balance
     for user_id, data in sorted_users:
-        name = data["name"]
+        name = member_directory.display_name(user_id, data["name"])
         balance = data["balance"]
         text += f"{name}: {balance} 💵\n"
 
@@ -6,6 +6,7 @@
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, CallbackContext
+from telegram.helpers import escape_markdown
 import logging
 import json
 import datetime
@@ -24,7 +25,8 @@ from betting import (
     process_event_results
 )
 from balance import get_balance
-from config import schedule_config, TIMEZONE_OFFSET
+from ingest import ingest_queue
+from config import get_config
 
 # Состояния для conversation handler
 BET_AMOUNT = 0
@@ -114,7 +116,8 @@ async def bet_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     # Получаем время публикации результатов из конфига
-    betting_config = schedule_config.get("betting", {})
+    settings = get_config()
+    betting_config = settings.schedule.get("betting", {})
     results_time = betting_config.get("results_time", "21:00")
     
     # Формируем сообщение с описанием события
@@ -132,7 +135,7 @@ async def bet_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         text += f"• {option_text}\n"
     
     text += f"\n💰 Выигрыш зависит от общей суммы ставок в тотализаторе!\n"
-    text += f"⏰ Результаты в {results_time} (UTC+{TIMEZONE_OFFSET}). Удачи! 🍀\n\n"
+    text += f"⏰ Результаты в {results_time} (UTC+{settings.timezone_offset}). Удачи! 🍀\n\n"
     text += "👇 Сделайте ваш выбор:"
     
     # Создаем клавиатуру с вариантами
@@ -357,7 +360,8 @@ async def bet_amount_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     logging.info(f"Размещаем ставку: user_id={user_id}, user_name={user_name}, event_id={event_id}, option_id={option_id}, amount={amount}")
     
-    success = place_bet(user_id, user_name, event_id, option_id, amount)
+    # Ставку вместе со списанием монет применяет писатель очереди событий
+    success = await ingest_queue.submit(place_bet, user_id, user_name, event_id, option_id, amount)
     
     if not success:
         logging.error("Не удалось разместить ставку")
@@ -508,7 +512,7 @@ async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if winners:
             text += "\n🏆 *Счастливчики:*\n"
             for winner in winners:
-                user_name = winner.get("user_name", "Unknown")
+                user_name = escape_markdown(winner.get("user_name", "Unknown"))
                 win_amount = winner.get("win_amount", 0)
                 bet_amount = winner.get("bet_amount", 0) if "bet_amount" in winner else 0
                 streak = winner.get("streak", 0)
@@ -520,7 +524,7 @@ async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             text += "\n💸 *Не повезло:*\n"
             max_losers = 3  # Ограничим количество проигравших
             for idx, loser in enumerate(losers[:max_losers]):
-                user_name = loser.get("user_name", "Unknown")
+                user_name = escape_markdown(loser.get("user_name", "Unknown"))
                 loss_amount = loser.get("loss_amount", 0)
                 
                 text += f"• {user_name}: -{loss_amount} 💵\n"
@@ -565,8 +569,6 @@ async def publish_betting_event(context: CallbackContext):
     """
     app = context.application # Получаем app из контекста
     from betting import get_next_active_event
-    from config import POST_CHAT_ID
-    from config import schedule_config, TIMEZONE_OFFSET
     import state
     
     # Проверяем, включена ли система ставок
@@ -575,7 +577,8 @@ async def publish_betting_event(context: CallbackContext):
         return
     
     # Получаем времена из конфига
-    betting_config = schedule_config.get("betting", {})
+    settings = get_config()
+    betting_config = settings.schedule.get("betting", {})
     results_time = betting_config.get("results_time", "21:00")
     close_time = betting_config.get("close_time", "20:00")
     
@@ -609,8 +612,8 @@ async def publish_betting_event(context: CallbackContext):
         text += f"• {option_text}\n"
     
     text += f"\n💰 Сделайте ваши ставки!\n"
-    text += f"⏰ Прием ставок до {close_time} (UTC+{TIMEZONE_OFFSET})\n"
-    text += f"🏆 Результаты в {results_time} (UTC+{TIMEZONE_OFFSET})\n\n"
+    text += f"⏰ Прием ставок до {close_time} (UTC+{settings.timezone_offset})\n"
+    text += f"🏆 Результаты в {results_time} (UTC+{settings.timezone_offset})\n\n"
     text += "Чтобы сделать ставку, используйте команду /bet"
     
     # Создаем inline-клавиатуру с кнопкой для ставки
@@ -619,9 +622,9 @@ async def publish_betting_event(context: CallbackContext):
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    # Отправляем сообщение в POST_CHAT_ID с кнопкой
+    # Отправляем сообщение в чат публикаций с кнопкой
     await app.bot.send_message(
-        chat_id=POST_CHAT_ID,
+        chat_id=settings.post_chat_id,
         text=text,
         parse_mode="Markdown",
         reply_markup=reply_markup
@@ -634,7 +637,7 @@ async def publish_betting_event(context: CallbackContext):
     else:
         logging.error(f"Не удалось пометить событие с ID {event_id} как неактивное")
 
-    logging.info(f"Опубликовано событие для ставок (ID: {event_id}) в чат {POST_CHAT_ID}")
+    logging.info(f"Опубликовано событие для ставок (ID: {event_id}) в чат {settings.post_chat_id}")
 
 async def process_betting_results(context: CallbackContext):
     """
@@ -646,13 +649,13 @@ async def process_betting_results(context: CallbackContext):
     """
     app = context.application # Получаем app из контекста
     from betting import load_betting_events, process_event_results
-    from config import POST_CHAT_ID, ADMIN_GROUP_ID
     import state
     
     # Проверяем, включена ли система ставок
     if not state.betting_enabled:
         logging.info("Система ставок отключена. Пропускаем обработку результатов.")
         return
+    settings = get_config()
     
     # Получаем все события, готовые для обработки результатов:
     # - неактивные
@@ -671,7 +674,7 @@ async def process_betting_results(context: CallbackContext):
         # Если нет событий для обработки результатов, отправляем сообщение администраторам
         logging.warning("Нет событий для обработки результатов ставок")
         await app.bot.send_message(
-            chat_id=ADMIN_GROUP_ID,
+            chat_id=settings.admin_group_id,
             text="⚠️ Предупреждение: нет событий для обработки результатов ставок."
         )
         return
@@ -721,7 +724,7 @@ async def process_betting_results(context: CallbackContext):
         if winners:
             text += "\n🏆 *ПОЗДРАВЛЯЕМ!*\n"
             for winner in winners:
-                user_name = winner.get("user_name", "Unknown")
+                user_name = escape_markdown(winner.get("user_name", "Unknown"))
                 win_amount = winner.get("win_amount", 0)
                 bet_amount = winner.get("bet_amount", 0)
                 streak = winner.get("streak", 0)
@@ -737,7 +740,7 @@ async def process_betting_results(context: CallbackContext):
             text += "\n💸 *Повезет в следующий раз:*\n"
             max_losers = 3  # Ограничиваем для компактности
             for idx, loser in enumerate(losers[:max_losers]):
-                user_name = loser.get("user_name", "Unknown")
+                user_name = escape_markdown(loser.get("user_name", "Unknown"))
                 loss_amount = loser.get("loss_amount", 0)
                 
                 text += f"• {user_name}: -{loss_amount} 💵\n"
@@ -745,14 +748,14 @@ async def process_betting_results(context: CallbackContext):
             if len(losers) > max_losers:
                 text += f"• и еще {len(losers) - max_losers} участников...\n"
         
-        # Отправляем результаты в POST_CHAT_ID без кнопки для новой ставки
+        # Отправляем результаты в чат публикаций без кнопки для новой ставки
         await app.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=settings.post_chat_id,
             text=text,
             parse_mode="Markdown"
         )
         
-        logging.info(f"Опубликованы результаты ставок (ID события: {event_id}) в чат {POST_CHAT_ID}")
+        logging.info(f"Опубликованы результаты ставок (ID события: {event_id}) в чат {settings.post_chat_id}")
     
     # Общий лог о завершении публикации всех результатов
     logging.info(f"Завершена публикация результатов для всех {len(events_for_results)} событий")
@@ -764,7 +767,6 @@ async def close_betting_event(context: CallbackContext):
     """
     app = context.application # Получаем app из контекста
     from betting import load_betting_events, save_betting_events
-    from config import ADMIN_GROUP_ID
     import state
     
     # Проверяем, включена ли система ставок
@@ -1026,7 +1028,7 @@ async def betting_callback_handler(update: Update, context: ContextTypes.DEFAULT
         
         # Размещаем ставку стандартного размера (например, 50)
         bet_amount = 50
-        success = place_bet(user_id, username, event_id, option_id, bet_amount)
+        success = await ingest_queue.submit(place_bet, user_id, username, event_id, option_id, bet_amount)
         
         if success:
             await query.answer("Ставка принята!")
@@ -1051,7 +1053,6 @@ async def update_betting_schedule_command(update: Update, context: ContextTypes.
         context: Контекст бота
     """
     from utils import is_allowed_chat
-    from config import ADMIN_GROUP_ID
     
     # Проверяем, что команда вызвана в группе администраторов
     chat_id = update.effective_chat.id
@@ -1064,7 +1065,7 @@ async def update_betting_schedule_command(update: Update, context: ContextTypes.
     except Exception:
         is_admin = False
     
-    if chat_id != ADMIN_GROUP_ID and not is_admin:
+    if chat_id != get_config().admin_group_id and not is_admin:
         await context.bot.send_message(
             chat_id=chat_id,
             text="⚠️ Эта команда доступна только администраторам в специальной группе."
@@ -4,20 +4,23 @@
 Отправляет серию сообщений с псевдо-системными уведомлениями и прогресс-барами, 
 которые динамически обновляются, создавая иммерсивный эффект, и затем удаляются.
 """
-import asyncio
 import logging
-import random
+from rng import rng
 import string
 from telegram import Update
 from telegram.constants import ChatAction
 from telegram.ext import ContextTypes
-from config import file_ids
+from config import get_config
+from animations import Frame, frame_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('logout')
+
 def generate_random_hex(length: int) -> str:
     """Генерирует случайную шестнадцатеричную строку указанной длины."""
-    return ''.join(random.choices('0123456789ABCDEF', k=length))
+    return ''.join(_random.choices('0123456789ABCDEF', k=length))
 
 def generate_random_hex_bytes(count: int) -> str:
     """Генерирует последовательность из count байт в шестнадцатеричном виде через пробел."""
@@ -25,12 +28,12 @@ def generate_random_hex_bytes(count: int) -> str:
 
 def generate_random_binary(length: int) -> str:
     """Генерирует случайную бинарную строку указанной длины."""
-    return ''.join(random.choice('01') for _ in range(length))
+    return ''.join(_random.choice('01') for _ in range(length))
 
 def generate_noise(length: int) -> str:
     """Генерирует строку «шума» из случайных символов указанной длины."""
     noise_chars = string.punctuation + string.ascii_letters + string.digits
-    return ''.join(random.choices(noise_chars, k=length))
+    return ''.join(_random.choices(noise_chars, k=length))
 
 async def logout_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -44,25 +47,32 @@ async def logout_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     3. Динамическое обновление сообщений с хакерскими элементами
     4. Удаление всех сообщений через 5 секунд
     
+    Шаги 2-4 выполняются кадрами через frame_scheduler, обработчик
+    возвращает управление сразу после отправки GIF.
+    
     Args:
         update: Объект обновления от Telegram
         context: Контекст обработчика
     """
+    bot = context.bot
+    chat_id = update.effective_chat.id
     # Список для хранения ID сообщений от бота
     sent_messages = []
+    # ID сообщений, которые редактируются в ходе анимации
+    progress = {}
     
     # Отправляем гифку с подписью
-    logout_id = file_ids['animations']['logout']
+    logout_id = get_config().file_ids['animations']['logout']
     if logout_id:
-        sent_animation = await context.bot.send_animation(
-            chat_id=update.effective_chat.id,
+        sent_animation = await bot.send_animation(
+            chat_id=chat_id,
             animation=logout_id,
             caption="Начинаю сканирование беседы..."
         )
     else:
         with open("pictures/hacker_logout.gif", "rb") as gif_file:
-            sent_animation = await context.bot.send_animation(
-                chat_id=update.effective_chat.id,
+            sent_animation = await bot.send_animation(
+                chat_id=chat_id,
                 animation=gif_file,
                 caption="Начинаю сканирование беседы..."
             )
@@ -70,23 +80,25 @@ async def logout_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     sent_messages.append(sent_animation.message_id)
     
     # Эффект: бот «печатает»
-    await context.bot.send_chat_action(chat_id=update.effective_chat.id, action=ChatAction.TYPING)
-    await asyncio.sleep(2.5)
+    await bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
     
-    # Отправляем два начальных сообщения:
-    # 1. Прогресс-бар с шумом
-    progress_message = await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text="> Инициализация системы очистки...\n[░░░░░░░░░░]"
-    )
-    sent_messages.append(progress_message.message_id)
-    
-    # 2. Хакерский текст
-    hacker_message = await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text="[ОБНАРУЖЕНО НЕДОПУСТИМОЕ ПОВЕДЕНИЕ]\nПодготовка..."
-    )
-    sent_messages.append(hacker_message.message_id)
+    async def send_initial_messages():
+        # Отправляем два начальных сообщения:
+        # 1. Прогресс-бар с шумом
+        progress_message = await bot.send_message(
+            chat_id=chat_id,
+            text="> Инициализация системы очистки...\n[░░░░░░░░░░]"
+        )
+        sent_messages.append(progress_message.message_id)
+        progress['progress'] = progress_message.message_id
+        
+        # 2. Хакерский текст
+        hacker_message = await bot.send_message(
+            chat_id=chat_id,
+            text="[ОБНАРУЖЕНО НЕДОПУСТИМОЕ ПОВЕДЕНИЕ]\nПодготовка..."
+        )
+        sent_messages.append(hacker_message.message_id)
+        progress['hacker'] = hacker_message.message_id
     
     # Список стадий прогресс-бара
     progress_stages = [
@@ -101,57 +113,63 @@ async def logout_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Возможные цели для сканирования
     targets = ["системы", "базы данных", "чатовых потоков", "сетевых узлов", "токсичных сообщений"]
     
-    # Динамическое обновление сообщений
-    for stage in progress_stages:
-        # Генерируем динамические части для хакерского текста
-        target = random.choice(targets)
-        code = generate_random_hex(10)
-        algo = generate_random_hex_bytes(8)
-        encryption = generate_random_binary(32)
-        noise_line = generate_noise(random.randint(10, 30))
-        
-        dynamic_hacker_text = (
-            "[ОБНАРУЖЕНО НЕДОПУСТИМОЕ ПОВЕДЕНИЕ]\n"
-            f"Сканирование {target}...\n"
-            f"Обнаружен код: 0x{code}\n"
-            f"Запуск алгоритма очистки: [{algo}]\n"
-            f"Применение шифрования: {encryption}\n"
-            f"{noise_line}"
-        )
-        # Обновляем прогресс-бар с дополнительным шумом
-        progress_text = f"> Инициализация системы очистки...\n{stage}\n{generate_noise(20)}"
-        
-        try:
-            await context.bot.edit_message_text(
-                chat_id=update.effective_chat.id,
-                message_id=progress_message.message_id,
+    def make_stage_frame(stage):
+        async def update_messages():
+            # Генерируем динамические части для хакерского текста
+            target = _random.choice(targets)
+            code = generate_random_hex(10)
+            algo = generate_random_hex_bytes(8)
+            encryption = generate_random_binary(32)
+            noise_line = generate_noise(_random.randint(10, 30))
+            
+            dynamic_hacker_text = (
+                "[ОБНАРУЖЕНО НЕДОПУСТИМОЕ ПОВЕДЕНИЕ]\n"
+                f"Сканирование {target}...\n"
+                f"Обнаружен код: 0x{code}\n"
+                f"Запуск алгоритма очистки: [{algo}]\n"
+                f"Применение шифрования: {encryption}\n"
+                f"{noise_line}"
+            )
+            # Обновляем прогресс-бар с дополнительным шумом
+            progress_text = f"> Инициализация системы очистки...\n{stage}\n{generate_noise(20)}"
+            
+            await bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=progress['progress'],
                 text=progress_text
             )
-            await context.bot.edit_message_text(
-                chat_id=update.effective_chat.id,
-                message_id=hacker_message.message_id,
+            await bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=progress['hacker'],
                 text=dynamic_hacker_text
             )
-            await asyncio.sleep(1.5)
-        except Exception as e:
-            logger.error(f"Error updating messages: {e}")
-            break
+        return update_messages
     
-    # Финальное сообщение
-    final_message = await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text="[СИСТЕМА ОЧИСТКИ АКТИВИРОВАНА]\nВсе токсичные сообщения будут удалены."
-    )
-    sent_messages.append(final_message.message_id)
+    async def send_final_message():
+        # Финальное сообщение
+        final_message = await bot.send_message(
+            chat_id=chat_id,
+            text="[СИСТЕМА ОЧИСТКИ АКТИВИРОВАНА]\nВсе токсичные сообщения будут удалены."
+        )
+        sent_messages.append(final_message.message_id)
     
-    # Удаляем все сообщения через 5 секунд
-    await asyncio.sleep(5)
-    for message_id in sent_messages:
-        try:
-            await context.bot.delete_message(
-                chat_id=update.effective_chat.id,
-                message_id=message_id
-            )
-        except Exception as e:
-            logger.error(f"Error deleting message {message_id}: {e}")
-
+    async def delete_messages():
+        for message_id in sent_messages:
+            try:
+                await bot.delete_message(
+                    chat_id=chat_id,
+                    message_id=message_id
+                )
+            except Exception as e:
+                logger.error(f"Error deleting message {message_id}: {e}")
+    
+    # Динамическое обновление сообщений; при ошибке анимация сразу переходит к финалу
+    frames = [Frame(send_initial_messages, delay=2.5)]
+    for i, stage in enumerate(progress_stages):
+        frames.append(Frame(make_stage_frame(stage), delay=0 if i == 0 else 1.5))
+    finale = [
+        Frame(send_final_message, delay=1.5),
+        # Удаляем все сообщения через 5 секунд
+        Frame(delete_messages, delay=5),
+    ]
+    frame_scheduler.start(context.job_queue, f"logout:{chat_id}", chat_id, frames, finale)
@@ -4,47 +4,24 @@
 Система запоминает последнее отправленное пожелание и при следующем запросе 
 показывает следующее в списке, обеспечивая ротацию пожеланий.
 """
-import os
-import json
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes
+from phrase_rotator import phrase_rotator
 
 logger = logging.getLogger(__name__)
 
 # Путь к файлу с пожеланиями доброго утра (каждое пожелание с новой строки)
 MORNING_WISHES_FILE = "phrases/morning_wishes.txt"
-# Файл для хранения текущего индекса пожелания
+# Старый файл индекса: из него берётся начальная позиция при первом запуске
 MORNING_INDEX_FILE = "state_data/morning_index.json"
 
-def load_morning_wishes() -> list[str]:
-    """Считываем пожелания из файла. Пустые строки отбрасываются."""
-    if not os.path.exists(MORNING_WISHES_FILE):
-        return []
-    with open(MORNING_WISHES_FILE, "r", encoding="utf-8") as f:
-        wishes = [line.strip() for line in f if line.strip()]
-    return wishes
-
-def load_morning_index() -> int:
-    """Загружаем текущий индекс из файла. Если файла нет — возвращаем 0."""
-    if not os.path.exists(MORNING_INDEX_FILE):
-        return 0
-    try:
-        with open(MORNING_INDEX_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, dict) and "morning_index" in data:
-                return data["morning_index"]
-    except Exception as e:
-        logger.error("Ошибка чтения файла индекса утра: %s", e)
-    return 0
-
-def save_morning_index(index: int):
-    """Сохраняем новый индекс в файл."""
-    try:
-        with open(MORNING_INDEX_FILE, "w", encoding="utf-8") as f:
-            json.dump({"morning_index": index}, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        logger.error("Ошибка записи файла индекса утра: %s", e)
+phrase_rotator.register(
+    "morning",
+    MORNING_WISHES_FILE,
+    legacy_index_file=MORNING_INDEX_FILE,
+    legacy_key="morning_index"
+)
 
 async def morning_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -52,30 +29,21 @@ async def morning_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     Отправляет пользователю пожелание доброго утра, выбирая следующее 
     из списка относительно предыдущего запроса.
     
-    Функционал:
-    1. Загружает список пожеланий из файла
-    2. Определяет текущий индекс в списке пожеланий
-    3. Отправляет очередное пожелание пользователю
-    4. Обновляет индекс для следующего запроса
+    Список пожеланий и текущая позиция хранятся в phrase_rotator,
+    поэтому команда не читает файлы при каждом вызове.
     
     Args:
         update: Объект обновления от Telegram
         context: Контекст обработчика
     """
-    wishes = load_morning_wishes()
-    if not wishes:
+    # Берём очередное пожелание (с переходом к началу при достижении конца списка)
+    wish = phrase_rotator.next("morning")
+    if wish is None:
         await context.bot.send_message(
             chat_id=update.effective_chat.id, 
             text="Пока нет пожеланий доброго утра. Попробуйте позже."
         )
         return
 
-    # Загружаем текущий индекс
-    index = load_morning_index()
-    # Выбираем пожелание по индексу (с переходом к началу при достижении конца списка)
-    wish = wishes[index % len(wishes)]
     # Отправляем пожелание
     await context.bot.send_message(chat_id=update.effective_chat.id, text=wish)
-    # Увеличиваем индекс и сохраняем его
-    index = (index + 1) % len(wishes)
-    save_morning_index(index) 
\ No newline at end of file
@@ -2,10 +2,9 @@
 """
 Модуль для обработки команды /roll - бросок виртуального кубика.
 Поддерживает кубики с любым количеством граней и возможность перебросить результат.
+Частота бросков ограничивается command_limiter (класс roll) до вызова обработчиков.
 """
-import random
-import time
-import asyncio
+from rng import rng
 
 from telegram import (
     Update,
@@ -16,8 +15,11 @@ from telegram import (
 )
 from telegram.ext import ContextTypes
 from utils import check_chat_and_execute
-from config import DICE_GIF_ID, COOLDOWN
-from state import last_roll_time
+from config import get_config
+from animations import Frame, frame_scheduler
+
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('roll')
 
 async def roll_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
@@ -29,19 +31,6 @@ async def roll_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         context: Контекст обработчика с аргументами команды
     """
     async def _roll_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        user_id = update.effective_user.id
-        now = time.time()
-        # Проверка кулдауна между бросками
-        if user_id in last_roll_time:
-            diff = now - last_roll_time[user_id]
-            if diff < COOLDOWN:
-                await context.bot.send_message(
-                    chat_id=update.effective_chat.id,
-                    text=f"Слишком быстрый бросок! Подождите {COOLDOWN - diff:.1f} секунд."
-                )
-                return
-        last_roll_time[user_id] = now
-
         args = context.args
         try:
             # Определяем максимальное число на кубике (по умолчанию 6)
@@ -59,7 +48,8 @@ async def roll_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             )
             return
 
-        if not DICE_GIF_ID:
+        dice_gif_id = get_config().dice_gif_id
+        if not dice_gif_id:
             await context.bot.send_message(
                 chat_id=update.effective_chat.id,
                 text="У меня пока нет file_id для GIF! Сначала сделайте /getfileid"
@@ -69,15 +59,12 @@ async def roll_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         # Отправляем анимацию броска кубика
         msg = await context.bot.send_animation(
             chat_id=update.effective_chat.id,
-            animation=DICE_GIF_ID,
+            animation=dice_gif_id,
             caption="Кубик катится... 🎲"
         )
 
-        # Имитация задержки при броске
-        await asyncio.sleep(1)
-
         # Генерация случайного результата
-        result = random.randint(1, max_number)
+        result = _random.randint(1, max_number)
         # Создаем кнопку для переброса
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
@@ -86,19 +73,28 @@ async def roll_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             )]
         ])
 
-        # Обновляем сообщение с результатом броска
-        with open("pictures/dice_result.png", "rb") as image_file:
-            new_caption = (
-                f"🎲 Результат: {result} (из {max_number})\n"
-                f"🔄 Количество перебросов: 0"
-            )
-            media = InputMediaPhoto(image_file, caption=new_caption)
-            await context.bot.edit_message_media(
-                chat_id=msg.chat_id,
-                message_id=msg.message_id,
-                media=media,
-                reply_markup=keyboard
-            )
+        async def show_result():
+            # Обновляем сообщение с результатом броска
+            with open("pictures/dice_result.png", "rb") as image_file:
+                new_caption = (
+                    f"🎲 Результат: {result} (из {max_number})\n"
+                    f"🔄 Количество перебросов: 0"
+                )
+                media = InputMediaPhoto(image_file, caption=new_caption)
+                await context.bot.edit_message_media(
+                    chat_id=msg.chat_id,
+                    message_id=msg.message_id,
+                    media=media,
+                    reply_markup=keyboard
+                )
+
+        # Результат показывается через секунду (имитация броска), обработчик не ждёт
+        frame_scheduler.start(
+            context.job_queue,
+            f"roll:{msg.chat_id}:{msg.message_id}",
+            msg.chat_id,
+            [Frame(show_result, delay=1)]
+        )
     await check_chat_and_execute(update, context, _roll_command)
 
 async def roll_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -113,19 +109,6 @@ async def roll_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     query = update.callback_query
     await query.answer()
 
-    user_id = query.from_user.id
-    now = time.time()
-    # Проверка кулдауна между перебросами
-    if user_id in last_roll_time:
-        diff = now - last_roll_time[user_id]
-        if diff < COOLDOWN:
-            await query.answer(
-                text=f"Слишком быстро! Подождите {COOLDOWN - diff:.1f} секунд.",
-                show_alert=True
-            )
-            return
-    last_roll_time[user_id] = now
-
     # Разбор данных из callback_query
     data = query.data
     prefix, max_num_str, reroll_count_str = data.split("|")
@@ -133,13 +116,14 @@ async def roll_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     reroll_count = int(reroll_count_str)
     new_reroll_count = reroll_count + 1
 
-    if not DICE_GIF_ID:
+    dice_gif_id = get_config().dice_gif_id
+    if not dice_gif_id:
         await query.answer("Нет file_id! Сначала сделайте /getfileid.")
         return
 
     # Обновляем сообщение анимацией броска
     media_animation = InputMediaAnimation(
-        media=DICE_GIF_ID,
+        media=dice_gif_id,
         caption="Кубик катится... 🎲"
     )
     await query.edit_message_media(
@@ -147,11 +131,8 @@ async def roll_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         reply_markup=None
     )
 
-    # Имитация задержки при броске
-    await asyncio.sleep(1)
-
     # Генерация нового случайного результата
-    result = random.randint(1, max_number)
+    result = _random.randint(1, max_number)
     # Обновляем кнопку с новым счетчиком перебросов
     keyboard = InlineKeyboardMarkup([
         [InlineKeyboardButton(
@@ -160,14 +141,24 @@ async def roll_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         )]
     ])
 
-    # Обновляем сообщение с новым результатом
-    with open("pictures/dice_result.png", "rb") as image_file:
-        new_text = (
-            f"🎲 Результат: {result} (из {max_number})\n"
-            f"🔄 Количество перебросов: {new_reroll_count}"
-        )
-        media_photo = InputMediaPhoto(image_file, caption=new_text)
-        await query.edit_message_media(
-            media=media_photo,
-            reply_markup=keyboard
-        )
+    async def show_result():
+        # Обновляем сообщение с новым результатом
+        with open("pictures/dice_result.png", "rb") as image_file:
+            new_text = (
+                f"🎲 Результат: {result} (из {max_number})\n"
+                f"🔄 Количество перебросов: {new_reroll_count}"
+            )
+            media_photo = InputMediaPhoto(image_file, caption=new_text)
+            await query.edit_message_media(
+                media=media_photo,
+                reply_markup=keyboard
+            )
+
+    # Результат показывается через секунду (имитация броска), обработчик не ждёт
+    message = query.message
+    frame_scheduler.start(
+        context.job_queue,
+        f"roll:{message.chat_id}:{message.message_id}",
+        message.chat_id,
+        [Frame(show_result, delay=1)]
+    )
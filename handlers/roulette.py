@@ -3,8 +3,13 @@
 Модуль обработчика команды /roulette - интерактивная текстовая рулетка с выбором.
 Реализует функциональность для выбора случайного варианта из списка,
 предоставленного пользователем, с возможностью последовательного исключения вариантов.
+Рулетки чатов хранятся в ограниченном хранилище сессий и сохраняются в файл,
+поэтому незаконченная рулетка переживает перезапуск бота.
 """
-import random
+import atexit
+import sys
+import time
+from rng import rng
 from telegram import (
     Update,
     InlineKeyboardButton,
@@ -12,54 +17,174 @@ from telegram import (
 )
 from telegram.ext import ContextTypes
 from utils import check_chat_and_execute
-from state import ROULETTE_DATA
+from session_store import SessionStore
 
-def format_roulette_list(roulette_dict: dict) -> str:
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('roulette')
+
+ROULETTE_SESSIONS_FILE = "state_data/roulette_sessions.json"
+# Рулетка чата удаляется после суток без нажатий
+ROULETTE_TTL = 24 * 3600
+# Больше рулеток одновременно не хранится: самые давние вытесняются
+MAX_ROULETTES = 1000
+
+
+def _line(value, removed) -> str:
+    return f"<s>🔴 {value}</s>" if removed else f"🟢 {value}"
+
+
+class RouletteSession:
+    """
+    Рулетка чата: варианты и битовая маска удалённых вариантов
+    (бит i установлен — вариант i вычеркнут).
+
+    Оставшиеся варианты хранятся массивом индексов order с позициями pos,
+    вычёркивание меняет местами вариант с последним и укорачивает массив.
+    Строки списка для сообщения хранятся готовыми и меняются по одной,
+    поэтому спин не зависит от числа вариантов (кроме склейки текста).
+    """
+
+    __slots__ = ('items', 'removed', 'order', 'pos', 'lines', '_text', '_size', 'last_active')
+
+    def __init__(self, items, removed=0, last_active=None, order=None):
+        self.items = tuple(items)
+        self.removed = removed
+        self.last_active = time.time() if last_active is None else last_active
+        if order is None:
+            order = [i for i in range(len(self.items)) if not removed >> i & 1]
+        self.order = list(order)
+        self.pos = [-1] * len(self.items)
+        for position, index in enumerate(self.order):
+            self.pos[index] = position
+        self.lines = [_line(value, removed >> i & 1) for i, value in enumerate(self.items)]
+        self._text = None
+        self._size = self._measure()
+
+    def is_removed(self, index) -> bool:
+        return bool(self.removed >> index & 1)
+
+    def remaining(self) -> list:
+        """Индексы ещё не вычеркнутых вариантов (в порядке массива order)."""
+        return list(self.order)
+
+    def remaining_count(self) -> int:
+        return len(self.order)
+
+    def remove(self, index):
+        """Вычёркивает вариант за O(1): на его место в order встаёт последний."""
+        position = self.pos[index]
+        if position < 0:
+            return
+        last = self.order.pop()
+        if last != index:
+            self.order[position] = last
+            self.pos[last] = position
+        self.pos[index] = -1
+        self.removed |= 1 << index
+        line = _line(self.items[index], True)
+        self._size += sys.getsizeof(line) - sys.getsizeof(self.lines[index])
+        self.lines[index] = line
+        self._text = None
+
+    def spin(self, random) -> int:
+        """Вычёркивает случайный из оставшихся вариантов и возвращает его индекс."""
+        index = self.order[random.randrange(len(self.order))]
+        self.remove(index)
+        return index
+
+    def reset(self):
+        self.removed = 0
+        self.order = list(range(len(self.items)))
+        self.pos = list(self.order)
+        self.lines = [_line(value, False) for value in self.items]
+        self._text = None
+        self._size = self._measure()
+
+    def text(self) -> str:
+        """Список вариантов с HTML-разметкой; склеивается заново только после изменений."""
+        if self._text is None:
+            self._text = "\n".join(self.lines)
+        return self._text
+
+    def size_bytes(self) -> int:
+        """
+        Размер рулетки в байтах вместе с вариантами, готовыми строками и текстом.
+        Считается за O(1): размер строк обновляется при вычёркивании.
+        """
+        # order укорачивается при вычёркивании, поэтому измеряется каждый раз (O(1))
+        size = self._size + sys.getsizeof(self.order) + sys.getsizeof(self.removed)
+        if self._text is not None:
+            size += sys.getsizeof(self._text)
+        return size
+
+    def _measure(self) -> int:
+        size = sys.getsizeof(self)
+        for container in (self.items, self.pos, self.lines):
+            size += sys.getsizeof(container)
+        size += sum(sys.getsizeof(value) for value in self.items)
+        size += sum(sys.getsizeof(line) for line in self.lines)
+        return size
+
+    def to_json(self) -> dict:
+        return {
+            "items": list(self.items),
+            "removed": self.removed,
+            "order": self.order,
+            "last_active": self.last_active,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["items"], data["removed"], data["last_active"], data.get("order"))
+
+
+# Рулетки по chat_id
+roulette_sessions = SessionStore(
+    ttl=ROULETTE_TTL,
+    max_entries=MAX_ROULETTES,
+    path=ROULETTE_SESSIONS_FILE,
+    record_type=RouletteSession,
+    key_type=int,
+)
+atexit.register(roulette_sessions.flush)
+
+# Клавиатуры рулетки неизменны, поэтому создаются один раз
+SPIN_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("Крутить 🎰", callback_data="roulette|spin"),
+        InlineKeyboardButton("Начать заново 🔁", callback_data="roulette|startover")
+    ]
+])
+FINISHED_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("Начать заново 🔁", callback_data="roulette|startover")
+    ]
+])
+
+def format_roulette_list(session: RouletteSession) -> str:
     """
     Форматирует список вариантов для отображения в сообщении.
     Зачеркивает уже удалённые варианты.
     
     Args:
-        roulette_dict: Словарь с данными рулетки
+        session: Рулетка чата
         
     Returns:
         str: Отформатированный список вариантов с HTML-разметкой
     """
-    original_list = roulette_dict["original_list"]
-    removed_ids = roulette_dict["removed_list"]
-    lines = []
-    for item in original_list:
-        if item["id"] in removed_ids:
-            lines.append(f"<s>🔴 {item['value']}</s>")
-        else:
-            lines.append(f"🟢 {item['value']}")
-    return "\n".join(lines)
+    return session.text()
 
-def build_roulette_keyboard(roulette_dict: dict) -> InlineKeyboardMarkup:
+def build_roulette_keyboard(session: RouletteSession) -> InlineKeyboardMarkup:
     """
     Создает клавиатуру с кнопками для взаимодействия с рулеткой.
     
     Args:
-        roulette_dict: Словарь с данными рулетки
+        session: Рулетка чата
         
     Returns:
         InlineKeyboardMarkup: Клавиатура с кнопками "Крутить" и "Начать заново"
     """
-    current_list = roulette_dict["current_list"]
-    if len(current_list) > 1:
-        keyboard = [
-            [
-                InlineKeyboardButton("Крутить 🎰", callback_data="roulette|spin"),
-                InlineKeyboardButton("Начать заново 🔁", callback_data="roulette|startover")
-            ]
-        ]
-    else:
-        keyboard = [
-            [
-                InlineKeyboardButton("Начать заново 🔁", callback_data="roulette|startover")
-            ]
-        ]
-    return InlineKeyboardMarkup(keyboard)
+    return SPIN_KEYBOARD if session.remaining_count() > 1 else FINISHED_KEYBOARD
 
 async def roulette_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -93,17 +218,12 @@ async def roulette_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         chat_id = update.effective_chat.id
-        # Присваиваем каждому варианту уникальный id
-        items = [{"id": i, "value": variant} for i, variant in enumerate(variants)]
-        ROULETTE_DATA[chat_id] = {
-            "original_list": items,
-            "current_list": items[:],
-            "removed_list": []  # Будем хранить id удалённых элементов
-        }
+        # id варианта — его номер в списке
+        session = RouletteSession(variants)
+        roulette_sessions.put(chat_id, session)
 
-        roulette_dict = ROULETTE_DATA[chat_id]
-        text_list = format_roulette_list(roulette_dict)
-        keyboard = build_roulette_keyboard(roulette_dict)
+        text_list = format_roulette_list(session)
+        keyboard = build_roulette_keyboard(session)
 
         await context.bot.send_message(
             chat_id=chat_id,
@@ -120,45 +240,43 @@ async def roulette_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     data = query.data
     chat_id = query.message.chat_id
 
-    if chat_id not in ROULETTE_DATA:
+    session = roulette_sessions.get(chat_id)
+    if session is None:
         await query.edit_message_text(
             text="Нет активной рулетки. Сначала выполните /roulette."
         )
         return
 
     action = data.split("|")[1]
-    roulette_dict = ROULETTE_DATA[chat_id]
 
     if action == "spin":
-        if len(roulette_dict["current_list"]) > 1:
-            # Выбираем случайный элемент из текущего списка
-            removed_item = random.choice(roulette_dict["current_list"])
-            roulette_dict["current_list"].remove(removed_item)
-            roulette_dict["removed_list"].append(removed_item["id"])
-
-            text_list = format_roulette_list(roulette_dict)
-            if len(roulette_dict["current_list"]) == 1:
-                winner = roulette_dict["current_list"][0]
-                text_list += f"\n\nГОООООООООЛ! Победитель: <b>{winner['value']}</b> 🎊"
-
-            keyboard = build_roulette_keyboard(roulette_dict)
+        if session.remaining_count() > 1:
+            # Вычёркиваем случайный вариант из оставшихся
+            session.spin(_random)
+            text_list = format_roulette_list(session)
+            roulette_sessions.mark_dirty(chat_id)
+            if session.remaining_count() == 1:
+                winner = session.items[session.order[0]]
+                text_list += f"\n\nГОООООООООЛ! Победитель: <b>{winner}</b> 🎊"
+
+            keyboard = build_roulette_keyboard(session)
             await query.edit_message_text(
                 text=f"РОЛЯЯЯЕМ! 🎉\n\n{text_list}",
                 reply_markup=keyboard,
                 parse_mode="HTML"
             )
         else:
-            text_list = format_roulette_list(roulette_dict)
+            text_list = format_roulette_list(session)
             await query.edit_message_text(
                 text=f"Рулетка уже закончена.\n\n{text_list}",
                 parse_mode="HTML"
             )
 
     elif action == "startover":
-        roulette_dict["current_list"] = roulette_dict["original_list"][:]
-        roulette_dict["removed_list"] = []
-        text_list = format_roulette_list(roulette_dict)
-        keyboard = build_roulette_keyboard(roulette_dict)
+        session.reset()
+        text_list = format_roulette_list(session)
+        roulette_sessions.mark_dirty(chat_id)
+        keyboard = build_roulette_keyboard(session)
         await query.edit_message_text(
             text=f"РОЛЯЯЯЕМ! 🎉\n\n{text_list}",
             reply_markup=keyboard,
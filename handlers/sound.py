@@ -2,80 +2,66 @@
 Модуль звуковой панели для бота.
 Обеспечивает:
 - Интерактивную панель с кнопками для воспроизведения звуков
-- Загрузку конфигурации звуков из JSON-файла
-- Отправку аудиофайлов в чат по запросу
+- Загрузку конфигурации звуков из снимка настроек
+- Отправку аудиофайлов в чат по запросу: после первой загрузки звук
+  отправляется по сохранённому file_id
+- Перекодирование и выравнивание громкости звука перед первой загрузкой
 """
+import asyncio
 import os
-import json
 import logging
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
+import config
+from sound_catalog import SoundCatalog
+from audio_pipeline import AudioPipeline
 
 # Папка, где хранятся звуковые файлы
 SOUNDS_DIR = "sound_panel"
-# Конфигурационный файл с отображаемыми названиями
-SOUND_CONFIG_FILE = "config/sound_config.json"
-
-# Глобальное сопоставление коротких ID кнопок с именами файлов
-SOUND_MAPPING = {}
+# file_id звуков, уже загруженных в Telegram
+SOUND_FILE_IDS_FILE = "state_data/sound_file_ids.json"
+# Кэш перекодированных звуков
+AUDIO_CACHE_DIR = "state_data/audio_cache"
 
 logger = logging.getLogger(__name__)
 
-def load_sound_config() -> dict:
+# Каталог звуков: готовая клавиатура и file_id загруженных звуков
+sound_catalog = SoundCatalog(SOUNDS_DIR, SOUND_FILE_IDS_FILE)
+# Подготовка звуков к загрузке
+audio_pipeline = AudioPipeline(AUDIO_CACHE_DIR)
+
+def load_sound_config():
     """
-    Загружает конфигурацию звуков из SOUND_CONFIG_FILE.
-    Ожидается формат: { "filename.mp3": "Отображаемое название", ... }
-    
+    Возвращает конфигурацию звуков (config/sound_config.json) из текущего
+    снимка настроек, не обращаясь к диску.
+    Формат: { "filename.mp3": "Отображаемое название", ... }
+
     Returns:
-        dict: Словарь с сопоставлением имен файлов и отображаемых названий кнопок
+        Mapping: Сопоставление имен файлов и отображаемых названий кнопок
     """
-    try:
-        with open(SOUND_CONFIG_FILE, "r", encoding="utf-8") as f:
-            config = json.load(f)
-        return config
-    except Exception as e:
-        logger.error("Ошибка загрузки конфигурации звуков: %s", e)
-        return {}
+    return config.get_config().sound
 
 async def sound_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Обработчик команды /sound - отображает интерактивную панель с кнопками звуков.
-    
-    Создает клавиатуру с кнопками для каждого звука из конфигурации,
-    располагая по 2 кнопки в ряду.
-    
+
+    Клавиатура берется из каталога звуков и пересобирается только при изменении
+    конфигурации или папки со звуками.
+
     Args:
         update: Объект обновления от Telegram
         context: Контекст обработчика
     """
-    config = load_sound_config()
-    if not config:
+    panel = sound_catalog.panel(load_sound_config())
+    if not panel:
         await context.bot.send_message(chat_id=update.effective_chat.id, text="Конфигурация звуков не найдена.")
         return
 
-    global SOUND_MAPPING
-    SOUND_MAPPING = {}  # Обнуляем старое сопоставление
-    keyboard = []
-    row = []
-    # Используем счетчик для генерации короткого ID
-    for idx, (file_name, display_name) in enumerate(config.items(), start=1):
-        short_id = f"sound:{idx}"  # например, "sound:1", "sound:2", ...
-        SOUND_MAPPING[short_id] = file_name
-        row.append(InlineKeyboardButton(display_name, callback_data=short_id))
-        # Если в ряду 2 кнопки, добавляем ряд в клавиатуру и обнуляем ряд
-        if len(row) == 2:
-            keyboard.append(row)
-            row = []
-    # Если остались кнопки в ряду, добавляем их тоже
-    if row:
-        keyboard.append(row)
-
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await context.bot.send_message(
         chat_id=update.effective_chat.id,
         text="Выберите звук:",
-        reply_markup=reply_markup
+        reply_markup=panel.reply_markup
     )
 
 
@@ -83,38 +69,46 @@ async def sound_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def sound_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Обработчик callback запроса для кнопок звуковой панели.
-    
-    Получает короткий ID кнопки, находит соответствующий файл звука,
-    отправляет его в чат и удаляет панель с кнопками.
-    
+
+    Находит звук по ID кнопки, отправляет его в чат (по file_id, если звук
+    уже загружался) и удаляет панель с кнопками.
+
     Args:
         update: Объект обновления от Telegram с callback_query
         context: Контекст обработчика
     """
     query = update.callback_query
     await query.answer()
-    short_id = query.data  # теперь это, например, "sound:1"
-    global SOUND_MAPPING
-    file_name = SOUND_MAPPING.get(short_id)
-    if not file_name:
-        await query.edit_message_text("Аудиофайл не найден.")
-        return
-
-    file_path = os.path.join(SOUNDS_DIR, file_name)
-    if not os.path.exists(file_path):
+    entry = sound_catalog.panel(load_sound_config()).entries.get(query.data)
+    if entry is None:
         await query.edit_message_text("Аудиофайл не найден.")
         return
 
+    chat_id = update.effective_chat.id
     try:
-        # Отправляем аудиофайл в чат
-        with open(file_path, "rb") as audio_file:
-            await context.bot.send_audio(
-                chat_id=update.effective_chat.id,
-                audio=audio_file
-            )
+        file_id = sound_catalog.file_id(entry.sound_id)
+        if file_id:
+            try:
+                await context.bot.send_audio(chat_id=chat_id, audio=file_id)
+            except BadRequest as e:
+                # file_id устарел — загружаем файл заново
+                logger.warning("file_id звука %s не принят: %s", entry.file_name, e)
+                sound_catalog.forget(entry.sound_id)
+                file_id = None
+        if not file_id:
+            if not os.path.exists(entry.path):
+                await query.edit_message_text("Аудиофайл не найден.")
+                return
+            # Перекодирование блокирует, поэтому выполняется в отдельном потоке
+            upload_path = await asyncio.to_thread(audio_pipeline.prepare, entry.path)
+            # Имя для Telegram — исходное, с расширением подготовленного файла
+            filename = os.path.splitext(entry.file_name)[0] + os.path.splitext(upload_path)[1]
+            with open(upload_path, "rb") as audio_file:
+                message = await context.bot.send_audio(chat_id=chat_id, audio=audio_file, filename=filename)
+            attachment = message.effective_attachment if message else None
+            sound_catalog.remember(entry.sound_id, getattr(attachment, "file_id", None))
         # Удаляем панель с кнопками
         await query.delete_message()
     except Exception as e:
-        logger.error("Ошибка при отправке аудиофайла %s: %s", file_name, e)
+        logger.error("Ошибка при отправке аудиофайла %s: %s", entry.file_name, e)
         await query.edit_message_text("Ошибка при воспроизведении звука.")
-
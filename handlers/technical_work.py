@@ -6,7 +6,7 @@
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes
-from config import POST_CHAT_ID  # Или, если нужен другой чат, определите другой ID
+from config import get_config
 
 async def technical_work_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -18,19 +18,20 @@ async def technical_work_command(update: Update, context: ContextTypes.DEFAULT_T
         context: Контекст обработчика
         
     Note:
-        Сообщение отправляется в канал, указанный в POST_CHAT_ID,
+        Сообщение отправляется в канал, указанный в post_chat_id (bot_config.json),
         а не в чат, из которого была вызвана команда.
     """
+    post_chat_id = get_config().post_chat_id
     try:
         with open("pictures/technical_work.jpg", "rb") as photo:
             await context.bot.send_photo(
-                chat_id=POST_CHAT_ID,
+                chat_id=post_chat_id,
                 photo=photo,
                 caption="⚙️ Ведутся технические работы, бот будет недоступен.\n\nГотовьтесь к обновлениям, отдыхайте, пока можете! 😄"
             )
     except Exception as e:
         logging.error(f"Ошибка отправки technical_work.jpg: {e}")
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=post_chat_id,
             text="Ошибка: не удалось отправить сообщение о технических работах."
         )
@@ -0,0 +1,146 @@
+# http_client.py
+"""
+Модуль HTTP-клиента Bot API.
+Обеспечивает:
+- Раздельные пулы соединений: обычные вызовы API, загрузка медиа и getUpdates,
+  чтобы долгая отправка альбома не занимала соединение для ответов на кнопки
+- Размеры пулов, keep-alive, HTTP/2 и таймауты из раздела http в bot_config.json
+- Таймауты по типу операции вместо read_timeout=... в каждом вызове
+"""
+
+import importlib.util
+import logging
+
+import httpx
+from telegram.request import BaseRequest, HTTPXRequest
+
+logger = logging.getLogger(__name__)
+
+# Методы, которые загружают файлы и идут через пул uploads
+UPLOAD_ENDPOINTS = frozenset({
+    'sendPhoto', 'sendVideo', 'sendAnimation', 'sendMediaGroup', 'sendDocument',
+    'sendAudio', 'sendVoice', 'sendVideoNote', 'sendSticker', 'editMessageMedia',
+})
+
+
+class PooledHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest с настраиваемым временем жизни keep-alive соединений."""
+
+    def __init__(self, keepalive_expiry: float, **kwargs):
+        self._keepalive_expiry = keepalive_expiry
+        super().__init__(**kwargs)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = self._client_kwargs['limits']
+        self._client_kwargs['limits'] = httpx.Limits(
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=self._keepalive_expiry,
+        )
+        return super()._build_client()
+
+    @property
+    def write_timeout(self):
+        return self._client.timeout.write
+
+
+def resolve_http_version(requested: str) -> str:
+    """
+    Возвращает версию HTTP, которую можно использовать.
+    Для HTTP/2 нужен пакет h2 (python-telegram-bot[http2]); без него остаёмся на 1.1.
+    """
+    if requested == '2' and importlib.util.find_spec('h2') is None:
+        logger.warning("HTTP/2 включён в bot_config.http, но пакет h2 не установлен. Используется HTTP/1.1")
+        return '1.1'
+    return requested
+
+
+def build_request(pool: dict, http_version: str, keepalive_expiry: float) -> PooledHTTPXRequest:
+    """Создаёт пул соединений по настройкам одного раздела bot_config.http."""
+    return PooledHTTPXRequest(
+        keepalive_expiry=keepalive_expiry,
+        connection_pool_size=pool['pool_size'],
+        connect_timeout=pool['connect_timeout'],
+        read_timeout=pool['read_timeout'],
+        write_timeout=pool['write_timeout'],
+        pool_timeout=pool['pool_timeout'],
+        http_version=http_version,
+    )
+
+
+class RoutingRequest(BaseRequest):
+    """
+    Направляет загрузку файлов в пул uploads, остальные вызовы — в пул api.
+    Скачивание файлов (retrieve) тоже идёт через uploads.
+    """
+
+    def __init__(self, api: BaseRequest, uploads: PooledHTTPXRequest):
+        self.api = api
+        self.uploads = uploads
+
+    @property
+    def read_timeout(self):
+        return self.api.read_timeout
+
+    async def initialize(self) -> None:
+        await self.api.initialize()
+        await self.uploads.initialize()
+
+    async def shutdown(self) -> None:
+        await self.api.shutdown()
+        await self.uploads.shutdown()
+
+    def _pool_for(self, url: str) -> BaseRequest:
+        if '/file/bot' in url or url.rsplit('/', 1)[-1] in UPLOAD_ENDPOINTS:
+            return self.uploads
+        return self.api
+
+    async def do_request(
+        self,
+        url,
+        method,
+        request_data=None,
+        read_timeout=BaseRequest.DEFAULT_NONE,
+        write_timeout=BaseRequest.DEFAULT_NONE,
+        connect_timeout=BaseRequest.DEFAULT_NONE,
+        pool_timeout=BaseRequest.DEFAULT_NONE,
+    ):
+        pool = self._pool_for(url)
+        if pool is self.uploads and write_timeout is BaseRequest.DEFAULT_NONE:
+            # HTTPXRequest для файлов подставляет фиксированные 20 секунд на запись,
+            # поэтому таймаут пула uploads передаём явно
+            write_timeout = pool.write_timeout
+        return await pool.do_request(
+            url,
+            method,
+            request_data=request_data,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+        )
+
+
+def configure_requests(builder, http: dict):
+    """
+    Подключает пулы соединений к ApplicationBuilder.
+
+    Args:
+        builder: ApplicationBuilder
+        http: Раздел http из снимка конфигурации (get_config().http)
+    """
+    http_version = resolve_http_version(http['http_version'])
+    keepalive = http['keepalive_expiry']
+    request = RoutingRequest(
+        api=build_request(http['api'], http_version, keepalive),
+        uploads=build_request(http['uploads'], http_version, keepalive),
+    )
+    logger.info(
+        f"HTTP {http_version}: пул api {http['api']['pool_size']}, "
+        f"uploads {http['uploads']['pool_size']}, polling {http['polling']['pool_size']}"
+    )
+    return (
+        builder
+        .request(request)
+        .get_updates_request(build_request(http['polling'], http_version, keepalive))
+    )
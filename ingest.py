@@ -0,0 +1,126 @@
+# ingest.py
+"""
+Модуль очереди событий, изменяющих данные на диске (ответы на викторину,
+ставки, результаты игр в казино).
+Обеспечивает:
+- Постановку события в очередь без обращения к диску в обработчике
+- Единственную задачу-писателя, которая применяет события пачками:
+  каждые batch_interval секунд или по накоплении max_batch событий
+- Применение пачки внутри одной транзакции (например, balance_batch),
+  поэтому всплеск из сотни ответов даёт единицы записей файлов
+- Возврат результата события через asyncio.Future для тех, кому он нужен
+"""
+
+import asyncio
+import logging
+from contextlib import nullcontext
+
+from balance import balance_batch
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_INTERVAL = 0.05  # секунд ожидания остальных событий пачки
+INGEST_MAX_BATCH = 100        # событий в одной пачке
+
+
+class IngestQueue:
+    """
+    Очередь событий с одним писателем.
+
+    Событие — это функция с аргументами. Она выполняется в задаче-писателе,
+    последовательно с остальными событиями, поэтому проверка и изменение
+    данных внутри неё не пересекаются с другими обработчиками.
+    """
+
+    def __init__(self, batch_interval=INGEST_BATCH_INTERVAL, max_batch=INGEST_MAX_BATCH, transaction=None):
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self.transaction = transaction
+        self._queue = None
+        self._loop = None
+        self._writer = None
+        self.metrics = {
+            'events': 0,
+            'batches': 0,
+            'errors': 0,
+        }
+
+    def submit(self, func, *args, **kwargs) -> asyncio.Future:
+        """
+        Ставит событие в очередь. Должна вызываться из работающего цикла событий.
+
+        Args:
+            func: Функция, применяющая событие
+            *args, **kwargs: Её аргументы
+
+        Returns:
+            asyncio.Future: Результат func; ждать его необязательно
+        """
+        loop = asyncio.get_running_loop()
+        self._ensure_writer(loop)
+        future = loop.create_future()
+        self._queue.put_nowait((func, args, kwargs, future))
+        return future
+
+    async def drain(self):
+        """Ждёт, пока писатель применит все поставленные события."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    def _ensure_writer(self, loop):
+        if self._loop is not loop:
+            # Очередь привязана к циклу событий, в новом цикле заводим новую
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._writer = None
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._run())
+
+    async def _run(self):
+        # Писатель работает, пока есть события, и запускается заново следующим submit()
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait()]
+            deadline = loop.time() + self.batch_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                self._apply(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, batch):
+        self.metrics['batches'] += 1
+        self.metrics['events'] += len(batch)
+        try:
+            with self.transaction() if self.transaction else nullcontext():
+                for func, args, kwargs, future in batch:
+                    try:
+                        result = func(*args, **kwargs)
+                    except Exception as e:
+                        self.metrics['errors'] += 1
+                        logger.error(f"Ошибка применения события {getattr(func, '__name__', func)}: {e}")
+                        if not future.done():
+                            future.set_exception(e)
+                            # Ошибка уже в логе; не ругаемся, если результат никто не ждёт
+                            future.exception()
+                        continue
+                    if not future.done():
+                        future.set_result(result)
+        except Exception as e:
+            logger.error(f"Ошибка завершения пачки событий: {e}")
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+
+
+# Общая очередь для обработчиков бота; пачка событий меняет balance.json одной записью
+ingest_queue = IngestQueue(transaction=balance_batch)
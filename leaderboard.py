@@ -0,0 +1,151 @@
+# leaderboard.py
+"""
+Модуль звёздного рейтинга участников викторины.
+Обеспечивает:
+- Загрузку рейтинга из JSON-файла один раз и хранение его в памяти
+- Отсортированный индекс, который обновляется при каждом начислении звёзд
+- Получение первых K мест и места пользователя за O(log n) (двоичный поиск)
+- Отложенную запись: всплеск ответов в течение flush_delay секунд даёт одну запись файла
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    """
+    Рейтинг вида { str(user_id): {"stars": int, "name": str} }.
+    Индекс — список ключей (-stars, user_id), отсортированный по возрастанию,
+    то есть по убыванию звёзд.
+    """
+
+    def __init__(self, rating_file, flush_delay=1.0):
+        self.rating_file = rating_file
+        self.flush_delay = flush_delay
+        self._data = None
+        self._index = []
+        self._dirty = False
+        self._flush_handle = None
+
+    def add_stars(self, user_id, name, delta=1) -> int:
+        """
+        Начисляет пользователю звёзды и обновляет индекс.
+
+        Args:
+            user_id: ID пользователя Telegram
+            name: Отображаемое имя пользователя
+            delta: Количество звёзд
+
+        Returns:
+            int: Новое количество звёзд пользователя
+        """
+        data = self._load()
+        user_id_str = str(user_id)
+        entry = data.get(user_id_str)
+        if entry is None:
+            entry = data[user_id_str] = {"stars": 0, "name": None}
+        else:
+            self._index_remove(user_id_str, entry["stars"])
+        entry["stars"] = entry.get("stars", 0) + delta
+        entry["name"] = name
+        bisect.insort(self._index, (-entry["stars"], user_id_str))
+        self._mark_dirty()
+        return entry["stars"]
+
+    def top(self, k=None) -> list[tuple[str, dict]]:
+        """Возвращает первые k мест (или весь рейтинг) в порядке убывания звёзд."""
+        data = self._load()
+        keys = self._index if k is None else self._index[:k]
+        return [(user_id_str, data[user_id_str]) for _, user_id_str in keys]
+
+    def rank(self, user_id) -> int | None:
+        """
+        Возвращает место пользователя (1 — лидер, при равенстве звёзд место общее).
+
+        Returns:
+            int|None: Место или None, если пользователя нет в рейтинге
+        """
+        data = self._load()
+        entry = data.get(str(user_id))
+        if entry is None:
+            return None
+        return bisect.bisect_left(self._index, (-entry["stars"],)) + 1
+
+    def max_stars(self) -> int:
+        self._load()
+        return -self._index[0][0] if self._index else 0
+
+    def __len__(self):
+        return len(self._load())
+
+    def reset_stars(self):
+        """Обнуляет звёзды всех пользователей (имена сохраняются) и сразу записывает файл."""
+        for entry in self._load().values():
+            entry["stars"] = 0
+        self._rebuild_index()
+        self._dirty = True
+        self.flush()
+
+    def clear(self):
+        """Удаляет всех пользователей из рейтинга и сразу записывает файл."""
+        self._load().clear()
+        self._index = []
+        self._dirty = True
+        self.flush()
+
+    def flush(self):
+        """Записывает рейтинг в файл, если он изменился."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.rating_file) or ".", exist_ok=True)
+            with open(self.rating_file, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=4)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Ошибка записи {self.rating_file}: {e}")
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне цикла событий откладывать запись некому
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def _load(self) -> dict:
+        if self._data is not None:
+            return self._data
+        data = {}
+        if os.path.exists(self.rating_file):
+            try:
+                with open(self.rating_file, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if isinstance(loaded, dict):
+                    data = loaded
+            except Exception as e:
+                logger.error(f"Ошибка чтения {self.rating_file}: {e}")
+        self._data = data
+        self._rebuild_index()
+        return data
+
+    def _rebuild_index(self):
+        self._index = sorted((-entry.get("stars", 0), user_id_str) for user_id_str, entry in self._data.items())
+
+    def _index_remove(self, user_id_str, stars):
+        key = (-stars, user_id_str)
+        pos = bisect.bisect_left(self._index, key)
+        if pos < len(self._index) and self._index[pos] == key:
+            del self._index[pos]
@@ -12,12 +12,15 @@ import datetime
 import os
 from pathlib import Path
 import logging.handlers
+from telegram import Update
 from telegram.ext import (
     ApplicationBuilder,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
     PollAnswerHandler,
+    PollHandler,
+    TypeHandler,
     filters,
     CallbackContext
 )
@@ -89,12 +92,12 @@ def setup_logging():
 # Инициализация логгера
 logger = setup_logging()
 
-from config import TOKEN, schedule_config, reload_all_configs
+from config import get_config, reload_all_configs, ConfigError
 from handlers.start_help import start, help_command
 from handlers.getfileid import getfileid_command, catch_animation_fileid
 from handlers.roll import roll_command, roll_callback
 from handlers.roulette import roulette_command, roulette_callback
-from handlers.all import all_command
+from handlers.all import all_command, track_members
 from handlers.coffee_mishka import coffee_command, mishka_command, durka_command
 from handlers.chatid import chatid_command
 from handlers.technical_work import technical_work_command
@@ -116,15 +119,26 @@ from scheduler import (
     change_date_callback, 
     custom_date_handler, 
     reschedule_all_posts, 
-    parse_time_from_string, 
+    schedule_daily_resets,
+    register_config_subscribers,
     list_scheduled_posts_command, 
     delete_post_callback,
     talk_command,
     talk_media_group_command,
-    schedule_media_group_post_command
+    schedule_media_group_post_command,
+    talk_media_groups,
+    post_media_groups
 )
-from quiz import poll_answer_handler, rating_command, weekly_quiz_reset
+from quiz import poll_answer_handler, poll_update_handler, rating_command, ACTIVE_QUIZZES
 from state import load_state
+from ingest import ingest_queue
+from casino.session import casino_sessions
+from update_processor import KeyedUpdateProcessor
+from rate_limiter import OutboundRateLimiter
+from http_client import configure_requests
+from webhook import run_webhook
+from rng import rng
+from command_limiter import command_limiter
 
 from quiz import start_quiz_command, stop_quiz_command
 
@@ -175,9 +189,6 @@ class MediaGroupCommandFilter(BaseFilter):
     Фильтр для обработки команды /post, отправленной с медиа-группой (альбомом).
     Срабатывает на сообщения с media_group_id, когда первое сообщение содержит caption с /post.
     """
-    # Статические множества для отслеживания обрабатываемых групп
-    _post_media_groups = set()
-    
     def check_update(self, update):
         message = update.effective_message
         if not message:
@@ -201,27 +212,17 @@ class MediaGroupCommandFilter(BaseFilter):
             return False
         
         # Если группа уже обрабатывается, перехватываем все её сообщения
-        if media_group_id in self._post_media_groups:
+        if media_group_id in post_media_groups:
             logging.info(f"[DEBUG] MediaGroupCommandFilter: Перехватываем последующее сообщение группы {media_group_id}")
             return True
         
         # Если это новая группа с командой /post, добавляем её в список обрабатываемых
-        if has_post_command:
-            self._post_media_groups.add(media_group_id)
+        if has_post_command and post_media_groups.claim(media_group_id):
             logging.info(f"[DEBUG] MediaGroupCommandFilter: УСПЕШНО! Первое сообщение группы {media_group_id} с командой /post")
             return True
         
         # Иначе игнорируем
         return False
-        
-    @classmethod
-    def remove_group(cls, media_group_id):
-        """Удаляет идентификатор медиа-группы из списка обрабатываемых"""
-        if media_group_id in cls._post_media_groups:
-            cls._post_media_groups.remove(media_group_id)
-            logging.info(f"[DEBUG] MediaGroupCommandFilter: Удалена группа {media_group_id} из списка обрабатываемых")
-            return True
-        return False
 
 class TalkCommandFilter(BaseFilter):
     """
@@ -248,9 +249,6 @@ class MediaGroupTalkCommandFilter(BaseFilter):
     Фильтр для обработки команды /talk, отправленной с медиа-группой (альбомом).
     Срабатывает на все сообщения из медиа-группы, если первое сообщение содержит caption с /talk.
     """
-    # Статические множества для отслеживания обрабатываемых групп
-    _talk_media_groups = set()
-    
     def check_update(self, update):
         message = update.effective_message
         if not message:
@@ -270,48 +268,74 @@ class MediaGroupTalkCommandFilter(BaseFilter):
             return False
         
         # Если группа уже обрабатывается, перехватываем все её сообщения
-        if media_group_id in self._talk_media_groups:
+        if media_group_id in talk_media_groups:
             logging.info(f"[DEBUG] MediaGroupTalkCommandFilter: Перехватываем последующее сообщение группы {media_group_id}")
             return True
         
         # Если это новая группа с командой /talk, добавляем её в список обрабатываемых
-        if has_talk_command:
-            self._talk_media_groups.add(media_group_id)
+        if has_talk_command and talk_media_groups.claim(media_group_id):
             logging.info(f"[DEBUG] MediaGroupTalkCommandFilter: Обнаружена медиа-группа id={media_group_id} с командой /talk")
             return True
         
         # Игнорируем сообщения без caption или с неизвестной командой
         logging.info(f"[DEBUG] MediaGroupTalkCommandFilter: Игнорируем медиа-группу id={media_group_id} без команды")
         return False
-        
-    @classmethod
-    def remove_group(cls, media_group_id):
-        """Удаляет идентификатор медиа-группы из списка обрабатываемых"""
-        if media_group_id in cls._talk_media_groups:
-            cls._talk_media_groups.remove(media_group_id)
-            logging.info(f"[DEBUG] MediaGroupTalkCommandFilter: Удалена группа {media_group_id} из списка обрабатываемых")
-            return True
-        return False
 
 # Добавим обработчик команды для перезагрузки конфигураций
 async def reload_config_command(update, context):
-    """Обработчик команды для перезагрузки всех конфигураций бота"""
-    reload_all_configs()
+    """
+    Обработчик команды для перезагрузки всех конфигураций бота.
+    Подписчики (расписания, звуковая панель и т.д.) получают только
+    изменившиеся разделы и сразу применяют их без перезапуска.
+    Если новая конфигурация не читается или не проходит проверку,
+    бот продолжает работать на прежних настройках.
+    """
+    try:
+        reload_all_configs()
+    except (ConfigError, ValueError, OSError) as e:
+        logger.error(f"Не удалось перезагрузить конфигурацию: {e}")
+        await update.message.reply_text(f"Конфигурация не перезагружена, оставлены прежние настройки.\n{e}")
+        return
     await update.message.reply_text("Конфигурации перезагружены!")
 
+async def flush_pending_events(app) -> None:
+    """Применяет события, оставшиеся в очереди, и результаты сессий казино перед остановкой бота."""
+    await ingest_queue.drain()
+    casino_sessions.flush()
+
 def main() -> None:
     """
     Основная функция, которая инициализирует бота, добавляет обработчики команд
     и запускает опрос сервера Telegram на наличие обновлений
     """
-    app = ApplicationBuilder().token(TOKEN).build()
+    # Зерно и режим записи/воспроизведения генераторов задаются до первого обновления
+    rng.configure(**get_config().rng)
+    # Обновления разных чатов и пользователей обрабатываются параллельно,
+    # обновления одного пользователя в одном чате — строго по очереди
+    update_processor = KeyedUpdateProcessor(get_config().max_concurrent_updates)
+    # Отдельные пулы соединений для API, загрузки медиа и getUpdates
+    builder = configure_requests(ApplicationBuilder().token(get_config().token), get_config().http)
+    app = (
+        builder
+        .concurrent_updates(update_processor)
+        # Все исходящие запросы проходят через общий ограничитель частоты
+        .rate_limiter(OutboundRateLimiter())
+        .post_stop(flush_pending_events)
+        .build()
+    )
 
     # --- ВАЖНО ---:
-    # Считываем состояние флагов до того, как отдадим бота в run_polling
+    # Считываем состояние флагов до того, как отдадим бота в run_polling/run_webhook
     load_state()
+    # Поднимаем викторины, опубликованные до перезапуска, и отбрасываем устаревшие
+    ACTIVE_QUIZZES.prune()
 
     # Добавляем отладочный обработчик для всех callback запросов
     app.add_handler(CallbackQueryHandler(log_all_callbacks), group=-1)
+    # Ограничение частоты команд: лишние обновления останавливаются раньше всех обработчиков
+    app.add_handler(TypeHandler(Update, command_limiter), group=-3)
+    # Справочник участников видит все обновления раньше остальных обработчиков
+    app.add_handler(TypeHandler(Update, track_members), group=-2)
 
     # Команды базовые
     app.add_handler(CommandHandler("start", start))
@@ -353,6 +377,7 @@ def main() -> None:
 
     # Викторины и мудрости
     app.add_handler(PollAnswerHandler(poll_answer_handler))
+    app.add_handler(PollHandler(poll_update_handler))
     app.add_handler(CommandHandler("rating", rating_command))
     app.add_handler(CommandHandler("start_quiz", start_quiz_command))
     app.add_handler(CommandHandler("stop_quiz", stop_quiz_command))
@@ -398,27 +423,11 @@ def main() -> None:
     app.add_handler(CallbackQueryHandler(history_command, pattern="^history_betting$"))
 
     # Планировщик задач
-    # Назначаем "ночной" джоб для сброса расписания
-    midnight_config = schedule_config['midnight_reset']
-    midnight_time = parse_time_from_string(midnight_config['time'])
-    app.job_queue.run_daily(
-        midnight_reset_callback,
-        time=midnight_time,
-        days=tuple(midnight_config['days']),
-        name="reset_schedule",
-        job_kwargs={'misfire_grace_time': 3600}  # Добавим запас времени
-    )
+    # Назначаем "ночной" сброс расписания и еженедельный сброс викторин
+    schedule_daily_resets(app.job_queue)
 
-    # Еженедельный сброс викторин
-    quiz_reset_config = schedule_config['weekly_quiz_reset']
-    quiz_reset_time = parse_time_from_string(quiz_reset_config['time'])
-    app.job_queue.run_daily(
-        weekly_quiz_reset,
-        time=quiz_reset_time,
-        days=tuple(quiz_reset_config['days']),
-        name="weekly_quiz_reset",
-        job_kwargs={'misfire_grace_time': 3600}
-    )
+    # Перепланируем задачи при изменении конфигурации (/reload_config)
+    register_config_subscribers(app.job_queue, app)
 
     # При первом запуске бота — сразу же сделаем сброс расписания
     # Планировщик автоматически передаст контекст в callback
@@ -434,7 +443,11 @@ def main() -> None:
     from scheduler import schedule_betting_events
     schedule_betting_events(app.job_queue, app)
 
-    app.run_polling()
+    if get_config().webhook['enabled']:
+        run_webhook(app, get_config().webhook)
+    else:
+        # chat_member не приходит без явного запроса, а нужен справочнику участников
+        app.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == "__main__":
     main()
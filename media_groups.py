@@ -0,0 +1,393 @@
+# media_groups.py
+"""
+Модуль сборки медиа-групп (альбомов) из отдельных сообщений.
+Telegram присылает альбом несколькими сообщениями с общим media_group_id,
+поэтому части нужно накопить и обработать разом, когда поток сообщений затихнет.
+
+Обеспечивает:
+- Один таймер asyncio на группу, который перезапускается с каждой новой частью
+- Вытеснение групп, которые так и не были завершены (TTL)
+- Ограничения на число файлов в группе и число одновременно собираемых групп
+- Счётчики для диагностики
+- Компактное описание части альбома (MediaItem), которое хранится в сборщике,
+  сохраняется в отложенных публикациях и превращается в InputMedia при отправке
+- Журнал частей (MediaGroupJournal), по которому сбор продолжается после перезапуска
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from telegram import InputMediaPhoto, InputMediaVideo, InputMediaAudio, InputMediaDocument
+
+logger = logging.getLogger(__name__)
+
+# Telegram не принимает альбомы больше 10 файлов
+MAX_GROUP_ITEMS = 10
+
+# Тип части альбома -> класс InputMedia для отправки
+INPUT_MEDIA_TYPES = {
+    "photo": InputMediaPhoto,
+    "video": InputMediaVideo,
+    "audio": InputMediaAudio,
+    "document": InputMediaDocument,
+}
+
+
+class MediaItem:
+    """
+    Часть альбома: тип, file_id и необязательная подпись.
+    В JSON хранится как {"file_id": ..., "type": ...} — в том же формате,
+    что и media_files отложенных публикаций.
+    """
+    __slots__ = ('kind', 'file_id', 'caption', 'parse_mode')
+
+    def __init__(self, kind, file_id, caption=None, parse_mode=None):
+        self.kind = kind
+        self.file_id = file_id
+        self.caption = caption
+        self.parse_mode = parse_mode
+
+    def __eq__(self, other):
+        if not isinstance(other, MediaItem):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"MediaItem({self.kind!r}, {self.file_id!r})"
+
+    @classmethod
+    def from_message(cls, message):
+        """
+        Создаёт описание части альбома из сообщения Telegram.
+
+        Returns:
+            MediaItem или None, если тип вложения не поддерживается
+        """
+        if message.photo:
+            return cls("photo", message.photo[-1].file_id)
+        if message.video:
+            return cls("video", message.video.file_id)
+        if message.audio:
+            return cls("audio", message.audio.file_id)
+        if message.document:
+            return cls("document", message.document.file_id)
+        return None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("type"), data.get("file_id"), data.get("caption"), data.get("parse_mode"))
+
+    def to_dict(self) -> dict:
+        data = {"file_id": self.file_id, "type": self.kind}
+        if self.caption:
+            data["caption"] = self.caption
+        if self.parse_mode:
+            data["parse_mode"] = self.parse_mode
+        return data
+
+    def to_input_media(self, caption=None):
+        """
+        Создаёт объект InputMedia для отправки.
+
+        Args:
+            caption: Подпись, заменяющая собственную подпись части
+
+        Returns:
+            InputMedia или None для неизвестного типа
+        """
+        media_cls = INPUT_MEDIA_TYPES.get(self.kind)
+        if media_cls is None:
+            return None
+        return media_cls(media=self.file_id, caption=caption or self.caption or None, parse_mode=self.parse_mode)
+
+
+def build_album(items, caption=None) -> list:
+    """
+    Превращает части альбома в список InputMedia для send_media_group.
+    Подпись альбома ставится на первый файл, части неизвестных типов пропускаются.
+
+    Args:
+        items: Список MediaItem
+        caption: Подпись альбома
+
+    Returns:
+        list: Объекты InputMedia
+    """
+    album = []
+    for item in items:
+        media = item.to_input_media(caption if not album else None)
+        if media is None:
+            logger.warning(f"Неизвестный тип части альбома: {item.kind}")
+            continue
+        album.append(media)
+    return album
+
+
+class MediaGroupJournal:
+    """
+    Журнал собираемых медиа-групп в формате JSON Lines.
+    Каждая принятая часть дописывается в конец файла отдельной строкой,
+    завершённая группа отмечается строкой {"group": ..., "done": true}.
+    Когда незавершённых групп не остаётся, файл удаляется.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._open_groups = set()
+
+    def append(self, media_group_id, item, meta=None):
+        """Записывает часть альбома (и метаданные группы, если они есть)."""
+        entry = {"group": media_group_id, "item": item.to_dict()}
+        if meta:
+            entry["meta"] = meta
+        self._open_groups.add(media_group_id)
+        self._write([entry])
+
+    def close(self, media_group_id):
+        """Отмечает группу завершённой."""
+        if media_group_id not in self._open_groups:
+            return
+        self._open_groups.discard(media_group_id)
+        if self._open_groups:
+            self._write([{"group": media_group_id, "done": True}])
+        else:
+            self._clear()
+
+    def load(self) -> dict:
+        """
+        Восстанавливает незавершённые группы из журнала и сжимает его.
+
+        Returns:
+            dict: media_group_id -> группа в формате MediaGroupAggregator (без 'context')
+        """
+        if not self.path.exists():
+            return {}
+        groups = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Недописанная строка после аварийного завершения
+                        logger.warning(f"Пропущена повреждённая строка журнала {self.path}")
+                        continue
+                    group_id = entry.get("group")
+                    if entry.get("done"):
+                        groups.pop(group_id, None)
+                        continue
+                    group = groups.setdefault(group_id, {'media': []})
+                    group.update(entry.get("meta", {}))
+                    group['media'].append(MediaItem.from_dict(entry["item"]))
+        except Exception as e:
+            logger.error(f"Ошибка чтения журнала {self.path}: {e}")
+            return {}
+
+        # Переписываем журнал, оставляя только незавершённые группы
+        self._open_groups = set(groups)
+        self._clear()
+        entries = []
+        for group_id, group in groups.items():
+            meta = {k: v for k, v in group.items() if k != 'media'}
+            for i, item in enumerate(group['media']):
+                entry = {"group": group_id, "item": item.to_dict()}
+                if i == 0 and meta:
+                    entry["meta"] = meta
+                entries.append(entry)
+        if entries:
+            self._write(entries)
+        return groups
+
+    def _write(self, entries):
+        try:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            logger.error(f"Ошибка записи журнала {self.path}: {e}")
+
+    def _clear(self):
+        try:
+            self.path.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Ошибка удаления журнала {self.path}: {e}")
+
+
+class MediaGroupAggregator:
+    """
+    Накопитель частей медиа-групп.
+
+    Группа регистрируется через claim() (обычно фильтром по первому сообщению
+    с командой), наполняется через add(), а после `delay` секунд тишины
+    передаётся в `on_complete(context, media_group_id, group)`.
+    Группа — словарь с ключами 'media' (список частей), 'context' и
+    произвольными метаданными, переданными в add().
+    С журналом (`journal`) части должны быть MediaItem, а метаданные — JSON-совместимыми.
+    """
+
+    def __init__(self, name, on_complete, delay=5.0, ttl=300.0,
+                 max_items=MAX_GROUP_ITEMS, max_groups=100, journal=None):
+        self.name = name
+        self.journal = journal
+        self.on_complete = on_complete
+        self.delay = delay
+        self.ttl = ttl
+        self.max_items = max_items
+        self.max_groups = max_groups
+        self._groups = {}
+        self._timers = {}
+        self._tasks = set()
+        self.metrics = {
+            'groups_started': 0,
+            'groups_completed': 0,
+            'groups_expired': 0,
+            'groups_rejected': 0,
+            'items_added': 0,
+            'items_dropped': 0,
+            'timer_resets': 0,
+            'groups_restored': 0,
+        }
+
+    def __contains__(self, media_group_id):
+        group = self._groups.get(media_group_id)
+        return group is not None and not self._is_expired(group)
+
+    def __len__(self):
+        return len(self._groups)
+
+    def get(self, media_group_id):
+        """Возвращает собираемую группу или None."""
+        return self._groups.get(media_group_id)
+
+    def claim(self, media_group_id) -> bool:
+        """
+        Регистрирует новую группу для сбора.
+
+        Returns:
+            bool: True, если группа собирается (новая или уже известная),
+                  False, если лимит одновременно собираемых групп исчерпан
+        """
+        self._evict_expired()
+        if media_group_id in self._groups:
+            return True
+        if len(self._groups) >= self.max_groups:
+            self.metrics['groups_rejected'] += 1
+            logger.warning(f"{self.name}: лимит в {self.max_groups} собираемых групп исчерпан, группа {media_group_id} отклонена")
+            return False
+        self._groups[media_group_id] = {
+            'media': [],
+            'context': None,
+            'created_at': time.monotonic(),
+        }
+        self.metrics['groups_started'] += 1
+        return True
+
+    def add(self, media_group_id, item, context, **meta) -> bool:
+        """
+        Добавляет часть в группу и перезапускает её таймер.
+        Незарегистрированная группа регистрируется автоматически.
+
+        Args:
+            media_group_id: Идентификатор медиа-группы
+            item: Часть альбома
+            context: Контекст обработчика, передаётся в on_complete
+            **meta: Метаданные группы (caption, chat_id и т.п.)
+
+        Returns:
+            bool: True, если часть принята
+        """
+        if not self.claim(media_group_id):
+            return False
+        group = self._groups[media_group_id]
+        group.update(meta)
+        group['context'] = context
+        if len(group['media']) >= self.max_items:
+            self.metrics['items_dropped'] += 1
+            logger.warning(f"{self.name}: группа {media_group_id} уже содержит {self.max_items} файлов, лишний файл отброшен")
+            return False
+        group['media'].append(item)
+        self.metrics['items_added'] += 1
+        if self.journal is not None:
+            self.journal.append(media_group_id, item, meta)
+        self._arm_timer(media_group_id)
+        return True
+
+    def discard(self, media_group_id):
+        """Прекращает сбор группы без вызова on_complete."""
+        timer = self._timers.pop(media_group_id, None)
+        if timer is not None:
+            timer.cancel()
+        if self.journal is not None:
+            self.journal.close(media_group_id)
+        return self._groups.pop(media_group_id, None)
+
+    def restore(self, context) -> int:
+        """
+        Продолжает сбор групп, незавершённых до перезапуска бота.
+        Таймеры восстановленных групп запускаются заново.
+
+        Args:
+            context: Контекст, который получит on_complete
+
+        Returns:
+            int: Количество восстановленных групп
+        """
+        if self.journal is None:
+            return 0
+        restored = 0
+        for media_group_id, group in self.journal.load().items():
+            if media_group_id in self._groups:
+                continue
+            group['context'] = context
+            group['created_at'] = time.monotonic()
+            self._groups[media_group_id] = group
+            self._arm_timer(media_group_id)
+            restored += 1
+        self.metrics['groups_restored'] += restored
+        if restored:
+            logger.info(f"{self.name}: восстановлено незавершённых групп: {restored}")
+        return restored
+
+    def _arm_timer(self, media_group_id):
+        timer = self._timers.pop(media_group_id, None)
+        if timer is not None:
+            timer.cancel()
+            self.metrics['timer_resets'] += 1
+        loop = asyncio.get_running_loop()
+        self._timers[media_group_id] = loop.call_later(self.delay, self._fire, media_group_id)
+
+    def _fire(self, media_group_id):
+        self._timers.pop(media_group_id, None)
+        group = self._groups.pop(media_group_id, None)
+        if group is None:
+            return
+        task = asyncio.ensure_future(self._complete(media_group_id, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _complete(self, media_group_id, group):
+        self.metrics['groups_completed'] += 1
+        logger.info(f"{self.name}: группа {media_group_id} собрана ({len(group['media'])} файлов)")
+        try:
+            await self.on_complete(group['context'], media_group_id, group)
+        except Exception as e:
+            logger.error(f"{self.name}: ошибка при обработке группы {media_group_id}: {e}", exc_info=True)
+        finally:
+            if self.journal is not None:
+                self.journal.close(media_group_id)
+
+    def _is_expired(self, group):
+        return time.monotonic() - group['created_at'] > self.ttl
+
+    def _evict_expired(self):
+        expired = [gid for gid, group in self._groups.items() if self._is_expired(group)]
+        for gid in expired:
+            self.discard(gid)
+            self.metrics['groups_expired'] += 1
+            logger.warning(f"{self.name}: группа {gid} не была завершена за {self.ttl} сек. и удалена")
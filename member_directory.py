@@ -0,0 +1,113 @@
+# member_directory.py
+"""
+Модуль справочника участников чатов.
+Обеспечивает:
+- Кэш администраторов чата с готовой строкой упоминаний для /all и сроком жизни (TTL)
+- Сброс кэша чата при обновлениях ChatMemberUpdated (назначение, снятие, выход)
+- Актуальные имена пользователей по обновлениям, которые видит бот: ими заменяются
+  устаревшие имена ("Unknown") из balance.json, ставок и рейтинга викторины;
+  число запомненных имён ограничено, давно не встречавшиеся вытесняются
+
+Имена возвращаются как есть: экранирование под HTML или Markdown — на стороне
+того, кто вставляет имя в сообщение.
+"""
+
+import html
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд список администраторов считается актуальным
+DEFAULT_ADMINS_TTL = 10 * 60
+# Больше имён не хранится: давно не встречавшиеся пользователи вытесняются
+DEFAULT_MAX_NAMES = 5000
+
+# Имена-заглушки, которые сохранялись, когда настоящее имя было неизвестно
+PLACEHOLDER_NAMES = ("", "Unknown")
+
+
+def mention(user) -> str:
+    """Упоминание пользователя: @username или HTML-ссылка на профиль."""
+    if user.username:
+        return f"@{user.username}"
+    return f'<a href="tg://user?id={user.id}">{html.escape(user.first_name or str(user.id))}</a>'
+
+
+class MemberDirectory:
+    """
+    Справочник вида { chat_id: (строка упоминаний администраторов, срок годности) }
+    и { user_id: имя } в порядке последнего появления.
+    """
+
+    def __init__(self, admins_ttl=DEFAULT_ADMINS_TTL, max_names=DEFAULT_MAX_NAMES):
+        self.admins_ttl = admins_ttl
+        self.max_names = max_names
+        self._admins = {}
+        self._names = OrderedDict()
+
+    async def admin_mentions(self, bot, chat_id, now=None) -> str:
+        """
+        Строка упоминаний администраторов чата. Пока кэш не истёк,
+        Bot API не вызывается.
+
+        Raises:
+            TelegramError: Если список администраторов не удалось получить
+        """
+        now = time.monotonic() if now is None else now
+        cached = self._admins.get(chat_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        admins = await bot.getChatAdministrators(chat_id)
+        for admin in admins:
+            self.remember(admin.user)
+        text = " ".join(mention(admin.user) for admin in admins)
+        self._admins[chat_id] = (text, now + self.admins_ttl)
+        return text
+
+    def invalidate(self, chat_id):
+        """Сбрасывает кэш администраторов чата."""
+        self._admins.pop(chat_id, None)
+
+    def remember(self, user):
+        """Запоминает актуальное имя пользователя."""
+        if user is None:
+            return
+        name = user.full_name or (f"@{user.username}" if user.username else None)
+        if name:
+            self._names[user.id] = name
+            self._names.move_to_end(user.id)
+            if len(self._names) > self.max_names:
+                self._names.popitem(last=False)
+
+    def observe(self, update):
+        """
+        Учитывает обновление: запоминает имя автора, а при ChatMemberUpdated
+        сбрасывает кэш администраторов чата.
+        """
+        self.remember(update.effective_user)
+        member_update = update.chat_member or update.my_chat_member
+        if member_update is not None:
+            self.remember(member_update.new_chat_member.user)
+            self.invalidate(member_update.chat.id)
+            logger.debug(f"Состав чата {member_update.chat.id} изменился, кэш администраторов сброшен")
+
+    def display_name(self, user_id, stored=None, default=None):
+        """
+        Имя для вывода: актуальное имя из справочника, иначе сохранённое
+        (если это не заглушка), иначе default.
+        """
+        name = self._names.get(int(user_id))
+        if name:
+            return name
+        if stored is not None and stored not in PLACEHOLDER_NAMES:
+            return stored
+        return stored if default is None else default
+
+    def __len__(self):
+        return len(self._names)
+
+
+# Общий справочник участников бота
+member_directory = MemberDirectory()
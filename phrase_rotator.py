@@ -0,0 +1,162 @@
+# phrase_rotator.py
+"""
+Модуль циклической выдачи фраз из текстовых файлов (пожелания доброго утра,
+пожелания перед сном, похвалы победителям викторины).
+
+Обеспечивает:
+- Однократную загрузку файлов с фразами и перечитывание при изменении (по mtime)
+- Хранение курсоров в памяти
+- Сохранение всех курсоров в один файл не чаще, чем раз в save_interval секунд
+- Перенос курсоров из старых файлов индексов (morning_index.json и т.п.)
+"""
+
+import atexit
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Общий файл с курсорами всех наборов фраз
+PHRASE_STATE_FILE = "state_data/phrase_cursors.json"
+
+
+def load_phrases(path) -> list[str]:
+    """
+    Считывает фразы из файла, по одной на строку. Пустые строки отбрасываются.
+
+    Returns:
+        list[str]: Список фраз или пустой список, если файла нет
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class PhraseRotator:
+    """
+    Выдаёт фразы из зарегистрированных наборов по кругу.
+    Файлы проверяются на изменения не чаще, чем раз в check_interval секунд,
+    поэтому обычный вызов next() не обращается к диску.
+    """
+
+    def __init__(self, state_file, save_interval=30.0, check_interval=5.0):
+        self.state_file = state_file
+        self.save_interval = save_interval
+        self.check_interval = check_interval
+        self._sources = {}
+        self._cursors = None
+        self._dirty = False
+        self._saved_at = None
+
+    def register(self, name, path, default=None, legacy_index_file=None, legacy_key=None):
+        """
+        Регистрирует набор фраз.
+
+        Args:
+            name: Имя набора (ключ в файле курсоров)
+            path: Файл с фразами
+            default: Фразы на случай, если файл отсутствует или пуст
+            legacy_index_file: Старый файл индекса, из которого берётся начальный курсор
+            legacy_key: Ключ индекса в старом файле
+        """
+        self._sources[name] = {
+            'path': path,
+            'default': list(default or []),
+            'legacy_index_file': legacy_index_file,
+            'legacy_key': legacy_key,
+            'phrases': None,
+            'mtime': None,
+            'checked_at': None,
+        }
+
+    def next(self, name) -> str | None:
+        """
+        Возвращает очередную фразу набора и сдвигает курсор.
+
+        Returns:
+            str|None: Фраза или None, если в наборе нет фраз
+        """
+        phrases = self._phrases(name)
+        if not phrases:
+            return None
+        cursors = self._load_cursors()
+        if name not in cursors:
+            cursors[name] = self._read_legacy_index(self._sources[name])
+        index = cursors[name] % len(phrases)
+        cursors[name] = (index + 1) % len(phrases)
+        self._dirty = True
+        self._maybe_flush()
+        return phrases[index]
+
+    def flush(self):
+        """Сохраняет курсоры, если они изменились."""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(self._cursors, f, ensure_ascii=False, indent=4)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Ошибка записи файла курсоров фраз: {e}")
+        self._saved_at = time.monotonic()
+
+    def _maybe_flush(self):
+        if self._saved_at is None or time.monotonic() - self._saved_at >= self.save_interval:
+            self.flush()
+
+    def _phrases(self, name) -> list[str]:
+        source = self._sources[name]
+        now = time.monotonic()
+        if source['phrases'] is not None and now - source['checked_at'] < self.check_interval:
+            return source['phrases']
+        source['checked_at'] = now
+        try:
+            mtime = os.stat(source['path']).st_mtime_ns
+        except OSError:
+            mtime = None
+        if source['phrases'] is None or mtime != source['mtime']:
+            try:
+                phrases = load_phrases(source['path'])
+            except Exception as e:
+                logger.error(f"Ошибка чтения фраз {source['path']}: {e}")
+                phrases = []
+            source['phrases'] = phrases or source['default']
+            source['mtime'] = mtime
+        return source['phrases']
+
+    def _load_cursors(self) -> dict:
+        if self._cursors is not None:
+            return self._cursors
+        self._cursors = {}
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._cursors = {k: v for k, v in data.items() if isinstance(v, int)}
+            except Exception as e:
+                logger.error(f"Ошибка чтения файла курсоров фраз: {e}")
+        return self._cursors
+
+    @staticmethod
+    def _read_legacy_index(source) -> int:
+        path = source['legacy_index_file']
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get(source['legacy_key']), int):
+                return data[source['legacy_key']]
+        except Exception as e:
+            logger.error(f"Ошибка чтения файла индекса {path}: {e}")
+        return 0
+
+
+# Общий экземпляр для команд бота; несохранённые курсоры записываются при выходе
+phrase_rotator = PhraseRotator(PHRASE_STATE_FILE)
+atexit.register(phrase_rotator.flush)
@@ -8,30 +8,60 @@
 - Еженедельное обновление викторин
 """
 
+import html
 import os
 import json
-import random
+from rng import rng
 import datetime
+import atexit
 
 from telegram import Poll
 from telegram.ext import ContextTypes
 
-from config import POST_CHAT_ID, MATERIALS_DIR
+from config import get_config
 
 from balance import update_balance
+from consumable_pool import ConsumablePool
+from phrase_rotator import phrase_rotator
+from leaderboard import Leaderboard
+from active_polls import ActivePollRegistry
+from ingest import ingest_queue
+from member_directory import member_directory
 
 import state
 
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('quiz')
+
 
 # Пути к файлам
-QUIZ_FILE = os.path.join(MATERIALS_DIR, "quiz.json")  # исходные вопросы
+QUIZ_FILE = os.path.join(get_config().materials_dir, "quiz.json")  # исходные вопросы
 RATING_FILE = "state_data/rating.json"                           # для хранения звёзд
 PRAISES_FILE = "phrases/praises_rating.txt"  # тексты похвал
-PRAISE_INDEX_FILE = "state_data/praise_state.json"
-
-# Глобальная структура, чтобы запоминать правильный ответ
-# key = poll_id (str), value = correct_option_id (int)
-ACTIVE_QUIZZES = {}
+PRAISE_INDEX_FILE = "state_data/praise_state.json"   # старый индекс похвал, нужен для переноса
+QUIZ_POOL_STATE_FILE = "state_data/quiz_pool_state.json"  # перестановка невыданных вопросов
+QUIZ_USED_LOG_FILE = "state_data/quiz_used.log"           # журнал выданных вопросов
+ACTIVE_QUIZZES_FILE = "state_data/active_quizzes.jsonl"   # журнал активных опросов
+
+# Пул вопросов: выдаёт каждый вопрос из quiz.json один раз, не перезаписывая файл
+QUIZ_POOL = ConsumablePool(QUIZ_FILE, QUIZ_POOL_STATE_FILE, QUIZ_USED_LOG_FILE)
+
+# Звёздный рейтинг: держится в памяти, записывается в rating.json пачками
+LEADERBOARD = Leaderboard(RATING_FILE)
+atexit.register(LEADERBOARD.flush)
+
+# Фразы похвалы для итогов недели
+phrase_rotator.register(
+    "praise",
+    PRAISES_FILE,
+    default=["Поздравляем! Ты великолепен!", "Блестящая победа!"],
+    legacy_index_file=PRAISE_INDEX_FILE,
+    legacy_key="praise_index"
+)
+
+# Реестр опубликованных викторин: poll_id (str) -> correct_option_id (int).
+# Переживает перезапуск бота, опросы вытесняются после закрытия или через неделю
+ACTIVE_QUIZZES = ActivePollRegistry(ACTIVE_QUIZZES_FILE)
 
 WEEKLY_COUNT_FILE = "state_data/weekly_quiz_count.json"
 
@@ -105,7 +135,7 @@ def save_quiz_questions(questions: list[dict]):
 
 def get_random_question() -> dict | None:
     """
-    Возвращает случайный вопрос из quiz.json и удаляет его из файла,
+    Возвращает случайный вопрос из пула и отмечает его выданным,
     чтобы не повторялся.
     
     Returns:
@@ -114,121 +144,34 @@ def get_random_question() -> dict | None:
     # Проверяем, запущен ли тест
     is_test = hasattr(state, 'is_test_mode') and state.is_test_mode
 
-    # Загружаем вопросы
-    questions = load_quiz_questions()
-    if not questions:
-        return None
-        
-    # Выбираем случайный вопрос
-    question = random.choice(questions)
-    
-    # Удаляем вопрос из списка только в реальном режиме, не в тестах
-    if not is_test:
-        questions.remove(question)
-        save_quiz_questions(questions)
-        
-    return question
-
+    # Отмечаем вопрос выданным только в реальном режиме, не в тестах
+    return QUIZ_POOL.draw(consume=not is_test)
 
-def load_rating() -> dict:
-    """
-    Загружает рейтинг участников викторины.
-    
-    Returns:
-        dict: Словарь вида:
-          {
-             "123456789": { "stars": 3, "name": "username_или_имя" },
-             "987654321": { "stars": 1, "name": "другое_имя" }
-          }
-        Если файл пуст или отсутствует — вернёт пустой словарь.
-    """
-    if not os.path.exists(RATING_FILE):
-        return {}
-    try:
-        with open(RATING_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, dict):
-                return data
-    except Exception as e:
-        return {}
 
-def save_rating(rating: dict):
+def import_quiz_questions(questions: list[dict]) -> int:
     """
-    Сохраняет рейтинг в JSON-файл.
+    Добавляет новые вопросы в quiz.json, перемешивая их с ещё не выданными.
     
     Args:
-        rating: Словарь вида:
-            dict[user_id_str] = { "stars": int, "name": str }
-    """
-    try:
-        with open(RATING_FILE, "w", encoding="utf-8") as f:
-            json.dump(rating, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        pass
-
-
-
-def load_praises() -> list[str]:
-    """
-    Считывает фразы похвалы из файла.
-    
-    Returns:
-        list[str]: Список строк с фразами похвалы
-    """
-    if not os.path.exists(PRAISES_FILE):
-        return ["Поздравляем! Ты великолепен!", "Блестящая победа!"]
-    with open(PRAISES_FILE, "r", encoding="utf-8") as f:
-        lines = [line.strip() for line in f.readlines() if line.strip()]
-        return lines if lines else ["Молодец!", "Отличный результат!"]
-    
-
-def load_praise_index() -> int:
-    """
-    Загружает текущий индекс для циклического выбора фраз похвалы.
-    
+        questions: Список словарей с вопросами
+        
     Returns:
-        int: Текущий индекс или 0, если файла нет
+        int: Количество добавленных вопросов
     """
-    if not os.path.exists(PRAISE_INDEX_FILE):
-        return 0
-    try:
-        with open(PRAISE_INDEX_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, dict) and "praise_index" in data:
-                return data["praise_index"]
-    except:
-        pass
-    return 0
+    return QUIZ_POOL.extend(questions)
 
-def save_praise_index(index: int):
-    """
-    Сохраняет текущий индекс фразы похвалы.
-    
-    Args:
-        index: Индекс последней использованной фразы
-    """
-    with open(PRAISE_INDEX_FILE, "w", encoding="utf-8") as f:
-        json.dump({"praise_index": index}, f, ensure_ascii=False, indent=4)
 
-def get_next_praise(praises: list[str]) -> str:
+def get_next_praise() -> str:
     """
-    Возвращает очередную фразу из списка `praises` по циклу.
-    Состояние (индекс) хранится в praise_state.json.
-    
-    Args:
-        praises: Список фраз похвалы
+    Возвращает очередную фразу похвалы по циклу.
+    Фразы и позиция хранятся в phrase_rotator.
     
     Returns:
         str: Следующая фраза похвалы
     """
-    if not praises:
+    phrase = phrase_rotator.next("praise")
+    if phrase is None:
         return "Поздравляем! (нет фраз в praises)"
-
-    current_index = load_praise_index()
-    phrase = praises[current_index % len(praises)]
-    # Увеличиваем индекс и сохраняем
-    current_index += 1
-    save_praise_index(current_index)
     return phrase
 
 
@@ -247,7 +190,7 @@ async def quiz_post_callback(context: ContextTypes.DEFAULT_TYPE):
     question_data = get_random_question()
     if not question_data:
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=get_config().post_chat_id,
             text="Вопросы для викторины закончились 😢"
         )
         return
@@ -258,14 +201,14 @@ async def quiz_post_callback(context: ContextTypes.DEFAULT_TYPE):
 
     # Перемешиваем варианты ответов для непредсказуемости
     shuffled_options = original_options[:]
-    random.shuffle(shuffled_options)
+    _random.shuffle(shuffled_options)
     try:
         correct_index = shuffled_options.index(correct_answer)
     except ValueError:
         correct_index = 0
 
     message = await context.bot.send_poll(
-        chat_id=POST_CHAT_ID,
+        chat_id=get_config().post_chat_id,
         question=question_text,
         options=shuffled_options,
         type=Poll.QUIZ,
@@ -300,26 +243,34 @@ async def poll_answer_handler(update, context):
 
     # Если пользователь выбрал правильный вариант (совпал индекс)
     if correct_index in chosen_ids:
-        rating = load_rating()
-        user_id_str = str(user_id)
-
-        # Получаем текущие данные пользователя из рейтинга
-        old_data = rating.get(user_id_str, {"stars": 0, "name": None})
-        old_data["stars"] = old_data.get("stars", 0) + 1  # увеличиваем звезды
-
         # Запоминаем имя пользователя
         tg_user = poll_answer.user
         name_candidate = tg_user.username if tg_user.username else tg_user.first_name
         if not name_candidate:
-            name_candidate = f"User_{user_id_str}"  # на случай, если ничего нет
+            name_candidate = f"User_{user_id}"  # на случай, если ничего нет
+
+        # Звезды и монеты начисляет писатель очереди, вместе с соседними ответами
+        ingest_queue.submit(record_correct_answer, user_id, name_candidate)
 
-        old_data["name"] = name_candidate
 
-        rating[user_id_str] = old_data
-        save_rating(rating)
+def record_correct_answer(user_id, name):
+    """
+    Начисляет звезду и монеты за правильный ответ.
+    Выполняется в писателе очереди событий, а не в обработчике ответа.
+    """
+    LEADERBOARD.add_stars(user_id, name)
+    # Начисляем 5 монет за правильный ответ
+    update_balance(user_id, 5)  # Награда за правильный ответ
+
 
-        # Начисляем 5 монет за правильный ответ
-        update_balance(user_id, 5)  # Награда за правильный ответ
+async def poll_update_handler(update, context):
+    """
+    Обработчик изменения состояния опроса.
+    Закрытая викторина удаляется из реестра активных опросов.
+    """
+    poll = update.poll
+    if poll and poll.is_closed:
+        ACTIVE_QUIZZES.close(poll.id)
 
 
 
@@ -329,20 +280,18 @@ async def rating_command(update, context):
     /rating — показать текущий рейтинг (сортируем по убыванию звёзд),
     а также в первой строке указывается, из скольки максимальных звезд (количество вопросов за неделю).
     """
-    rating = load_rating()
     weekly_count = load_weekly_quiz_count()  # максимальное число звезд, если бы все ответы были верными
 
-    if not rating:
+    # Рейтинг уже отсортирован по количеству звезд
+    items = LEADERBOARD.top()
+    if not items:
         await context.bot.send_message(chat_id=update.effective_chat.id, text="Рейтинг пока пуст.")
         return
 
-    # Сортируем по количеству звезд
-    items = sorted(rating.items(), key=lambda x: x[1]["stars"], reverse=True)
-
     lines = [f"<b>Звездный рейтинг (максимум {weekly_count} ⭐)</b>:"]
     for user_id_str, data in items:
         stars = data["stars"]
-        name = data["name"] or user_id_str
+        name = html.escape(member_directory.display_name(user_id_str, data["name"], user_id_str))
         lines.append(f"• {name}: {stars} ⭐")
 
     await context.bot.send_message(
@@ -357,62 +306,58 @@ async def weekly_quiz_reset(context: ContextTypes.DEFAULT_TYPE):
     if not state.quiz_enabled:
         return
 
-    rating = load_rating()
-    if not rating:
+    if not len(LEADERBOARD):
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=get_config().post_chat_id,
             text="На этой неделе никто не набрал звёздочек ��"
         )
         # Сбрасываем количество вопросов викторины за неделю:
         save_weekly_quiz_count(0)
-        save_rating({})
+        LEADERBOARD.clear()
         return
 
-    max_stars = max((x["stars"] for x in rating.values()), default=0)
+    max_stars = LEADERBOARD.max_stars()
     
     # Если никто не набрал звезд
     if max_stars == 0:
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=get_config().post_chat_id,
             text="На этой неделе никто не набрал звёздочек 😢"
         )
         # Сбрасываем количество вопросов викторины за неделю:
         save_weekly_quiz_count(0)
-        save_rating(rating)
+        LEADERBOARD.flush()
         return
 
-    winners = [uid for (uid, val) in rating.items() if val["stars"] == max_stars]
+    all_sorted = LEADERBOARD.top()
+    winners = [(user_id_str, val) for (user_id_str, val) in all_sorted if val["stars"] == max_stars]
     weekly_count = load_weekly_quiz_count()  # максимальное число звезд
 
-    praises = load_praises()
-    random_praise = get_next_praise(praises)
+    random_praise = get_next_praise()
 
     lines = ["<b>Итоги недели!</b>"]
     lines.append(f"Победитель с результатом {max_stars} ⭐:")
-    for w in winners:
-        name = rating[w]["name"] or "Безымянный"
+    for user_id_str, w in winners:
+        name = html.escape(member_directory.display_name(user_id_str, w["name"], "Безымянный"))
         lines.append(f"• {name}")
     lines.append("")
     lines.append(random_praise)
     lines.append("")
     lines.append(f"Звездный рейтинг за неделю (всего вопросов: {weekly_count}):")
 
-    all_sorted = sorted(rating.items(), key=lambda x: x[1]["stars"], reverse=True)
-    for _, val in all_sorted:
+    for user_id_str, val in all_sorted:
         stars = val["stars"]
-        name = val["name"] or "Безымянный"
+        name = html.escape(member_directory.display_name(user_id_str, val["name"], "Безымянный"))
         lines.append(f"• {name}: {stars} ⭐")
 
     await context.bot.send_message(
-        chat_id=POST_CHAT_ID,
+        chat_id=get_config().post_chat_id,
         text="\n".join(lines),
         parse_mode="HTML"
     )
 
     # Сбрасываем звёзды пользователей:
-    for k in rating.keys():
-        rating[k]["stars"] = 0
-    save_rating(rating)
+    LEADERBOARD.reset_stars()
 
     # Сбрасываем количество вопросов викторины за неделю:
     save_weekly_quiz_count(0)
@@ -424,9 +369,8 @@ async def weekly_quiz_reset(context: ContextTypes.DEFAULT_TYPE):
 #
 
 def count_quiz_questions() -> int:
-    """Просто возвращаем, сколько осталось вопросов в quiz.json."""
-    questions = load_quiz_questions()
-    return len(questions)
+    """Возвращает, сколько вопросов ещё не было выдано."""
+    return QUIZ_POOL.count()
 
 #
 # Новые команды для включения/выключения викторины
@@ -0,0 +1,251 @@
+# rate_limiter.py
+"""
+Модуль ограничения частоты исходящих запросов к Telegram API.
+Обеспечивает:
+- Общий лимит запросов бота и отдельные лимиты для каждого чата
+  (для групп — 20 сообщений в минуту, для личных чатов — около одного в секунду)
+- Приоритеты: публикации (фото, видео, альбомы, опросы) уходят раньше обычных
+  сообщений, а косметические правки и удаления — в последнюю очередь
+- Автоматический повтор запроса после RetryAfter с паузой, которую запросил Telegram
+
+Подключается через ApplicationBuilder.rate_limiter, поэтому все вызовы context.bot.*
+проходят через него без изменений в обработчиках.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: меньше — важнее
+PRIORITY_POST = 0
+PRIORITY_NORMAL = 1
+PRIORITY_COSMETIC = 2
+
+# Лимиты Telegram по умолчанию
+OVERALL_RATE = 30          # запросов в секунду на бота
+PRIVATE_CHAT_RATE = 1      # сообщений в секунду в личном чате
+PRIVATE_CHAT_BURST = 3
+GROUP_CHAT_RATE = 20 / 60  # сообщений в секунду в группе
+GROUP_CHAT_BURST = 20
+
+# Сколько раз повторять запрос после RetryAfter
+MAX_RETRIES = 3
+
+# Методы, которые отправляют или меняют сообщения в чате и подпадают под лимиты
+_LIMITED_PREFIXES = ('send', 'forward', 'copy', 'edit', 'delete', 'stop', 'pin', 'unpin')
+_POST_ENDPOINTS = frozenset({
+    'sendPhoto', 'sendVideo', 'sendAnimation', 'sendMediaGroup',
+    'sendDocument', 'sendAudio', 'sendVoice', 'sendPoll',
+})
+_COSMETIC_PREFIXES = ('edit', 'delete', 'sendChatAction')
+
+
+class TokenBucket:
+    """
+    Корзина токенов: rate токенов в секунду, не больше capacity.
+    Время передаётся явно, чтобы корзину было легко проверять.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, rate, capacity, now=0.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.paused_until = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now, cost=1) -> float:
+        """Через сколько секунд корзина сможет выдать cost токенов."""
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        cost = min(cost, self.capacity)
+        if self.tokens < cost:
+            wait = max(wait, (cost - self.tokens) / self.rate)
+        return wait
+
+    def consume(self, now, cost=1):
+        self._refill(now)
+        self.tokens -= min(cost, self.capacity)
+
+    def pause(self, until):
+        """Не выдаёт токены до момента until (после RetryAfter)."""
+        self.paused_until = max(self.paused_until, until)
+
+
+def request_priority(endpoint: str, rate_limit_args=None) -> int:
+    """
+    Определяет приоритет запроса по методу API.
+    Явный приоритет можно передать через rate_limit_args: число или {"priority": число}.
+    """
+    if isinstance(rate_limit_args, int):
+        return rate_limit_args
+    if isinstance(rate_limit_args, dict) and 'priority' in rate_limit_args:
+        return rate_limit_args['priority']
+    if endpoint in _POST_ENDPOINTS:
+        return PRIORITY_POST
+    if endpoint.startswith(_COSMETIC_PREFIXES):
+        return PRIORITY_COSMETIC
+    return PRIORITY_NORMAL
+
+
+class OutboundRateLimiter(BaseRateLimiter):
+    """
+    Планировщик исходящих запросов.
+
+    Каждый запрос ждёт токенов в общей корзине и в корзине своего чата.
+    Ожидающие запросы выдаются одним диспетчером в порядке приоритета,
+    внутри одного приоритета — в порядке поступления.
+    """
+
+    def __init__(
+        self,
+        overall_rate=OVERALL_RATE,
+        private_chat_rate=PRIVATE_CHAT_RATE,
+        private_chat_burst=PRIVATE_CHAT_BURST,
+        group_chat_rate=GROUP_CHAT_RATE,
+        group_chat_burst=GROUP_CHAT_BURST,
+        max_retries=MAX_RETRIES,
+    ):
+        self._overall = (overall_rate, overall_rate)
+        self._private = (private_chat_rate, private_chat_burst)
+        self._group = (group_chat_rate, group_chat_burst)
+        self.max_retries = max_retries
+        self._global_bucket = None
+        self._chat_buckets = {}
+        self._pending = []
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._dispatcher = None
+        self.metrics = {
+            'requests': 0,
+            'retries': 0,
+        }
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for *_, future in self._pending:
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if not endpoint.startswith(_LIMITED_PREFIXES):
+            return await callback(*args, **kwargs)
+
+        chat_id = data.get('chat_id')
+        priority = request_priority(endpoint, rate_limit_args)
+        cost = len(data['media']) if endpoint == 'sendMediaGroup' and data.get('media') else 1
+        self.metrics['requests'] += 1
+
+        attempt = 0
+        while True:
+            await self._acquire(chat_id, priority, cost)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.metrics['retries'] += 1
+                delay = _seconds(e.retry_after)
+                logger.warning(f"RetryAfter {delay} с для {endpoint} в чате {chat_id}, повтор {attempt}")
+                self._pause(chat_id, delay)
+
+    def pending(self) -> int:
+        """Количество запросов, ожидающих своей очереди."""
+        return sum(1 for *_, future in self._pending if not future.done())
+
+    def _buckets(self, chat_id, now):
+        if self._global_bucket is None:
+            self._global_bucket = TokenBucket(*self._overall, now=now)
+        if chat_id is None:
+            return (self._global_bucket,)
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Строковые chat_id (@channel) и отрицательные — группы и каналы
+            is_private = isinstance(chat_id, int) and chat_id > 0
+            bucket = TokenBucket(*(self._private if is_private else self._group), now=now)
+            self._chat_buckets[chat_id] = bucket
+        return (self._global_bucket, bucket)
+
+    def _pause(self, chat_id, delay):
+        now = asyncio.get_running_loop().time()
+        # Пауза относится к чату; без чата — ко всем запросам
+        self._buckets(chat_id, now)[-1].pause(now + delay)
+
+    async def _acquire(self, chat_id, priority, cost):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._pending, (priority, next(self._seq), chat_id, cost, future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+        self._wakeup.set()
+        await future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            self._wakeup.clear()
+            wait = self._grant(loop.time())
+            if not self._pending:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _grant(self, now) -> float:
+        """
+        Выдаёт разрешения всем запросам, для которых есть токены.
+        Возвращает, через сколько секунд стоит проверить очередь снова.
+        """
+        remaining = []
+        blocked_chats = set()
+        global_blocked = False
+        next_check = None
+        for item in sorted(self._pending):
+            _, _, chat_id, cost, future = item
+            if future.done():
+                continue
+            # Более важный запрос ждёт: менее важные не обгоняют его ни в чате, ни глобально
+            if global_blocked or chat_id in blocked_chats:
+                remaining.append(item)
+                continue
+            buckets = self._buckets(chat_id, now)
+            wait = max(bucket.wait_time(now, cost) for bucket in buckets)
+            if wait > 0:
+                if buckets[0].wait_time(now, cost) > 0:
+                    global_blocked = True
+                blocked_chats.add(chat_id)
+                remaining.append(item)
+                next_check = wait if next_check is None else min(next_check, wait)
+                continue
+            for bucket in buckets:
+                bucket.consume(now, cost)
+            future.set_result(None)
+        heapq.heapify(remaining)
+        self._pending = remaining
+        return next_check
+
+
+def _seconds(value) -> float:
+    # В новых версиях PTB retry_after может быть timedelta
+    return value.total_seconds() if hasattr(value, 'total_seconds') else float(value)
@@ -0,0 +1,164 @@
+# rng.py
+"""
+Модуль генераторов случайных чисел бота.
+Обеспечивает:
+- Именованные потоки случайных чисел для подсистем (расписание, контент, викторина,
+  казино, /roll и т.д.), независимые друг от друга
+- Воспроизводимость: при заданном seed каждый поток получает своё зерно,
+  выведенное из общего, поэтому изменение одной подсистемы не сдвигает другие
+- Режим записи (record): зерно и число обращений к каждому потоку сохраняются в файл
+- Режим воспроизведения (replay): зерно берётся из файла, а при остановке
+  сверяется число обращений, чтобы заметить расхождение нагрузки
+
+Без настроек (раздел rng в bot_config отсутствует) потоки инициализируются
+из системного источника случайности, как обычный модуль random.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import random
+
+logger = logging.getLogger(__name__)
+
+# Режимы работы сервиса
+MODE_OFF = 'off'
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+DEFAULT_RECORD_FILE = "state_data/rng_session.json"
+
+
+class RandomStream(random.Random):
+    """
+    Поток случайных чисел. Считает обращения к генератору: все методы
+    random.Random сводятся к random() и getrandbits().
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.draws = 0
+        super().__init__()
+
+    def random(self):
+        self.draws += 1
+        return super().random()
+
+    def getrandbits(self, k):
+        self.draws += 1
+        return super().getrandbits(k)
+
+
+def derive_seed(seed, name) -> int:
+    """Зерно потока name, выведенное из общего зерна seed."""
+    digest = hashlib.sha256(f"{seed}:{name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class RandomService:
+    """
+    Реестр именованных потоков. Потоки создаются при первом обращении и живут
+    всё время работы бота, поэтому ссылку на поток можно хранить в модуле:
+    configure() переинициализирует существующие потоки на месте.
+    """
+
+    def __init__(self):
+        self._streams = {}
+        self.seed = None
+        self.mode = MODE_OFF
+        self.record_file = DEFAULT_RECORD_FILE
+        self._recorded_draws = {}
+
+    def stream(self, name) -> RandomStream:
+        """Возвращает поток подсистемы name."""
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = RandomStream(name)
+            self._reseed(stream)
+        return stream
+
+    def configure(self, seed=None, mode=MODE_OFF, file=DEFAULT_RECORD_FILE):
+        """
+        Настраивает сервис и переинициализирует все потоки.
+
+        Args:
+            seed: Общее зерно; None — системная случайность (в режиме record зерно выбирается и сохраняется)
+            mode: 'off', 'record' или 'replay'
+            file: Файл записи для режимов record и replay
+
+        Raises:
+            ValueError: Неизвестный режим или файл записи для replay не читается
+        """
+        if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Неизвестный режим генератора: {mode}")
+        self.mode = mode
+        self.record_file = file
+        self._recorded_draws = {}
+        if mode == MODE_REPLAY:
+            try:
+                with open(file, "r", encoding="utf-8") as f:
+                    recording = json.load(f)
+                seed = recording["seed"]
+                self._recorded_draws = recording.get("draws", {})
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Не удалось прочитать запись генератора {file}: {e}") from e
+        elif mode == MODE_RECORD and seed is None:
+            seed = random.SystemRandom().randrange(2 ** 63)
+        self.seed = seed
+        for stream in self._streams.values():
+            self._reseed(stream)
+        if mode == MODE_RECORD:
+            self.save()
+        logger.info(f"Генератор случайных чисел: режим {mode}, зерно {seed if seed is not None else 'системное'}")
+
+    def draws(self) -> dict:
+        """Число обращений к каждому потоку с момента настройки."""
+        return {name: stream.draws for name, stream in self._streams.items()}
+
+    def divergence(self) -> dict:
+        """
+        В режиме replay — потоки, число обращений к которым отличается от записи.
+
+        Returns:
+            dict: { имя_потока: (в_записи, сейчас) }
+        """
+        if self.mode != MODE_REPLAY:
+            return {}
+        current = self.draws()
+        names = set(current) | set(self._recorded_draws)
+        return {
+            name: (self._recorded_draws.get(name, 0), current.get(name, 0))
+            for name in sorted(names)
+            if self._recorded_draws.get(name, 0) != current.get(name, 0)
+        }
+
+    def save(self):
+        """В режиме record записывает зерно и число обращений к потокам."""
+        if self.mode != MODE_RECORD:
+            return
+        tmp_path = self.record_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.record_file) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"seed": self.seed, "draws": self.draws()}, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.record_file)
+        except OSError as e:
+            logger.error(f"Ошибка записи {self.record_file}: {e}")
+
+    def close(self):
+        """Завершение работы: сохраняет запись или сообщает о расхождении с ней."""
+        self.save()
+        diverged = self.divergence()
+        if diverged:
+            logger.warning(f"Воспроизведение разошлось с записью (в записи, сейчас): {diverged}")
+
+    def _reseed(self, stream):
+        stream.seed(None if self.seed is None else derive_seed(self.seed, stream.name))
+        stream.draws = 0
+
+
+# Общий сервис генераторов бота
+rng = RandomService()
+atexit.register(rng.close)
@@ -13,16 +13,18 @@ import json
 import os
 from pathlib import Path
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, InputMediaPhoto, InputMediaVideo, InputMediaAudio, InputMediaDocument, InputMediaAnimation
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, InputMediaAnimation
 
 from autopost import autopost_10_pics_callback, autopost_4_videos_callback
 from quiz import quiz_post_callback, weekly_quiz_reset
 from wisdom import wisdom_post_callback
 from utils import random_time_in_range, parse_time_from_string, convert_local_to_utc
+from media_groups import MediaGroupAggregator, MediaGroupJournal, MediaItem, build_album
 
 import state  # Флаги автопубликации, викторины, мудрости и т.д.
 
-from config import POST_CHAT_ID, schedule_config, TIMEZONE_OFFSET
+import config
+from config import get_config
 
 # Добавляем импорт функций для системы ставок
 from handlers.betting_commands import publish_betting_event, process_betting_results, close_betting_event
@@ -33,6 +35,8 @@ logger = logging.getLogger(__name__)
 
 # Файл для хранения отложенных публикаций
 SCHEDULED_POSTS_FILE = Path("state_data") / "scheduled_posts.json"
+# Журнал частей альбомов /post, которые ещё собираются
+MEDIA_GROUP_JOURNAL_FILE = Path("state_data") / "post_media_groups.jsonl"
 
 
 async def reschedule_all_posts(context: ContextTypes.DEFAULT_TYPE):
@@ -41,6 +45,7 @@ async def reschedule_all_posts(context: ContextTypes.DEFAULT_TYPE):
     - если время публикации прошло, публикует их сразу;
     - если ещё не наступило – планирует задачу (run_once) на нужное время.
     Поддерживает как одиночные публикации, так и медиа-группы.
+    Также продолжает сбор альбомов /post, прерванный перезапуском.
     
     Args:
         context: Контекст от планировщика задач Telegram
@@ -67,50 +72,12 @@ async def reschedule_all_posts(context: ContextTypes.DEFAULT_TYPE):
                     media_files = data.get("media_files", [])
                     
                     if not media_files:
-                        await context.bot.send_message(chat_id=chat_id, text=text, read_timeout=300)
+                        await context.bot.send_message(chat_id=chat_id, text=text)
                     else:
-                        # Создаем объекты InputMedia для отправки
-                        media_to_send = []
-                        for i, media_file in enumerate(media_files):
-                            file_id = media_file.get("file_id")
-                            media_type = media_file.get("type")
-                            
-                            # Для первого элемента добавляем caption, для остальных - нет
-                            caption = text if i == 0 else None
-                            
-                            # Проверяем, что у нас есть caption и он корректного типа
-                            if caption is not None and caption != "":
-                                logger.info(f"[DEBUG] delayed_post_callback: Установка caption='{caption}' для i={i}")
-                                
-                                # Создаем объекты InputMedia с caption
-                                if media_type == "photo":
-                                    media_obj = InputMediaPhoto(media=file_id, caption=caption)
-                                    media_to_send.append(media_obj)
-                                elif media_type == "video":
-                                    media_obj = InputMediaVideo(media=file_id, caption=caption)
-                                    media_to_send.append(media_obj)
-                                elif media_type == "audio":
-                                    media_obj = InputMediaAudio(media=file_id, caption=caption)
-                                    media_to_send.append(media_obj)
-                                elif media_type == "document":
-                                    media_obj = InputMediaDocument(media=file_id, caption=caption)
-                                    media_to_send.append(media_obj)
-                            else:
-                                # Если caption нет, создаем объекты без него
-                                if media_type == "photo":
-                                    media_obj = InputMediaPhoto(media=file_id)
-                                    media_to_send.append(media_obj)
-                                elif media_type == "video":
-                                    media_obj = InputMediaVideo(media=file_id)
-                                    media_to_send.append(media_obj)
-                                elif media_type == "audio":
-                                    media_obj = InputMediaAudio(media=file_id)
-                                    media_to_send.append(media_obj)
-                                elif media_type == "document":
-                                    media_obj = InputMediaDocument(media=file_id)
-                                    media_to_send.append(media_obj)
+                        # Создаем объекты InputMedia для отправки, caption - на первом файле
+                        media_to_send = build_album([MediaItem.from_dict(m) for m in media_files], text)
                         
-                        await context.bot.send_media_group(chat_id=chat_id, media=media_to_send, read_timeout=300)
+                        await context.bot.send_media_group(chat_id=chat_id, media=media_to_send)
                 else:
                     # Обычная публикация
                     media = data.get("media")
@@ -118,15 +85,15 @@ async def reschedule_all_posts(context: ContextTypes.DEFAULT_TYPE):
                     
                     if media:
                         if media_type == "photo":
-                            await context.bot.send_photo(chat_id=chat_id, photo=media, caption=text, read_timeout=300)
+                            await context.bot.send_photo(chat_id=chat_id, photo=media, caption=text)
                         elif media_type == "video":
-                            await context.bot.send_video(chat_id=chat_id, video=media, caption=text, read_timeout=300)
+                            await context.bot.send_video(chat_id=chat_id, video=media, caption=text)
                         elif media_type == "audio":
-                            await context.bot.send_audio(chat_id=chat_id, audio=media, caption=text, read_timeout=300)
+                            await context.bot.send_audio(chat_id=chat_id, audio=media, caption=text)
                         else:
-                            await context.bot.send_message(chat_id=chat_id, text=text, read_timeout=300)
+                            await context.bot.send_message(chat_id=chat_id, text=text)
                     else:
-                        await context.bot.send_message(chat_id=chat_id, text=text, read_timeout=300)
+                        await context.bot.send_message(chat_id=chat_id, text=text)
                 
                 logger.info(f"Отложенная публикация {post_id} опубликована немедленно (запланировано на {scheduled_dt}).")
             except Exception as e:
@@ -146,6 +113,9 @@ async def reschedule_all_posts(context: ContextTypes.DEFAULT_TYPE):
     
     save_scheduled_posts(scheduled_posts)
 
+    # Альбомы, которые собирались в момент остановки бота
+    post_media_groups.restore(context)
+
 
 def load_scheduled_posts() -> dict:
     """
@@ -199,75 +169,56 @@ def save_scheduled_posts(data: dict):
 # ==== ЕЖЕДНЕВНОЕ РАСПИСАНИЕ (автопост, викторины, мудрость) ====
 #
 
-def schedule_autopost_for_today(job_queue):
+# Слоты автопостинга: имя задачи (и раздела autopost) и публикация
+AUTOPOST_SLOTS = (
+    ("morning_pics", autopost_10_pics_callback),   # утренние картинки
+    ("day_videos", autopost_4_videos_callback),    # дневные видео
+    ("day_pics", autopost_10_pics_callback),       # дневные картинки
+    ("evening_pics", autopost_10_pics_callback),   # вечерние картинки
+)
+
+
+def schedule_autopost_for_today(job_queue, only=None):
     """
     Планирует автоматические публикации на сегодня согласно расписанию из конфигурации.
     Включает утренние картинки, дневные видео, дневные и вечерние картинки.
     
     Args:
         job_queue: Очередь задач планировщика Telegram
+        only: Имена слотов, которые нужно запланировать (по умолчанию все)
     """
-    # Расписание утренних картинок
-    morning_config = schedule_config['autopost']['morning_pics']
-    start_time = parse_time_from_string(morning_config['time_range']['start'])
-    end_time = parse_time_from_string(morning_config['time_range']['end'])
-    time1 = random_time_in_range(start_time, end_time)
-    job_queue.run_daily(
-        autopost_10_pics_callback,
-        time=time1,
-        days=tuple(morning_config['days']),
-        name="morning_pics"
-    )
-
-    # Расписание дневных видео
-    day_videos_config = schedule_config['autopost']['day_videos']
-    start_time = parse_time_from_string(day_videos_config['time_range']['start'])
-    end_time = parse_time_from_string(day_videos_config['time_range']['end'])
-    time2 = random_time_in_range(start_time, end_time)
-    job_queue.run_daily(
-        autopost_4_videos_callback,
-        time=time2,
-        days=tuple(day_videos_config['days']),
-        name="day_videos"
-    )
-
-    # Расписание дневных картинок
-    day_pics_config = schedule_config['autopost']['day_pics']
-    start_time = parse_time_from_string(day_pics_config['time_range']['start'])
-    end_time = parse_time_from_string(day_pics_config['time_range']['end'])
-    time3 = random_time_in_range(start_time, end_time)
-    job_queue.run_daily(
-        autopost_10_pics_callback,
-        time=time3,
-        days=tuple(day_pics_config['days']),
-        name="day_pics"
-    )
+    autopost_config = get_config().schedule['autopost']
 
-    # Расписание вечерних картинок
-    evening_pics_config = schedule_config['autopost']['evening_pics']
-    start_time = parse_time_from_string(evening_pics_config['time_range']['start'])
-    end_time = parse_time_from_string(evening_pics_config['time_range']['end'])
-    time4 = random_time_in_range(start_time, end_time)
-    job_queue.run_daily(
-        autopost_10_pics_callback,
-        time=time4,
-        days=tuple(evening_pics_config['days']),
-        name="evening_pics"
-    )
+    for name, callback in AUTOPOST_SLOTS:
+        if only is not None and name not in only:
+            continue
+        slot_config = autopost_config[name]
+        start_time = parse_time_from_string(slot_config['time_range']['start'])
+        end_time = parse_time_from_string(slot_config['time_range']['end'])
+        job_queue.run_daily(
+            callback,
+            time=random_time_in_range(start_time, end_time),
+            days=tuple(slot_config['days']),
+            name=name
+        )
 
 
-def schedule_quizzes_for_today(job_queue):
+def schedule_quizzes_for_today(job_queue, only=None):
     """
     Планирует викторины на сегодня согласно расписанию из конфигурации.
     Если викторины отключены через state.quiz_enabled или в конфигурации, ничего не делает.
     
     Args:
         job_queue: Очередь задач планировщика Telegram
+        only: Имена задач викторин (quiz_N), которые нужно запланировать (по умолчанию все)
     """
-    if not state.quiz_enabled or not schedule_config['quiz']['enabled']:
+    quiz_config = get_config().schedule['quiz']
+    if not state.quiz_enabled or not quiz_config['enabled']:
         return
 
-    for i, quiz_time_config in enumerate(schedule_config['quiz']['quiz_times'], start=1):
+    for i, quiz_time_config in enumerate(quiz_config['quiz_times'], start=1):
+        if only is not None and f"quiz_{i}" not in only:
+            continue
         start_time = parse_time_from_string(quiz_time_config['time_range']['start'])
         end_time = parse_time_from_string(quiz_time_config['time_range']['end'])
         time = random_time_in_range(start_time, end_time)
@@ -287,10 +238,10 @@ def schedule_wisdom_for_today(job_queue):
     Args:
         job_queue: Очередь задач планировщика Telegram
     """
-    if not state.wisdom_enabled or not schedule_config['wisdom']['enabled']:
+    wisdom_config = get_config().schedule['wisdom']
+    if not state.wisdom_enabled or not wisdom_config['enabled']:
         return
-        
-    wisdom_config = schedule_config['wisdom']
+
     start_time = parse_time_from_string(wisdom_config['time_range']['start'])
     end_time = parse_time_from_string(wisdom_config['time_range']['end'])
     time = random_time_in_range(start_time, end_time)
@@ -302,6 +253,175 @@ def schedule_wisdom_for_today(job_queue):
     )
 
 
+def schedule_daily_resets(job_queue):
+    """
+    Планирует ежедневный сброс расписания и еженедельный сброс викторин
+    согласно конфигурации.
+    
+    Args:
+        job_queue: Очередь задач планировщика Telegram
+    """
+    schedule_config = get_config().schedule
+
+    # Назначаем "ночной" джоб для сброса расписания
+    midnight_config = schedule_config['midnight_reset']
+    midnight_time = parse_time_from_string(midnight_config['time'])
+    job_queue.run_daily(
+        midnight_reset_callback,
+        time=midnight_time,
+        days=tuple(midnight_config['days']),
+        name="reset_schedule",
+        job_kwargs={'misfire_grace_time': 3600}  # Добавим запас времени
+    )
+
+    # Еженедельный сброс викторин
+    quiz_reset_config = schedule_config['weekly_quiz_reset']
+    quiz_reset_time = parse_time_from_string(quiz_reset_config['time'])
+    job_queue.run_daily(
+        weekly_quiz_reset,
+        time=quiz_reset_time,
+        days=tuple(quiz_reset_config['days']),
+        name="weekly_quiz_reset",
+        job_kwargs={'misfire_grace_time': 3600}
+    )
+
+
+def _remove_jobs(job_queue, names):
+    """
+    Удаляет из очереди все задачи с указанными именами.
+    
+    Args:
+        job_queue: Очередь задач планировщика Telegram
+        names: Имена задач для удаления
+    """
+    for name in names:
+        for job in job_queue.get_jobs_by_name(name):
+            job.schedule_removal()
+
+
+# Имена задач, которые создаёт каждая подсистема расписания
+AUTOPOST_JOB_NAMES = ("morning_pics", "day_videos", "day_pics", "evening_pics")
+WISDOM_JOB_NAMES = ("wisdom",)
+BETTING_JOB_NAMES = ("publish_betting_event", "close_betting_event", "process_betting_results")
+DAILY_RESET_JOB_NAMES = ("reset_schedule", "weekly_quiz_reset")
+
+
+def _quiz_names(quiz_times):
+    """Имена задач викторин для списка quiz_times."""
+    return {f"quiz_{i}" for i in range(1, len(quiz_times) + 1)}
+
+
+def _quiz_job_names(job_queue):
+    """Возвращает имена всех задач викторин, находящихся в очереди."""
+    return [job.name for job in job_queue.jobs() if job.name and job.name.startswith("quiz_")]
+
+
+def _ran_today(job) -> bool:
+    """
+    Срабатывание ежедневной задачи на сегодня уже позади: следующий запуск
+    назначен не на сегодня.
+    """
+    next_t = job.next_t
+    if not isinstance(next_t, datetime.datetime):
+        return False
+    return next_t.date() > datetime.datetime.now(next_t.tzinfo).date()
+
+
+def _replan_slots(job_queue, names):
+    """
+    Снимает задачи слотов с изменившимся расписанием.
+    Слот, который сегодня уже сработал, заново не планируется: иначе при новом
+    времени позже текущего публикация вышла бы второй раз за день. Его
+    запланирует полуночный сброс с новыми настройками.
+
+    Returns:
+        list: Слоты, которые нужно запланировать заново
+    """
+    to_schedule = []
+    for name in names:
+        jobs = job_queue.get_jobs_by_name(name)
+        ran_today = any(_ran_today(job) for job in jobs)
+        for job in jobs:
+            job.schedule_removal()
+        if ran_today:
+            logger.info(f"Задача {name} сегодня уже выполнена, новое расписание вступит в силу завтра")
+        else:
+            to_schedule.append(name)
+    return to_schedule
+
+
+def _section_change(changes, key):
+    """Старое и новое значение раздела из изменений конфигурации (или пустые словари)."""
+    old, new = changes.get(key, (None, None))
+    return old or {}, new or {}
+
+
+def register_config_subscribers(job_queue, app):
+    """
+    Подписывает подсистемы расписания на изменения конфигурации.
+    При перезагрузке конфигурации (/reload_config) перепланируются только те
+    задачи, чьи настройки изменились; остальные сохраняют уже выбранное время.
+    Смена часового пояса затрагивает все задачи, так как времена хранятся
+    в локальном поясе.
+    
+    Args:
+        job_queue: Очередь задач планировщика Telegram
+        app: Экземпляр telegram.ext.Application
+    """
+    timezone_key = "bot_config.timezone_offset"
+
+    def _reschedule_autopost(changes):
+        old, new = _section_change(changes, "schedule_config.autopost")
+        names = [
+            name for name in AUTOPOST_JOB_NAMES
+            if timezone_key in changes or old.get(name) != new.get(name)
+        ]
+        names = _replan_slots(job_queue, names)
+        if names:
+            schedule_autopost_for_today(job_queue, only=names)
+        logger.info(f"Расписание автопостинга обновлено после изменения конфигурации: {sorted(changes)}, слоты {names}")
+
+    def _reschedule_quizzes(changes):
+        old, new = _section_change(changes, "schedule_config.quiz")
+        old_times, new_times = old.get('quiz_times', ()), new.get('quiz_times', ())
+        all_changed = timezone_key in changes or old.get('enabled') != new.get('enabled')
+        names = {
+            f"quiz_{i}" for i in range(1, max(len(old_times), len(new_times)) + 1)
+            if all_changed or i > len(old_times) or i > len(new_times) or old_times[i - 1] != new_times[i - 1]
+        }
+        # Задачи викторин, которых нет в новом расписании
+        names.update(name for name in _quiz_job_names(job_queue) if all_changed or name not in _quiz_names(new_times))
+        names = _replan_slots(job_queue, sorted(names))
+        if names:
+            schedule_quizzes_for_today(job_queue, only=names)
+        logger.info(f"Расписание викторин обновлено после изменения конфигурации: {sorted(changes)}, слоты {names}")
+
+    def _reschedule_wisdom(changes):
+        names = _replan_slots(job_queue, WISDOM_JOB_NAMES)
+        if names:
+            schedule_wisdom_for_today(job_queue)
+        logger.info(f"Расписание мудрости дня обновлено после изменения конфигурации: {sorted(changes)}")
+
+    def _reschedule_betting(changes):
+        _remove_jobs(job_queue, BETTING_JOB_NAMES)
+        schedule_betting_events(job_queue, app)
+        logger.info(f"Расписание ставок обновлено после изменения конфигурации: {sorted(changes)}")
+
+    def _reschedule_daily_resets(changes):
+        _remove_jobs(job_queue, DAILY_RESET_JOB_NAMES)
+        schedule_daily_resets(job_queue)
+        logger.info(f"Расписание сбросов обновлено после изменения конфигурации: {sorted(changes)}")
+
+    config.subscribe(["schedule_config.autopost", timezone_key], _reschedule_autopost)
+    config.subscribe(["schedule_config.quiz", timezone_key], _reschedule_quizzes)
+    config.subscribe(["schedule_config.wisdom", timezone_key], _reschedule_wisdom)
+    config.subscribe(["schedule_config.betting", timezone_key], _reschedule_betting)
+    config.subscribe(
+        ["schedule_config.midnight_reset", "schedule_config.weekly_quiz_reset", timezone_key],
+        _reschedule_daily_resets
+    )
+
+
 async def midnight_reset_callback(context: ContextTypes.DEFAULT_TYPE):
     """
     Обработчик для полуночного сброса и перепланирования всех задач.
@@ -407,7 +527,7 @@ async def schedule_post_command(update: Update, context: ContextTypes.DEFAULT_TY
     scheduled_posts = load_scheduled_posts()
     post_id = str(len(scheduled_posts) + 1)
     data_to_post = {
-        "chat_id": POST_CHAT_ID,
+        "chat_id": get_config().post_chat_id,
         "datetime": scheduled_dt.isoformat(),
         "text": content_text,
         "media": media,
@@ -471,53 +591,15 @@ async def delayed_post_callback(context: ContextTypes.DEFAULT_TYPE):
             
             if not media_files:
                 logger.error(f"[DEBUG] delayed_post_callback: Список медиа пуст для публикации {post_id}")
-                await bot.send_message(chat_id=chat_id, text=text, read_timeout=300)
+                await bot.send_message(chat_id=chat_id, text=text)
             else:
                 logger.info(f"[DEBUG] delayed_post_callback: Отправка медиа-группы с {len(media_files)} файлами")
                 
-                # Преобразуем сохраненные file_ids в InputMedia объекты
-                media_to_send = []
-                for i, media_file in enumerate(media_files):
-                    file_id = media_file.get("file_id")
-                    media_type = media_file.get("type")
-                    
-                    # Для первого элемента добавляем caption, для остальных - нет
-                    caption = text if i == 0 else None
-                    
-                    # Проверяем, что у нас есть caption и он корректного типа
-                    if caption is not None and caption != "":
-                        logger.info(f"[DEBUG] delayed_post_callback: Установка caption='{caption}' для i={i}")
-                        
-                        # Создаем объекты InputMedia с caption
-                        if media_type == "photo":
-                            media_obj = InputMediaPhoto(media=file_id, caption=caption)
-                            media_to_send.append(media_obj)
-                        elif media_type == "video":
-                            media_obj = InputMediaVideo(media=file_id, caption=caption)
-                            media_to_send.append(media_obj)
-                        elif media_type == "audio":
-                            media_obj = InputMediaAudio(media=file_id, caption=caption)
-                            media_to_send.append(media_obj)
-                        elif media_type == "document":
-                            media_obj = InputMediaDocument(media=file_id, caption=caption)
-                            media_to_send.append(media_obj)
-                    else:
-                        # Если caption нет, создаем объекты без него
-                        if media_type == "photo":
-                            media_obj = InputMediaPhoto(media=file_id)
-                            media_to_send.append(media_obj)
-                        elif media_type == "video":
-                            media_obj = InputMediaVideo(media=file_id)
-                            media_to_send.append(media_obj)
-                        elif media_type == "audio":
-                            media_obj = InputMediaAudio(media=file_id)
-                            media_to_send.append(media_obj)
-                        elif media_type == "document":
-                            media_obj = InputMediaDocument(media=file_id)
-                            media_to_send.append(media_obj)
+                # Преобразуем сохраненные описания в InputMedia объекты, caption - на первом файле
+                media_to_send = build_album([MediaItem.from_dict(m) for m in media_files], text)
                 
                 # Отправляем медиа-группу
-                await bot.send_media_group(chat_id=chat_id, media=media_to_send, read_timeout=300)
+                await bot.send_media_group(chat_id=chat_id, media=media_to_send)
                 logger.info(f"[DEBUG] delayed_post_callback: Медиа-группа для публикации {post_id} успешно отправлена")
         else:
             # Обычная публикация с одним или без медиа
@@ -526,15 +608,15 @@ async def delayed_post_callback(context: ContextTypes.DEFAULT_TYPE):
             
             if media:
                 if media_type == "photo":
-                    await bot.send_photo(chat_id=chat_id, photo=media, caption=text, read_timeout=300)
+                    await bot.send_photo(chat_id=chat_id, photo=media, caption=text)
                 elif media_type == "video":
-                    await bot.send_video(chat_id=chat_id, video=media, caption=text, read_timeout=300)
+                    await bot.send_video(chat_id=chat_id, video=media, caption=text)
                 elif media_type == "audio":
-                    await bot.send_audio(chat_id=chat_id, audio=media, caption=text, read_timeout=300)
+                    await bot.send_audio(chat_id=chat_id, audio=media, caption=text)
                 else:
-                    await bot.send_message(chat_id=chat_id, text=text, read_timeout=300)
+                    await bot.send_message(chat_id=chat_id, text=text)
             else:
-                await bot.send_message(chat_id=chat_id, text=text, read_timeout=300)
+                await bot.send_message(chat_id=chat_id, text=text)
             
             logger.info(f"[DEBUG] delayed_post_callback: Публикация {post_id} успешно отправлена")
     except Exception as e:
@@ -792,84 +874,79 @@ async def talk_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         message_text = ""
 
+    post_chat_id = get_config().post_chat_id
+
     # Определяем наличие медиа-файлов
     media_files = []
     
     # Проверяем различные типы медиа
     if update.message.photo:
         await context.bot.send_photo(
-            chat_id=POST_CHAT_ID, 
+            chat_id=post_chat_id, 
             photo=update.message.photo[-1].file_id, 
-            caption=message_text,
-            read_timeout=300
+            caption=message_text
         )
         await update.message.reply_text("Сообщение с фото отправлено в групповой чат.")
         return
     
     elif update.message.video:
         await context.bot.send_video(
-            chat_id=POST_CHAT_ID, 
+            chat_id=post_chat_id, 
             video=update.message.video.file_id, 
-            caption=message_text,
-            read_timeout=300
+            caption=message_text
         )
         await update.message.reply_text("Сообщение с видео отправлено в групповой чат.")
         return
         
     elif update.message.audio:
         await context.bot.send_audio(
-            chat_id=POST_CHAT_ID, 
+            chat_id=post_chat_id, 
             audio=update.message.audio.file_id, 
-            caption=message_text,
-            read_timeout=300
+            caption=message_text
         )
         await update.message.reply_text("Сообщение с аудио отправлено в групповой чат.")
         return
         
     elif update.message.animation:
         await context.bot.send_animation(
-            chat_id=POST_CHAT_ID, 
+            chat_id=post_chat_id, 
             animation=update.message.animation.file_id, 
-            caption=message_text,
-            read_timeout=300
+            caption=message_text
         )
         await update.message.reply_text("Сообщение с GIF отправлено в групповой чат.")
         return
         
     elif update.message.document:
         await context.bot.send_document(
-            chat_id=POST_CHAT_ID, 
+            chat_id=post_chat_id, 
             document=update.message.document.file_id, 
-            caption=message_text,
-            read_timeout=300
+            caption=message_text
         )
         await update.message.reply_text("Сообщение с документом отправлено в групповой чат.")
         return
         
     elif update.message.voice:
         await context.bot.send_voice(
-            chat_id=POST_CHAT_ID, 
+            chat_id=post_chat_id, 
             voice=update.message.voice.file_id, 
-            caption=message_text,
-            read_timeout=300
+            caption=message_text
         )
         await update.message.reply_text("Сообщение с голосовым сообщением отправлено в групповой чат.")
         return
         
     elif update.message.video_note:
         await context.bot.send_video_note(
-            chat_id=POST_CHAT_ID, 
-            video_note=update.message.video_note.file_id,
-            read_timeout=300
+            chat_id=post_chat_id, 
+            video_note=update.message.video_note.file_id
         )
         if message_text:
-            await context.bot.send_message(chat_id=POST_CHAT_ID, text=message_text, read_timeout=300)
+            await context.bot.send_message(chat_id=post_chat_id, text=message_text)
         await update.message.reply_text("Видеосообщение отправлено в групповой чат.")
         return
     
     # Если нет медиа, отправляем простое текстовое сообщение
     elif message_text:
-        await context.bot.send_message(chat_id=POST_CHAT_ID, text=message_text, read_timeout=300)
+        await context.bot.send_message(chat_id=post_chat_id, text=message_text)
         await update.message.reply_text("Сообщение отправлено в групповой чат.")
         return
     
@@ -882,8 +959,8 @@ async def talk_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def talk_media_group_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Обрабатывает команду /talk, отправленную с группой медиа-файлов (альбомом).
-    Собирает все файлы из группы и отправляет их одним альбомом.
-    Перезапускает таймер отправки при поступлении нового файла группы.
+    Передаёт части альбома в talk_media_groups, который отправит их одним альбомом,
+    когда новые файлы группы перестанут поступать.
     
     Args:
         update: Объект Update от Telegram
@@ -891,8 +968,6 @@ async def talk_media_group_command(update: Update, context: ContextTypes.DEFAULT
     """
     message = update.effective_message
     media_group_id = message.media_group_id
-    job_name = f"send_group_{media_group_id}"
-    delay = 5 # Увеличиваем задержку до 5 секунд, чтобы успели собраться все изображения
     
     # Подробное логирование входящего сообщения
     caption_text = message.caption if message.caption else 'None'
@@ -907,158 +982,51 @@ async def talk_media_group_command(update: Update, context: ContextTypes.DEFAULT
         logger.warning(f"[DEBUG] talk_media_group_command: Сообщение с командой /post не должно сюда попадать! Игнорируем.")
         return
 
-    # Инициализируем хранилище для медиа-групп, если его нет
-    if 'media_groups' not in context.bot_data:
-        context.bot_data['media_groups'] = {}
-        logger.info(f"[DEBUG] talk_media_group_command: Инициализирован пустой словарь media_groups")
-    
-    # Формируем объект InputMedia для текущего сообщения
-    current_media = None
-    if message.photo:
-        current_media = InputMediaPhoto(message.photo[-1].file_id)
-    elif message.video:
-        current_media = InputMediaVideo(message.video.file_id)
-    elif message.audio:
-        current_media = InputMediaAudio(message.audio.file_id)
-    elif message.document:
-        current_media = InputMediaDocument(message.document.file_id)
-    # Добавьте другие типы медиа при необходимости (animation?)
-    
+    current_media = MediaItem.from_message(message)
     if not current_media:
-        logger.warning(f"[DEBUG] talk_media_group_command: Не удалось создать InputMedia для сообщения в группе {media_group_id}")
+        logger.warning(f"[DEBUG] talk_media_group_command: Не удалось определить тип вложения для сообщения в группе {media_group_id}")
         return
 
-    # Если это первое сообщение из группы, которое мы видим
-    if media_group_id not in context.bot_data['media_groups']:
-        # Проверяем наличие caption именно в первом сообщении
-        if message.caption and message.caption.startswith("/talk"):
-            # Извлекаем текст сообщения
-            text_parts = message.caption.split(' ', 1)
-            message_text = text_parts[1].strip() if len(text_parts) > 1 else ""
-            
-            logger.info(f"[DEBUG] talk_media_group_command: Найдена команда /talk, извлечен текст: '{message_text}'")
-            
-            # Создаем запись для группы
-            context.bot_data['media_groups'][media_group_id] = {
-                'media': [current_media],
-                'caption': message_text,
-                'chat_id': message.chat_id, # Сохраняем chat_id пользователя для ответа
-                'processed': False
-            }
-            logger.info(f"[DEBUG] talk_media_group_command: Создана новая группа {media_group_id} с caption='{message_text}'")
-            
-            # Удаляем существующие задачи для этой группы, если они есть
-            current_jobs = context.job_queue.get_jobs_by_name(job_name)
-            for job in current_jobs:
-                job.schedule_removal()
-                logger.info(f"[DEBUG] talk_media_group_command: Удалена существующая задача для группы {media_group_id}")
-            
-            # Планируем отправку
-            context.job_queue.run_once(
-                send_media_group_callback,
-                when=delay, 
-                data={'media_group_id': media_group_id},
-                name=job_name
-            )
-            logger.info(f"[DEBUG] talk_media_group_command: Запланирована отправка группы {media_group_id} через {delay} сек.")
-        else:
-            # Если это первое сообщение, но без команды /talk - игнорируем
-            logger.warning(f"[DEBUG] talk_media_group_command: Первое сообщение группы {media_group_id} без caption /talk. Игнорируем группу.")
-            return
-    else:
+    group_data = talk_media_groups.get(media_group_id)
+    if group_data and group_data['media']:
         # Это последующее сообщение из группы
-        group_data = context.bot_data['media_groups'][media_group_id]
-        logger.info(f"[DEBUG] talk_media_group_command: Найдена существующая группа {media_group_id} с {len(group_data['media'])} файлами")
-        
-        # Проверяем, что группа еще не была обработана
-        if not group_data['processed']:
-            group_data['media'].append(current_media)
-            count = len(group_data['media'])
-            logger.info(f"[DEBUG] talk_media_group_command: Добавлен файл в группу {media_group_id}. Всего файлов: {count}")
-            
-            # Удаляем существующие задачи для этой группы
-            current_jobs = context.job_queue.get_jobs_by_name(job_name)
-            for job in current_jobs:
-                job.schedule_removal()
-                logger.info(f"[DEBUG] talk_media_group_command: Удалена существующая задача для группы {media_group_id}")
-            
-            # Перезапускаем таймер отправки
-            context.job_queue.run_once(
-                send_media_group_callback,
-                when=delay, 
-                data={'media_group_id': media_group_id},
-                name=job_name
-            )
-            logger.info(f"[DEBUG] talk_media_group_command: Перезапущен таймер отправки группы {media_group_id} на {delay} сек.")
-        else:
-             logger.info(f"[DEBUG] talk_media_group_command: Группа {media_group_id} уже обработана, игнорируем новый файл.")
+        talk_media_groups.add(media_group_id, current_media, context)
+        logger.info(f"[DEBUG] talk_media_group_command: Добавлен файл в группу {media_group_id}. Всего файлов: {len(group_data['media'])}")
+        return
+
+    # Проверяем наличие caption именно в первом сообщении
+    if not (message.caption and message.caption.startswith("/talk")):
+        logger.warning(f"[DEBUG] talk_media_group_command: Первое сообщение группы {media_group_id} без caption /talk. Игнорируем группу.")
+        return
 
-async def send_media_group_callback(context: ContextTypes.DEFAULT_TYPE):
+    # Извлекаем текст сообщения
+    text_parts = message.caption.split(' ', 1)
+    message_text = text_parts[1].strip() if len(text_parts) > 1 else ""
+    logger.info(f"[DEBUG] talk_media_group_command: Найдена команда /talk, извлечен текст: '{message_text}'")
+
+    talk_media_groups.add(
+        media_group_id,
+        current_media,
+        context,
+        caption=message_text,
+        chat_id=message.chat_id  # Сохраняем chat_id пользователя для ответа
+    )
+    logger.info(f"[DEBUG] talk_media_group_command: Создана новая группа {media_group_id} с caption='{message_text}'")
+
+async def send_media_group_callback(context: ContextTypes.DEFAULT_TYPE, media_group_id, group_data):
     """
-    Функция обратного вызова для отправки накопленной медиа-группы.
-    Отправляет все файлы, накопленные в группе, с указанным caption.
+    Отправляет собранную медиа-группу с указанным caption.
+    Вызывается talk_media_groups, когда новые файлы группы перестали поступать.
     
     Args:
-        context: Контекст, содержащий данные о медиа-группе
+        context: Контекст обработчика последнего сообщения группы
+        media_group_id: Идентификатор медиа-группы
+        group_data: Собранная группа (media, caption, chat_id)
     """
-    # Получаем данные о группе
-    media_group_id = context.job.data['media_group_id']
     logger.info(f"[DEBUG] send_media_group_callback: Вызван для группы {media_group_id}")
     
-    if 'media_groups' not in context.bot_data:
-        logger.error(f"[DEBUG] send_media_group_callback: Ошибка - словарь media_groups не найден в bot_data")
-        return
-    
-    if media_group_id not in context.bot_data['media_groups']:
-        logger.error(f"[DEBUG] send_media_group_callback: Ошибка - группа {media_group_id} не найдена в bot_data['media_groups']")
-        return
-    
-    # Очищаем идентификатор медиа-группы из списка обрабатываемых
-    from main import MediaGroupTalkCommandFilter
-    MediaGroupTalkCommandFilter.remove_group(media_group_id)
-    
-    group_data = context.bot_data['media_groups'][media_group_id]
-    
-    # Отмечаем группу как обработанную
-    group_data['processed'] = True
-    
-    # Создаем копии объектов InputMedia с нужным caption
-    media_to_send = []
-    for i, media in enumerate(group_data['media']):
-        # Для первого элемента добавляем caption, для остальных - нет
-        caption = group_data['caption'] if i == 0 else None
-        
-        logger.info(f"[DEBUG] send_media_group_callback: Обработка медиа {i}, caption='{caption}'")
-        
-        # Проверяем, что у нас есть caption и он корректного типа
-        if caption is not None and caption != "":
-            # Создаем новый объект с теми же данными, но с нужным caption
-            if isinstance(media, InputMediaPhoto):
-                media_obj = InputMediaPhoto(media=media.media, caption=caption)
-                media_to_send.append(media_obj)
-            elif isinstance(media, InputMediaVideo):
-                media_obj = InputMediaVideo(media=media.media, caption=caption)
-                media_to_send.append(media_obj)
-            elif isinstance(media, InputMediaAudio):
-                media_obj = InputMediaAudio(media=media.media, caption=caption)
-                media_to_send.append(media_obj)
-            elif isinstance(media, InputMediaDocument):
-                media_obj = InputMediaDocument(media=media.media, caption=caption)
-                media_to_send.append(media_obj)
-        else:
-            # Без caption
-            if isinstance(media, InputMediaPhoto):
-                media_obj = InputMediaPhoto(media=media.media)
-                media_to_send.append(media_obj)
-            elif isinstance(media, InputMediaVideo):
-                media_obj = InputMediaVideo(media=media.media)
-                media_to_send.append(media_obj)
-            elif isinstance(media, InputMediaAudio):
-                media_obj = InputMediaAudio(media=media.media)
-                media_to_send.append(media_obj)
-            elif isinstance(media, InputMediaDocument):
-                media_obj = InputMediaDocument(media=media.media)
-                media_to_send.append(media_obj)
+    # Caption ставится на первый файл альбома
+    media_to_send = build_album(group_data['media'], group_data['caption'])
     
     # Отправляем группу
     files_count = len(media_to_send)
@@ -1070,9 +1038,8 @@ async def send_media_group_callback(context: ContextTypes.DEFAULT_TYPE):
     
     try:
         await context.bot.send_media_group(
-            chat_id=POST_CHAT_ID,
-            media=media_to_send,
-            read_timeout=300
+            chat_id=get_config().post_chat_id,
+            media=media_to_send
         )
         logger.info(f"[DEBUG] send_media_group_callback: Группа {media_group_id} успешно отправлена")
         
@@ -1086,8 +1053,7 @@ async def send_media_group_callback(context: ContextTypes.DEFAULT_TYPE):
                     InlineKeyboardButton("Завтра", callback_data=f"set_date:tomorrow:{media_group_id}"),
                     InlineKeyboardButton("Выбрать дату", callback_data=f"set_date:custom:{media_group_id}")
                 ]
-            ]),
-            read_timeout=300
+            ])
         )
     except Exception as e:
         logger.error(f"[DEBUG] send_media_group_callback: Ошибка при отправке группы {media_group_id}: {str(e)}")
@@ -1095,19 +1061,15 @@ async def send_media_group_callback(context: ContextTypes.DEFAULT_TYPE):
         # Сообщаем пользователю об ошибке
         await context.bot.send_message(
             chat_id=group_data['chat_id'],
-            text=f"Не удалось отправить альбом: {str(e)}",
-            read_timeout=300
+            text=f"Не удалось отправить альбом: {str(e)}"
         )
-    
-    # Удаляем данные группы, если они больше не нужны
-    del context.bot_data['media_groups'][media_group_id]
 
 
 async def schedule_media_group_post_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Обрабатывает команду /post, отправленную с группой медиа-файлов (альбомом).
-    Собирает все файлы из группы и отправляет их одним альбомом в запланированное время.
-    Перезапускает таймер сбора при поступлении нового файла группы.
+    Передаёт части альбома в post_media_groups, который создаст отложенную публикацию,
+    когда новые файлы группы перестанут поступать.
     
     Args:
         update: Объект Update от Telegram
@@ -1115,8 +1077,6 @@ async def schedule_media_group_post_command(update: Update, context: ContextType
     """
     message = update.effective_message
     media_group_id = message.media_group_id
-    job_name = f"collect_group_{media_group_id}"
-    delay = 5  # Увеличиваем задержку до 5 секунд, чтобы успели собраться все изображения
     
     # Подробное логирование входящего сообщения
     caption_text = message.caption if message.caption else 'None'
@@ -1125,226 +1085,81 @@ async def schedule_media_group_post_command(update: Update, context: ContextType
                 f"Photo: {bool(message.photo)}, Video: {bool(message.video)}, "
                 f"Audio: {bool(message.audio)}, Document: {bool(message.document)}")
     
-    # Проверяем, существует ли уже эта медиа-группа в обработке
-    if media_group_id in context.bot_data.get('scheduled_media_groups', {}):
+    current_media = MediaItem.from_message(message)
+    if not current_media:
+        logger.warning(f"[DEBUG] schedule_media_group_post_command: Не удалось определить тип вложения для сообщения в группе {media_group_id}")
+        return
+
+    group_data = post_media_groups.get(media_group_id)
+    if group_data and group_data['media']:
         # Это последующее сообщение из группы, обрабатываем его без проверки caption
-        group_data = context.bot_data['scheduled_media_groups'][media_group_id]
-        logger.info(f"[DEBUG] schedule_media_group_post_command: Найдена существующая группа {media_group_id} с {len(group_data['media'])} файлами")
-        
-        # Формируем объект InputMedia для текущего сообщения
-        current_media = None
-        media_type = None
-        
-        if message.photo:
-            current_media = InputMediaPhoto(message.photo[-1].file_id)
-            media_type = "photo"
-        elif message.video:
-            current_media = InputMediaVideo(message.video.file_id)
-            media_type = "video"
-        elif message.audio:
-            current_media = InputMediaAudio(message.audio.file_id)
-            media_type = "audio"
-        elif message.document:
-            current_media = InputMediaDocument(message.document.file_id)
-            media_type = "document"
-        
-        if not current_media:
-            logger.warning(f"[DEBUG] schedule_media_group_post_command: Не удалось создать InputMedia для сообщения в группе {media_group_id}")
-            return
-            
-        # Проверяем, что группа еще не была обработана
-        if not group_data['processed']:
-            group_data['media'].append(current_media)
-            group_data['media_types'].append(media_type)
-            count = len(group_data['media'])
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Добавлен файл в группу {media_group_id}. Всего файлов: {count}")
-            
-            # Удаляем существующие задачи для этой группы
-            current_jobs = context.job_queue.get_jobs_by_name(job_name)
-            for job in current_jobs:
-                job.schedule_removal()
-                logger.info(f"[DEBUG] schedule_media_group_post_command: Удалена существующая задача для группы {media_group_id}")
-            
-            # Перезапускаем таймер сбора
-            context.job_queue.run_once(
-                collect_media_group_callback,
-                when=delay, 
-                data={'media_group_id': media_group_id},
-                name=job_name
-            )
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Перезапущен таймер сбора группы {media_group_id} на {delay} сек.")
-        else:
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Группа {media_group_id} уже обработана, игнорируем новый файл.")
+        post_media_groups.add(media_group_id, current_media, context)
+        logger.info(f"[DEBUG] schedule_media_group_post_command: Добавлен файл в группу {media_group_id}. Всего файлов: {len(group_data['media'])}")
         return
     
     # Если это первое сообщение из группы - проверяем наличие caption с командой /post
     if not (message.caption and message.caption.startswith("/post")):
         logger.warning(f"[DEBUG] schedule_media_group_post_command: Первое сообщение группы {media_group_id} без команды /post. Игнорируем группу.")
         return
+
+    # Извлекаем время и текст сообщения
+    parts = message.caption.split()
+    if len(parts) < 2:
+        await message.reply_text("Укажите время в формате HH:MM, например: /post 15:30")
+        return
         
-    # Инициализируем хранилище для медиа-групп отложенных постов, если его нет
-    if 'scheduled_media_groups' not in context.bot_data:
-        context.bot_data['scheduled_media_groups'] = {}
-        logger.info(f"[DEBUG] schedule_media_group_post_command: Инициализирован пустой словарь scheduled_media_groups")
-    
-    # Формируем объект InputMedia для текущего сообщения
-    current_media = None
-    media_type = None
-    
-    if message.photo:
-        current_media = InputMediaPhoto(message.photo[-1].file_id)
-        media_type = "photo"
-    elif message.video:
-        current_media = InputMediaVideo(message.video.file_id)
-        media_type = "video"
-    elif message.audio:
-        current_media = InputMediaAudio(message.audio.file_id)
-        media_type = "audio"
-    elif message.document:
-        current_media = InputMediaDocument(message.document.file_id)
-        media_type = "document"
-    # Добавьте другие типы медиа при необходимости
-    
-    if not current_media:
-        logger.warning(f"[DEBUG] schedule_media_group_post_command: Не удалось создать InputMedia для сообщения в группе {media_group_id}")
+    time_str = parts[1]
+    try:
+        time_obj = datetime.datetime.strptime(time_str, "%H:%M").time()
+    except ValueError:
+        await message.reply_text("Неверный формат времени. Используйте HH:MM, например: 15:30")
         return
-
-    # Если это первое сообщение из группы, которое мы видим
-    if media_group_id not in context.bot_data['scheduled_media_groups']:
-        # Проверяем наличие caption с командой /post именно в первом сообщении
-        if message.caption and message.caption.startswith("/post"):
-            # Извлекаем время и текст сообщения
-            parts = message.caption.split()
-            if len(parts) < 2:
-                await message.reply_text("Укажите время в формате HH:MM, например: /post 15:30")
-                return
-                
-            time_str = parts[1]
-            try:
-                time_obj = datetime.datetime.strptime(time_str, "%H:%M").time()
-            except ValueError:
-                await message.reply_text("Неверный формат времени. Используйте HH:MM, например: 15:30")
-                return
-                
-            now = datetime.datetime.now()
-            scheduled_date = now.date()
-            scheduled_dt = datetime.datetime.combine(scheduled_date, time_obj)
-            if scheduled_dt <= now:
-                scheduled_dt += datetime.timedelta(days=1)
-                
-            # Извлекаем текст сообщения (все, что идет после времени)
-            # Разбиваем строку вручную, чтобы корректно получить все, что после времени
-            command_and_time = f"/post {time_str}"
-            if len(message.caption) > len(command_and_time):
-                message_text = message.caption[len(command_and_time):].strip()
-            else:
-                message_text = ""
-                
-            logger.info(f"[DEBUG] Извлеченный текст сообщения: '{message_text}', тип: {type(message_text).__name__}")
-            
-            # Создаем запись для группы
-            context.bot_data['scheduled_media_groups'][media_group_id] = {
-                'media': [current_media],
-                'media_types': [media_type],
-                'caption': message_text,
-                'chat_id': message.chat_id,  # Сохраняем chat_id пользователя для ответа
-                'datetime': scheduled_dt.isoformat(),
-                'processed': False
-            }
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Создана новая группа {media_group_id} на {scheduled_dt}")
-            
-            # Удаляем существующие задачи для этой группы, если они есть
-            current_jobs = context.job_queue.get_jobs_by_name(job_name)
-            for job in current_jobs:
-                job.schedule_removal()
-                logger.info(f"[DEBUG] schedule_media_group_post_command: Удалена существующая задача для группы {media_group_id}")
-            
-            # Планируем завершение сбора медиа-группы
-            context.job_queue.run_once(
-                collect_media_group_callback,
-                when=delay, 
-                data={'media_group_id': media_group_id},
-                name=job_name
-            )
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Запланировано завершение сбора группы {media_group_id} через {delay} сек.")
-        else:
-            # Первое сообщение без валидной команды - игнорируем группу
-            logger.warning(f"[DEBUG] schedule_media_group_post_command: Первое сообщение группы {media_group_id} без команды /post. Игнорируем группу.")
-            return
+        
+    now = datetime.datetime.now()
+    scheduled_date = now.date()
+    scheduled_dt = datetime.datetime.combine(scheduled_date, time_obj)
+    if scheduled_dt <= now:
+        scheduled_dt += datetime.timedelta(days=1)
+        
+    # Извлекаем текст сообщения (все, что идет после времени)
+    # Разбиваем строку вручную, чтобы корректно получить все, что после времени
+    command_and_time = f"/post {time_str}"
+    if len(message.caption) > len(command_and_time):
+        message_text = message.caption[len(command_and_time):].strip()
     else:
-        # Это последующее сообщение из группы
-        group_data = context.bot_data['scheduled_media_groups'][media_group_id]
-        logger.info(f"[DEBUG] schedule_media_group_post_command: Найдена существующая группа {media_group_id} с {len(group_data['media'])} файлами")
+        message_text = ""
         
-        # Проверяем, что группа еще не была обработана
-        if not group_data['processed']:
-            group_data['media'].append(current_media)
-            group_data['media_types'].append(media_type)
-            count = len(group_data['media'])
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Добавлен файл в группу {media_group_id}. Всего файлов: {count}")
-            
-            # Удаляем существующие задачи для этой группы
-            current_jobs = context.job_queue.get_jobs_by_name(job_name)
-            for job in current_jobs:
-                job.schedule_removal()
-                logger.info(f"[DEBUG] schedule_media_group_post_command: Удалена существующая задача для группы {media_group_id}")
-            
-            # Перезапускаем таймер сбора
-            context.job_queue.run_once(
-                collect_media_group_callback,
-                when=delay, 
-                data={'media_group_id': media_group_id},
-                name=job_name
-            )
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Перезапущен таймер сбора группы {media_group_id} на {delay} сек.")
-        else:
-            logger.info(f"[DEBUG] schedule_media_group_post_command: Группа {media_group_id} уже обработана, игнорируем новый файл.")
+    logger.info(f"[DEBUG] Извлеченный текст сообщения: '{message_text}', тип: {type(message_text).__name__}")
+    
+    post_media_groups.add(
+        media_group_id,
+        current_media,
+        context,
+        caption=message_text,
+        chat_id=message.chat_id,  # Сохраняем chat_id пользователя для ответа
+        datetime=scheduled_dt.isoformat()
+    )
+    logger.info(f"[DEBUG] schedule_media_group_post_command: Создана новая группа {media_group_id} на {scheduled_dt}")
 
 
-async def collect_media_group_callback(context: ContextTypes.DEFAULT_TYPE):
+async def collect_media_group_callback(context: ContextTypes.DEFAULT_TYPE, media_group_id, group_data):
     """
-    Функция обратного вызова для завершения сбора медиа-группы и планирования её отправки.
-    Создаёт отложенную публикацию с собранными медиа-файлами.
+    Создаёт отложенную публикацию из собранной медиа-группы.
+    Вызывается post_media_groups, когда новые файлы группы перестали поступать.
     
     Args:
-        context: Контекст, содержащий данные о медиа-группе
+        context: Контекст обработчика последнего сообщения группы
+        media_group_id: Идентификатор медиа-группы
+        group_data: Собранная группа (media, caption, chat_id, datetime)
     """
-    # Получаем данные о группе
-    media_group_id = context.job.data['media_group_id']
     logger.info(f"[DEBUG] collect_media_group_callback: Вызван для группы {media_group_id}")
     
-    if 'scheduled_media_groups' not in context.bot_data:
-        logger.error(f"[DEBUG] collect_media_group_callback: Ошибка - словарь scheduled_media_groups не найден в bot_data")
-        return
-    
-    if media_group_id not in context.bot_data['scheduled_media_groups']:
-        logger.error(f"[DEBUG] collect_media_group_callback: Ошибка - группа {media_group_id} не найдена в scheduled_media_groups")
-        return
-    
-    # Очищаем идентификатор медиа-группы из списка обрабатываемых
-    from main import MediaGroupCommandFilter
-    MediaGroupCommandFilter.remove_group(media_group_id)
-    
-    group_data = context.bot_data['scheduled_media_groups'][media_group_id]
-    
-    # Отмечаем группу как обработанную
-    group_data['processed'] = True
-    
     # Добавляем в хранилище отложенных публикаций
     scheduled_posts = load_scheduled_posts()
     post_id = str(len(scheduled_posts) + 1)
     
-    # Преобразуем объекты InputMedia в file_ids для сохранения
-    media_files = []
-    for i, media in enumerate(group_data['media']):
-        if isinstance(media, InputMediaPhoto):
-            media_files.append({"file_id": media.media, "type": "photo"})
-        elif isinstance(media, InputMediaVideo):
-            media_files.append({"file_id": media.media, "type": "video"})
-        elif isinstance(media, InputMediaAudio):
-            media_files.append({"file_id": media.media, "type": "audio"})
-        elif isinstance(media, InputMediaDocument):
-            media_files.append({"file_id": media.media, "type": "document"})
+    # Сохраняем описания частей альбома в формате JSON
+    media_files = [item.to_dict() for item in group_data['media']]
     
     # Получаем текст для публикации
     caption_text = group_data.get('caption', '')
@@ -1352,7 +1167,7 @@ async def collect_media_group_callback(context: ContextTypes.DEFAULT_TYPE):
     
     # Создаем запись для отложенной публикации
     data_to_post = {
-        "chat_id": POST_CHAT_ID,
+        "chat_id": get_config().post_chat_id,
         "datetime": group_data['datetime'],
         "text": caption_text,
         "is_media_group": True,
@@ -1396,12 +1211,21 @@ async def collect_media_group_callback(context: ContextTypes.DEFAULT_TYPE):
         text=f"Публикация альбома с {len(media_files)} медиа-файлами создана на {scheduled_dt.strftime('%Y-%m-%d %H:%M')}.",
         reply_markup=keyboard
     )
-    
-    # Удаляем данные группы, т.к. они уже перенесены в отложенные публикации
-    del context.bot_data['scheduled_media_groups'][media_group_id]
     logger.info(f"[DEBUG] collect_media_group_callback: Альбом {media_group_id} запланирован на {scheduled_dt}")
 
 
+# Сборщики альбомов для /talk и /post. Таймер группы перезапускается с каждым
+# новым файлом, группа обрабатывается через MEDIA_GROUP_DELAY секунд тишины.
+MEDIA_GROUP_DELAY = 5
+talk_media_groups = MediaGroupAggregator("talk_media_groups", send_media_group_callback, delay=MEDIA_GROUP_DELAY)
+post_media_groups = MediaGroupAggregator(
+    "post_media_groups",
+    collect_media_group_callback,
+    delay=MEDIA_GROUP_DELAY,
+    journal=MediaGroupJournal(MEDIA_GROUP_JOURNAL_FILE)
+)
+
+
 def adjust_time_with_timezone(time_str):
     """
     Корректирует время из локального часового пояса в UTC.
@@ -1418,7 +1242,7 @@ def adjust_time_with_timezone(time_str):
         hours, minutes = map(int, time_str.split(':'))
         
         # Конвертируем из локального времени в UTC (вычитаем смещение часового пояса)
-        hours_utc = (hours - TIMEZONE_OFFSET) % 24
+        hours_utc = (hours - get_config().timezone_offset) % 24
         
         # Возвращаем объект time
         return datetime.time(hour=hours_utc, minute=minutes)
@@ -1437,16 +1261,13 @@ def schedule_betting_events(job_queue, app):
         app: Экземпляр telegram.ext.Application (больше не используется напрямую здесь,
              но оставлен для совместимости с midnight_reset_callback)
     """
-    from config import schedule_config
-    import state
-    
     # Проверяем только глобальный флаг включения ставок
     if not state.betting_enabled:
         logging.info("Система ставок отключена. Пропускаем планирование.")
         return
     
     # Получаем настройки из конфига
-    betting_config = schedule_config.get("betting", {})
+    betting_config = get_config().schedule.get("betting", {})
     
     # Проверяем, нужно ли запускать сегодня
     now = datetime.datetime.now()
@@ -0,0 +1,205 @@
+# session_store.py
+"""
+Модуль хранилища сессий с ограничением по размеру и сроку жизни.
+Обеспечивает:
+- LRU-вытеснение: при превышении max_entries удаляется сессия, к которой
+  дольше всего не обращались
+- TTL: сессии, простоявшие дольше ttl секунд, удаляются при следующем обращении
+  или при вызове expire() — с начала словаря, без обхода всех сессий
+- Необязательное сохранение в JSON-файл с отложенной записью, чтобы сессии
+  переживали перезапуск бота
+- Учёт занимаемой памяти и счётчики обращений в metrics
+
+Записи — компактные объекты с __slots__ и полем last_active. Для сохранения
+в файл класс записи должен уметь to_json() и from_json(data).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def record_size(record) -> int:
+    """Примерный размер записи в байтах: сама запись и значения её полей."""
+    size_bytes = getattr(record, 'size_bytes', None)
+    if size_bytes is not None:
+        return size_bytes()
+    size = sys.getsizeof(record)
+    for cls in type(record).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            size += sys.getsizeof(getattr(record, slot, None))
+    return size
+
+
+class SessionStore:
+    """
+    Сессии вида { ключ: запись } в порядке последнего обращения.
+
+    on_evict(key, record) вызывается перед удалением сессии по TTL или LRU
+    (но не при явном pop), пока запись ещё доступна через peek().
+    """
+
+    def __init__(self, ttl, max_entries, path=None, record_type=None, key_type=str,
+                 flush_delay=1.0, on_evict=None, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.record_type = record_type
+        self.key_type = key_type
+        self.flush_delay = flush_delay
+        self.on_evict = on_evict
+        self._clock = clock
+        self._entries = None
+        self._sizes = {}
+        self._dirty = False
+        self._flush_handle = None
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'evicted': 0,
+            'expired': 0,
+            'entries': 0,
+            'memory_bytes': 0,
+        }
+
+    def get(self, key, default=None):
+        """Возвращает сессию и отмечает обращение; истёкшая сессия удаляется."""
+        entries = self._load()
+        record = entries.get(key)
+        if record is not None and self._clock() - record.last_active >= self.ttl:
+            self._evict(key, 'expired')
+            record = None
+        if record is None:
+            self.metrics['misses'] += 1
+            return default
+        self.metrics['hits'] += 1
+        self._touch(key, record)
+        return record
+
+    def peek(self, key, default=None):
+        """Возвращает сессию без отметки обращения и проверки срока."""
+        return self._load().get(key, default)
+
+    def put(self, key, record):
+        """Добавляет или заменяет сессию, вытесняя самые давние при переполнении."""
+        entries = self._load()
+        entries[key] = record
+        self._touch(key, record)
+        while len(entries) > self.max_entries:
+            self._evict(next(iter(entries)), 'evicted')
+
+    def pop(self, key, default=None):
+        """Удаляет сессию без вызова on_evict."""
+        record = self._load().pop(key, default)
+        if key in self._sizes:
+            self.metrics['memory_bytes'] -= self._sizes.pop(key)
+            self.metrics['entries'] = len(self._entries)
+            self._mark_dirty()
+        return record
+
+    def mark_dirty(self, key):
+        """Сессия изменена на месте: пересчитывает её размер и планирует запись."""
+        record = self._load().get(key)
+        if record is not None:
+            self._account(key, record)
+            self._mark_dirty()
+
+    def expire(self, now=None) -> int:
+        """
+        Удаляет сессии, простоявшие дольше ttl.
+
+        Returns:
+            int: Количество удалённых сессий
+        """
+        now = self._clock() if now is None else now
+        entries = self._load()
+        expired = []
+        for key, record in entries.items():
+            if now - record.last_active < self.ttl:
+                break
+            expired.append(key)
+        for key in expired:
+            self._evict(key, 'expired')
+        return len(expired)
+
+    def flush(self):
+        """Записывает сессии в файл, если они изменились (только при заданном path)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty or self.path is None:
+            return
+        data = {str(key): record.to_json() for key, record in self._entries.items()}
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(f"Ошибка записи {self.path}: {e}")
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._load())
+
+    def _touch(self, key, record):
+        record.last_active = self._clock()
+        self._entries.move_to_end(key)
+        self._account(key, record)
+        if self.path is not None:
+            self._mark_dirty()
+
+    def _account(self, key, record):
+        size = record_size(record)
+        self.metrics['memory_bytes'] += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+        self.metrics['entries'] = len(self._entries)
+
+    def _evict(self, key, reason):
+        if self.on_evict is not None:
+            self.on_evict(key, self._entries[key])
+        self.pop(key)
+        self.metrics[reason] += 1
+
+    def _mark_dirty(self):
+        if self.path is None:
+            return
+        self._dirty = True
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне цикла событий откладывать запись некому
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def _load(self) -> OrderedDict:
+        if self._entries is not None:
+            return self._entries
+        self._entries = OrderedDict()
+        if self.path is None or not os.path.exists(self.path):
+            return self._entries
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            records = [(self.key_type(key), self.record_type.from_json(item)) for key, item in data.items()]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Ошибка чтения {self.path}: {e}")
+            return self._entries
+        # Порядок словаря — порядок последнего обращения
+        for key, record in sorted(records, key=lambda item: item[1].last_active):
+            self._entries[key] = record
+            self._account(key, record)
+        return self._entries
@@ -0,0 +1,163 @@
+# sound_catalog.py
+"""
+Модуль каталога звуковой панели.
+Обеспечивает:
+- Готовую клавиатуру панели, которая собирается один раз и пересобирается только
+  при изменении конфигурации звуков или содержимого папки со звуками (по mtime)
+- Стабильные ID кнопок, выведенные из имени и содержимого файла: кнопки старых
+  панелей продолжают работать после перезапуска и перезагрузки конфигурации
+- Хранение file_id Telegram для каждого звука после первой загрузки,
+  чтобы повторные нажатия отправляли звук по ID без загрузки файла
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from telegram import InlineKeyboardMarkup, InlineKeyboardButton
+
+logger = logging.getLogger(__name__)
+
+# Префикс callback_data кнопок панели
+CALLBACK_PREFIX = "sound:"
+# Сколько шестнадцатеричных символов хэша попадает в ID кнопки
+ID_LENGTH = 12
+# Кнопок в ряду панели
+BUTTONS_PER_ROW = 2
+
+
+def sound_id(file_name, path) -> str:
+    """
+    ID звука: хэш имени и содержимого файла.
+
+    Returns:
+        str: ID вида "sound:<hex>", пригодный для callback_data
+    """
+    digest = hashlib.sha1(file_name.encode("utf-8") + b"\0")
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return CALLBACK_PREFIX + digest.hexdigest()[:ID_LENGTH]
+
+
+class SoundEntry:
+    """Звук панели: ID кнопки, имя файла, название и путь к файлу."""
+
+    __slots__ = ('sound_id', 'file_name', 'title', 'path')
+
+    def __init__(self, sound_id, file_name, title, path):
+        self.sound_id = sound_id
+        self.file_name = file_name
+        self.title = title
+        self.path = path
+
+
+class SoundPanel:
+    """
+    Собранная панель. Не изменяется после сборки: пересборка создаёт новую панель,
+    поэтому одновременные /sound и нажатия кнопок не мешают друг другу.
+    """
+
+    __slots__ = ('sounds', 'dir_mtime', 'entries', 'reply_markup')
+
+    def __init__(self, sounds, dir_mtime, entries):
+        self.sounds = sounds
+        self.dir_mtime = dir_mtime
+        self.entries = {entry.sound_id: entry for entry in entries}
+        keyboard = [
+            [InlineKeyboardButton(entry.title, callback_data=entry.sound_id)
+             for entry in entries[i:i + BUTTONS_PER_ROW]]
+            for i in range(0, len(entries), BUTTONS_PER_ROW)
+        ]
+        self.reply_markup = InlineKeyboardMarkup(keyboard)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SoundCatalog:
+    """
+    Каталог звуков папки sounds_dir и сохранённые file_id вида { ID звука: file_id }.
+    """
+
+    def __init__(self, sounds_dir, file_ids_path):
+        self.sounds_dir = sounds_dir
+        self.file_ids_path = file_ids_path
+        self._panel = None
+        # Кэш ID по (путь, размер, mtime), чтобы пересборка не хэшировала неизменённые файлы
+        self._ids = {}
+        self._file_ids = None
+
+    def panel(self, sounds) -> SoundPanel:
+        """
+        Возвращает панель для конфигурации sounds ({ файл: название }).
+        Пересобирает её, если изменилась конфигурация или mtime папки со звуками.
+        """
+        dir_mtime = self._dir_mtime()
+        panel = self._panel
+        if panel is None or panel.sounds is not sounds or panel.dir_mtime != dir_mtime:
+            panel = self._panel = self._build(sounds, dir_mtime)
+        return panel
+
+    def file_id(self, sound_id):
+        """Сохранённый file_id звука или None, если звук ещё не загружался."""
+        return self._load_file_ids().get(sound_id)
+
+    def remember(self, sound_id, file_id):
+        """Запоминает file_id звука после загрузки."""
+        file_ids = self._load_file_ids()
+        if file_id and file_ids.get(sound_id) != file_id:
+            file_ids[sound_id] = file_id
+            self._save_file_ids()
+
+    def forget(self, sound_id):
+        """Удаляет file_id, который Telegram больше не принимает."""
+        if self._load_file_ids().pop(sound_id, None) is not None:
+            self._save_file_ids()
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.sounds_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _build(self, sounds, dir_mtime) -> SoundPanel:
+        entries = []
+        ids = {}
+        for file_name, title in sounds.items():
+            path = os.path.join(self.sounds_dir, file_name)
+            try:
+                stat = os.stat(path)
+                key = (path, stat.st_size, stat.st_mtime_ns)
+                entry_id = self._ids.get(key) or sound_id(file_name, path)
+            except OSError:
+                logger.warning(f"Звук {file_name} из конфигурации не найден в {self.sounds_dir}")
+                continue
+            ids[key] = entry_id
+            entries.append(SoundEntry(entry_id, file_name, title, path))
+        self._ids = ids
+        logger.info(f"Собрана звуковая панель: {len(entries)} звуков")
+        return SoundPanel(sounds, dir_mtime, entries)
+
+    def _load_file_ids(self) -> dict:
+        if self._file_ids is None:
+            try:
+                with open(self.file_ids_path, "r", encoding="utf-8") as f:
+                    self._file_ids = json.load(f)
+            except FileNotFoundError:
+                self._file_ids = {}
+            except (OSError, ValueError) as e:
+                logger.error(f"Ошибка чтения {self.file_ids_path}: {e}")
+                self._file_ids = {}
+        return self._file_ids
+
+    def _save_file_ids(self):
+        tmp_path = self.file_ids_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.file_ids_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._file_ids, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.file_ids_path)
+        except OSError as e:
+            logger.error(f"Ошибка записи {self.file_ids_path}: {e}")
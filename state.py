@@ -16,12 +16,6 @@ quiz_enabled = True      # Включены ли викторины
 wisdom_enabled = True    # Включены ли мудрые мысли
 betting_enabled = True   # Включены ли ставки
 
-# Время последнего броска для каждого пользователя (для /roll)
-last_roll_time = {}
-
-# Хранение сессий рулетки (для /roulette)
-ROULETTE_DATA = {}
-
 def save_state(autopost_value, quiz_value, wisdom_value, betting_value):
     """
     Сохраняет состояние флагов бота в JSON файл.
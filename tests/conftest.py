@@ -0,0 +1,29 @@
+import pytest
+from types import SimpleNamespace
+
+
+class ManualJobQueue:
+    """
+    Подмена JobQueue для тестов: задачи не ждут своего времени,
+    а выполняются по вызову run_all() в порядке постановки.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.delays = []
+
+    def run_once(self, callback, when, data=None, name=None, **kwargs):
+        job = SimpleNamespace(callback=callback, when=when, data=data, name=name)
+        self.jobs.append(job)
+        self.delays.append(when)
+        return job
+
+    async def run_all(self):
+        while self.jobs:
+            job = self.jobs.pop(0)
+            await job.callback(SimpleNamespace(job=job))
+
+
+@pytest.fixture
+def job_queue():
+    return ManualJobQueue()
@@ -0,0 +1,91 @@
+import pytest
+import json
+from unittest.mock import patch
+
+try:
+    import active_polls
+    from active_polls import ActivePollRegistry
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов active_polls: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_registry_survives_restart(tmp_path):
+    """Опросы восстанавливаются из журнала новым экземпляром реестра."""
+    path = tmp_path / "polls.jsonl"
+    registry = ActivePollRegistry(path)
+    registry["p1"] = 2
+    registry.add("p2", 0)
+    registry.close("p2")
+
+    restored = ActivePollRegistry(path)
+
+    assert "p1" in restored
+    assert restored["p1"] == 2
+    assert "p2" not in restored
+    assert restored.get("p2") is None
+    assert len(restored) == 1
+    # Журнал при загрузке сжат до активных опросов
+    assert len(_lines(path)) == 1
+
+
+def test_expired_polls_are_evicted(tmp_path):
+    path = tmp_path / "polls.jsonl"
+    registry = ActivePollRegistry(path, ttl=60)
+
+    with patch.object(active_polls.time, 'time', return_value=1000.0):
+        registry.add("old", 1)
+        registry.add("fresh", 0, ttl=600)
+    with patch.object(active_polls.time, 'time', return_value=1100.0):
+        assert "old" not in registry
+        assert registry["fresh"] == 0
+        with pytest.raises(KeyError):
+            registry["old"]
+        assert ActivePollRegistry(path).get("old") is None
+
+
+def test_prune_and_compaction(tmp_path):
+    """Журнал не растёт бесконечно: старые записи удаляются при сжатии."""
+    path = tmp_path / "polls.jsonl"
+    registry = ActivePollRegistry(path, ttl=60)
+
+    with patch.object(active_polls.time, 'time', return_value=1000.0):
+        for i in range(100):
+            registry.add(f"p{i}", i % 4)
+            registry.close(f"p{i}")
+        registry.add("live", 3)
+    assert len(_lines(path)) <= 2 * len(registry) + active_polls.COMPACT_SLACK
+
+    with patch.object(active_polls.time, 'time', return_value=2000.0):
+        assert registry.prune() == 1
+    assert len(registry) == 0
+    # При следующем запуске пустой журнал удаляется
+    assert len(ActivePollRegistry(path)) == 0
+    assert not path.exists()
+
+
+def test_torn_line_is_skipped(tmp_path):
+    path = tmp_path / "polls.jsonl"
+    ActivePollRegistry(path).add("p1", 1)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"poll": "p2", "corr')
+
+    registry = ActivePollRegistry(path)
+
+    assert registry.get("p1") == 1
+    assert len(registry) == 1
+    assert [json.loads(line)["poll"] for line in _lines(path)] == ["p1"]
+
+
+def test_clear_removes_journal(tmp_path):
+    path = tmp_path / "polls.jsonl"
+    registry = ActivePollRegistry(path)
+    registry["p1"] = 0
+
+    registry.clear()
+
+    assert len(registry) == 0
+    assert not path.exists()
@@ -6,9 +6,17 @@ import logging
 try:
     from handlers.all import all_command
     from config import MANUAL_USERNAMES
+    from member_directory import MemberDirectory
 except ImportError as e:
     pytest.skip(f"Пропуск тестов all: не удалось импортировать модуль all ({e}).", allow_module_level=True)
 
+@pytest.fixture(autouse=True)
+def directory():
+    """Отдельный справочник участников на каждый тест, чтобы кэш не переходил между тестами."""
+    directory = MemberDirectory()
+    with patch('handlers.all.member_directory', directory):
+        yield directory
+
 # Тест для функции all_command (успешный случай)
 @pytest.mark.asyncio
 @patch('handlers.all.check_chat_and_execute')
@@ -139,4 +147,32 @@ async def test_all_command_empty_admins_list():
     assert call_args['chat_id'] == 123456
     # Проверяем, что в тексте сообщения используются MANUAL_USERNAMES
     for username in MANUAL_USERNAMES:
-        assert username in call_args['text'] 
\ No newline at end of file
+        assert username in call_args['text'] 
+
+# Тест: повторный /all отвечает из кэша, изменение состава чата сбрасывает кэш
+@pytest.mark.asyncio
+async def test_all_command_cached_until_member_update(directory):
+    """Тест кэширования списка администраторов"""
+    from handlers.all import track_members
+    mock_update = MagicMock()
+    mock_context = MagicMock()
+    mock_context.bot = AsyncMock()
+    mock_update.effective_chat.id = 123456
+    admin = MagicMock()
+    admin.user.username = "admin1"
+    mock_context.bot.getChatAdministrators.return_value = [admin]
+
+    with patch('handlers.all.check_chat_and_execute') as mock_check:
+        await all_command(mock_update, mock_context)
+        _all_command = mock_check.call_args[0][2]
+
+    await _all_command(mock_update, mock_context)
+    await _all_command(mock_update, mock_context)
+    assert mock_context.bot.getChatAdministrators.call_count == 1
+    assert mock_context.bot.send_message.call_args[1]['text'] == "@admin1"
+
+    member_update = MagicMock()
+    member_update.chat_member.chat.id = 123456
+    await track_members(member_update, mock_context)
+    await _all_command(mock_update, mock_context)
+    assert mock_context.bot.getChatAdministrators.call_count == 2
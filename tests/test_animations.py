@@ -0,0 +1,124 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+
+try:
+    import animations
+    from animations import Frame, FrameScheduler
+    from telegram.error import RetryAfter
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов animations: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _recorder(log, name, error=None):
+    async def action():
+        log.append(name)
+        if error is not None:
+            raise error
+    return action
+
+
+@pytest.mark.asyncio
+async def test_frames_run_in_order_then_finale(job_queue):
+    log = []
+    scheduler = FrameScheduler(min_interval=0)
+
+    scheduler.start(
+        job_queue, "a", 1,
+        [Frame(_recorder(log, "f1"), delay=2), Frame(_recorder(log, "f2"), delay=1)],
+        [Frame(_recorder(log, "cleanup"), delay=5)]
+    )
+    assert log == []  # start() только ставит первый кадр в очередь
+    assert "a" in scheduler
+
+    await job_queue.run_all()
+
+    assert log == ["f1", "f2", "cleanup"]
+    assert job_queue.delays == [2, 1, 5]
+    assert "a" not in scheduler
+
+
+@pytest.mark.asyncio
+async def test_failed_frame_skips_to_finale(job_queue):
+    log = []
+    scheduler = FrameScheduler(min_interval=0)
+
+    with patch('animations.logger') as mock_logger:
+        scheduler.start(
+            job_queue, "a", 1,
+            [Frame(_recorder(log, "f1", ValueError("boom"))), Frame(_recorder(log, "f2"))],
+            [Frame(_recorder(log, "final", ValueError("again"))), Frame(_recorder(log, "cleanup"))]
+        )
+        await job_queue.run_all()
+
+    # Ошибка в финале не мешает выполнить оставшиеся завершающие кадры
+    assert log == ["f1", "final", "cleanup"]
+    assert mock_logger.error.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_repeats_frame(job_queue):
+    calls = AsyncMock(side_effect=[RetryAfter(3), None])
+    scheduler = FrameScheduler(min_interval=0)
+
+    scheduler.start(job_queue, "a", 1, [Frame(calls)])
+    await job_queue.run_all()
+
+    assert calls.await_count == 2
+    assert job_queue.delays == [0, 3]
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_restart_with_same_key(job_queue):
+    log = []
+    scheduler = FrameScheduler(min_interval=0)
+
+    scheduler.start(job_queue, "a", 1, [Frame(_recorder(log, "old"))], [Frame(_recorder(log, "old_cleanup"))])
+    scheduler.start(job_queue, "a", 1, [Frame(_recorder(log, "new"))])
+    await job_queue.run_all()
+
+    # Старая анимация отменена, но её завершающие кадры выполнены
+    assert log == ["old_cleanup", "new"]
+    assert scheduler.cancel("a") is False
+
+
+@pytest.mark.asyncio
+async def test_frames_paced_per_chat(job_queue):
+    scheduler = FrameScheduler(min_interval=1.0)
+    noop = AsyncMock()
+
+    with patch.object(animations.time, 'monotonic', return_value=100.0):
+        scheduler.start(job_queue, "a", 1, [Frame(noop), Frame(noop, delay=0.2)])
+        await job_queue.run_all()
+
+    # Второй кадр отложен до истечения интервала для чата
+    assert job_queue.delays == [0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_cancel_during_frame_keeps_first_finale_frame(job_queue):
+    log = []
+    scheduler = FrameScheduler(min_interval=0)
+
+    async def cancelling():
+        log.append("f1")
+        scheduler.cancel("a")
+
+    scheduler.start(
+        job_queue, "a", 1,
+        [Frame(cancelling), Frame(_recorder(log, "f2"))],
+        [Frame(_recorder(log, "final")), Frame(_recorder(log, "cleanup"))]
+    )
+    await job_queue.run_all()
+
+    assert log == ["f1", "final", "cleanup"]
+
+
+@pytest.mark.asyncio
+async def test_pacing_state_dropped_after_last_animation(job_queue):
+    scheduler = FrameScheduler(min_interval=1.0)
+
+    scheduler.start(job_queue, "a", 1, [Frame(AsyncMock())])
+    scheduler.start(job_queue, "b", 2, [Frame(AsyncMock())])
+    await job_queue.run_all()
+
+    assert scheduler._last_frame_at == {}
@@ -0,0 +1,101 @@
+import pytest
+import math
+import os
+import struct
+import subprocess
+import wave
+from unittest.mock import patch
+
+try:
+    from audio_pipeline import AudioPipeline, read_wav
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов audio_pipeline: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _float_wav(path, rate=48000, seconds=0.5, amplitude=0.9):
+    """Стерео WAV в формате IEEE float 32 бит, как в sound_panel."""
+    frames = int(rate * seconds)
+    samples = []
+    for i in range(frames):
+        value = amplitude * math.sin(2 * math.pi * 440 * i / rate)
+        samples += [value, value]
+    data = struct.pack(f"<{len(samples)}f", *samples)
+    fmt = struct.pack("<HHIIHH", 3, 2, rate, rate * 8, 8, 32)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+
+def test_float_wav_compacted_without_ffmpeg(tmp_path):
+    src = tmp_path / "loud.wav"
+    _float_wav(src)
+    pipeline = AudioPipeline(str(tmp_path / "cache"), ffmpeg="")
+
+    prepared = pipeline.prepare(str(src))
+
+    assert prepared != str(src)
+    assert os.path.getsize(prepared) * 7 < os.path.getsize(src)
+    with wave.open(prepared) as out:
+        assert (out.getnchannels(), out.getsampwidth(), out.getframerate()) == (1, 2, 24000)
+    rate, channels, samples = read_wav(prepared)
+    peak = max(abs(s) for s in samples)
+    rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+    # Громкий синус приглушён до целевого RMS, пик не выше -1 dBFS
+    assert rms == pytest.approx(10 ** (-18 / 20), rel=0.05)
+    assert peak <= 10 ** (-1 / 20)
+
+
+def test_prepared_file_is_cached(tmp_path):
+    src = tmp_path / "sound.wav"
+    _float_wav(src, seconds=0.1)
+    pipeline = AudioPipeline(str(tmp_path / "cache"), ffmpeg="")
+    first = pipeline.prepare(str(src))
+
+    with patch('audio_pipeline.compact_wav', side_effect=AssertionError("повторная обработка")):
+        assert pipeline.prepare(str(src)) == first
+        # Копия с другим именем попадает в тот же кэш по содержимому
+        copy = tmp_path / "copy.wav"
+        copy.write_bytes(src.read_bytes())
+        assert pipeline.prepare(str(copy)) == first
+
+
+def test_other_formats_sent_as_is_without_ffmpeg(tmp_path):
+    src = tmp_path / "sound.mp3"
+    src.write_bytes(b"mp3 data")
+
+    assert AudioPipeline(str(tmp_path / "cache"), ffmpeg="").prepare(str(src)) == str(src)
+
+
+def test_broken_wav_falls_back_to_original(tmp_path):
+    src = tmp_path / "broken.wav"
+    src.write_bytes(b"not a wav")
+
+    assert AudioPipeline(str(tmp_path / "cache"), ffmpeg="").prepare(str(src)) == str(src)
+
+
+def test_ffmpeg_transcodes_with_loudnorm(tmp_path):
+    src = tmp_path / "clip.m4a"
+    src.write_bytes(b"m4a data")
+    pipeline = AudioPipeline(str(tmp_path / "cache"), ffmpeg="/usr/bin/ffmpeg")
+
+    def fake_run(args, **kwargs):
+        with open(args[-1], "wb") as f:
+            f.write(b"mp3")
+
+    with patch('audio_pipeline.subprocess.run', side_effect=fake_run) as mock_run:
+        prepared = pipeline.prepare(str(src))
+
+    args = mock_run.call_args[0][0]
+    assert args[0] == "/usr/bin/ffmpeg"
+    assert any(arg.startswith("loudnorm=") for arg in args)
+    assert prepared.endswith(".mp3")
+    assert open(prepared, "rb").read() == b"mp3"
+
+
+def test_ffmpeg_failure_falls_back_to_original(tmp_path):
+    src = tmp_path / "clip.mp4"
+    src.write_bytes(b"mp4 data")
+    pipeline = AudioPipeline(str(tmp_path / "cache"), ffmpeg="/usr/bin/ffmpeg")
+
+    with patch('audio_pipeline.subprocess.run', side_effect=subprocess.CalledProcessError(1, "ffmpeg")):
+        assert pipeline.prepare(str(src)) == str(src)
+    assert os.listdir(tmp_path / "cache") == []
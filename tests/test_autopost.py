@@ -1,6 +1,7 @@
 import pytest
 import os
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch, mock_open, MagicMock, AsyncMock, call, ANY
 
 # Импортируем тестируемый модуль и его функции/переменные
@@ -30,15 +31,21 @@ except ImportError as e:
 # Мокаем пути в config перед всеми тестами этого файла
 @pytest.fixture(autouse=True)
 def mock_config_paths():
-    with patch('config.ERO_ANIME_DIR', Path("/mock/ero-anime")), \
-         patch('config.ERO_REAL_DIR', Path("/mock/ero-real")), \
-         patch('config.SINGLE_MEME_DIR', Path("/mock/single-meme")), \
-         patch('config.STANDART_ART_DIR', Path("/mock/standart-art")), \
-         patch('config.STANDART_MEME_DIR', Path("/mock/standart-meme")), \
-         patch('config.VIDEO_MEME_DIR', Path("/mock/video-meme")), \
-         patch('config.VIDEO_ERO_DIR', Path("/mock/video-ero")), \
-         patch('config.VIDEO_AUTO_DIR', Path("/mock/video-auto")), \
-         patch('config.POST_CHAT_ID', -4737984792): # Мок ID чата для постов
+    settings = SimpleNamespace(
+        content_dirs={
+            "ero_anime": Path("/mock/ero-anime"),
+            "ero_real": Path("/mock/ero-real"),
+            "single_meme": Path("/mock/single-meme"),
+            "standart_art": Path("/mock/standart-art"),
+            "standart_meme": Path("/mock/standart-meme"),
+            "video_meme": Path("/mock/video-meme"),
+            "video_ero": Path("/mock/video-ero"),
+            "video_auto": Path("/mock/video-auto"),
+        },
+        post_chat_id=-4737984792,  # Мок ID чата для постов
+        timezone_offset=0,
+    )
+    with patch('autopost.get_config', lambda: settings):
         yield
 
 def test_get_folder_by_category_known():
@@ -85,7 +92,7 @@ async def test_autopost_10_pics_success(mock_move, mock_open_file, mock_is_valid
     assert all(isinstance(m, InputMediaPhoto) for m in kwargs['media'])
     
     # Проверка отправки анекдота
-    context.bot.send_message.assert_awaited_once_with(chat_id=-4737984792, text="Тестовый анекдот", read_timeout=180)
+    context.bot.send_message.assert_awaited_once_with(chat_id=-4737984792, text="Тестовый анекдот")
     
     # Проверка перемещения в архив
     assert mock_move.call_count == 10
@@ -237,7 +244,7 @@ async def test_autopost_4_videos_success(mock_move, mock_open_file, mock_is_vali
     assert all(isinstance(m, InputMediaVideo) for m in kwargs['media'])
 
     # Проверка отправки анекдота
-    context.bot.send_message.assert_awaited_once_with(chat_id=-4737984792, text="Анекдот Видео", read_timeout=180)
+    context.bot.send_message.assert_awaited_once_with(chat_id=-4737984792, text="Анекдот Видео")
 
     # Проверка перемещения в архив
     assert mock_move.call_count == 4
@@ -292,7 +299,7 @@ async def test_autopost_4_videos_fallback_logic(mock_move, mock_open_file, mock_
     args, kwargs = context.bot.send_media_group.call_args
     assert len(kwargs['media']) == 4
 
-    context.bot.send_message.assert_awaited_once_with(chat_id=-4737984792, text="Анекдот Фоллбэк", read_timeout=180)
+    context.bot.send_message.assert_awaited_once_with(chat_id=-4737984792, text="Анекдот Фоллбэк")
 
     assert mock_move.call_count == 4
     # Проверяем, что файлы для замены категорий архивируются с правильными категориями
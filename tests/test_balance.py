@@ -11,6 +11,7 @@ try:
         save_balances,
         get_balance,
         update_balance,
+        balance_batch,
         BALANCE_FILE # Импортируем константу, чтобы использовать в моках
     )
 except ImportError:
@@ -175,4 +176,24 @@ def test_update_balance_new_user_add_negative(mock_save, mock_load):
     update_balance(789, -50)
     mock_load.assert_called_once()
     expected_data = {"789": {"balance": 0, "name": "Unknown"}} # Баланс не должен быть отрицательным
-    mock_save.assert_called_once_with(expected_data) 
\ No newline at end of file
+    mock_save.assert_called_once_with(expected_data) 
+
+
+# --- Тесты для balance_batch ---
+
+def test_balance_batch_writes_once(tmp_path):
+    """Внутри пакета файл читается и записывается по одному разу."""
+    path = tmp_path / "balance.json"
+    path.write_text(json.dumps({"1": {"balance": 10, "name": "A"}}), encoding="utf-8")
+
+    with patch('balance.BALANCE_FILE', str(path)), \
+         patch('json.dump', wraps=json.dump) as mock_dump:
+        with balance_batch():
+            update_balance(1, 5)
+            update_balance(2, 7)
+            update_balance(1, -15)
+            assert get_balance(2) == 7
+            # До конца пакета файл не тронут
+            assert json.loads(path.read_text(encoding="utf-8")) == {"1": {"balance": 10, "name": "A"}}
+        assert mock_dump.call_count == 1
+        assert load_balances() == {"1": {"balance": 0, "name": "A"}, "2": {"balance": 7, "name": "Unknown"}}
@@ -21,6 +21,7 @@ try:
         BETTING_EVENTS_FILE,
         BETTING_DATA_FILE
     )
+    from casino.session import CasinoSessionManager
 except ImportError:
     pytest.skip("Пропуск тестов betting: не удалось импортировать модуль betting.", allow_module_level=True)
 
@@ -272,6 +273,23 @@ def test_place_bet_insufficient_balance(mock_get_balance):
     mock_get_balance.assert_called_once_with(123)
     assert result is False
 
+@pytest.mark.asyncio
+async def test_place_bet_sees_unflushed_casino_loss(tmp_path):
+    """Монеты, проигранные в казино до отложенной записи, нельзя поставить ещё раз."""
+    path = tmp_path / "balance.json"
+    path.write_text(json.dumps({"123": {"balance": 100, "name": "User1"}}), encoding="utf-8")
+    sessions = CasinoSessionManager(flush_delay=60)
+
+    with patch('balance.BALANCE_FILE', str(path)), \
+         patch('betting.casino_sessions', sessions), \
+         patch('betting.load_betting_events', return_value={"events": [{"id": 1, "options": [{"id": 1}]}]}), \
+         patch('betting.save_betting_data') as mock_save_data:
+        assert sessions.settle(123, 100, 0, game='slots') == 0
+        assert place_bet(123, "User1", 1, 1, 100) is False
+
+    mock_save_data.assert_not_called()
+    assert json.loads(path.read_text(encoding="utf-8"))["123"]["balance"] == 0
+
 @patch('betting.get_balance', return_value=100)
 @patch('betting.load_betting_events')
 def test_place_bet_event_not_found(mock_load_events, mock_get_balance):
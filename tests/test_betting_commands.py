@@ -1,9 +1,12 @@
 import pytest
 import json
 import sys
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 
 # Предварительно добавляем патчи для state и других модулей
+# (только на время импорта, чтобы не влиять на тесты других модулей)
+_original_modules = {name: sys.modules.get(name) for name in ('state', 'config')}
 sys.modules['state'] = MagicMock(betting_enabled=True)
 sys.modules['config'] = MagicMock(POST_CHAT_ID=123, ADMIN_GROUP_ID=456)
 
@@ -30,6 +33,12 @@ try:
     from betting import process_event_results
 except ImportError as e:
     pytest.skip(f"Пропуск тестов betting_commands: не удалось импортировать модуль handlers.betting_commands или его зависимости ({e}).", allow_module_level=True)
+finally:
+    for _name, _module in _original_modules.items():
+        if _module is None:
+            sys.modules.pop(_name, None)
+        else:
+            sys.modules[_name] = _module
 
 # --- Тесты для bet_command ---
 
@@ -389,8 +398,8 @@ async def test_publish_betting_event():
     # Патчим функции напрямую внутри теста для лучшего контроля
     with patch('betting.get_next_active_event') as mock_get_next, \
          patch.dict('sys.modules', {'state': MagicMock(betting_enabled=True)}), \
-         patch('config.POST_CHAT_ID', 12345), \
-         patch('config.schedule_config', {"betting": {}}):
+         patch('handlers.betting_commands.get_config',
+               lambda: SimpleNamespace(post_chat_id=12345, schedule={"betting": {}}, timezone_offset=0)):
         
         # Настраиваем моки
         mock_get_next.return_value = {
@@ -426,7 +435,8 @@ async def test_publish_betting_event_no_events():
     # Патчим функции напрямую внутри теста
     with patch('betting.get_next_active_event') as mock_get_next, \
          patch.dict('sys.modules', {'state': MagicMock(betting_enabled=True)}), \
-         patch('config.schedule_config', {"betting": {}}):
+         patch('handlers.betting_commands.get_config',
+               lambda: SimpleNamespace(post_chat_id=123, schedule={"betting": {}}, timezone_offset=0)):
         # Настраиваем моки
         mock_get_next.return_value = None
         
@@ -457,8 +467,8 @@ async def test_process_betting_results():
     with patch('betting.load_betting_events') as mock_load_events, \
          patch('betting.process_event_results') as mock_process_results, \
          patch.dict('sys.modules', {'state': MagicMock(betting_enabled=True)}), \
-         patch('config.POST_CHAT_ID', 123), \
-         patch('config.ADMIN_GROUP_ID', 456):
+         patch('handlers.betting_commands.get_config',
+               lambda: SimpleNamespace(post_chat_id=123, admin_group_id=456)):
         
         # Настраиваем моки
         event = {
@@ -517,7 +527,8 @@ async def test_process_betting_results_event_not_found():
     # Патчим функции напрямую внутри теста
     with patch('betting.load_betting_events') as mock_load_events, \
          patch.dict('sys.modules', {'state': MagicMock(betting_enabled=True)}), \
-         patch('config.ADMIN_GROUP_ID', 456):
+         patch('handlers.betting_commands.get_config',
+               lambda: SimpleNamespace(post_chat_id=123, admin_group_id=456)):
          
         # Настраиваем моки
         mock_load_events.return_value = {"events": []}
@@ -11,16 +11,24 @@ try:
     )
     # Импортируем зависимости для мокирования
     import balance
+    from casino.session import CasinoSessionManager
     import casino.slots as casino_slots
     import casino.roulette as casino_roulette
     from telegram import Update, InlineKeyboardMarkup, User, CallbackQuery, Message
 except ImportError as e:
     pytest.skip(f"Пропуск тестов casino_main: не удалось импортировать модуль casino.casino_main или его зависимости ({e}).", allow_module_level=True)
 
+@pytest.fixture(autouse=True)
+def sessions():
+    """Отдельные сессии казино для каждого теста."""
+    manager = CasinoSessionManager(flush_delay=0)
+    with patch('casino.casino_main.casino_sessions', manager):
+        yield manager
+
 # --- Тесты для casino_command ---
 
 @pytest.mark.asyncio
-@patch('casino.casino_main.get_balance', return_value=100) # Мок баланса
+@patch('casino.session.get_balance', return_value=100) # Мок баланса
 async def test_casino_command_from_message(mock_get_balance):
     """Тест вызова /casino из сообщения."""
     update = MagicMock(spec=Update)
@@ -61,7 +69,7 @@ async def test_casino_command_from_message(mock_get_balance):
     assert keyboard[1][0].callback_data == "casino:exit"
 
 @pytest.mark.asyncio
-@patch('casino.casino_main.get_balance', return_value=50)
+@patch('casino.session.get_balance', return_value=50)
 async def test_casino_command_from_callback(mock_get_balance):
     """Тест вызова казино из callback (например, возврат в меню)."""
     update = MagicMock(spec=Update)
@@ -206,19 +214,21 @@ async def test_casino_callback_handler_slots_bet(mock_handle_slots_bet):
     query.answer.assert_not_called()
 
 @pytest.mark.asyncio
+@patch('casino.session.get_balance', return_value=100)
 @patch('casino.casino_main.handle_roulette_bet_callback')
-async def test_casino_callback_handler_roulette_bet(mock_handle_roulette_bet):
+async def test_casino_callback_handler_roulette_bet(mock_handle_roulette_bet, mock_get_balance, sessions):
     """Тест перенаправления на обработчик ставки рулетки."""
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     query.data = "roulette_bet:red:5"
+    query.from_user = MagicMock(spec=User)
+    query.from_user.id = 123
     update.callback_query = query
     context = MagicMock()
-    context.user_data = {} # Инициализируем user_data
 
     await casino_callback_handler(update, context)
 
-    assert context.user_data['bet_amount'] == 5 # Проверяем сохранение ставки
+    assert sessions.game_bet(123, 'roulette') == 5 # Проверяем сохранение ставки в сессии казино
     mock_handle_roulette_bet.assert_awaited_once_with(query, context, "red")
     query.answer.assert_not_called()
 
@@ -0,0 +1,111 @@
+import pytest
+import json
+from unittest.mock import patch
+
+try:
+    import balance
+    from casino.session import CasinoSessionManager
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов casino.session: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+@pytest.fixture
+def balance_file(tmp_path):
+    path = tmp_path / "balance.json"
+    path.write_text(json.dumps({"1": {"balance": 100, "name": "Игрок"}}), encoding="utf-8")
+    with patch('balance.BALANCE_FILE', str(path)):
+        yield path
+
+
+def _read(path, user_id="1"):
+    return json.loads(path.read_text(encoding="utf-8"))[user_id]["balance"]
+
+
+@pytest.mark.asyncio
+async def test_spins_stay_in_memory_until_flush(balance_file):
+    sessions = CasinoSessionManager(flush_delay=60)
+
+    with patch('json.dump', wraps=json.dump) as mock_dump, \
+         patch('json.load', wraps=json.load) as mock_load:
+        assert sessions.open(1).balance == 100
+        for _ in range(8):
+            sessions.settle(1, 10, 0, game='slots')
+        assert sessions.settle(1, 10, 30, game='slots') == 40
+        assert mock_load.call_count == 1
+        mock_dump.assert_not_called()
+
+        sessions.flush()
+        assert mock_dump.call_count == 1
+
+    assert _read(balance_file) == 40
+    session = sessions.get(1)
+    assert session.bet == 10
+    assert list(session.history)[-1] == ('slots', 10, 30)
+
+
+def test_insufficient_balance_rejected(balance_file):
+    sessions = CasinoSessionManager()
+
+    assert sessions.settle(1, 150, 300) is None
+    assert sessions.balance(1) == 100
+    sessions.flush()
+    assert _read(balance_file) == 100
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_changes_made_outside_casino(balance_file):
+    sessions = CasinoSessionManager(flush_delay=60)
+    sessions.open(1)
+    sessions.settle(1, 50, 0)
+
+    # Начисление за викторину, пока сессия открыта
+    balance.update_balance(1, 5)
+    sessions.flush()
+
+    assert _read(balance_file) == 55
+    assert sessions.balance(1) == 55
+
+
+@pytest.mark.asyncio
+async def test_stake_checked_against_debits_outside_casino(balance_file):
+    sessions = CasinoSessionManager(flush_delay=60)
+    sessions.open(1)
+    sessions.settle(1, 10, 0)
+
+    # Ставка в тотализаторе списала монеты, пока сессия открыта
+    with balance.balance_batch():
+        balance.update_balance(1, -80)
+
+    assert sessions.balance(1) == 10
+    assert sessions.settle(1, 50, 0) is None
+    assert sessions.settle(1, 10, 0) == 0
+    sessions.flush()
+    assert _read(balance_file) == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_session_expires_with_flush(balance_file):
+    sessions = CasinoSessionManager(idle_timeout=60, flush_delay=60)
+    session = sessions.open(1)
+    sessions.settle(1, 30, 0)
+
+    assert sessions.expire(now=session.last_active + 30) == 0
+    assert sessions.expire(now=session.last_active + 61) == 1
+    assert 1 not in sessions
+    assert _read(balance_file) == 70
+
+
+def test_close_writes_session(balance_file):
+    sessions = CasinoSessionManager()
+    sessions.settle(1, 10, 0)
+    sessions.close(1)
+
+    assert len(sessions) == 0
+    assert _read(balance_file) == 90
+
+
+def test_settle_outside_event_loop_writes_immediately(balance_file):
+    sessions = CasinoSessionManager()
+    sessions.settle(1, 10, 0)
+
+    assert _read(balance_file) == 90
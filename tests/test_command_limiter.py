@@ -0,0 +1,146 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from types import MappingProxyType
+
+try:
+    from telegram.ext import ApplicationHandlerStop
+    from command_limiter import CommandLimiter, command_name
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов command_limiter: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+SETTINGS = MappingProxyType({
+    'max_entries': 3,
+    'classes': {
+        'roll': {'interval': 5, 'burst': 1, 'commands': ['roll'], 'callbacks': ['roll|']},
+        'casino': {'interval': 1, 'burst': 3, 'commands': ['casino'], 'callbacks': ['casino:', 'slots_bet:']},
+    },
+})
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(settings=SETTINGS):
+    clock = Clock()
+    return CommandLimiter(settings_provider=lambda: settings, clock=clock), clock
+
+
+def _message_update(text, user_id=1):
+    update = MagicMock()
+    update.callback_query = None
+    update.message.text = text
+    update.message.caption = None
+    update.message.reply_text = AsyncMock()
+    update.effective_user.id = user_id
+    return update
+
+
+def _callback_update(data, user_id=1):
+    update = MagicMock()
+    update.callback_query.data = data
+    update.callback_query.answer = AsyncMock()
+    update.effective_user.id = user_id
+    return update
+
+
+def test_command_name():
+    message = MagicMock(text="/Roll@mishka_bot 20", caption=None)
+    assert command_name(message) == "roll"
+    assert command_name(MagicMock(text=None, caption="/talk привет")) == "talk"
+    assert command_name(MagicMock(text="просто текст", caption=None)) is None
+
+
+def test_classify():
+    limiter, _ = _limiter()
+
+    assert limiter.classify(_message_update("/roll 20")) == 'roll'
+    assert limiter.classify(_callback_update("slots_bet:10")) == 'casino'
+    assert limiter.classify(_callback_update("roll|6|0")) == 'roll'
+    assert limiter.classify(_message_update("/balance")) is None
+    assert limiter.classify(_callback_update("bet_option_1")) is None
+
+
+def test_roll_cooldown_and_independent_classes():
+    limiter, clock = _limiter()
+
+    assert limiter.acquire(1, 'roll') == 0
+    clock.now += 2
+    assert limiter.acquire(1, 'roll') == pytest.approx(3.0)
+    # Другой класс и другой пользователь не затронуты
+    assert limiter.acquire(1, 'casino') == 0
+    assert limiter.acquire(2, 'roll') == 0
+    clock.now += 3
+    assert limiter.acquire(1, 'roll') == 0
+
+
+def test_buckets_bounded_by_lru():
+    limiter, _ = _limiter()
+
+    for user_id in range(10):
+        limiter.acquire(user_id, 'roll')
+
+    assert len(limiter) == 3
+    # Самые давние пользователи вытеснены, их корзина начинается заново
+    assert limiter.acquire(0, 'roll') == 0
+    assert limiter.acquire(9, 'roll') > 0
+
+
+@pytest.mark.asyncio
+async def test_handler_stops_spam_and_warns_once():
+    limiter, _ = _limiter()
+    context = MagicMock()
+
+    await limiter(_message_update("/roll"), context)
+    spam = [_message_update("/roll") for _ in range(3)]
+    for update in spam:
+        with pytest.raises(ApplicationHandlerStop):
+            await limiter(update, context)
+
+    spam[0].message.reply_text.assert_awaited_once_with("Слишком быстро! Подождите 5.0 секунд.")
+    spam[1].message.reply_text.assert_not_called()
+
+    update = _callback_update("roll|6|0")
+    with pytest.raises(ApplicationHandlerStop):
+        await limiter(update, context)
+    update.callback_query.answer.assert_awaited_once_with(text="Слишком быстро! Подождите 5.0 секунд.", show_alert=True)
+
+    # Не ограничиваемые обновления проходят без изменений
+    await limiter(_message_update("/balance"), context)
+
+
+def test_settings_change_rebuilds_index():
+    settings = {'value': SETTINGS}
+    limiter = CommandLimiter(settings_provider=lambda: settings['value'], clock=Clock())
+    limiter.acquire(1, 'roll')
+
+    settings['value'] = MappingProxyType({'max_entries': 3, 'classes': {
+        'roll': {'interval': 1, 'burst': 2, 'commands': ['dice'], 'callbacks': []},
+    }})
+
+    assert limiter.classify(_message_update("/dice")) == 'roll'
+    assert limiter.classify(_message_update("/roll")) is None
+    assert limiter.acquire(1, 'roll') == 0
+
+
+def test_reload_keeps_buckets_of_unchanged_classes():
+    settings = {'value': SETTINGS}
+    limiter = CommandLimiter(settings_provider=lambda: settings['value'], clock=Clock())
+    assert limiter.acquire(1, 'roll') == 0
+    assert limiter.acquire(1, 'casino') == 0
+
+    # /reload_config без изменений лимитов: новый снимок с теми же значениями
+    settings['value'] = MappingProxyType(dict(SETTINGS))
+    assert limiter.acquire(1, 'roll') > 0
+
+    # Изменился только класс casino: корзина roll сохраняется
+    classes = dict(SETTINGS['classes'])
+    classes['casino'] = dict(classes['casino'], burst=5)
+    settings['value'] = MappingProxyType({'max_entries': 3, 'classes': classes})
+    assert limiter.acquire(1, 'roll') > 0
+    assert len(limiter) == 1
@@ -214,14 +214,185 @@ def test_load_config_invalid_json_no_cache(mock_exists, mock_stat):
 
 # --- Тесты для reload_all_configs --- 
 
-@patch('config.load_config')
+def _example_configs():
+    """Загружает примеры конфигураций из config/*.example.json."""
+    configs = {}
+    for name, file_name in config.CONFIG_FILES.items():
+        example_path = Path('config') / file_name.replace('.json', '.example.json')
+        with open(example_path, 'r', encoding='utf-8') as f:
+            configs[name] = json.load(f)
+    return configs
+
+@patch.object(config, 'load_config')
 def test_reload_all_configs(mock_load_config):
     """Тестирует принудительную перезагрузку всех конфигураций."""
-    
-    # Убираем пропуск теста
-    # import pytest
-    # pytest.skip("Из-за использования глобальных переменных в config.py этот тест сложно реализовать корректно.")
-    
-    # # В реальном проекте нужно переработать архитектуру config.py, 
-    # # чтобы он не использовал глобальные переменные напрямую,
-    # # а предоставлял их через функции/классы с явной инициализацией 
\ No newline at end of file
+    configs = _example_configs()
+    configs['bot_config']['cooldown'] = 42
+    mock_load_config.side_effect = lambda file_name, use_cache=True: configs[file_name.replace('.json', '')]
+
+    old_snapshot = config.get_config()
+    try:
+        changes = reload_all_configs()
+
+        # Все файлы перечитаны без кэша
+        assert mock_load_config.call_count == len(config.CONFIG_FILES)
+        for call_args in mock_load_config.call_args_list:
+            assert call_args.kwargs == {'use_cache': False}
+        # Снимок заменён целиком, изменения отражены в diff
+        assert config.get_config() is not old_snapshot
+        assert config.get_config().cooldown == 42
+        assert changes["bot_config.cooldown"][1] == 42
+    finally:
+        config._snapshot = old_snapshot
+
+@patch.object(config, 'load_config')
+def test_reload_all_configs_invalid_keeps_old_snapshot(mock_load_config):
+    """Тест: невалидная конфигурация не заменяет текущий снимок."""
+    configs = _example_configs()
+    del configs['bot_config']['token']
+    mock_load_config.side_effect = lambda file_name, use_cache=True: configs[file_name.replace('.json', '')]
+
+    old_snapshot = config.get_config()
+    with pytest.raises(config.ConfigError, match="bot_config.token"):
+        reload_all_configs()
+    assert config.get_config() is old_snapshot
+
+# --- Тесты для снимка конфигурации ---
+
+def test_build_snapshot_typed_and_read_only():
+    """Тест: снимок содержит типизированные поля и не изменяется."""
+    snapshot = config.build_snapshot(_example_configs())
+
+    assert snapshot.chat_id == snapshot.allowed_chat_ids[0]
+    assert snapshot.content_dirs['ero_anime'] == Path("post_materials/ero-anime")
+    assert snapshot.dice_gif_id == "YOUR_DICE_ANIMATION_ID"
+    with pytest.raises(Exception):
+        snapshot.cooldown = 10
+    with pytest.raises(TypeError):
+        snapshot.schedule['quiz'] = {}
+    with pytest.raises(TypeError):
+        snapshot.file_ids['animations']['dice'] = "other"
+
+def test_validate_configs_reports_all_errors():
+    """Тест: проверка схемы собирает все ошибки сразу."""
+    configs = _example_configs()
+    configs['bot_config']['cooldown'] = "3"
+    del configs['paths_config']['content_dirs']['video_auto']
+
+    with pytest.raises(config.ConfigError) as exc_info:
+        config.validate_configs(configs)
+
+    message = str(exc_info.value)
+    assert "bot_config.cooldown" in message
+    assert "paths_config.content_dirs.video_auto" in message
+
+def test_max_concurrent_updates_default_and_validation():
+    """Тест: max_concurrent_updates необязателен, но должен быть положительным числом."""
+    configs = _example_configs()
+    del configs['bot_config']['max_concurrent_updates']
+    assert config.build_snapshot(configs).max_concurrent_updates == config.DEFAULT_MAX_CONCURRENT_UPDATES
+
+    configs['bot_config']['max_concurrent_updates'] = 0
+    with pytest.raises(config.ConfigError, match="bot_config.max_concurrent_updates"):
+        config.validate_configs(configs)
+
+def test_http_settings_merged_with_defaults():
+    """Тест: раздел http дополняется значениями по умолчанию и проверяется."""
+    configs = _example_configs()
+    configs['bot_config']['http'] = {"uploads": {"pool_size": 2}}
+    http = config.build_snapshot(configs).http
+
+    assert http['uploads']['pool_size'] == 2
+    assert http['uploads']['read_timeout'] == config.DEFAULT_HTTP_CONFIG['uploads']['read_timeout']
+    assert http['api'] == config.DEFAULT_HTTP_CONFIG['api']
+
+    configs['bot_config']['http'] = {"http_version": "3", "api": {"pool_size": 0, "retries": 1}}
+    with pytest.raises(config.ConfigError) as exc_info:
+        config.validate_configs(configs)
+    message = str(exc_info.value)
+    assert "http.http_version" in message
+    assert "http.api.pool_size" in message
+    assert "http.api.retries" in message
+
+def test_rng_section_validation():
+    """Тест: раздел rng дополняется значениями по умолчанию и проверяется."""
+    configs = _example_configs()
+    configs['bot_config']['rng'] = {"seed": 42}
+    rng_settings = config.build_snapshot(configs).rng
+    assert rng_settings['seed'] == 42
+    assert rng_settings['mode'] == config.DEFAULT_RNG_CONFIG['mode']
+
+    configs['bot_config']['rng'] = {"seed": "42", "mode": "rewind"}
+    with pytest.raises(config.ConfigError) as exc_info:
+        config.validate_configs(configs)
+    message = str(exc_info.value)
+    assert "rng.seed" in message
+    assert "rng.mode" in message
+
+def test_rate_limits_merged_with_defaults():
+    """Тест: классы rate_limits дополняются значениями по умолчанию, roll берёт интервал из cooldown."""
+    configs = _example_configs()
+    configs['bot_config']['cooldown'] = 7
+    configs['bot_config']['rate_limits'] = {"classes": {"sound": {"burst": 1}, "quiz": {"interval": 3, "commands": ["rating"]}}}
+    limits = config.build_snapshot(configs).rate_limits
+
+    assert limits['classes']['roll']['interval'] == 7
+    assert limits['classes']['sound']['burst'] == 1
+    assert limits['classes']['sound']['callbacks'] == ('sound:',)
+    assert limits['classes']['quiz']['burst'] == 1
+    assert limits['max_entries'] == config.DEFAULT_RATE_LIMITS['max_entries']
+
+    configs['bot_config']['rate_limits'] = {"max_entries": 0, "classes": {"roll": {"interval": -1, "commands": "roll"}}}
+    with pytest.raises(config.ConfigError) as exc_info:
+        config.validate_configs(configs)
+    message = str(exc_info.value)
+    assert "rate_limits.max_entries" in message
+    assert "rate_limits.classes.roll.interval" in message
+    assert "rate_limits.classes.roll.commands" in message
+
+def test_get_config_does_not_touch_disk():
+    """Тест: чтение настроек не обращается к файловой системе."""
+    with patch('pathlib.Path.stat', side_effect=AssertionError("stat")), \
+         patch('builtins.open', side_effect=AssertionError("open")):
+        snapshot = config.get_config()
+        assert snapshot.post_chat_id == config.POST_CHAT_ID
+        assert config.ERO_ANIME_DIR == snapshot.content_dirs['ero_anime']
+
+# --- Тесты для шины изменений конфигурации ---
+
+def test_diff_configs_reports_only_changed_sections():
+    """Тест: diff_configs возвращает только изменившиеся разделы."""
+    old = {"schedule_config": {"quiz": {"enabled": True}, "wisdom": {"enabled": True}}}
+    new = {"schedule_config": {"quiz": {"enabled": False}, "wisdom": {"enabled": True}}}
+
+    changes = config.diff_configs(old, new)
+
+    assert changes == {"schedule_config.quiz": ({"enabled": True}, {"enabled": False})}
+
+def test_notify_subscribers_filters_by_keys():
+    """Тест: подписчик вызывается только при изменении интересующих его ключей."""
+    quiz_callback = MagicMock()
+    sound_callback = MagicMock()
+    config.subscribe("schedule_config.quiz", quiz_callback)
+    config.subscribe("sound_config", sound_callback)
+    try:
+        config.notify_subscribers({"schedule_config.quiz": (1, 2), "bot_config.cooldown": (3, 5)})
+
+        quiz_callback.assert_called_once_with({"schedule_config.quiz": (1, 2)})
+        sound_callback.assert_not_called()
+    finally:
+        config.unsubscribe(quiz_callback)
+        config.unsubscribe(sound_callback)
+
+def test_notify_subscribers_survives_failing_callback():
+    """Тест: ошибка одного подписчика не мешает остальным."""
+    failing = MagicMock(side_effect=Exception("boom"))
+    healthy = MagicMock()
+    config.subscribe("sound_config", failing)
+    config.subscribe("sound_config", healthy)
+    try:
+        config.notify_subscribers({"sound_config.a.mp3": (None, "A")})
+        healthy.assert_called_once()
+    finally:
+        config.unsubscribe(failing)
+        config.unsubscribe(healthy)
@@ -0,0 +1,107 @@
+import pytest
+import json
+import os
+
+try:
+    from consumable_pool import ConsumablePool, fingerprint
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов consumable_pool: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {
+        'source': tmp_path / "items.json",
+        'state': tmp_path / "state.json",
+        'log': tmp_path / "used.log",
+    }
+
+
+def make_pool(paths, items=None):
+    if items is not None:
+        paths['source'].write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    return ConsumablePool(str(paths['source']), str(paths['state']), str(paths['log']))
+
+
+def test_draw_returns_each_item_once(paths):
+    items = [{"question": f"Q{i}"} for i in range(20)]
+    pool = make_pool(paths, items)
+
+    drawn = [pool.draw() for _ in range(20)]
+
+    assert sorted(d["question"] for d in drawn) == sorted(i["question"] for i in items)
+    assert pool.draw() is None
+    assert pool.count() == 0
+
+
+def test_draw_does_not_rewrite_source(paths):
+    pool = make_pool(paths, ["a", "b", "c"])
+    pool.count()
+    mtime = os.stat(paths['source']).st_mtime_ns
+
+    pool.draw()
+    pool.draw()
+
+    assert os.stat(paths['source']).st_mtime_ns == mtime
+    assert len(paths['log'].read_text().splitlines()) == 2
+
+
+def test_state_survives_restart(paths):
+    """Новый экземпляр продолжает ту же перестановку с того же места."""
+    items = [f"w{i}" for i in range(10)]
+    first = make_pool(paths, items)
+    drawn = [first.draw() for _ in range(4)]
+    expected_rest = [first.draw(consume=False)]
+
+    second = make_pool(paths)
+
+    assert second.count() == 6
+    assert second.draw() == expected_rest[0]
+    rest = [second.draw() for _ in range(5)]
+    assert sorted(drawn + expected_rest + rest) == sorted(items)
+
+
+def test_draw_without_consume(paths):
+    pool = make_pool(paths, ["only"])
+
+    assert pool.draw(consume=False) == "only"
+    assert pool.count() == 1
+
+
+def test_extend_mixes_new_items_with_remaining(paths):
+    pool = make_pool(paths, ["a", "b", "c"])
+    first = pool.draw()
+
+    assert pool.extend(["d", "e"]) == 2
+    assert pool.count() == 4
+
+    rest = [pool.draw() for _ in range(4)]
+    assert first not in rest
+    assert sorted([first] + rest) == ["a", "b", "c", "d", "e"]
+    assert len(json.loads(paths['source'].read_text(encoding="utf-8"))) == 5
+
+
+def test_manual_edit_rebuilds_without_used_items(paths):
+    """Ручная правка файла перестраивает пул, выданные элементы не повторяются."""
+    pool = make_pool(paths, ["a", "b"])
+    first = pool.draw()
+
+    paths['source'].write_text(json.dumps(["a", "b", "c"]), encoding="utf-8")
+    os.utime(paths['source'], ns=(1, 1))
+
+    assert pool.count() == 2
+    rest = {pool.draw(), pool.draw()}
+    assert first not in rest
+    assert pool.draw() is None
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint("x") != fingerprint("y")
+
+
+def test_missing_source_is_empty_pool(paths):
+    pool = make_pool(paths)
+
+    assert pool.count() == 0
+    assert pool.draw() is None
@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+try:
+    import config
+    import http_client
+    from http_client import RoutingRequest, build_request, configure_requests
+    from telegram.ext import ApplicationBuilder
+    from telegram.request import BaseRequest
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов http_client: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _routing():
+    api = build_request(config.DEFAULT_HTTP_CONFIG['api'], '1.1', 30)
+    uploads = build_request(config.DEFAULT_HTTP_CONFIG['uploads'], '1.1', 30)
+    api.do_request = AsyncMock(return_value=(200, b"{}"))
+    uploads.do_request = AsyncMock(return_value=(200, b"{}"))
+    return RoutingRequest(api, uploads), api, uploads
+
+
+@pytest.mark.asyncio
+async def test_uploads_routed_to_separate_pool():
+    request, api, uploads = _routing()
+    base = "https://api.telegram.org/bot123:abc"
+
+    await request.do_request(f"{base}/answerCallbackQuery", "POST")
+    await request.do_request(f"{base}/sendMediaGroup", "POST")
+    await request.do_request("https://api.telegram.org/file/bot123:abc/photos/1.jpg", "GET")
+
+    assert api.do_request.await_count == 1
+    assert uploads.do_request.await_count == 2
+    # Для загрузок таймаут записи берётся из пула uploads, а не фиксированные 20 секунд
+    assert uploads.do_request.await_args_list[0].kwargs['write_timeout'] == 300
+    assert api.do_request.await_args.kwargs['write_timeout'] is BaseRequest.DEFAULT_NONE
+
+
+def test_pool_settings_applied():
+    request = build_request(config.DEFAULT_HTTP_CONFIG['uploads'], '1.1', 12)
+    limits = request._client_kwargs['limits']
+
+    assert limits.max_connections == 4
+    assert limits.keepalive_expiry == 12
+    assert request.read_timeout == 300
+
+
+def test_http2_falls_back_without_h2():
+    with patch('importlib.util.find_spec', return_value=None):
+        assert http_client.resolve_http_version('2') == '1.1'
+    assert http_client.resolve_http_version('1.1') == '1.1'
+
+
+def test_configure_requests_builds_application():
+    http = config._http_settings({"polling": {"pool_size": 2}})
+    app = configure_requests(ApplicationBuilder().token("123:abc"), http).build()
+
+    assert isinstance(app.bot.request, RoutingRequest)
+    assert app.bot._request[0]._client_kwargs['limits'].max_connections == 2
@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+import json
+from contextlib import contextmanager
+from unittest.mock import patch
+
+try:
+    import balance
+    from ingest import IngestQueue
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов ingest: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+@pytest.mark.asyncio
+async def test_events_applied_in_order_with_results():
+    applied = []
+
+    def record(value):
+        applied.append(value)
+        return value * 2
+
+    queue = IngestQueue(batch_interval=0.01)
+    futures = [queue.submit(record, i) for i in range(5)]
+
+    assert applied == []  # обработчик только ставит события в очередь
+    assert await asyncio.gather(*futures) == [0, 2, 4, 6, 8]
+    assert applied == [0, 1, 2, 3, 4]
+    assert queue.metrics['batches'] == 1
+    assert queue.metrics['events'] == 5
+
+
+@pytest.mark.asyncio
+async def test_batch_wrapped_in_transaction_and_split_by_size():
+    transactions = []
+
+    @contextmanager
+    def transaction():
+        transactions.append("begin")
+        yield
+        transactions.append("commit")
+
+    queue = IngestQueue(batch_interval=0.01, max_batch=3, transaction=transaction)
+    for i in range(7):
+        queue.submit(lambda: None)
+    await queue.drain()
+
+    assert queue.metrics['batches'] == 3
+    assert transactions == ["begin", "commit"] * 3
+
+
+@pytest.mark.asyncio
+async def test_failed_event_does_not_break_batch():
+    queue = IngestQueue(batch_interval=0.01)
+
+    def fail():
+        raise ValueError("boom")
+
+    with patch('ingest.logger') as mock_logger:
+        bad = queue.submit(fail)
+        good = queue.submit(lambda: "ok")
+        ignored = queue.submit(fail)  # результат никто не ждёт
+        assert await good == "ok"
+
+    with pytest.raises(ValueError):
+        await bad
+    assert ignored.done()
+    assert queue.metrics['errors'] == 2
+    assert mock_logger.error.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_burst_of_answers_gives_single_balance_write(tmp_path):
+    """Сотня начислений за один интервал — одна запись balance.json."""
+    path = tmp_path / "balance.json"
+    queue = IngestQueue(batch_interval=0.05, transaction=balance.balance_batch)
+
+    with patch('balance.BALANCE_FILE', str(path)), \
+         patch('json.dump', wraps=json.dump) as mock_dump:
+        for user_id in range(100):
+            queue.submit(balance.update_balance, user_id, 5)
+        await queue.drain()
+
+    assert mock_dump.call_count == 1
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert len(data) == 100
+    assert all(entry["balance"] == 5 for entry in data.values())
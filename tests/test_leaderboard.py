@@ -0,0 +1,103 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import patch
+
+try:
+    from leaderboard import Leaderboard
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов leaderboard: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_add_stars_keeps_sorted_order(tmp_path):
+    board = Leaderboard(str(tmp_path / "rating.json"))
+
+    board.add_stars(1, "A", 2)
+    board.add_stars(2, "B", 5)
+    board.add_stars(3, "C", 1)
+    assert board.add_stars(3, "C2", 3) == 4
+
+    assert [uid for uid, _ in board.top()] == ["2", "3", "1"]
+    assert [uid for uid, _ in board.top(2)] == ["2", "3"]
+    assert board.top(1)[0][1] == {"stars": 5, "name": "B"}
+    assert board.max_stars() == 5
+    assert len(board) == 3
+    # Вне цикла событий каждое начисление сразу записывается
+    assert _read(board.rating_file)["3"] == {"stars": 4, "name": "C2"}
+
+
+def test_rank_with_ties(tmp_path):
+    board = Leaderboard(str(tmp_path / "rating.json"))
+    board.add_stars(1, "A", 3)
+    board.add_stars(2, "B", 3)
+    board.add_stars(3, "C", 1)
+
+    assert board.rank(1) == 1
+    assert board.rank(2) == 1
+    assert board.rank(3) == 3
+    assert board.rank(4) is None
+
+
+@pytest.mark.asyncio
+async def test_burst_is_written_once(tmp_path):
+    """Всплеск начислений внутри цикла событий даёт одну запись файла."""
+    board = Leaderboard(str(tmp_path / "rating.json"), flush_delay=0.05)
+
+    with patch.object(board, 'flush', wraps=board.flush) as mock_flush:
+        for i in range(20):
+            board.add_stars(i % 4, f"user{i % 4}")
+        assert not (tmp_path / "rating.json").exists()
+        await asyncio.sleep(0.1)
+
+    assert mock_flush.call_count == 1
+    data = _read(board.rating_file)
+    assert len(data) == 4
+    assert all(entry["stars"] == 5 for entry in data.values())
+
+
+def test_reset_stars_and_clear(tmp_path):
+    board = Leaderboard(str(tmp_path / "rating.json"))
+    board.add_stars(1, "A", 3)
+    board.add_stars(2, "B", 1)
+
+    board.reset_stars()
+    assert board.max_stars() == 0
+    assert _read(board.rating_file) == {"1": {"stars": 0, "name": "A"}, "2": {"stars": 0, "name": "B"}}
+
+    board.add_stars(2, "B")
+    assert board.rank(2) == 1
+
+    board.clear()
+    assert len(board) == 0
+    assert board.top() == []
+    assert _read(board.rating_file) == {}
+
+
+def test_loads_existing_file(tmp_path):
+    path = tmp_path / "rating.json"
+    path.write_text(json.dumps({
+        "10": {"stars": 1, "name": "X"},
+        "20": {"stars": 7, "name": "Y"},
+    }), encoding="utf-8")
+
+    board = Leaderboard(str(path))
+
+    assert [uid for uid, _ in board.top()] == ["20", "10"]
+    board.add_stars(10, "X", 10)
+    assert board.rank(10) == 1
+    assert board.rank(20) == 2
+
+
+def test_corrupted_file_gives_empty_board(tmp_path):
+    path = tmp_path / "rating.json"
+    path.write_text("{не json", encoding="utf-8")
+
+    board = Leaderboard(str(path))
+
+    assert len(board) == 0
+    assert board.max_stars() == 0
@@ -73,18 +73,17 @@ def test_generate_noise():
 # --- Тесты для основной функции ---
 
 @pytest.mark.asyncio
-@patch('handlers.logout_command.file_ids')
-@patch('handlers.logout_command.asyncio.sleep')
-async def test_logout_command_with_file_id(mock_sleep, mock_file_ids):
+@patch('handlers.logout_command.get_config')
+async def test_logout_command_with_file_id(mock_get_config, job_queue):
     """Тест logout_command с использованием file_id"""
     # Настраиваем моки
-    mock_file_ids.return_value = {'animations': {'logout': 'test_file_id'}}
-    mock_file_ids.__getitem__.return_value = {'logout': 'test_file_id'}
+    mock_get_config.return_value.file_ids = {'animations': {'logout': 'test_file_id'}}
     
     # Создаем моки для update и context
     update = MagicMock()
     context = MagicMock()
     context.bot = AsyncMock()  # Используем AsyncMock для асинхронных методов
+    context.job_queue = job_queue
     update.effective_chat.id = 123
     
     # Настройка ответа для send_animation
@@ -106,6 +105,9 @@ async def test_logout_command_with_file_id(mock_sleep, mock_file_ids):
     
     # Вызываем тестируемую функцию
     await logout_command(update, context)
+    # Обработчик вернул управление до начала анимации
+    context.bot.delete_message.assert_not_awaited()
+    await job_queue.run_all()
     
     # Проверяем, что были вызваны нужные методы
     context.bot.send_animation.assert_awaited_once_with(
@@ -121,20 +123,18 @@ async def test_logout_command_with_file_id(mock_sleep, mock_file_ids):
     # Должны быть удалены все 4 сообщения
     assert context.bot.delete_message.await_count == 4
     
-    # Проверяем, что sleep был вызван нужное количество раз
-    # 1 раз для имитации "печатания", несколько раз для прогресс-бара,
-    # и в конце перед удалением сообщений
-    assert mock_sleep.await_count >= 3
+    # Проверяем паузы между кадрами: "печатание", прогресс-бар и ожидание перед удалением
+    assert job_queue.delays[0] == 2.5
+    assert job_queue.delays[-1] == 5
+    assert context.bot.edit_message_text.await_count == 12
 
 @pytest.mark.asyncio
-@patch('handlers.logout_command.file_ids')
-@patch('handlers.logout_command.asyncio.sleep')
+@patch('handlers.logout_command.get_config')
 @patch('builtins.open')
-async def test_logout_command_with_file(mock_open, mock_sleep, mock_file_ids):
+async def test_logout_command_with_file(mock_open, mock_get_config, job_queue):
     """Тест logout_command с использованием локального файла"""
     # Настраиваем моки
-    mock_file_ids.return_value = {'animations': {'logout': None}}
-    mock_file_ids.__getitem__.return_value = {'logout': None}
+    mock_get_config.return_value.file_ids = {'animations': {'logout': None}}
     
     # Настраиваем мок для open
     mock_file = MagicMock()
@@ -144,6 +144,7 @@ async def test_logout_command_with_file(mock_open, mock_sleep, mock_file_ids):
     update = MagicMock()
     context = MagicMock()
     context.bot = AsyncMock()  # Используем AsyncMock для асинхронных методов
+    context.job_queue = job_queue
     update.effective_chat.id = 123
     
     # Настройка ответа для send_animation
@@ -165,6 +166,9 @@ async def test_logout_command_with_file(mock_open, mock_sleep, mock_file_ids):
     
     # Вызываем тестируемую функцию
     await logout_command(update, context)
+    # Обработчик вернул управление до начала анимации
+    context.bot.delete_message.assert_not_awaited()
+    await job_queue.run_all()
     
     # Проверяем, что файл был открыт
     mock_open.assert_called_once_with("pictures/hacker_logout.gif", "rb")
@@ -189,18 +193,17 @@ async def test_logout_command_with_file(mock_open, mock_sleep, mock_file_ids):
     )
 
 @pytest.mark.asyncio
-@patch('handlers.logout_command.file_ids')
-@patch('handlers.logout_command.asyncio.sleep')
-async def test_logout_command_exception_handling(mock_sleep, mock_file_ids):
+@patch('handlers.logout_command.get_config')
+async def test_logout_command_exception_handling(mock_get_config, job_queue):
     """Тест обработки исключений в logout_command"""
     # Настраиваем моки
-    mock_file_ids.return_value = {'animations': {'logout': 'test_file_id'}}
-    mock_file_ids.__getitem__.return_value = {'logout': 'test_file_id'}
+    mock_get_config.return_value.file_ids = {'animations': {'logout': 'test_file_id'}}
     
     # Создаем моки для update и context
     update = MagicMock()
     context = MagicMock()
     context.bot = AsyncMock()  # Используем AsyncMock для асинхронных методов
+    context.job_queue = job_queue
     update.effective_chat.id = 123
     
     # Настройка ответа для send_animation
@@ -226,6 +229,9 @@ async def test_logout_command_exception_handling(mock_sleep, mock_file_ids):
     
     # Вызываем тестируемую функцию
     await logout_command(update, context)
+    # Обработчик вернул управление до начала анимации
+    context.bot.delete_message.assert_not_awaited()
+    await job_queue.run_all()
     
     # Проверяем, что выполнение не прервалось исключением и
     # финальное сообщение отправлено
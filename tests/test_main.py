@@ -4,6 +4,7 @@ import sys
 from pathlib import Path
 from unittest.mock import patch, MagicMock, AsyncMock, call, ANY
 import datetime
+from types import SimpleNamespace
 
 # Импортируем тестируемый модуль и его компоненты
 try:
@@ -17,7 +18,6 @@ try:
         main as main_function # Переименовываем, чтобы не конфликтовать с импортом
     )
     # Импортируем зависимости для мокирования
-    import config
     import state
     # Импортируем некоторые хендлеры для проверки регистрации
     from handlers.start_help import start
@@ -149,6 +149,20 @@ async def test_reload_config_command(mock_reload):
     mock_reload.assert_called_once()
     update.message.reply_text.assert_awaited_once_with("Конфигурации перезагружены!")
 
+@pytest.mark.asyncio
+@patch('main.reload_all_configs', side_effect=main.ConfigError("bot_config.token: отсутствует обязательный ключ"))
+async def test_reload_config_command_invalid_config(mock_reload):
+    """Невалидная конфигурация не применяется, пользователь получает описание ошибки."""
+    update = MagicMock(spec=Update)
+    update.message = AsyncMock()
+    update.message.reply_text = AsyncMock()
+    
+    await reload_config_command(update, MagicMock())
+    
+    reply = update.message.reply_text.await_args[0][0]
+    assert reply.startswith("Конфигурация не перезагружена")
+    assert "bot_config.token" in reply
+
 # --- Тесты для main_function (частично) ---
 
 # Определяем мок конфигурации отдельно
@@ -160,10 +174,10 @@ MOCK_SCHEDULE_CONFIG = {
 # Мокаем ApplicationBuilder и его цепочку вызовов
 @patch('telegram.ext.ApplicationBuilder') 
 @patch('main.load_state')
-# Мокаем schedule_config
-@patch('main.schedule_config', MOCK_SCHEDULE_CONFIG)
-@patch('main.parse_time_from_string', side_effect=lambda t: datetime.datetime.strptime(t, '%H:%M').time())
-@patch.object(config, 'TOKEN', 'test_token')  # Используем patch.object для прямого обновления объекта
+# Мокаем расписание
+@patch('scheduler.get_config', lambda: SimpleNamespace(schedule=MOCK_SCHEDULE_CONFIG))
+@patch('scheduler.parse_time_from_string', side_effect=lambda t: datetime.datetime.strptime(t, '%H:%M').time())
+@patch('main.get_config', lambda: SimpleNamespace(token='test_token'))
 def test_main_function_setup(mock_parse_time, mock_load_state, mock_app_builder):
     """Этот тест проверяет взаимодействие с ApplicationBuilder, но без вызова main."""
     # Вместо вызова main_function просто проверим, что mock_app_builder не был вызван (пустой тест)
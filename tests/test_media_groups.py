@@ -0,0 +1,168 @@
+import pytest
+import asyncio
+from unittest.mock import patch, AsyncMock, MagicMock
+
+try:
+    import media_groups
+    from media_groups import MediaGroupAggregator, MediaGroupJournal, MediaItem, build_album
+    from telegram import InputMediaPhoto, InputMediaDocument
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов media_groups: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+@pytest.mark.asyncio
+async def test_group_completed_after_quiet_period():
+    """Группа передаётся в on_complete один раз, после паузы в поступлении частей."""
+    on_complete = AsyncMock()
+    aggregator = MediaGroupAggregator("test", on_complete, delay=0.05)
+    context = MagicMock()
+
+    assert aggregator.claim("g1") is True
+    aggregator.add("g1", "a", context, caption="текст")
+    await asyncio.sleep(0.03)
+    aggregator.add("g1", "b", context)
+    await asyncio.sleep(0.03)
+    on_complete.assert_not_awaited()  # таймер перезапущен второй частью
+
+    await asyncio.sleep(0.1)
+    on_complete.assert_awaited_once()
+    ctx, group_id, group = on_complete.await_args[0]
+    assert ctx is context
+    assert group_id == "g1"
+    assert group['media'] == ["a", "b"]
+    assert group['caption'] == "текст"
+    assert "g1" not in aggregator
+    assert aggregator.metrics['groups_completed'] == 1
+    assert aggregator.metrics['timer_resets'] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_items_cap():
+    """Части сверх лимита отбрасываются и учитываются в метриках."""
+    aggregator = MediaGroupAggregator("test", AsyncMock(), delay=10, max_items=2)
+    context = MagicMock()
+
+    assert aggregator.add("g1", "a", context) is True
+    assert aggregator.add("g1", "b", context) is True
+    assert aggregator.add("g1", "c", context) is False
+    assert aggregator.get("g1")['media'] == ["a", "b"]
+    assert aggregator.metrics['items_dropped'] == 1
+    aggregator.discard("g1")
+
+
+def test_max_groups_cap():
+    """Новые группы отклоняются, пока собирается max_groups групп."""
+    aggregator = MediaGroupAggregator("test", AsyncMock(), max_groups=1)
+
+    assert aggregator.claim("g1") is True
+    assert aggregator.claim("g2") is False
+    assert aggregator.claim("g1") is True
+    assert aggregator.metrics['groups_rejected'] == 1
+
+
+def test_unfinished_group_expires():
+    """Группа, которая так и не была завершена, вытесняется по TTL."""
+    aggregator = MediaGroupAggregator("test", AsyncMock(), ttl=60, max_groups=1)
+
+    with patch.object(media_groups.time, 'monotonic', return_value=1000.0):
+        aggregator.claim("g1")
+    with patch.object(media_groups.time, 'monotonic', return_value=1061.0):
+        assert "g1" not in aggregator
+        assert aggregator.claim("g2") is True
+
+    assert aggregator.get("g1") is None
+    assert aggregator.metrics['groups_expired'] == 1
+
+
+@pytest.mark.asyncio
+async def test_on_complete_error_is_logged():
+    """Ошибка в on_complete не теряется и не ломает сборщик."""
+    on_complete = AsyncMock(side_effect=RuntimeError("boom"))
+    aggregator = MediaGroupAggregator("test", on_complete, delay=0.01)
+
+    with patch('media_groups.logger') as mock_logger:
+        aggregator.add("g1", "a", MagicMock())
+        await asyncio.sleep(0.05)
+
+    mock_logger.error.assert_called_once()
+    assert len(aggregator) == 0
+
+
+def test_media_item_json_round_trip():
+    """MediaItem сохраняется в формате media_files и восстанавливается без потерь."""
+    item = MediaItem("photo", "file1", caption="подпись", parse_mode="HTML")
+    data = item.to_dict()
+
+    assert data == {"file_id": "file1", "type": "photo", "caption": "подпись", "parse_mode": "HTML"}
+    assert MediaItem.from_dict(data) == item
+    assert MediaItem("video", "v").to_dict() == {"file_id": "v", "type": "video"}
+    assert not hasattr(item, '__dict__')
+
+
+def test_media_item_from_message():
+    message = MagicMock(photo=[MagicMock(file_id="small"), MagicMock(file_id="big")])
+    assert MediaItem.from_message(message) == MediaItem("photo", "big")
+
+    message = MagicMock(photo=None, video=None, audio=None, document=None)
+    assert MediaItem.from_message(message) is None
+
+
+def test_build_album_caption_on_first_item():
+    """Подпись альбома ставится на первый файл, неизвестные типы пропускаются."""
+    items = [MediaItem("sticker", "s"), MediaItem("photo", "p"), MediaItem("document", "d")]
+
+    album = build_album(items, "Альбом")
+
+    assert [type(m) for m in album] == [InputMediaPhoto, InputMediaDocument]
+    assert album[0].caption == "Альбом"
+    assert album[1].caption is None
+    assert build_album([MediaItem("photo", "p")], "")[0].caption is None
+
+
+def test_journal_keeps_only_unfinished_groups(tmp_path):
+    """Журнал возвращает незавершённые группы с метаданными и удаляется, когда они закончились."""
+    path = tmp_path / "journal.jsonl"
+    journal = MediaGroupJournal(path)
+    journal.append("g1", MediaItem("photo", "p1"), {"caption": "текст", "datetime": "2024-01-01T12:00:00"})
+    journal.append("g2", MediaItem("photo", "x"))
+    journal.append("g1", MediaItem("video", "v1"))
+    journal.close("g2")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"group": "g1", "item": {"file_')  # недописанная строка
+
+    groups = MediaGroupJournal(path).load()
+
+    assert list(groups) == ["g1"]
+    assert groups["g1"]['media'] == [MediaItem("photo", "p1"), MediaItem("video", "v1")]
+    assert groups["g1"]['caption'] == "текст"
+    # Журнал сжат до незавершённых групп
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+    journal.close("g1")
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_restore_resumes_collection_after_restart(tmp_path):
+    """После перезапуска группа из журнала дособирается и передаётся в on_complete."""
+    path = tmp_path / "journal.jsonl"
+    before = MediaGroupAggregator("test", AsyncMock(), delay=10, journal=MediaGroupJournal(path))
+    before.add("g1", MediaItem("photo", "p1"), MagicMock(), chat_id=42)
+    # Бот "упал" до срабатывания таймера
+    for timer in before._timers.values():
+        timer.cancel()
+
+    on_complete = AsyncMock()
+    after = MediaGroupAggregator("test", on_complete, delay=0.01, journal=MediaGroupJournal(path))
+    context = MagicMock()
+
+    assert after.restore(context) == 1
+    after.add("g1", MediaItem("photo", "p2"), context)
+    await asyncio.sleep(0.05)
+
+    ctx, group_id, group = on_complete.await_args[0]
+    assert ctx is context
+    assert group['chat_id'] == 42
+    assert [item.file_id for item in group['media']] == ["p1", "p2"]
+    assert after.metrics['groups_restored'] == 1
+    assert not path.exists()
@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+try:
+    from member_directory import MemberDirectory, mention
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов member_directory: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _user(user_id, first_name, username=None):
+    user = MagicMock()
+    user.id = user_id
+    user.first_name = first_name
+    user.full_name = first_name
+    user.username = username
+    return user
+
+
+def test_mention_escapes_name():
+    assert mention(_user(1, "Саня", "sanya")) == "@sanya"
+    assert mention(_user(2, "<Мишка>")) == '<a href="tg://user?id=2">&lt;Мишка&gt;</a>'
+
+
+@pytest.mark.asyncio
+async def test_admin_mentions_expire_after_ttl():
+    directory = MemberDirectory(admins_ttl=60)
+    bot = AsyncMock()
+    bot.getChatAdministrators.return_value = [MagicMock(user=_user(1, "Саня", "sanya"))]
+
+    assert await directory.admin_mentions(bot, 10, now=0) == "@sanya"
+    assert await directory.admin_mentions(bot, 10, now=59) == "@sanya"
+    assert bot.getChatAdministrators.call_count == 1
+
+    await directory.admin_mentions(bot, 10, now=61)
+    assert bot.getChatAdministrators.call_count == 2
+
+
+def test_observe_learns_names_and_invalidates():
+    directory = MemberDirectory()
+    directory._admins[10] = ("@old", float("inf"))
+
+    update = MagicMock()
+    update.effective_user = _user(1, "Саня")
+    update.my_chat_member = None
+    update.chat_member.chat.id = 10
+    update.chat_member.new_chat_member.user = _user(2, "Мишка")
+    directory.observe(update)
+
+    assert 10 not in directory._admins
+    assert directory.display_name("1") == "Саня"
+    assert directory.display_name(2, "Unknown") == "Мишка"
+
+
+def test_display_name_replaces_placeholders():
+    directory = MemberDirectory()
+
+    assert directory.display_name("5", "Старое имя") == "Старое имя"
+    assert directory.display_name("5", "Unknown", "Безымянный") == "Безымянный"
+    assert directory.display_name("5", None, "5") == "5"
+    assert directory.display_name("5", "Unknown") == "Unknown"
+
+
+def test_names_are_capped_by_recent_use():
+    directory = MemberDirectory(max_names=2)
+    directory.remember(_user(1, "Первый"))
+    directory.remember(_user(2, "Второй"))
+    directory.remember(_user(1, "Первый"))
+    directory.remember(_user(3, "Третий"))
+
+    assert len(directory) == 2
+    assert directory.display_name(2, "Сохранённое") == "Сохранённое"
+    assert directory.display_name(1) == "Первый"
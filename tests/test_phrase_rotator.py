@@ -0,0 +1,80 @@
+import pytest
+import json
+import os
+from unittest.mock import patch
+
+try:
+    from phrase_rotator import PhraseRotator, load_phrases
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов phrase_rotator: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+@pytest.fixture
+def files(tmp_path):
+    phrases = tmp_path / "phrases.txt"
+    phrases.write_text("Один\n\nДва\nТри\n", encoding="utf-8")
+    return {'phrases': phrases, 'state': tmp_path / "cursors.json", 'legacy': tmp_path / "legacy.json"}
+
+
+def test_load_phrases_skips_empty_lines(files, tmp_path):
+    assert load_phrases(str(files['phrases'])) == ["Один", "Два", "Три"]
+    assert load_phrases(str(tmp_path / "missing.txt")) == []
+
+
+def test_next_cycles_and_reads_file_once(files):
+    rotator = PhraseRotator(str(files['state']), save_interval=3600)
+    rotator.register("test", str(files['phrases']))
+
+    with patch('phrase_rotator.load_phrases', wraps=load_phrases) as mock_load:
+        result = [rotator.next("test") for _ in range(4)]
+
+    assert result == ["Один", "Два", "Три", "Один"]
+    mock_load.assert_called_once()
+
+
+def test_cursors_saved_in_one_file_throttled(files):
+    rotator = PhraseRotator(str(files['state']), save_interval=3600)
+    rotator.register("a", str(files['phrases']))
+    rotator.register("b", str(files['phrases']))
+
+    rotator.next("a")  # первое сохранение сразу
+    rotator.next("a")
+    rotator.next("b")
+    assert json.loads(files['state'].read_text()) == {"a": 1}
+
+    rotator.flush()
+    assert json.loads(files['state'].read_text()) == {"a": 2, "b": 1}
+
+    # Новый экземпляр продолжает с сохранённых позиций
+    restored = PhraseRotator(str(files['state']))
+    restored.register("a", str(files['phrases']))
+    assert restored.next("a") == "Три"
+
+
+def test_legacy_index_used_once(files):
+    files['legacy'].write_text(json.dumps({"old_index": 2}), encoding="utf-8")
+    rotator = PhraseRotator(str(files['state']))
+    rotator.register("test", str(files['phrases']), legacy_index_file=str(files['legacy']), legacy_key="old_index")
+
+    assert rotator.next("test") == "Три"
+    assert rotator.next("test") == "Один"
+
+
+def test_reload_on_mtime_change(files):
+    rotator = PhraseRotator(str(files['state']), check_interval=0)
+    rotator.register("test", str(files['phrases']))
+    assert rotator.next("test") == "Один"
+
+    files['phrases'].write_text("Новая\n", encoding="utf-8")
+    os.utime(files['phrases'], ns=(1, 1))
+
+    assert rotator.next("test") == "Новая"
+
+
+def test_default_phrases_when_file_missing(files, tmp_path):
+    rotator = PhraseRotator(str(files['state']))
+    rotator.register("test", str(tmp_path / "missing.txt"), default=["Запасная"])
+    rotator.register("empty", str(tmp_path / "missing.txt"))
+
+    assert rotator.next("test") == "Запасная"
+    assert rotator.next("empty") is None
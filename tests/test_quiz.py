@@ -2,6 +2,7 @@ import pytest
 import json
 import os
 import datetime
+from types import SimpleNamespace
 from unittest.mock import patch, mock_open, MagicMock, AsyncMock, call, ANY
 
 # Импортируем тестируемые функции и переменные из quiz.py
@@ -10,9 +11,8 @@ try:
     from quiz import (
         load_weekly_quiz_count, save_weekly_quiz_count, WEEKLY_COUNT_FILE,
         load_quiz_questions, save_quiz_questions, QUIZ_FILE,
-        load_rating, save_rating, RATING_FILE,
-        load_praises, PRAISES_FILE,
-        load_praise_index, save_praise_index, PRAISE_INDEX_FILE,
+        RATING_FILE,
+        PRAISES_FILE, PRAISE_INDEX_FILE,
         get_random_question,
         get_next_praise,
         quiz_post_callback,
@@ -28,13 +28,31 @@ try:
     import state
     import config
     import balance
+    from phrase_rotator import PhraseRotator
+    from leaderboard import Leaderboard
     from telegram import Poll, PollOption, User, PollAnswer
 except ImportError as e:
     pytest.skip(f"Пропуск тестов quiz: не удалось импортировать модуль quiz или его зависимости ({e}).", allow_module_level=True)
 
+@pytest.fixture
+def leaderboard(tmp_path):
+    """Рейтинг во временном файле вместо state_data/rating.json."""
+    board = Leaderboard(str(tmp_path / "rating.json"), flush_delay=0)
+    with patch.object(quiz, 'LEADERBOARD', board):
+        yield board
+
+
+def _read_rating(board):
+    with open(board.rating_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 # Фикстура для очистки ACTIVE_QUIZZES перед каждым тестом
 @pytest.fixture(autouse=True)
-def clear_active_quizzes():
+def clear_active_quizzes(tmp_path):
+    # Журнал опросов ведём во временном каталоге
+    path_patch = patch.object(ACTIVE_QUIZZES, 'path', tmp_path / "active_quizzes.jsonl")
+    path_patch.start()
     ACTIVE_QUIZZES.clear()
     # Устанавливаем режим теста, чтобы не модифицировать реальные файлы данных
     state.is_test_mode = True
@@ -52,6 +70,8 @@ def clear_active_quizzes():
     yield
     # После выполнения тестов сбрасываем режим теста
     state.is_test_mode = False
+    ACTIVE_QUIZZES.clear()
+    path_patch.stop()
 
 # --- Тесты файловых операций --- (Упрощенные примеры, аналогично balance/state)
 
@@ -74,48 +94,52 @@ def test_save_weekly_quiz_count(mock_dump, mock_file):
     handle = mock_file()
     mock_dump.assert_called_once_with({"count": 10}, handle, ensure_ascii=False, indent=4)
 
-# ... (Аналогичные тесты для load/save_quiz_questions, load/save_rating, load_praises, load/save_praise_index) ...
+# ... (Аналогичные тесты для load/save_quiz_questions, load/save_rating) ...
 # Для краткости пропустим их детальную реализацию, но они должны быть написаны
 
 # --- Тесты для get_random_question ---
 
-@patch('state.available_questions', new_callable=list, create=True)
-@patch('quiz.load_quiz_questions', return_value=[
-    {"question": "Q1", "options": ["a","b","c"], "answer": "a"},
-    {"question": "Q2", "options": ["c","d","e"], "answer": "d"}
-])
-@patch('quiz.save_quiz_questions')
-@patch('state.used_questions', new_callable=set, create=True)
-def test_get_random_question_success(mock_used_set, mock_save_func, mock_load_func, mock_available_list):
-    # Исходная функция get_random_question ожидает список вопросов
-    mock_load_func.return_value = [
+@pytest.fixture
+def quiz_pool(tmp_path):
+    """Пул вопросов на временных файлах вместо post_materials/quiz.json."""
+    source = tmp_path / "quiz.json"
+    def make(questions):
+        source.write_text(json.dumps(questions, ensure_ascii=False), encoding="utf-8")
+        pool = quiz.ConsumablePool(str(source), str(tmp_path / "state.json"), str(tmp_path / "used.log"))
+        return pool
+    return make
+
+
+def test_get_random_question_success(quiz_pool):
+    questions = [
         {"question": "Q1", "options": ["a","b","c"], "answer": "a"},
         {"question": "Q2", "options": ["c","d","e"], "answer": "d"}
     ]
+    with patch.object(quiz, 'QUIZ_POOL', quiz_pool(questions)):
+        result = get_random_question()
     
-    result = get_random_question()
-    
-    mock_load_func.assert_called_once()
-    # Не проверяем вызов mock_save_func, так как реализация может сохранять вопросы
     assert result is not None
     assert result["question"] in ["Q1", "Q2"]
-    # Не проверяем state.used_questions, т.к. вопросы удаляются из самого списка
 
 
-def test_get_random_question_from_loaded():
-    # Тестируем, что get_random_question вызывает load_quiz_questions и обрабатывает его результаты
-    # Мокаем load_quiz_questions так, чтобы возвращал список с одним вопросом
+def test_get_random_question_consumes_outside_test_mode(quiz_pool):
+    """В реальном режиме вопрос отмечается выданным и больше не повторяется."""
     q_data = {"question": "Test", "options": ["A", "B"], "answer": "A"}
+    pool = quiz_pool([q_data])
+    state.is_test_mode = False
     
-    with patch('quiz.load_quiz_questions', return_value=[q_data]) as mock_load, \
-         patch('quiz.save_quiz_questions') as mock_save:
-        result = get_random_question()
-        
-        mock_load.assert_called_once()
-        # Не проверяем mock_save, так как реализация может сохранять вопросы
-        assert result == q_data  # Функция должна вернуть тот же словарь из списка
-        # Из-за mock_load в обоих вызовах будет создаваться новый список с одним элементом,
-        # так что проверять изменение списка не имеет смысла
+    with patch.object(quiz, 'QUIZ_POOL', pool):
+        assert get_random_question() == q_data
+        assert get_random_question() is None
+        assert count_quiz_questions() == 0
+
+
+def test_get_random_question_test_mode_does_not_consume(quiz_pool):
+    q_data = {"question": "Test", "options": ["A", "B"], "answer": "A"}
+    
+    with patch.object(quiz, 'QUIZ_POOL', quiz_pool([q_data])):
+        assert get_random_question() == q_data
+        assert count_quiz_questions() == 1
 
 
 # --- Тесты для quiz_post_callback ---
@@ -147,7 +171,7 @@ async def test_quiz_post_callback_success():
     # Патчим все необходимые функции и значения
     with patch.object(quiz, 'get_random_question', return_value=q_data), \
          patch.object(state, 'quiz_enabled', True), \
-         patch.object(quiz, 'POST_CHAT_ID', -1001234567890), \
+         patch.object(quiz, 'get_config', lambda: SimpleNamespace(post_chat_id=-1001234567890)), \
          patch.object(quiz, 'ACTIVE_QUIZZES', {}), \
          patch.object(quiz, 'load_weekly_quiz_count', return_value=5), \
          patch.object(quiz, 'save_weekly_quiz_count') as mock_save_weekly_quiz_count:
@@ -190,7 +214,7 @@ async def test_quiz_post_callback_no_questions():
     # Патчим необходимые функции и значения
     with patch.object(quiz, 'get_random_question', return_value=None), \
          patch.object(state, 'quiz_enabled', True), \
-         patch.object(quiz, 'POST_CHAT_ID', 12345):
+         patch.object(quiz, 'get_config', lambda: SimpleNamespace(post_chat_id=12345)):
         
         # Вызываем тестируемую функцию
         await quiz_post_callback(context)
@@ -207,15 +231,13 @@ async def test_quiz_post_callback_no_questions():
 # --- Тесты для poll_answer_handler ---
 
 @pytest.mark.asyncio
-async def test_poll_answer_handler_correct():
+async def test_poll_answer_handler_correct(leaderboard):
     user_id = 111
     user_name = "UserOne"
     poll_id = "poll123"
     correct_option = 1
-    
+
     with patch('quiz.update_balance') as mock_update_balance, \
-         patch('quiz.load_rating', return_value={}) as mock_load_rating, \
-         patch('quiz.save_rating') as mock_save_rating, \
          patch('quiz.ACTIVE_QUIZZES', {poll_id: correct_option}):
 
         update = MagicMock()
@@ -225,34 +247,35 @@ async def test_poll_answer_handler_correct():
         update.poll_answer.user.id = user_id
         update.poll_answer.user.username = user_name
         update.poll_answer.option_ids = [correct_option]
-        
+
         context = MagicMock()
-        
+
         # Вызываем тестируемую функцию
         await poll_answer_handler(update, context)
-        
+        mock_update_balance.assert_not_called()  # начисление ушло в очередь событий
+        await quiz.ingest_queue.drain()
+        leaderboard.flush()
+
         # Проверяем обновление баланса и рейтинга
         mock_update_balance.assert_called_once_with(user_id, 5)
-        
+        assert leaderboard.rank(user_id) == 1
+
         # Проверяем сохранение рейтинга
-        mock_save_rating.assert_called_once()
-        saved_rating = mock_save_rating.call_args[0][0]
+        saved_rating = _read_rating(leaderboard)
         assert str(user_id) in saved_rating
         assert saved_rating[str(user_id)]["stars"] == 1
         assert saved_rating[str(user_id)]["name"] == user_name
 
 
 @pytest.mark.asyncio
-async def test_poll_answer_handler_incorrect():
+async def test_poll_answer_handler_incorrect(leaderboard):
     user_id = 222
     user_name = "UserTwo"
     poll_id = "poll456"
     correct_option = 0  # верный ответ
     wrong_option = 2    # ответ пользователя
-    
-    with patch('quiz.update_balance') as mock_update_balance, \
-         patch('quiz.load_rating') as mock_load_rating, \
-         patch('quiz.save_rating') as mock_save_rating:
+
+    with patch('quiz.update_balance') as mock_update_balance:
 
         # Настраиваем ACTIVE_QUIZZES напрямую
         ACTIVE_QUIZZES[poll_id] = correct_option
@@ -267,23 +290,46 @@ async def test_poll_answer_handler_incorrect():
         context = MagicMock()
 
         await poll_answer_handler(update, context)
+        await quiz.ingest_queue.drain()
 
         mock_update_balance.assert_not_called()
-        mock_save_rating.assert_not_called()
+        assert len(leaderboard) == 0
+        assert not os.path.exists(leaderboard.rating_file)
+
+
+@pytest.mark.asyncio
+async def test_closed_poll_gives_no_reward(leaderboard):
+    """После закрытия опроса ответы на него не засчитываются."""
+    ACTIVE_QUIZZES["poll789"] = 1
+
+    closed = MagicMock()
+    closed.poll.id = "poll789"
+    closed.poll.is_closed = True
+    await quiz.poll_update_handler(closed, MagicMock())
+
+    assert "poll789" not in ACTIVE_QUIZZES
+
+    update = MagicMock()
+    update.poll_answer.poll_id = "poll789"
+    update.poll_answer.user.id = 333
+    update.poll_answer.option_ids = [1]
+    with patch('quiz.update_balance') as mock_update_balance:
+        await poll_answer_handler(update, MagicMock())
+        await quiz.ingest_queue.drain()
+
+    mock_update_balance.assert_not_called()
+    assert len(leaderboard) == 0
 
 
 # --- Тесты для rating_command ---
 
 @pytest.mark.asyncio
-async def test_rating_command_with_results():
-    with patch('quiz.load_rating') as mock_load_rating, \
-         patch('quiz.load_weekly_quiz_count', return_value=10) as mock_weekly_count:
+async def test_rating_command_with_results(leaderboard):
+    with patch('quiz.load_weekly_quiz_count', return_value=10) as mock_weekly_count:
 
-        mock_load_rating.return_value = {
-            "111": {"stars": 5, "name": "UserA"},
-            "222": {"stars": 10, "name": "UserB"},
-            "333": {"stars": 2, "name": "UserC"},
-        }
+        leaderboard.add_stars(111, "UserA", 5)
+        leaderboard.add_stars(222, "UserB", 10)
+        leaderboard.add_stars(333, "UserC", 2)
 
         update = MagicMock()
         update.effective_chat.id = 123
@@ -292,7 +338,6 @@ async def test_rating_command_with_results():
 
         await rating_command(update, context)
 
-        mock_load_rating.assert_called_once()
         context.bot.send_message.assert_awaited_once()
         args, kwargs = context.bot.send_message.await_args
         expected_text = (
@@ -307,21 +352,35 @@ async def test_rating_command_with_results():
 
 
 @pytest.mark.asyncio
-async def test_rating_command_empty():
-    with patch('quiz.load_rating', return_value={}) as mock_load_rating:
-        update = MagicMock()
-        update.effective_chat.id = 123
-        context = MagicMock()
-        context.bot = AsyncMock()
-        context.bot.send_message = AsyncMock()
+async def test_rating_command_escapes_names(leaderboard):
+    leaderboard.add_stars(111, "<b>Мишка & Co</b>", 3)
+
+    update = MagicMock()
+    update.effective_chat.id = 123
+    context = MagicMock()
+    context.bot = AsyncMock()
 
+    with patch('quiz.load_weekly_quiz_count', return_value=10):
         await rating_command(update, context)
 
-        mock_load_rating.assert_called_once()
-        context.bot.send_message.assert_awaited_once_with(
-            chat_id=123,
-            text="Рейтинг пока пуст."
-        )
+    text = context.bot.send_message.await_args.kwargs['text']
+    assert "• &lt;b&gt;Мишка &amp; Co&lt;/b&gt;: 3 ⭐" in text
+
+
+@pytest.mark.asyncio
+async def test_rating_command_empty(leaderboard):
+    update = MagicMock()
+    update.effective_chat.id = 123
+    context = MagicMock()
+    context.bot = AsyncMock()
+    context.bot.send_message = AsyncMock()
+
+    await rating_command(update, context)
+
+    context.bot.send_message.assert_awaited_once_with(
+        chat_id=123,
+        text="Рейтинг пока пуст."
+    )
 
 
 # --- Тесты для start/stop_quiz_command ---
@@ -416,169 +475,118 @@ async def test_stop_quiz_command():
 
 # --- Тесты для get_next_praise ---
 
-@patch('quiz.load_praise_index')
-@patch('quiz.save_praise_index')
-def test_get_next_praise_cycling(mock_save_index, mock_load_index):
+def _praise_rotator(tmp_path, praises, default=None):
+    praises_file = tmp_path / "praises.txt"
+    praises_file.write_text("\n".join(praises), encoding="utf-8")
+    rotator = PhraseRotator(str(tmp_path / "cursors.json"))
+    rotator.register("praise", str(praises_file), default=default)
+    return rotator
+
+def test_get_next_praise_cycling(tmp_path):
     # Список фраз похвалы
     test_praises = ["Отлично!", "Молодец!", "Превосходно!"]
     
-    # Подготавливаем мок для load_praise_index
-    # Мокаем различные индексы для проверки циклического перебора
-    mock_load_index.side_effect = [0, 1, 2, 0]
-    
-    # Проверяем первый вызов (индекс 0 -> фраза 0)
-    assert get_next_praise(test_praises) == test_praises[0]
-    mock_load_index.assert_called_once()
-    # Проверяем, что индекс сохранен как 1 для следующего вызова
-    mock_save_index.assert_called_once_with(1)
-    
-    # Сбрасываем моки для нового вызова
-    mock_load_index.reset_mock()
-    mock_save_index.reset_mock()
-    
-    # Проверяем второй вызов (индекс 1 -> фраза 1)
-    assert get_next_praise(test_praises) == test_praises[1]
-    mock_load_index.assert_called_once()
-    # Проверяем, что индекс сохранен как 2
-    mock_save_index.assert_called_once_with(2)
-    
-    # Сбрасываем моки для нового вызова
-    mock_load_index.reset_mock()
-    mock_save_index.reset_mock()
-    
-    # Проверяем третий вызов (индекс 2 -> фраза 2)
-    assert get_next_praise(test_praises) == test_praises[2]
-    mock_load_index.assert_called_once()
-    # Проверяем, что индекс сохранен как 3 (не цикл)
-    mock_save_index.assert_called_once_with(3)
-
-    # Сбрасываем моки для нового вызова
-    mock_load_index.reset_mock()
-    mock_save_index.reset_mock()
-    
-    # Проверяем четвертый вызов (индекс 0 -> фраза 0)
-    assert get_next_praise(test_praises) == test_praises[0]
-    mock_load_index.assert_called_once()
-    # Проверяем, что индекс сохранен как 1
-    mock_save_index.assert_called_once_with(1)
-
-@patch('quiz.load_praise_index', return_value=0)
-@patch('quiz.save_praise_index')
-def test_get_next_praise_empty_list(mock_save_index, mock_load_index):
-    assert get_next_praise([]) == "Поздравляем! (нет фраз в praises)"
-    mock_load_index.assert_not_called()
-    mock_save_index.assert_not_called()
+    with patch.object(quiz, 'phrase_rotator', _praise_rotator(tmp_path, test_praises)):
+        # Фразы идут по кругу
+        assert [get_next_praise() for _ in range(4)] == test_praises + [test_praises[0]]
+
+def test_get_next_praise_empty_list(tmp_path):
+    with patch.object(quiz, 'phrase_rotator', _praise_rotator(tmp_path, [])):
+        assert get_next_praise() == "Поздравляем! (нет фраз в praises)"
     
 # --- Тесты для count_quiz_questions ---
-@patch('quiz.load_quiz_questions', return_value=["q1", "q2"])
-def test_count_quiz_questions(mock_load):
-    assert count_quiz_questions() == 2
-    mock_load.assert_called_once()
-
-@patch('quiz.load_quiz_questions', return_value=[])
-@patch('quiz.save_quiz_questions')
-def test_get_random_question_all_empty(mock_save, mock_load):
+def test_count_quiz_questions(quiz_pool):
+    with patch.object(quiz, 'QUIZ_POOL', quiz_pool(["q1", "q2"])):
+        assert count_quiz_questions() == 2
+
+def test_get_random_question_all_empty(quiz_pool):
     # Тест на случай, если нет вопросов
-    # Явно устанавливаем пустой список как возвращаемое значение
-    mock_load.return_value = []
-    
-    result = get_random_question()
+    with patch.object(quiz, 'QUIZ_POOL', quiz_pool([])):
+        result = get_random_question()
     
-    mock_load.assert_called_once()
-    # При пустом списке save не должна вызываться
-    mock_save.assert_not_called()
     assert result is None
 
 
 # --- Тесты для weekly_quiz_reset ---
 
 @pytest.mark.asyncio
-async def test_weekly_quiz_reset_with_winner():
+async def test_weekly_quiz_reset_with_winner(leaderboard):
     """Тест еженедельного сброса рейтинга викторин с победителем."""
     # Подготавливаем тестовые данные рейтинга
-    test_rating = {
-        "111": {"stars": 5, "name": "Winner"},
-        "222": {"stars": 2, "name": "RunnerUp"}
-    }
-    
+    leaderboard.add_stars(111, "Winner", 5)
+    leaderboard.add_stars(222, "RunnerUp", 2)
+
     # Создаем мок бота
     bot = AsyncMock()
     bot.send_message = AsyncMock()
-    
+
     # Создаем контекст с нашим мок-ботом
     context = MagicMock()
     context.bot = bot
-    
+
     # Патчим все необходимые функции и значения
     with patch.object(state, 'quiz_enabled', True), \
-         patch.object(quiz, 'POST_CHAT_ID', 999), \
-         patch.object(quiz, 'load_rating', return_value=test_rating), \
-         patch.object(quiz, 'save_rating') as mock_save_rating, \
+         patch.object(quiz, 'get_config', lambda: SimpleNamespace(post_chat_id=999)), \
          patch.object(quiz, 'load_weekly_quiz_count', return_value=10), \
          patch.object(quiz, 'save_weekly_quiz_count') as mock_save_weekly_quiz_count, \
-         patch.object(quiz, 'load_praises', return_value=["End!"]), \
          patch.object(quiz, 'get_next_praise', return_value="End!"):
-        
+
         # Вызываем тестируемую функцию
         await quiz.weekly_quiz_reset(context)
-        
+
         # Проверяем, что было отправлено сообщение
         assert bot.send_message.call_count == 1
-        
+
         # Получаем аргументы вызова send_message
         args, kwargs = bot.send_message.call_args
         assert kwargs['chat_id'] == 999
         assert "Winner" in kwargs['text']
-        
-        # Проверяем, что save_rating был вызван
-        assert mock_save_rating.call_count == 1
-        
-        # Проверяем аргументы вызова save_rating (должен быть словарь где звезды обнулены)
-        saved_data = mock_save_rating.call_args[0][0]
+        assert kwargs['text'].index("Winner: 5") < kwargs['text'].index("RunnerUp: 2")
+
+        # Проверяем сохранённый рейтинг (звезды обнулены, имена сохранены)
+        saved_data = _read_rating(leaderboard)
         assert isinstance(saved_data, dict)
         assert len(saved_data) == 2
         assert "111" in saved_data and "222" in saved_data
         assert saved_data["111"]["stars"] == 0
         assert saved_data["222"]["stars"] == 0
-        
+        assert leaderboard.max_stars() == 0
+
         # Проверяем, что счетчик викторин был сброшен
         mock_save_weekly_quiz_count.assert_called_once_with(0)
 
 @pytest.mark.asyncio
-async def test_weekly_quiz_reset_no_winner():
+async def test_weekly_quiz_reset_no_winner(leaderboard):
     """Тест еженедельного сброса рейтинга викторин без победителей."""
     # Создаем мок бота
     bot = AsyncMock()
     bot.send_message = AsyncMock()
-    
+
     # Создаем контекст с нашим мок-ботом
     context = MagicMock()
     context.bot = bot
-    
+
     # Патчим все необходимые функции и значения
     with patch.object(state, 'quiz_enabled', True), \
-         patch.object(quiz, 'POST_CHAT_ID', 999), \
-         patch.object(quiz, 'load_rating', return_value={}), \
-         patch.object(quiz, 'save_rating') as mock_save_rating, \
+         patch.object(quiz, 'get_config', lambda: SimpleNamespace(post_chat_id=999)), \
          patch.object(quiz, 'load_weekly_quiz_count', return_value=5), \
          patch.object(quiz, 'save_weekly_quiz_count') as mock_save_weekly_quiz_count:
-        
+
         # Вызываем тестируемую функцию
         await quiz.weekly_quiz_reset(context)
-        
+
         # Проверяем, что было отправлено сообщение о отсутствии победителей
         assert bot.send_message.call_count == 1
-        
+
         # Получаем аргументы вызова send_message
         args, kwargs = bot.send_message.call_args
         assert kwargs['chat_id'] == 999
         assert "никто не набрал" in kwargs['text'].lower()
-        
-        # Проверяем вызовы функций
-        assert mock_save_rating.call_count == 1
-        saved_data = mock_save_rating.call_args[0][0]
+
+        # Проверяем сохранённый рейтинг
+        saved_data = _read_rating(leaderboard)
         assert isinstance(saved_data, dict)
         assert len(saved_data) == 0  # Пустой словарь
-        
+
         # Проверяем, что счетчик викторин был сброшен
-        mock_save_weekly_quiz_count.assert_called_once_with(0)
\ No newline at end of file
+        mock_save_weekly_quiz_count.assert_called_once_with(0)
@@ -0,0 +1,101 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+
+try:
+    from rate_limiter import (
+        OutboundRateLimiter, TokenBucket, request_priority,
+        PRIORITY_POST, PRIORITY_NORMAL, PRIORITY_COSMETIC,
+    )
+    from telegram.error import RetryAfter
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов rate_limiter: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def test_token_bucket_refill_and_pause():
+    bucket = TokenBucket(rate=2, capacity=2, now=0.0)
+    bucket.consume(0.0)
+    bucket.consume(0.0)
+    assert bucket.wait_time(0.0) == pytest.approx(0.5)
+    assert bucket.wait_time(0.5) == 0
+
+    bucket.pause(10.0)
+    assert bucket.wait_time(1.0) == pytest.approx(9.0)
+    # Стоимость больше ёмкости ограничивается ёмкостью, иначе запрос не прошёл бы никогда
+    assert bucket.wait_time(10.0, cost=5) == 0
+
+
+def test_request_priority():
+    assert request_priority('sendMediaGroup') == PRIORITY_POST
+    assert request_priority('sendMessage') == PRIORITY_NORMAL
+    assert request_priority('editMessageText') == PRIORITY_COSMETIC
+    assert request_priority('deleteMessage') == PRIORITY_COSMETIC
+    assert request_priority('editMessageText', {"priority": PRIORITY_POST}) == PRIORITY_POST
+
+
+async def _send(limiter, log, endpoint, chat_id=-100):
+    async def callback():
+        log.append(endpoint)
+        return endpoint
+    return await limiter.process_request(callback, (), {}, endpoint, {"chat_id": chat_id}, None)
+
+
+@pytest.mark.asyncio
+async def test_posts_go_before_cosmetic_edits():
+    limiter = OutboundRateLimiter(overall_rate=100, group_chat_rate=100, group_chat_burst=1)
+    log = []
+
+    await asyncio.gather(
+        _send(limiter, log, 'editMessageText'),
+        _send(limiter, log, 'sendMessage'),
+        _send(limiter, log, 'sendPhoto'),
+    )
+
+    assert log == ['sendPhoto', 'sendMessage', 'editMessageText']
+    assert limiter.pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_limit_delays_only_that_chat():
+    limiter = OutboundRateLimiter(private_chat_rate=10, private_chat_burst=1)
+    loop = asyncio.get_running_loop()
+    log = []
+
+    start = loop.time()
+    await asyncio.gather(_send(limiter, log, 'sendMessage', 1), _send(limiter, log, 'sendMessage', 2))
+    assert loop.time() - start < 0.05
+
+    start = loop.time()
+    await asyncio.gather(_send(limiter, log, 'sendMessage', 3), _send(limiter, log, 'sendMessage', 3))
+    assert loop.time() - start >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_retried():
+    limiter = OutboundRateLimiter()
+    callback = AsyncMock(side_effect=[RetryAfter(0), "ok"])
+
+    result = await limiter.process_request(callback, (), {}, 'sendMessage', {"chat_id": 1}, None)
+
+    assert result == "ok"
+    assert callback.await_count == 2
+    assert limiter.metrics['retries'] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_gives_up_after_max_retries():
+    limiter = OutboundRateLimiter(max_retries=1)
+    callback = AsyncMock(side_effect=RetryAfter(0))
+
+    with pytest.raises(RetryAfter):
+        await limiter.process_request(callback, (), {}, 'sendMessage', {"chat_id": 1}, None)
+    assert callback.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unlimited_endpoints_pass_through():
+    limiter = OutboundRateLimiter()
+    callback = AsyncMock(return_value="me")
+
+    assert await limiter.process_request(callback, (), {}, 'getMe', {}, None) == "me"
+    assert limiter.metrics['requests'] == 0
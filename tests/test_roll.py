@@ -1,6 +1,7 @@
 import pytest
 import time
 import asyncio
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock, ANY, mock_open, call
 
 # Импортируем тестируемые функции и переменные
@@ -43,13 +44,10 @@ async def get_inner_roll_command():
 # Тестируем внутреннюю логику _roll_command
 @pytest.mark.asyncio
 @patch('time.time')
-@patch('asyncio.sleep', return_value=None)
-@patch('random.randint', return_value=4) # Фиксированный результат броска
+@patch('handlers.roll._random.randint', return_value=4) # Фиксированный результат броска
 @patch('builtins.open', new_callable=mock_open, read_data=b'imagedata')
-@patch('handlers.roll.DICE_GIF_ID', 'test_gif_id') # Мок ID гифки
-@patch('handlers.roll.COOLDOWN', 5) # Мок кулдауна
-@patch('handlers.roll.last_roll_time', {}) # Чистим словарь кулдауна перед тестом
-async def test_roll_command_logic_default(mock_open_file, mock_randint, mock_sleep, mock_time):
+@patch('handlers.roll.get_config', lambda: SimpleNamespace(dice_gif_id='test_gif_id', cooldown=5)) # Мок ID гифки и кулдауна
+async def test_roll_command_logic_default(mock_open_file, mock_randint, mock_time, job_queue):
     # Получаем внутреннюю функцию
     inner_func = await get_inner_roll_command()
     
@@ -61,6 +59,7 @@ async def test_roll_command_logic_default(mock_open_file, mock_randint, mock_sle
     update.effective_user = user
     update.effective_chat.id = 987
     context = MagicMock()
+    context.job_queue = job_queue
     context.args = [] # Нет аргументов, кубик d6
     context.bot = AsyncMock()
     # Мок для send_animation возвращает объект сообщения с ID
@@ -74,11 +73,11 @@ async def test_roll_command_logic_default(mock_open_file, mock_randint, mock_sle
     
     # Вызываем захваченную внутреннюю функцию
     await inner_func(update, context)
+    # Результат ещё не показан: обработчик не ждёт окончания броска
+    context.bot.edit_message_media.assert_not_called()
+    await job_queue.run_all()
     
-    # Проверка кулдауна (первый вызов)
-    from handlers.roll import last_roll_time
-    assert last_roll_time[123] == 100.0
-    context.bot.send_message.assert_not_called() # Сообщения об ошибке кулдауна нет
+    context.bot.send_message.assert_not_called() # Сообщений об ошибке нет
     
     # Проверка отправки анимации
     context.bot.send_animation.assert_awaited_once_with(
@@ -86,7 +85,7 @@ async def test_roll_command_logic_default(mock_open_file, mock_randint, mock_sle
         animation='test_gif_id', 
         caption="Кубик катится... 🎲"
     )
-    mock_sleep.assert_awaited_once_with(1)
+    assert job_queue.delays == [1]
     
     # Проверка генерации результата (d6)
     mock_randint.assert_called_once_with(1, 6)
@@ -111,46 +110,12 @@ async def test_roll_command_logic_default(mock_open_file, mock_randint, mock_sle
     assert button.text == "Перебросить (0)"
     assert button.callback_data == "roll|6|0"
 
-@pytest.mark.asyncio
-@patch('time.time')
-@patch('handlers.roll.COOLDOWN', 5)
-@patch('handlers.roll.last_roll_time', {123: 98.0}) # Последний бросок 2 сек назад
-async def test_roll_command_logic_cooldown(mock_time):
-    # Получаем внутреннюю функцию
-    inner_func = await get_inner_roll_command()
-    
-    update = MagicMock(spec=Update)
-    user = MagicMock(spec=User)
-    user.id = 123
-    update.effective_user = user
-    update.effective_chat.id = 987
-    context = MagicMock()
-    context.args = []
-    context.bot = AsyncMock()
-    context.bot.send_message = AsyncMock()
-    
-    mock_time.return_value = 100.0 # Текущее время (100 - 98 = 2 сек < 5 сек)
-    
-    await inner_func(update, context)
-    
-    # Проверка сообщения о кулдауне
-    context.bot.send_message.assert_awaited_once()
-    args = context.bot.send_message.call_args
-    assert args.kwargs['chat_id'] == 987
-    assert "Слишком быстрый бросок!" in args.kwargs['text']
-    assert "Подождите 3.0 секунд." in args.kwargs['text']
-    context.bot.send_animation.assert_not_called() # Анимация не должна отправляться
-    context.bot.edit_message_media.assert_not_called()
-
 @pytest.mark.asyncio
 @patch('time.time', return_value=100.0)
-@patch('asyncio.sleep', return_value=None)
-@patch('random.randint', return_value=15)
+@patch('handlers.roll._random.randint', return_value=15)
 @patch('builtins.open', new_callable=mock_open, read_data=b'imagedata')
-@patch('handlers.roll.DICE_GIF_ID', 'test_gif_id')
-@patch('handlers.roll.COOLDOWN', 5)
-@patch('handlers.roll.last_roll_time', {}) 
-async def test_roll_command_logic_with_arg(mock_open_file, mock_randint, mock_sleep, mock_time):
+@patch('handlers.roll.get_config', lambda: SimpleNamespace(dice_gif_id='test_gif_id', cooldown=5))
+async def test_roll_command_logic_with_arg(mock_open_file, mock_randint, mock_time, job_queue):
     # Получаем внутреннюю функцию
     inner_func = await get_inner_roll_command()
     
@@ -161,6 +126,7 @@ async def test_roll_command_logic_with_arg(mock_open_file, mock_randint, mock_sl
     update.effective_user = user
     update.effective_chat.id = 987
     context = MagicMock()
+    context.job_queue = job_queue
     context.args = ["20"] # Бросок d20
     context.bot = AsyncMock()
     mock_sent_message = MagicMock(spec=Message)
@@ -170,6 +136,7 @@ async def test_roll_command_logic_with_arg(mock_open_file, mock_randint, mock_sl
     context.bot.edit_message_media = AsyncMock()
     
     await inner_func(update, context)
+    await job_queue.run_all()
     
     mock_randint.assert_called_once_with(1, 20) # Проверка диапазона d20
     
@@ -183,7 +150,6 @@ async def test_roll_command_logic_with_arg(mock_open_file, mock_randint, mock_sl
 
 @pytest.mark.asyncio
 @patch('time.time', return_value=100.0)
-@patch('handlers.roll.last_roll_time', {}) 
 async def test_roll_command_logic_invalid_arg(mock_time):
     # Получаем внутреннюю функцию
     inner_func = await get_inner_roll_command()
@@ -207,13 +173,10 @@ async def test_roll_command_logic_invalid_arg(mock_time):
 
 @pytest.mark.asyncio
 @patch('time.time', return_value=200.0)
-@patch('asyncio.sleep', return_value=None)
-@patch('random.randint', return_value=18) # Новый результат
+@patch('handlers.roll._random.randint', return_value=18) # Новый результат
 @patch('builtins.open', new_callable=mock_open, read_data=b'imagedata')
-@patch('handlers.roll.DICE_GIF_ID', 'test_gif_id') 
-@patch('handlers.roll.COOLDOWN', 5) 
-@patch('handlers.roll.last_roll_time', {}) 
-async def test_roll_callback_logic(mock_open_file, mock_randint, mock_sleep, mock_time):
+@patch('handlers.roll.get_config', lambda: SimpleNamespace(dice_gif_id='test_gif_id', cooldown=5))
+async def test_roll_callback_logic(mock_open_file, mock_randint, mock_time, job_queue):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     query.answer = AsyncMock()
@@ -224,16 +187,15 @@ async def test_roll_callback_logic(mock_open_file, mock_randint, mock_sleep, moc
     query.edit_message_media = AsyncMock()
     update.callback_query = query
     context = MagicMock()
+    context.job_queue = job_queue
     
     await roll_callback(update, context)
+    assert query.edit_message_media.await_count == 1  # пока только анимация
+    await job_queue.run_all()
     
     # Проверяем ответ на callback
     query.answer.assert_awaited_once()
     
-    # Проверяем кулдаун
-    from handlers.roll import last_roll_time
-    assert last_roll_time[456] == 200.0
-    
     # Проверяем редактирование на анимацию
     query.edit_message_media.assert_awaited()
     media_animation_call = query.edit_message_media.call_args_list[0]
@@ -241,7 +203,7 @@ async def test_roll_callback_logic(mock_open_file, mock_randint, mock_sleep, moc
     assert media_animation_call.kwargs['media'].media == 'test_gif_id'
     
     # Проверяем задержку
-    mock_sleep.assert_awaited_once_with(1)
+    assert job_queue.delays == [1]
     
     # Проверяем рандом
     mock_randint.assert_called_once_with(1, 10)
@@ -257,27 +219,3 @@ async def test_roll_callback_logic(mock_open_file, mock_randint, mock_sleep, moc
     button = keyboard.inline_keyboard[0][0]
     assert button.text == "Перебросить (3)"
     assert button.callback_data == "roll|10|3"
-
-@pytest.mark.asyncio
-@patch('time.time', return_value=200.0)
-@patch('handlers.roll.COOLDOWN', 5)
-@patch('handlers.roll.last_roll_time', {456: 198.0}) # Переброс 2 сек назад
-async def test_roll_callback_logic_cooldown(mock_time):
-    update = MagicMock(spec=Update)
-    query = MagicMock(spec=CallbackQuery)
-    query.answer = AsyncMock()
-    user = MagicMock(spec=User)
-    user.id = 456
-    query.from_user = user
-    query.data = "roll|10|2" 
-    update.callback_query = query
-    context = MagicMock()
-    
-    await roll_callback(update, context)
-    
-    # Проверка сообщения о кулдауне
-    query.answer.assert_awaited_with(
-        text="Слишком быстро! Подождите 3.0 секунд.",
-        show_alert=True
-    )
-    query.edit_message_media.assert_not_called() 
\ No newline at end of file
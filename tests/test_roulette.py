@@ -1,8 +1,7 @@
 import pytest
 import asyncio
-import json
 import random
-from unittest.mock import patch, mock_open, MagicMock, AsyncMock, call, ANY
+from unittest.mock import patch, MagicMock, AsyncMock, ANY
 
 # Импортируем тестируемый модуль и его функции
 try:
@@ -16,33 +15,32 @@ try:
     )
     # Импортируем зависимости для мокирования
     import balance
+    from casino.session import CasinoSessionManager
     import casino.roulette_utils as roulette_utils
     from telegram import Update, InlineKeyboardMarkup, User, CallbackQuery, Message, Chat
     from telegram.error import TimedOut
 except ImportError as e:
     pytest.skip(f"Пропуск тестов roulette: не удалось импортировать модуль casino.roulette или его зависимости ({e}).", allow_module_level=True)
 
+@pytest.fixture(autouse=True)
+def sessions():
+    """Отдельные сессии казино для каждого теста."""
+    manager = CasinoSessionManager(flush_delay=0)
+    with patch('casino.roulette.casino_sessions', manager):
+        yield manager
+
 # --- Тесты для load_file_ids ---
 
-@patch('builtins.open', new_callable=mock_open, read_data='{"animations": {"roulette": {"red": ["id1"], "black": ["id2"], "zero": ["id3"]}}}')
-@patch('os.path.join', return_value='config/file_ids.json') # Мок пути
-def test_load_file_ids_success(mock_join, mock_file):
-    ids = load_file_ids()
-    assert ids == {'animations': {'roulette': {'red': ['id1'], 'black': ['id2'], 'zero': ['id3']}}}
-    mock_join.assert_called_once_with('config', 'file_ids.json')
-    mock_file.assert_called_once_with('config/file_ids.json', 'r', encoding='utf-8')
+@patch('casino.roulette.get_config')
+def test_load_file_ids_success(mock_get_config):
+    file_ids = {'animations': {'roulette': {'red': ['id1'], 'black': ['id2'], 'zero': ['id3']}}}
+    mock_get_config.return_value = MagicMock(file_ids=file_ids)
+    assert load_file_ids() == file_ids
 
 @patch('builtins.open', side_effect=FileNotFoundError)
-@patch('os.path.join', return_value='config/file_ids.json')
-def test_load_file_ids_not_found(mock_join, mock_file):
-    with pytest.raises(FileNotFoundError):
-        load_file_ids()
-
-@patch('builtins.open', new_callable=mock_open, read_data='invalid json')
-@patch('os.path.join', return_value='config/file_ids.json')
-def test_load_file_ids_invalid_json(mock_join, mock_file):
-    with pytest.raises(json.JSONDecodeError):
-        load_file_ids()
+def test_load_file_ids_no_disk_access(mock_file):
+    load_file_ids()
+    mock_file.assert_not_called()
 
 # --- Тесты для safe_delete_message ---
 
@@ -84,8 +82,8 @@ async def test_safe_delete_message_failure_all_retries(mock_print, mock_sleep):
 # --- Тесты для handle_roulette_bet --- (Меню ставок)
 
 @pytest.mark.asyncio
-@patch('casino.roulette.get_balance', return_value=100)
-async def test_handle_roulette_bet_display(mock_get_balance):
+@patch('casino.session.get_balance', return_value=100)
+async def test_handle_roulette_bet_display(mock_get_balance, sessions):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     query.message = MagicMock(spec=Message)
@@ -97,7 +95,7 @@ async def test_handle_roulette_bet_display(mock_get_balance):
     update.effective_user = user
     
     context = MagicMock()
-    context.user_data = {'bet_amount': 10} # Текущая ставка
+    sessions.set_game_bet(111, 'roulette', 10) # Текущая ставка
     
     await handle_roulette_bet(update, context)
     
@@ -133,9 +131,9 @@ async def test_handle_roulette_bet_display(mock_get_balance):
 # --- Тесты для handle_change_bet ---
 
 @pytest.mark.asyncio
-@patch('casino.roulette.get_balance', return_value=100)
+@patch('casino.session.get_balance', return_value=100)
 @patch('casino.roulette.handle_roulette_bet') # Мокаем функцию отображения меню
-async def test_handle_change_bet_increase(mock_handle_bet_display, mock_get_balance):
+async def test_handle_change_bet_increase(mock_handle_bet_display, mock_get_balance, sessions):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     query.data = "change_bet:+5"
@@ -145,19 +143,19 @@ async def test_handle_change_bet_increase(mock_handle_bet_display, mock_get_bala
     update.effective_user = user
     
     context = MagicMock()
-    context.user_data = {'bet_amount': 10}
+    sessions.set_game_bet(222, 'roulette', 10)
     
     await handle_change_bet(update, context)
     
     mock_get_balance.assert_called_once_with(222)
-    assert context.user_data['bet_amount'] == 15 # Ставка увеличилась
+    assert sessions.game_bet(222, 'roulette') == 15 # Ставка увеличилась
     # Проверяем, что была вызвана функция для обновления меню
     mock_handle_bet_display.assert_awaited_once_with(update, context)
 
 @pytest.mark.asyncio
-@patch('casino.roulette.get_balance', return_value=100)
+@patch('casino.session.get_balance', return_value=100)
 @patch('casino.roulette.handle_roulette_bet')
-async def test_handle_change_bet_decrease(mock_handle_bet_display, mock_get_balance):
+async def test_handle_change_bet_decrease(mock_handle_bet_display, mock_get_balance, sessions):
     # ... (аналогично, но с "change_bet:-5") ...
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
@@ -167,17 +165,17 @@ async def test_handle_change_bet_decrease(mock_handle_bet_display, mock_get_bala
     user.id = 222
     update.effective_user = user
     context = MagicMock()
-    context.user_data = {'bet_amount': 10}
+    sessions.set_game_bet(222, 'roulette', 10)
     
     await handle_change_bet(update, context)
     
-    assert context.user_data['bet_amount'] == 5 # Ставка уменьшилась до минимума
+    assert sessions.game_bet(222, 'roulette') == 5 # Ставка уменьшилась до минимума
     mock_handle_bet_display.assert_awaited_once_with(update, context)
 
 @pytest.mark.asyncio
-@patch('casino.roulette.get_balance', return_value=100)
+@patch('casino.session.get_balance', return_value=100)
 @patch('casino.roulette.handle_roulette_bet')
-async def test_handle_change_bet_min_limit(mock_handle_bet_display, mock_get_balance):
+async def test_handle_change_bet_min_limit(mock_handle_bet_display, mock_get_balance, sessions):
     # ... (уменьшаем ставку, которая уже минимальна) ...
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
@@ -187,17 +185,17 @@ async def test_handle_change_bet_min_limit(mock_handle_bet_display, mock_get_bal
     user.id = 222
     update.effective_user = user
     context = MagicMock()
-    context.user_data = {'bet_amount': 5} # Уже минимальная ставка
+    sessions.set_game_bet(222, 'roulette', 5) # Уже минимальная ставка
 
     await handle_change_bet(update, context)
     
-    assert context.user_data['bet_amount'] == 5 # Ставка не изменилась
+    assert sessions.game_bet(222, 'roulette') == 5 # Ставка не изменилась
     mock_handle_bet_display.assert_awaited_once_with(update, context)
 
 @pytest.mark.asyncio
-@patch('casino.roulette.get_balance', return_value=20) # Низкий баланс
+@patch('casino.session.get_balance', return_value=20) # Низкий баланс
 @patch('casino.roulette.handle_roulette_bet')
-async def test_handle_change_bet_max_limit(mock_handle_bet_display, mock_get_balance):
+async def test_handle_change_bet_max_limit(mock_handle_bet_display, mock_get_balance, sessions):
     # ... (увеличиваем ставку, когда она почти равна балансу) ...
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
@@ -207,26 +205,24 @@ async def test_handle_change_bet_max_limit(mock_handle_bet_display, mock_get_bal
     user.id = 222
     update.effective_user = user
     context = MagicMock()
-    context.user_data = {'bet_amount': 18} # Близко к балансу
+    sessions.set_game_bet(222, 'roulette', 18) # Близко к балансу
 
     await handle_change_bet(update, context)
     
-    assert context.user_data['bet_amount'] == 20 # Ставка увеличилась до баланса
+    assert sessions.game_bet(222, 'roulette') == 20 # Ставка увеличилась до баланса
     mock_handle_bet_display.assert_awaited_once_with(update, context)
 
 # --- Тесты для handle_roulette_bet_callback --- (Обработка результата)
 
 @pytest.mark.asyncio
-@patch('casino.roulette.get_balance')
-@patch('casino.roulette.update_balance')
+@patch('casino.roulette.casino_sessions.settle')
 @patch('casino.roulette.get_roulette_result', return_value='red') # Результат - красное
 @patch('casino.roulette.load_file_ids', return_value={'animations': {'roulette': {'red': ['gif_red']}}})
-@patch('random.choice', return_value='gif_red')
+@patch('casino.roulette._random.choice', return_value='gif_red')
 @patch('casino.roulette.safe_delete_message', return_value=None)
-@patch('asyncio.sleep', return_value=None)
 async def test_handle_roulette_bet_callback_win_red(
-    mock_sleep, mock_safe_delete, mock_random_choice, mock_load_ids, 
-    mock_get_result, mock_update_balance, mock_get_balance
+    mock_safe_delete, mock_random_choice, mock_load_ids,
+    mock_get_result, mock_settle, job_queue
 ):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
@@ -241,22 +237,27 @@ async def test_handle_roulette_bet_callback_win_red(
     query.data = f"roulette_bet:red:{bet}" # Ставка на красное
     update.callback_query = query
     context = MagicMock()
+    context.job_queue = job_queue
     
-    mock_get_balance.side_effect = [1000, 1000 - bet + (100 * (bet / 50))] # Баланс до, баланс после
+    mock_settle.return_value = int(1000 - bet + (100 * (bet / 50))) # Баланс после ставки
     
     await handle_roulette_bet_callback(query, context, 'red')
     
-    mock_get_balance.assert_called()
     mock_get_result.assert_called_once()
     mock_load_ids.assert_called_once()
     mock_random_choice.assert_called_once_with(['gif_red']) # Выбор гифки
     query.message.chat.send_animation.assert_awaited_once_with('gif_red')
-    mock_sleep.assert_awaited_once_with(5.5)
+    # Обработчик не ждёт окончания анимации: результат показывается задачей JobQueue
+    query.answer.assert_awaited_once()
+    query.message.edit_text.assert_not_awaited()
+    assert job_queue.delays == [5.5]
+
+    await job_queue.run_all()
     mock_safe_delete.assert_awaited_once() # Проверка удаления гифки
     
-    # Проверка обновления баланса (списание + выигрыш)
+    # Проверка обновления баланса (списание + выигрыш одной операцией)
     expected_winnings = int(100 * (bet / 50))
-    mock_update_balance.assert_has_calls([call(333, -bet), call(333, expected_winnings)])
+    mock_settle.assert_called_once_with(333, bet, expected_winnings, game='roulette')
     
     # Проверка сообщения
     query.message.edit_text.assert_awaited_once()
@@ -268,11 +269,69 @@ async def test_handle_roulette_bet_callback_win_red(
     # ... (проверка кнопок) ...
     query.answer.assert_awaited_once()
 
+def _bet_query(user_id=333, bet=50, bet_type='red'):
+    query = MagicMock(spec=CallbackQuery)
+    query.answer = AsyncMock()
+    query.edit_message_reply_markup = AsyncMock()
+    query.from_user = MagicMock(spec=User)
+    query.from_user.id = user_id
+    query.message = MagicMock(spec=Message)
+    query.message.chat_id = -100
+    query.message.message_id = 7
+    query.message.chat = MagicMock(spec=Chat)
+    query.message.chat.send_animation = AsyncMock(return_value=MagicMock())
+    query.message.edit_text = AsyncMock()
+    query.data = f"roulette_bet:{bet_type}:{bet}"
+    return query
+
+@pytest.mark.asyncio
+@patch('casino.roulette.casino_sessions.settle', side_effect=[1050, 1100])
+@patch('casino.roulette.get_roulette_result', return_value='red')
+@patch('casino.roulette.load_file_ids', return_value={'animations': {'roulette': {'red': ['gif_red']}}})
+@patch('casino.roulette.safe_delete_message')
+async def test_handle_roulette_bet_callback_repeat_press_keeps_both_results(
+    mock_safe_delete, mock_load_ids, mock_get_result, mock_settle, job_queue
+):
+    """Повторное нажатие на то же сообщение не теряет результат первого спина."""
+    query = _bet_query()
+    context = MagicMock()
+    context.job_queue = job_queue
+
+    await handle_roulette_bet_callback(query, context, 'red')
+    await handle_roulette_bet_callback(query, context, 'red')
+
+    # Кнопки ставок снимаются до списания
+    query.edit_message_reply_markup.assert_awaited_with(reply_markup=None)
+    await job_queue.run_all()
+    assert mock_safe_delete.await_count == 2
+    texts = [c.args[0] for c in query.message.edit_text.await_args_list]
+    assert len(texts) == 2
+    assert "1050" in texts[0] and "1100" in texts[1]
+
+@pytest.mark.asyncio
+@patch('casino.roulette.casino_sessions.settle', return_value=1050)
+@patch('casino.roulette.get_roulette_result', return_value='red')
+@patch('casino.roulette.load_file_ids', return_value={'animations': {'roulette': {'red': ['gif_red']}}})
+async def test_handle_roulette_bet_callback_animation_failure_shows_result(
+    mock_load_ids, mock_get_result, mock_settle, job_queue
+):
+    query = _bet_query()
+    query.message.chat.send_animation = AsyncMock(side_effect=Exception("network"))
+    context = MagicMock()
+    context.job_queue = job_queue
+
+    await handle_roulette_bet_callback(query, context, 'red')
+
+    query.answer.assert_awaited_once_with()
+    query.message.edit_text.assert_awaited_once()
+    assert "Ваш текущий баланс*: 1050" in query.message.edit_text.call_args.args[0]
+    assert job_queue.jobs == []
+
 # ... (Аналогичные тесты для выигрыша zero, проигрыша, недостатка баланса) ...
 
 @pytest.mark.asyncio
-@patch('casino.roulette.get_balance', return_value=10) # Недостаточно средств
-async def test_handle_roulette_bet_callback_insufficient_funds(mock_get_balance):
+@patch('casino.roulette.casino_sessions.settle', return_value=None) # Недостаточно средств
+async def test_handle_roulette_bet_callback_insufficient_funds(mock_settle):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     query.answer = AsyncMock()
@@ -285,8 +344,10 @@ async def test_handle_roulette_bet_callback_insufficient_funds(mock_get_balance)
 
     await handle_roulette_bet_callback(query, context, 'black')
     
-    mock_get_balance.assert_called_once_with(444)
+    mock_settle.assert_called_once_with(444, bet, ANY, game='roulette')
     query.answer.assert_awaited_once_with("💸 У вас недостаточно средств для ставки.", show_alert=True)
+    # Ставка не принята: кнопки ставок возвращаются
+    query.edit_message_reply_markup.assert_awaited_with(reply_markup=query.message.reply_markup)
     # Другие действия (отправка гифки, редактирование) не должны выполняться
     query.message.chat.send_animation.assert_not_called() 
     query.message.edit_text.assert_not_called() 
\ No newline at end of file
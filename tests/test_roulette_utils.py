@@ -18,19 +18,14 @@ def test_get_roulette_result_returns_valid_outcome():
         result = get_roulette_result()
         assert result in valid_outcomes
 
-@patch('random.choices') # Мокаем сам random.choices
-def test_get_roulette_result_calls_choices_correctly(mock_choices):
-    """Тест, что random.choices вызывается с правильными аргументами."""
-    # Устанавливаем возвращаемое значение, чтобы избежать IndexError
-    mock_choices.return_value = ['black'] 
-    
-    get_roulette_result()
-    
-    expected_outcomes = ['black', 'red', 'zero']
-    expected_probabilities = [17.5 / 36, 17.5 / 36, 1 / 36]
-    
-    # Проверяем, что choices был вызван один раз с ожидаемыми параметрами
-    mock_choices.assert_called_once_with(expected_outcomes, expected_probabilities)
+@patch('casino.roulette_utils._random.random')
+def test_get_roulette_result_uses_cumulative_table(mock_random):
+    """Тест, что исход выбирается по накопленным весам одним случайным числом."""
+    # Накопленные веса: black 17.5, red 35, zero 36 (из 36)
+    mock_random.side_effect = [0.0, 0.5, 0.99]
+
+    assert [get_roulette_result() for _ in range(3)] == ['black', 'red', 'zero']
+    assert mock_random.call_count == 3
 
 def test_get_roulette_result_distribution():
     """
@@ -1,5 +1,6 @@
 import pytest
 import datetime as real_datetime
+from types import SimpleNamespace
 import json
 from pathlib import Path
 from unittest.mock import patch, mock_open, MagicMock, AsyncMock, call, ANY
@@ -26,6 +27,7 @@ try:
     import autopost
     import quiz
     import wisdom
+    from telegram import InputMediaPhoto, InputMediaVideo
 
 except ImportError as e:
     pytest.skip(f"Пропуск тестов scheduler: не удалось импортировать модуль scheduler или его зависимости ({e}).", allow_module_level=True)
@@ -95,7 +97,7 @@ async def test_reschedule_all_posts(mock_datetime, mock_save, mock_load):
     mock_load.assert_called_once()
 
     # Проверка поста в прошлом (past_post)
-    context.bot.send_message.assert_awaited_once_with(chat_id=10, text="Past", read_timeout=300)
+    context.bot.send_message.assert_awaited_once_with(chat_id=10, text="Past")
 
     # Проверка поста в будущем (future_post)
     expected_future_time = real_datetime.datetime(2024, 1, 1, 12, 0, 0)
@@ -139,12 +141,36 @@ async def test_delayed_post_callback_success(mock_save, mock_load):
     # Вместо проверки на один вызов проверяем, что функция была вызвана хотя бы один раз
     assert mock_load.call_count > 0
     # Проверяем отправку видео
-    context.bot.send_video.assert_awaited_once_with(chat_id=50, video="vid_id", caption="Delayed Video", read_timeout=300)
+    context.bot.send_video.assert_awaited_once_with(chat_id=50, video="vid_id", caption="Delayed Video")
     context.bot.send_message.assert_not_awaited()
     # Проверяем, что пост удален из сохраненных
     expected_saved_data = {"other_post": {}}
     mock_save.assert_called_once_with(expected_saved_data)
 
+@pytest.mark.asyncio
+@patch('scheduler.load_scheduled_posts')
+@patch('scheduler.save_scheduled_posts')
+async def test_delayed_post_callback_media_group(mock_save, mock_load):
+    """Сохранённый альбом отправляется одним send_media_group, caption - на первом файле."""
+    context = MagicMock()
+    context.bot = AsyncMock()
+    post_data = {
+        "datetime": "2024-01-01T13:00:00", "chat_id": 50, "text": "Альбом", "is_media_group": True,
+        "media_files": [{"file_id": "p1", "type": "photo"}, {"file_id": "v1", "type": "video"}]
+    }
+    mock_load.return_value = {"album": post_data}
+    context.job = MagicMock()
+    context.job.data = {"post_id": "album"}
+
+    await delayed_post_callback(context)
+
+    media = context.bot.send_media_group.await_args.kwargs['media']
+    assert [type(m) for m in media] == [InputMediaPhoto, InputMediaVideo]
+    assert [m.media for m in media] == ["p1", "v1"]
+    assert media[0].caption == "Альбом"
+    assert media[1].caption is None
+    mock_save.assert_called_once_with({})
+
 @pytest.mark.asyncio
 @patch('scheduler.load_scheduled_posts', return_value={"other": {}}) # Пост не найден
 @patch('scheduler.save_scheduled_posts')
@@ -188,7 +214,7 @@ def test_schedule_autopost_for_today():
     # Применяем патчи через with
     with patch('scheduler.parse_time_from_string', side_effect=parse_time_side_effect) as mock_parse_time, \
          patch('scheduler.random_time_in_range') as mock_random_time, \
-         patch('scheduler.schedule_config', config_patch_value) as mock_schedule_cfg:
+         patch('scheduler.get_config', return_value=SimpleNamespace(schedule=config_patch_value)):
 
         # Настраиваем side_effect для mock_random_time внутри with
         mock_random_time.side_effect = random_time_side_effect
@@ -225,7 +251,7 @@ def test_schedule_quizzes_for_today_enabled():
     # Применяем патчи через with
     with patch('scheduler.parse_time_from_string', side_effect=parse_time_side_effect) as mock_parse_time, \
          patch('scheduler.random_time_in_range') as mock_random_time, \
-         patch('scheduler.schedule_config', config_patch_value) as mock_schedule_cfg, \
+         patch('scheduler.get_config', return_value=SimpleNamespace(schedule=config_patch_value)), \
          patch('scheduler.state.quiz_enabled', True) as mock_quiz_state:
 
         # Настраиваем side_effect для mock_random_time внутри with
@@ -248,7 +274,7 @@ def test_schedule_quizzes_for_today_disabled_state():
     config_patch_value = {'quiz': {'enabled': True, 'quiz_times': []}}
 
     # Применяем патчи через with
-    with patch('scheduler.schedule_config', config_patch_value) as mock_schedule_cfg, \
+    with patch('scheduler.get_config', return_value=SimpleNamespace(schedule=config_patch_value)), \
          patch('scheduler.state.quiz_enabled', False) as mock_quiz_state:
 
         job_queue = MagicMock()
@@ -261,7 +287,7 @@ def test_schedule_quizzes_for_today_disabled_config():
     config_patch_value = {'quiz': {'enabled': False, 'quiz_times': []}}
 
     # Применяем патчи через with
-    with patch('scheduler.schedule_config', config_patch_value) as mock_schedule_cfg, \
+    with patch('scheduler.get_config', return_value=SimpleNamespace(schedule=config_patch_value)), \
          patch('scheduler.state.quiz_enabled', True) as mock_quiz_state:
 
         job_queue = MagicMock()
@@ -300,4 +326,82 @@ async def test_midnight_reset_callback(mock_weekly_reset, mock_sched_wisdom, moc
     mock_sched_wisdom.assert_called_once_with(job_queue)
     
     # Проверяем вызов сбросов
-    # mock_weekly_reset.assert_called_once() # Убираем эту проверку, т.к. weekly_reset здесь не вызывается 
\ No newline at end of file
+    # mock_weekly_reset.assert_called_once() # Убираем эту проверку, т.к. weekly_reset здесь не вызывается 
+# --- Тесты для перепланирования при изменении конфигурации ---
+
+def test_register_config_subscribers_reschedules_only_changed_subsystem():
+    """Тест: изменение раздела quiz перепланирует только викторины."""
+    job_queue = MagicMock()
+    old_quiz_job = MagicMock()
+    old_quiz_job.name = "quiz_1"
+    job_queue.jobs.return_value = [old_quiz_job]
+    job_queue.get_jobs_by_name.side_effect = lambda name: [old_quiz_job] if name == "quiz_1" else []
+
+    subscribers_before = list(config._subscribers)
+    with patch('scheduler.schedule_autopost_for_today') as mock_autopost, \
+         patch('scheduler.schedule_quizzes_for_today') as mock_quiz, \
+         patch('scheduler.schedule_wisdom_for_today') as mock_wisdom, \
+         patch('scheduler.schedule_betting_events') as mock_betting:
+        scheduler.register_config_subscribers(job_queue, MagicMock())
+        try:
+            config.notify_subscribers({"schedule_config.quiz": ({}, {"enabled": True})})
+        finally:
+            config._subscribers[:] = subscribers_before
+
+    old_quiz_job.schedule_removal.assert_called_once()
+    mock_quiz.assert_called_once_with(job_queue, only=["quiz_1"])
+    mock_autopost.assert_not_called()
+    mock_wisdom.assert_not_called()
+    mock_betting.assert_not_called()
+
+
+def _daily_job(name, next_t):
+    job = MagicMock()
+    job.name = name
+    job.next_t = next_t
+    return job
+
+
+def _notify(job_queue, changes):
+    subscribers_before = list(config._subscribers)
+    try:
+        scheduler.register_config_subscribers(job_queue, MagicMock())
+        config.notify_subscribers(changes)
+    finally:
+        config._subscribers[:] = subscribers_before
+
+
+def test_reload_keeps_unchanged_autopost_slots():
+    """Тест: перепланируются только слоты автопостинга с изменёнными настройками."""
+    later_today = real_datetime.datetime.now(real_datetime.timezone.utc)
+    jobs = {name: _daily_job(name, later_today) for name in scheduler.AUTOPOST_JOB_NAMES}
+    job_queue = MagicMock()
+    job_queue.get_jobs_by_name.side_effect = lambda name: [jobs[name]] if name in jobs else []
+    slot = {'time_range': {'start': '09:00', 'end': '10:00'}, 'days': [0, 1, 2, 3, 4, 5, 6]}
+    old = {name: slot for name in scheduler.AUTOPOST_JOB_NAMES}
+    new = dict(old, day_pics=dict(slot, time_range={'start': '15:00', 'end': '16:00'}))
+
+    with patch('scheduler.schedule_autopost_for_today') as mock_autopost:
+        _notify(job_queue, {"schedule_config.autopost": (old, new)})
+
+    mock_autopost.assert_called_once_with(job_queue, only=["day_pics"])
+    jobs["day_pics"].schedule_removal.assert_called_once()
+    for name in ("morning_pics", "day_videos", "evening_pics"):
+        jobs[name].schedule_removal.assert_not_called()
+
+
+def test_reload_does_not_repeat_slot_that_ran_today():
+    """Тест: викторина, уже прошедшая сегодня, не планируется повторно до полуночного сброса."""
+    tomorrow = real_datetime.datetime.now(real_datetime.timezone.utc) + real_datetime.timedelta(days=1)
+    done_job = _daily_job("quiz_1", tomorrow)
+    job_queue = MagicMock()
+    job_queue.jobs.return_value = [done_job]
+    job_queue.get_jobs_by_name.side_effect = lambda name: [done_job] if name == "quiz_1" else []
+    old = {'enabled': True, 'quiz_times': [{'time_range': {'start': '08:00', 'end': '08:30'}, 'days': [0]}]}
+    new = {'enabled': True, 'quiz_times': [{'time_range': {'start': '22:00', 'end': '22:30'}, 'days': [0]}]}
+
+    with patch('scheduler.schedule_quizzes_for_today') as mock_quiz:
+        _notify(job_queue, {"schedule_config.quiz": (old, new)})
+
+    done_job.schedule_removal.assert_called_once()
+    mock_quiz.assert_not_called()
@@ -10,16 +10,18 @@ import random # Добавим импорт random
 from telegram import Update, Message, User, Chat, PhotoSize, InputMediaPhoto, InputMediaVideo, InputMediaAudio, InputMediaDocument # Добавим остальные InputMedia*
 from telegram.ext import ContextTypes, JobQueue, Job
 
-# Импортируем тестируемые функции и константу POST_CHAT_ID
+# Импортируем тестируемые функции и доступ к настройкам
 # Предполагается, что scheduler.py находится в корне проекта или настроен PYTHONPATH
 try:
-    from scheduler import talk_media_group_command, send_media_group_callback, POST_CHAT_ID, logger # Импортируем и логгер
+    from scheduler import talk_media_group_command, send_media_group_callback, get_config, logger # Импортируем и логгер
+    from media_groups import MediaGroupAggregator, MediaItem
 except ImportError:
     # Если запуск тестов идет из другой директории, можно попробовать так:
     import sys
     import os
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-    from scheduler import talk_media_group_command, send_media_group_callback, POST_CHAT_ID, logger
+    from scheduler import talk_media_group_command, send_media_group_callback, get_config, logger
+    from media_groups import MediaGroupAggregator, MediaItem
 
 
 class TestTalkMediaGroup(unittest.TestCase):
@@ -58,8 +60,8 @@ class TestTalkMediaGroup(unittest.TestCase):
         self.context.bot = self.bot_mock 
         self.context.job_queue = self.job_queue_mock
 
-        # Устанавливаем POST_CHAT_ID (если он импортирован)
-        self.target_chat_id = POST_CHAT_ID if 'POST_CHAT_ID' in globals() else -1001234567890 # Запасной ID
+        # Чат для публикаций из текущих настроек
+        self.target_chat_id = get_config().post_chat_id
 
     def _create_mock_photo_message(self, user_id, chat_id, media_group_id, file_id, caption=None):
         """Вспомогательная функция для создания мока сообщения с фото"""
@@ -91,88 +93,40 @@ class TestTalkMediaGroup(unittest.TestCase):
         file_ids = ["file1", "file2", "file3"]
         caption_command = "/talk Тестовый альбом"
         expected_caption = "Тестовый альбом"
-        job_name = f"send_group_{media_group_id}"
-
-        # 1. Имитируем получение первого сообщения с caption
-        update1, _ = self._create_mock_photo_message(user_id, chat_id, media_group_id, file_ids[0], caption=caption_command)
-        asyncio.run(talk_media_group_command(update1, self.context))
-
-        # Проверка: создана запись в bot_data, запланирована задача
-        self.assertIn('media_groups', self.context.bot_data)
-        self.assertIn(str(media_group_id), self.context.bot_data['media_groups'])
-        group_data = self.context.bot_data['media_groups'][str(media_group_id)]
-        self.assertEqual(len(group_data['media']), 1)
-        self.assertIsInstance(group_data['media'][0], InputMediaPhoto)
-        self.assertEqual(group_data['media'][0].media, file_ids[0])
-        self.assertEqual(group_data['caption'], expected_caption)
-        self.assertEqual(group_data['chat_id'], chat_id)
-        self.assertFalse(group_data['processed'])
-        self.job_queue_mock.run_once.assert_called_once_with(
-            send_media_group_callback,
-            when=5, # Изменено с 2 на 5 секунд
-            data={'media_group_id': str(media_group_id)},
-            name=job_name
-        )
-        self.assertIn(job_name, self.scheduled_jobs) # Проверяем, что задача действительно 'запланирована'
-
-        # 2. Имитируем получение второго сообщения (без caption)
-        update2, _ = self._create_mock_photo_message(user_id, chat_id, media_group_id, file_ids[1], caption=None)
-        # Сбросим счетчик вызовов run_once перед вторым вызовом talk_command
-        self.job_queue_mock.run_once.reset_mock()
-        asyncio.run(talk_media_group_command(update2, self.context))
-
-        # Проверка: добавлен второй файл, таймер перезапущен
-        group_data = self.context.bot_data['media_groups'][str(media_group_id)]
-        self.assertEqual(len(group_data['media']), 2)
-        self.assertIsInstance(group_data['media'][1], InputMediaPhoto)
-        self.assertEqual(group_data['media'][1].media, file_ids[1])
-        # Убедимся, что run_once был вызван снова для перезапуска таймера
-        self.job_queue_mock.run_once.assert_called_once_with(
-             send_media_group_callback,
-             when=5, # Изменено с 2 на 5 секунд
-             data={'media_group_id': str(media_group_id)},
-             name=job_name
-        )
 
-        # 3. Имитируем получение третьего сообщения (без caption)
-        update3, _ = self._create_mock_photo_message(user_id, chat_id, media_group_id, file_ids[2], caption=None)
-        # Сбросим счетчик вызовов run_once перед третьим вызовом talk_command
-        self.job_queue_mock.run_once.reset_mock()
-        asyncio.run(talk_media_group_command(update3, self.context))
-
-         # Проверка: добавлен третий файл, таймер снова перезапущен
-        group_data = self.context.bot_data['media_groups'][str(media_group_id)]
-        self.assertEqual(len(group_data['media']), 3)
-        self.assertIsInstance(group_data['media'][2], InputMediaPhoto)
-        self.assertEqual(group_data['media'][2].media, file_ids[2])
-        self.job_queue_mock.run_once.assert_called_once_with(
-             send_media_group_callback,
-             when=5, # Изменено с 2 на 5 секунд
-             data={'media_group_id': str(media_group_id)},
-             name=job_name
-        )
+        # Отдельный сборщик с короткой задержкой, чтобы не ждать 5 секунд
+        aggregator = MediaGroupAggregator("test_talk", send_media_group_callback, delay=0.05)
+
+        async def scenario():
+            with patch('scheduler.talk_media_groups', aggregator):
+                # 1. Первое сообщение с caption
+                update1, _ = self._create_mock_photo_message(user_id, chat_id, media_group_id, file_ids[0], caption=caption_command)
+                await talk_media_group_command(update1, self.context)
+
+                # Проверка: группа создана в сборщике, job_queue не используется
+                group_data = aggregator.get(str(media_group_id))
+                self.assertIsNotNone(group_data)
+                self.assertEqual(len(group_data['media']), 1)
+                self.assertEqual(group_data['media'][0], MediaItem("photo", file_ids[0]))
+                self.assertEqual(group_data['caption'], expected_caption)
+                self.assertEqual(group_data['chat_id'], chat_id)
+                self.job_queue_mock.run_once.assert_not_called()
+
+                # 2-3. Последующие сообщения без caption
+                for file_id in file_ids[1:]:
+                    update, _ = self._create_mock_photo_message(user_id, chat_id, media_group_id, file_id, caption=None)
+                    await talk_media_group_command(update, self.context)
+
+                group_data = aggregator.get(str(media_group_id))
+                self.assertEqual([m.file_id for m in group_data['media']], file_ids)
+                self.bot_mock.send_media_group.assert_not_called()
+
+                # 4. Ждём срабатывания таймера группы
+                await asyncio.sleep(0.2)
+
+        asyncio.run(scenario())
 
-        # 4. Имитируем срабатывание таймера - вызываем callback
-        # Получаем последний запланированный callback
-        scheduled_task = self.scheduled_jobs.get(job_name)
-        self.assertIsNotNone(scheduled_task, f'Задача {job_name} не найдена в запланированных')
-        callback_func = scheduled_task['callback']
-        callback_job = scheduled_task['job']
-
-        # Передаем мок context в callback
-        # Важно: создаем новый мок Application для callback context
-        mock_callback_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE) # Создаем мок для callback context
-        mock_callback_context.application = MagicMock(bot=self.bot_mock) # Устанавливаем мок application с ботом
-        mock_callback_context.bot_data = self.context.bot_data # Передаем bot_data
-        # В callback_job.data тоже должна быть строка
-        callback_job.data = {'media_group_id': str(media_group_id)}
-        mock_callback_context.job = callback_job # Передаем мок задачи
-        mock_callback_context.bot = self.bot_mock # Добавим прямого бота, так как send_media_group_callback его использует
-
-        asyncio.run(callback_func(mock_callback_context))
-
-        # 5. Проверяем результат вызова callback
-        # Проверка вызова send_media_group
+        # 5. Проверяем результат
         self.bot_mock.send_media_group.assert_awaited_once()
         call_args, call_kwargs = self.bot_mock.send_media_group.call_args
 
@@ -198,8 +152,24 @@ class TestTalkMediaGroup(unittest.TestCase):
         # Вместо проверки конкретных значений, проверяем только, что метод был вызван
         self.assertTrue(self.bot_mock.send_message.called, "Метод send_message не был вызван")
         
-        # Проверяем, что группа удалена из bot_data
-        self.assertNotIn(str(media_group_id), self.context.bot_data.get('media_groups', {}))
+        # Проверяем, что группа удалена из сборщика и bot_data не используется
+        self.assertNotIn(str(media_group_id), aggregator)
+        self.assertEqual(aggregator.metrics['groups_completed'], 1)
+        self.assertNotIn('media_groups', self.context.bot_data)
+
+    @patch('scheduler.logger')
+    def test_media_group_without_talk_caption_ignored(self, mock_logger):
+        """Первое сообщение без /talk не создаёт группу"""
+        aggregator = MediaGroupAggregator("test_talk", send_media_group_callback, delay=0.05)
+
+        async def scenario():
+            with patch('scheduler.talk_media_groups', aggregator):
+                update, _ = self._create_mock_photo_message(1, 2, 555, "file1", caption=None)
+                await talk_media_group_command(update, self.context)
+
+        asyncio.run(scenario())
+        self.assertEqual(len(aggregator), 0)
+        self.bot_mock.send_media_group.assert_not_called()
 
 
 # Запуск тестов, если файл выполняется напрямую
@@ -0,0 +1,173 @@
+import json
+import random
+import sys
+import pytest
+
+try:
+    from session_store import SessionStore, record_size
+    from handlers.roulette import RouletteSession
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов session_store: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Record:
+    __slots__ = ('value', 'last_active')
+
+    def __init__(self, value, last_active=0.0):
+        self.value = value
+        self.last_active = last_active
+
+    def to_json(self):
+        return {"value": self.value, "last_active": self.last_active}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["value"], data["last_active"])
+
+
+def _store(**kwargs):
+    clock = Clock()
+    kwargs.setdefault('ttl', 60)
+    kwargs.setdefault('max_entries', 3)
+    return SessionStore(clock=clock, **kwargs), clock
+
+
+def test_lru_evicts_least_recently_used():
+    evicted = []
+    store, clock = _store(on_evict=lambda key, record: evicted.append((key, record.value)))
+    for key in "abc":
+        store.put(key, Record(key))
+        clock.now += 1
+    store.get("a")  # "a" становится самой свежей
+    store.put("d", Record("d"))
+
+    assert evicted == [("b", "b")]
+    assert "b" not in store
+    assert len(store) == 3
+    assert store.metrics['evicted'] == 1
+
+
+def test_ttl_expires_on_get_and_expire():
+    evicted = []
+    store, clock = _store(on_evict=lambda key, record: evicted.append(key))
+    store.put("a", Record(1))
+    clock.now += 30
+    store.put("b", Record(2))
+
+    clock.now += 31
+    assert store.get("a") is None
+    assert store.get("b").value == 2  # обращение продлевает жизнь сессии
+
+    clock.now += 59
+    assert store.expire() == 0
+    clock.now += 1
+    assert store.expire() == 1
+    assert evicted == ["a", "b"]
+    assert store.metrics['expired'] == 2
+    assert len(store) == 0
+
+
+def test_pop_does_not_call_on_evict():
+    evicted = []
+    store, _ = _store(on_evict=lambda key, record: evicted.append(key))
+    store.put("a", Record(1))
+    assert store.pop("a").value == 1
+    assert store.pop("a") is None
+    assert evicted == []
+
+
+def test_metrics_count_hits_misses_and_memory():
+    store, _ = _store()
+    record = Record("x" * 100)
+    store.put("a", record)
+    assert store.metrics['entries'] == 1
+    assert store.metrics['memory_bytes'] == record_size(record)
+
+    record.value = "x" * 1000
+    store.mark_dirty("a")
+    assert store.metrics['memory_bytes'] == record_size(record)
+
+    store.get("a")
+    store.get("missing")
+    assert store.metrics['hits'] == 1
+    assert store.metrics['misses'] == 1
+
+    store.pop("a")
+    assert store.metrics['entries'] == 0
+    assert store.metrics['memory_bytes'] == 0
+
+
+def test_persistence_round_trip(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    store, clock = _store(path=path, record_type=Record, key_type=int)
+    store.put(1, Record("first"))
+    clock.now += 1
+    store.put(2, Record("second"))
+    store.flush()
+
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"1", "2"}
+
+    restored, restored_clock = _store(path=path, record_type=Record, key_type=int, max_entries=2)
+    restored_clock.now = clock.now
+    assert restored.get(1).value == "first"
+    # Порядок обращений восстановлен: после get(1) самой давней стала 2
+    restored.put(3, Record("third"))
+    assert 2 not in restored
+    assert 1 in restored
+
+
+def test_corrupted_file_starts_empty(tmp_path):
+    path = tmp_path / "sessions.json"
+    path.write_text("{not json", encoding="utf-8")
+    store, _ = _store(path=str(path), record_type=Record)
+    assert len(store) == 0
+
+
+def test_roulette_session_bitset_round_trip():
+    session = RouletteSession(["a", "b", "c", "b"], last_active=5.0)
+    session.remove(1)
+    session.remove(3)
+
+    assert sorted(session.remaining()) == [0, 2]
+    assert session.is_removed(3)
+    restored = RouletteSession.from_json(json.loads(json.dumps(session.to_json())))
+    assert restored.items == ("a", "b", "c", "b")
+    assert restored.remaining() == session.remaining()
+    assert restored.text() == session.text()
+
+    restored.reset()
+    assert sorted(restored.remaining()) == [0, 1, 2, 3]
+    assert "<s>" not in restored.text()
+
+
+def test_roulette_session_spin_keeps_index_and_text_in_sync():
+    items = [f"Вариант {i}" for i in range(300)]
+    session = RouletteSession(items)
+    rnd = random.Random(1)
+    removed = set()
+    while session.remaining_count() > 1:
+        index = session.spin(rnd)
+        assert index not in removed
+        removed.add(index)
+        assert session.lines[index] == f"<s>🔴 {items[index]}</s>"
+
+    winner = session.order[0]
+    assert winner not in removed
+    assert len(removed) == len(items) - 1
+    assert all(session.pos[i] == -1 for i in removed)
+    assert session.text().count("🟢") == 1
+    # Размер, обновляемый при вычёркивании, совпадает с посчитанным заново по полям
+    expected = sys.getsizeof(session) + sys.getsizeof(session.removed) + sys.getsizeof(session.text())
+    for container in (session.items, session.order, session.pos, session.lines):
+        expected += sys.getsizeof(container)
+    expected += sum(sys.getsizeof(value) for value in session.items + tuple(session.lines))
+    assert session.size_bytes() == expected
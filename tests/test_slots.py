@@ -1,21 +1,29 @@
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock, call
+from unittest.mock import patch, MagicMock, AsyncMock
 
 # Импортируем тестируемый модуль и его функции
 try:
     import casino.slots as casino_slots
-    from casino.slots import handle_slots_callback, handle_slots_bet_callback, SLOT_SYMBOLS
+    from casino.slots import handle_slots_callback, handle_slots_bet_callback
     # Импортируем зависимости для мокирования
     import balance
+    from casino.session import CasinoSessionManager
     from telegram import Update, InlineKeyboardMarkup, User, CallbackQuery
 except ImportError as e:
     pytest.skip(f"Пропуск тестов slots: не удалось импортировать модуль casino.slots или его зависимости ({e}).", allow_module_level=True)
 
+@pytest.fixture(autouse=True)
+def sessions():
+    """Отдельные сессии казино для каждого теста."""
+    manager = CasinoSessionManager(flush_delay=0)
+    with patch('casino.slots.casino_sessions', manager):
+        yield manager
+
 # --- Тесты для handle_slots_callback ---
 
 @pytest.mark.asyncio
-@patch('casino.slots.get_balance')
-async def test_handle_slots_callback(mock_get_balance):
+@patch('casino.session.get_balance')
+async def test_handle_slots_callback(mock_get_balance, sessions):
     query = MagicMock(spec=CallbackQuery)
     query.answer = AsyncMock()
     query.from_user = MagicMock(spec=User)
@@ -39,7 +47,7 @@ async def test_handle_slots_callback(mock_get_balance):
     expected_bet_10 = 20 # 10% от 200
     
     # Проверяем сохранение ставки по умолчанию
-    assert context.user_data['slots_bet'] == expected_bet_1
+    assert sessions.game_bet(123, 'slots') == expected_bet_1
     
     # Проверяем отправленное сообщение и клавиатуру
     query.edit_message_text.assert_awaited_once()
@@ -56,8 +64,8 @@ async def test_handle_slots_callback(mock_get_balance):
     assert keyboard[2][0].callback_data == f"slots_bet:{expected_bet_10}"
 
 @pytest.mark.asyncio
-@patch('casino.slots.get_balance')
-async def test_handle_slots_callback_low_balance(mock_get_balance):
+@patch('casino.session.get_balance')
+async def test_handle_slots_callback_low_balance(mock_get_balance, sessions):
     """Тест, что минимальная ставка равна 1, даже если % от баланса меньше."""
     query = MagicMock(spec=CallbackQuery)
     query.answer = AsyncMock()
@@ -76,7 +84,7 @@ async def test_handle_slots_callback_low_balance(mock_get_balance):
     expected_bet_5 = 2 # max(int(50*0.05), 1)
     expected_bet_10 = 5 # max(int(50*0.1), 1)
     
-    assert context.user_data['slots_bet'] == expected_bet_1
+    assert sessions.game_bet(456, 'slots') == expected_bet_1
     
     args, kwargs = query.edit_message_text.call_args
     keyboard = kwargs['reply_markup'].inline_keyboard
@@ -90,10 +98,10 @@ async def test_handle_slots_callback_low_balance(mock_get_balance):
 # --- Тесты для handle_slots_bet_callback ---
 
 @pytest.mark.asyncio
-@patch('casino.slots.get_balance')
-@patch('casino.slots.update_balance')
-@patch('random.choice')
-async def test_handle_slots_bet_jackpot(mock_random_choice, mock_update_balance, mock_get_balance):
+@patch('casino.session.get_balance', return_value=100)
+@patch('casino.slots.casino_sessions.settle')
+@patch('casino.slots.spin_reels')
+async def test_handle_slots_bet_jackpot(mock_spin_reels, mock_settle, mock_get_balance, sessions):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     query.answer = AsyncMock()
@@ -107,21 +115,18 @@ async def test_handle_slots_bet_jackpot(mock_random_choice, mock_update_balance,
     context = MagicMock()
     context.user_data = {}
     
-    # Баланс до ставки, баланс после выигрыша
-    mock_get_balance.side_effect = [100, 100 - bet + (bet * 5)]
+    # Баланс после списания ставки и выигрыша
+    mock_settle.return_value = 100 - bet + (bet * 5)
     # Результат игры - джекпот
-    mock_random_choice.return_value = "💎"
+    mock_spin_reels.return_value = ["💎", "💎", "💎"]
     
     await handle_slots_bet_callback(update, context)
     
     query.answer.assert_awaited_once()
-    assert context.user_data['slots_bet'] == bet
+    assert sessions.game_bet(777, 'slots') == bet
     
-    # Проверяем списание ставки и начисление выигрыша
-    mock_update_balance.assert_has_calls([
-        call(777, -bet), # Списание ставки
-        call(777, bet * 5)  # Начисление выигрыша x5
-    ])
+    # Проверяем списание ставки и начисление выигрыша x5 одной операцией
+    mock_settle.assert_called_once_with(777, bet, bet * 5, game='slots')
     
     # Проверяем результат в сообщении
     query.edit_message_text.assert_awaited_once()
@@ -139,10 +144,10 @@ async def test_handle_slots_bet_jackpot(mock_random_choice, mock_update_balance,
     assert keyboard[1][0].callback_data == "casino:menu"
 
 @pytest.mark.asyncio
-@patch('casino.slots.get_balance')
-@patch('casino.slots.update_balance')
-@patch('random.choice')
-async def test_handle_slots_bet_two_match(mock_random_choice, mock_update_balance, mock_get_balance):
+@patch('casino.session.get_balance', return_value=100)
+@patch('casino.slots.casino_sessions.settle')
+@patch('casino.slots.spin_reels')
+async def test_handle_slots_bet_two_match(mock_spin_reels, mock_settle, mock_get_balance, sessions):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     # ... (аналогичная настройка update/query/context) ...
@@ -156,16 +161,13 @@ async def test_handle_slots_bet_two_match(mock_random_choice, mock_update_balanc
     context = MagicMock()
     context.user_data = {}
 
-    mock_get_balance.side_effect = [50, 50 - bet + (bet * 2)]
+    mock_settle.return_value = 50 - bet + (bet * 2)
     # Результат - два совпадения
-    mock_random_choice.side_effect = ["🍒", "🍒", "🍋"]
+    mock_spin_reels.return_value = ["🍒", "🍒", "🍋"]
     
     await handle_slots_bet_callback(update, context)
     
-    mock_update_balance.assert_has_calls([
-        call(888, -bet), 
-        call(888, bet * 2)  # Выигрыш x2
-    ])
+    mock_settle.assert_called_once_with(888, bet, bet * 2, game='slots')  # Выигрыш x2
     
     # Проверяем результат в сообщении
     args, kwargs = query.edit_message_text.call_args
@@ -176,10 +178,10 @@ async def test_handle_slots_bet_two_match(mock_random_choice, mock_update_balanc
     # ... (проверка кнопок) ...
 
 @pytest.mark.asyncio
-@patch('casino.slots.get_balance')
-@patch('casino.slots.update_balance')
-@patch('random.choice')
-async def test_handle_slots_bet_no_match(mock_random_choice, mock_update_balance, mock_get_balance):
+@patch('casino.session.get_balance', return_value=100)
+@patch('casino.slots.casino_sessions.settle')
+@patch('casino.slots.spin_reels')
+async def test_handle_slots_bet_no_match(mock_spin_reels, mock_settle, mock_get_balance, sessions):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     # ... (аналогичная настройка update/query/context) ...
@@ -193,14 +195,14 @@ async def test_handle_slots_bet_no_match(mock_random_choice, mock_update_balance
     context = MagicMock()
     context.user_data = {}
 
-    mock_get_balance.side_effect = [200, 200 - bet]
+    mock_settle.return_value = 200 - bet
     # Результат - нет совпадений
-    mock_random_choice.side_effect = ["🔔", "🍀", "7️⃣"]
+    mock_spin_reels.return_value = ["🔔", "🍀", "7️⃣"]
     
     await handle_slots_bet_callback(update, context)
     
     # Проверяем только списание ставки
-    mock_update_balance.assert_called_once_with(999, -bet)
+    mock_settle.assert_called_once_with(999, bet, 0, game='slots')
     
     # Проверяем результат в сообщении
     args, kwargs = query.edit_message_text.call_args
@@ -211,9 +213,9 @@ async def test_handle_slots_bet_no_match(mock_random_choice, mock_update_balance
     # ... (проверка кнопок) ...
 
 @pytest.mark.asyncio
-@patch('casino.slots.get_balance', return_value=5) # Баланс меньше ставки
-@patch('casino.slots.update_balance')
-async def test_handle_slots_bet_insufficient_balance(mock_update_balance, mock_get_balance):
+@patch('balance.load_balances', return_value={"111": {"balance": 5, "name": "User"}}) # Баланс меньше ставки
+@patch('balance.save_balances')
+async def test_handle_slots_bet_insufficient_balance(mock_save_balances, mock_load_balances, sessions):
     update = MagicMock(spec=Update)
     query = MagicMock(spec=CallbackQuery)
     # ... (настройка update/query/context) ...
@@ -230,8 +232,8 @@ async def test_handle_slots_bet_insufficient_balance(mock_update_balance, mock_g
     await handle_slots_bet_callback(update, context)
     
     query.answer.assert_awaited_once()
-    mock_get_balance.assert_called_once_with(111)
-    mock_update_balance.assert_not_called() # Баланс не должен меняться
+    mock_save_balances.assert_not_called() # Баланс не должен меняться
+    assert sessions.game_bet(111, 'slots') is None
     # Проверяем сообщение об ошибке
     query.edit_message_text.assert_awaited_once_with("Недостаточно монет для этой ставки!")
 
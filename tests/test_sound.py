@@ -1,167 +1,184 @@
 import pytest
-from unittest.mock import patch, mock_open, MagicMock, AsyncMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import json
-import os
+from telegram.error import BadRequest
 
 # Импортируем тестируемые функции
 try:
     from handlers.sound import load_sound_config, sound_command, sound_callback
+    from sound_catalog import SoundCatalog
+    from audio_pipeline import AudioPipeline
 except ImportError as e:
     pytest.skip(f"Пропуск тестов sound: не удалось импортировать модуль sound ({e}).", allow_module_level=True)
 
 # Тесты для функции load_sound_config
-@patch('builtins.open', new_callable=mock_open, read_data='{"sound.mp3": "Звук 1", "beep.mp3": "Звук 2"}')
-def test_load_sound_config_success(mock_file):
-    """Тест успешной загрузки конфигурации звуков"""
+@patch('handlers.sound.config.get_config')
+def test_load_sound_config_success(mock_get_config):
+    """Тест получения конфигурации звуков из снимка настроек"""
+    mock_get_config.return_value = MagicMock(sound={"sound.mp3": "Звук 1", "beep.mp3": "Звук 2"})
+    
     result = load_sound_config()
     
-    assert isinstance(result, dict)
     assert result == {"sound.mp3": "Звук 1", "beep.mp3": "Звук 2"}
-    mock_file.assert_called_once_with("config/sound_config.json", "r", encoding="utf-8")
 
-@patch('builtins.open', side_effect=Exception("Ошибка чтения файла"))
-def test_load_sound_config_error(mock_file):
-    """Тест обработки ошибки при чтении конфигурации звуков"""
-    # Нет необходимости мокать логгер, так как сообщение об ошибке
-    # будет записано в реальный логгер
-    
-    result = load_sound_config()
+@patch('builtins.open', side_effect=Exception("Файл не должен читаться"))
+def test_load_sound_config_no_disk_access(mock_file):
+    """Тест: конфигурация звуков берется из снимка без чтения файла"""
+    load_sound_config()
     
-    assert result == {}
-    mock_file.assert_called_once_with("config/sound_config.json", "r", encoding="utf-8")
+    mock_file.assert_not_called()
+
+SOUNDS = {"sound.mp3": "Звук 1", "beep.mp3": "Звук 2"}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Каталог во временной папке с двумя звуками."""
+    sounds_dir = tmp_path / "sound_panel"
+    sounds_dir.mkdir()
+    (sounds_dir / "sound.mp3").write_bytes(b"sound data")
+    (sounds_dir / "beep.mp3").write_bytes(b"beep data")
+    catalog = SoundCatalog(str(sounds_dir), str(tmp_path / "sound_file_ids.json"))
+    pipeline = AudioPipeline(str(tmp_path / "audio_cache"), ffmpeg="")
+    with patch('handlers.sound.sound_catalog', catalog), \
+         patch('handlers.sound.audio_pipeline', pipeline), \
+         patch('handlers.sound.load_sound_config', return_value=SOUNDS):
+        yield catalog
+
+
+def _callback_update(data):
+    mock_update = MagicMock()
+    mock_update.effective_chat.id = 123456
+    mock_update.callback_query = AsyncMock()
+    mock_update.callback_query.data = data
+    return mock_update
+
+
+def _context(file_id="file-id-1"):
+    mock_context = MagicMock()
+    mock_context.bot = AsyncMock()
+    mock_context.bot.send_audio.return_value = MagicMock(effective_attachment=MagicMock(file_id=file_id))
+    return mock_context
+
+
+def _button_ids(reply_markup):
+    return [button.callback_data for row in reply_markup.inline_keyboard for button in row]
+
 
 # Тесты для функции sound_command
 @pytest.mark.asyncio
-@patch('handlers.sound.load_sound_config')
-async def test_sound_command_success(mock_load_config):
+async def test_sound_command_success(catalog):
     """Тест успешного отображения звуковой панели"""
-    mock_load_config.return_value = {"sound.mp3": "Звук 1", "beep.mp3": "Звук 2"}
-    
-    # Создаем моки для Update и Context
     mock_update = MagicMock()
-    mock_context = MagicMock()
-    mock_context.bot = AsyncMock()
+    mock_context = _context()
     mock_update.effective_chat.id = 123456
-    
+
     await sound_command(mock_update, mock_context)
-    
-    # Проверяем, что был вызван метод send_message
+
     mock_context.bot.send_message.assert_called_once()
-    # Проверяем аргументы вызова
     call_args = mock_context.bot.send_message.call_args[1]
     assert call_args['chat_id'] == 123456
     assert call_args['text'] == "Выберите звук:"
-    # Проверяем наличие reply_markup с кнопками
-    assert 'reply_markup' in call_args
-    # Проверяем, что в SOUND_MAPPING теперь есть записи
-    from handlers.sound import SOUND_MAPPING
-    assert len(SOUND_MAPPING) == 2
-    assert "sound:1" in SOUND_MAPPING
-    assert "sound:2" in SOUND_MAPPING
+    ids = _button_ids(call_args['reply_markup'])
+    assert len(ids) == 2
+    assert all(sound_id.startswith("sound:") for sound_id in ids)
 
 @pytest.mark.asyncio
-@patch('handlers.sound.load_sound_config')
-async def test_sound_command_no_config(mock_load_config):
+async def test_sound_command_no_config(catalog):
     """Тест обработки отсутствия конфигурации звуков"""
-    mock_load_config.return_value = {}
-    
     mock_update = MagicMock()
-    mock_context = MagicMock()
-    mock_context.bot = AsyncMock()
+    mock_context = _context()
     mock_update.effective_chat.id = 123456
-    
-    await sound_command(mock_update, mock_context)
-    
+
+    with patch('handlers.sound.load_sound_config', return_value={}):
+        await sound_command(mock_update, mock_context)
+
     mock_context.bot.send_message.assert_called_once_with(
         chat_id=123456,
         text="Конфигурация звуков не найдена."
     )
 
+def test_panel_built_once_and_ids_stable(catalog, tmp_path):
+    """Тест: панель собирается один раз, ID зависят от содержимого и не зависят от порядка"""
+    panel = catalog.panel(SOUNDS)
+    assert catalog.panel(SOUNDS) is panel
+
+    reordered = {"beep.mp3": "Звук 2", "sound.mp3": "Звук 1"}
+    other = SoundCatalog(catalog.sounds_dir, str(tmp_path / "other.json"))
+    assert set(other.panel(reordered).entries) == set(panel.entries)
+
+    # Изменение файла меняет его ID и пересобирает панель
+    (tmp_path / "sound_panel" / "beep.mp3").write_bytes(b"new beep data")
+    (tmp_path / "sound_panel" / "new.mp3").write_bytes(b"new")
+    rebuilt = catalog.panel(SOUNDS)
+    assert rebuilt is not panel
+    assert len(set(rebuilt.entries) & set(panel.entries)) == 1
+
 # Тесты для функции sound_callback
 @pytest.mark.asyncio
-async def test_sound_callback_success():
-    """Тест успешного воспроизведения звука"""
-    # Настраиваем SOUND_MAPPING
-    from handlers.sound import SOUND_MAPPING
-    SOUND_MAPPING.clear()
-    SOUND_MAPPING["sound:1"] = "test_sound.mp3"
-    
-    # Создаем моки
-    mock_update = MagicMock()
-    mock_context = MagicMock()
-    mock_context.bot = AsyncMock()
-    mock_update.effective_chat.id = 123456
-    mock_update.callback_query = AsyncMock()
-    mock_update.callback_query.data = "sound:1"
-    
-    # Патчим os.path.exists и open
-    with patch('os.path.exists', return_value=True), \
-         patch('builtins.open', mock_open(read_data=b'audio data')):
-        await sound_callback(mock_update, mock_context)
-    
-    # Проверяем, что вызваны все необходимые методы
+async def test_sound_callback_uploads_once_then_sends_file_id(catalog):
+    """Тест: первое нажатие загружает файл, следующие отправляют file_id"""
+    sound_id = _button_ids(catalog.panel(SOUNDS).reply_markup)[0]
+    mock_context = _context()
+
+    mock_update = _callback_update(sound_id)
+    await sound_callback(mock_update, mock_context)
     mock_update.callback_query.answer.assert_called_once()
-    mock_context.bot.send_audio.assert_called_once()
     mock_update.callback_query.delete_message.assert_called_once()
+    assert mock_context.bot.send_audio.call_args[1]['audio'] != "file-id-1"
+
+    with patch('builtins.open', side_effect=AssertionError("файл не должен читаться")):
+        await sound_callback(_callback_update(sound_id), mock_context)
+    mock_context.bot.send_audio.assert_called_with(chat_id=123456, audio="file-id-1")
+    assert json.loads(open(catalog.file_ids_path, encoding="utf-8").read()) == {sound_id: "file-id-1"}
 
 @pytest.mark.asyncio
-async def test_sound_callback_file_not_found():
-    """Тест обработки отсутствующего аудиофайла"""
-    # Настраиваем SOUND_MAPPING
-    from handlers.sound import SOUND_MAPPING
-    SOUND_MAPPING.clear()
-    SOUND_MAPPING["sound:1"] = "nonexistent.mp3"
-    
-    mock_update = MagicMock()
-    mock_context = MagicMock()
-    mock_update.effective_chat.id = 123456
-    mock_update.callback_query = AsyncMock()
-    mock_update.callback_query.data = "sound:1"
-    
+async def test_sound_callback_stale_file_id_reuploads(catalog):
+    """Тест: если Telegram не принимает file_id, файл загружается заново"""
+    sound_id = _button_ids(catalog.panel(SOUNDS).reply_markup)[0]
+    catalog.remember(sound_id, "stale")
+    mock_context = _context(file_id="fresh")
+    fresh_message = mock_context.bot.send_audio.return_value
+    mock_context.bot.send_audio.side_effect = [BadRequest("wrong file identifier"), fresh_message]
+
+    await sound_callback(_callback_update(sound_id), mock_context)
+
+    assert mock_context.bot.send_audio.call_count == 2
+    assert catalog.file_id(sound_id) == "fresh"
+
+@pytest.mark.asyncio
+async def test_sound_callback_file_not_found(catalog):
+    """Тест обработки аудиофайла, удалённого после сборки панели"""
+    sound_id = _button_ids(catalog.panel(SOUNDS).reply_markup)[0]
+    mock_update = _callback_update(sound_id)
+
     with patch('os.path.exists', return_value=False):
-        await sound_callback(mock_update, mock_context)
-    
+        await sound_callback(mock_update, _context())
+
     mock_update.callback_query.answer.assert_called_once()
     mock_update.callback_query.edit_message_text.assert_called_once_with("Аудиофайл не найден.")
 
 @pytest.mark.asyncio
-async def test_sound_callback_invalid_id():
+async def test_sound_callback_invalid_id(catalog):
     """Тест обработки недействительного ID звука"""
-    # Очищаем SOUND_MAPPING
-    from handlers.sound import SOUND_MAPPING
-    SOUND_MAPPING.clear()
-    
-    mock_update = MagicMock()
-    mock_context = MagicMock()
-    mock_update.callback_query = AsyncMock()
-    mock_update.callback_query.data = "sound:999"  # ID, которого нет в маппинге
-    
-    await sound_callback(mock_update, mock_context)
-    
+    mock_update = _callback_update("sound:999")
+
+    await sound_callback(mock_update, _context())
+
     mock_update.callback_query.answer.assert_called_once()
     mock_update.callback_query.edit_message_text.assert_called_once_with("Аудиофайл не найден.")
 
 @pytest.mark.asyncio
-async def test_sound_callback_send_error():
+async def test_sound_callback_send_error(catalog):
     """Тест обработки ошибки при отправке аудиофайла"""
-    # Настраиваем SOUND_MAPPING
-    from handlers.sound import SOUND_MAPPING
-    SOUND_MAPPING.clear()
-    SOUND_MAPPING["sound:1"] = "test_sound.mp3"
-    
-    mock_update = MagicMock()
-    mock_context = MagicMock()
-    mock_context.bot = AsyncMock()
+    sound_id = _button_ids(catalog.panel(SOUNDS).reply_markup)[0]
+    mock_context = _context()
     mock_context.bot.send_audio.side_effect = Exception("Ошибка отправки")
-    mock_update.effective_chat.id = 123456
-    mock_update.callback_query = AsyncMock()
-    mock_update.callback_query.data = "sound:1"
-    
-    # Мы не будем мокать логгер, так как сообщение записывается в реальный логгер
-    with patch('os.path.exists', return_value=True), \
-         patch('builtins.open', mock_open(read_data=b'audio data')):
-        await sound_callback(mock_update, mock_context)
-    
+    mock_update = _callback_update(sound_id)
+
+    await sound_callback(mock_update, mock_context)
+
     mock_update.callback_query.answer.assert_called_once()
     mock_context.bot.send_audio.assert_called_once()
-    mock_update.callback_query.edit_message_text.assert_called_once_with("Ошибка при воспроизведении звука.") 
\ No newline at end of file
+    mock_update.callback_query.edit_message_text.assert_called_once_with("Ошибка при воспроизведении звука.")
+    assert catalog.file_id(sound_id) is None
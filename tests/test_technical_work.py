@@ -3,13 +3,16 @@ from unittest.mock import patch, MagicMock, mock_open, AsyncMock
 
 # Импортируем тестируемые функции
 try:
-    from handlers.technical_work import technical_work_command, POST_CHAT_ID
+    from handlers.technical_work import technical_work_command
 except ImportError as e:
     pytest.skip(f"Пропуск тестов technical_work: не удалось импортировать модуль handlers.technical_work или его зависимости ({e}).", allow_module_level=True)
 
+POST_CHAT_ID = -1001234567890
+
 @pytest.mark.asyncio
+@patch('handlers.technical_work.get_config', return_value=MagicMock(post_chat_id=POST_CHAT_ID))
 @patch('builtins.open', new_callable=mock_open)
-async def test_technical_work_command_success(mock_file):
+async def test_technical_work_command_success(mock_file, mock_get_config):
     """Тест успешного выполнения команды /technical_work"""
     # Настраиваем мок для файла
     mock_file_handle = MagicMock()
@@ -34,9 +37,10 @@ async def test_technical_work_command_success(mock_file):
     )
 
 @pytest.mark.asyncio
+@patch('handlers.technical_work.get_config', return_value=MagicMock(post_chat_id=POST_CHAT_ID))
 @patch('builtins.open')
 @patch('logging.error')
-async def test_technical_work_command_error(mock_logging, mock_open):
+async def test_technical_work_command_error(mock_logging, mock_open, mock_get_config):
     """Тест обработки ошибки при выполнении команды /technical_work"""
     # Настраиваем мок для файла, чтобы он вызвал исключение
     mock_open.side_effect = Exception("Test error")
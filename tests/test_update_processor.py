@@ -0,0 +1,103 @@
+import pytest
+import asyncio
+from types import SimpleNamespace
+
+try:
+    from update_processor import KeyedUpdateProcessor, update_key
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов update_processor: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _update(chat_id=None, user_id=None):
+    return SimpleNamespace(
+        effective_chat=SimpleNamespace(id=chat_id) if chat_id is not None else None,
+        effective_user=SimpleNamespace(id=user_id) if user_id is not None else None,
+    )
+
+
+def test_update_key():
+    assert update_key(_update(1, 2)) == (1, 2)
+    assert update_key(_update(user_id=2)) == (None, 2)
+    assert update_key(_update()) is None
+
+
+@pytest.mark.asyncio
+async def test_same_key_processed_in_order():
+    processor = KeyedUpdateProcessor(8)
+    log = []
+
+    async def handler(name, delay):
+        log.append(f"{name}:start")
+        await asyncio.sleep(delay)
+        log.append(f"{name}:end")
+
+    # Первое обновление медленнее второго, но второе ждёт своей очереди
+    await asyncio.gather(
+        processor.do_process_update(_update(1, 1), handler("first", 0.02)),
+        processor.do_process_update(_update(1, 1), handler("second", 0)),
+    )
+
+    assert log == ["first:start", "first:end", "second:start", "second:end"]
+    assert processor.metrics['processed'] == 2
+    assert processor.active_keys() == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_concurrently():
+    processor = KeyedUpdateProcessor(8)
+    release = asyncio.Event()
+    started = []
+
+    async def handler(name):
+        started.append(name)
+        await release.wait()
+
+    tasks = [
+        asyncio.create_task(processor.do_process_update(_update(1, user_id), handler(user_id)))
+        for user_id in range(3)
+    ]
+    await asyncio.sleep(0)
+
+    assert sorted(started) == [0, 1, 2]
+    assert processor.metrics['running'] == 3
+    release.set()
+    await asyncio.gather(*tasks)
+    assert processor.metrics['running'] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_respected():
+    processor = KeyedUpdateProcessor(2)
+    peak = 0
+
+    async def handler():
+        nonlocal peak
+        peak = max(peak, processor.metrics['running'])
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(
+        processor.do_process_update(_update(user_id, user_id), handler())
+        for user_id in range(6)
+    ))
+
+    assert peak == 2
+    assert processor.metrics['max_waiting'] == 4
+    assert processor.metrics['waiting'] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_update_releases_key():
+    processor = KeyedUpdateProcessor(1)
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def ok():
+        return None
+
+    with pytest.raises(ValueError):
+        await processor.do_process_update(_update(1, 1), fail())
+    await asyncio.wait_for(processor.do_process_update(_update(1, 1), ok()), timeout=1)
+
+    assert processor.active_keys() == 0
+    assert processor.metrics['processed'] == 2
@@ -1,5 +1,6 @@
 import pytest
 import datetime
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from telegram import Update, Chat
@@ -24,12 +25,12 @@ except ImportError:
 
 # --- Тесты для is_allowed_chat ---
 
-@patch('utils.ALLOWED_CHAT_IDS', {123, 456}) # Мокаем разрешенные ID
+@patch('utils.get_config', lambda: SimpleNamespace(allowed_chat_ids=(123, 456))) # Мокаем разрешенные ID
 def test_is_allowed_chat_allowed():
     """Тестирует случай, когда чат разрешен."""
     assert is_allowed_chat(123) is True
 
-@patch('utils.ALLOWED_CHAT_IDS', {123, 456})
+@patch('utils.get_config', lambda: SimpleNamespace(allowed_chat_ids=(123, 456)))
 def test_is_allowed_chat_not_allowed():
     """Тестирует случай, когда чат не разрешен."""
     assert is_allowed_chat(789) is False
@@ -104,7 +105,7 @@ async def test_check_chat_and_execute_not_allowed_leave_fails(mock_logger, mock_
 
 # --- Тесты для random_time_in_range ---
 
-@patch('random.randint') # Мокаем генератор случайных чисел
+@patch('utils._random.randint') # Мокаем генератор случайных чисел
 def test_random_time_in_range(mock_randint):
     """Тестирует генерацию случайного времени с моком random.randint."""
     start_time = datetime.time(10, 0, 0)
@@ -136,7 +137,7 @@ def test_random_time_in_range_boundaries():
 
 def test_parse_time_from_string_valid():
     """Тестирует парсинг валидной строки времени."""
-    with patch('utils.TIMEZONE_OFFSET', 7):  # Мокаем смещение часового пояса UTC+7
+    with patch('utils.get_config', lambda: SimpleNamespace(timezone_offset=7)):  # Мокаем смещение часового пояса UTC+7
         assert parse_time_from_string("14:25") == datetime.time(7, 25)  # 14:25 - 7 = 7:25 UTC
         assert parse_time_from_string("00:00") == datetime.time(17, 0)  # 00:00 - 7 = 17:00 UTC предыдущего дня (24-7=17)
         assert parse_time_from_string("23:59") == datetime.time(16, 59)  # 23:59 - 7 = 16:59 UTC
@@ -152,7 +153,7 @@ def test_parse_time_from_string_invalid_format():
 
 def test_parse_time_from_string_invalid_values():
     """Тестирует парсинг строки с невалидными значениями времени."""
-    with patch('utils.TIMEZONE_OFFSET', 7):  # Мокаем смещение часового пояса
+    with patch('utils.get_config', lambda: SimpleNamespace(timezone_offset=7)):  # Мокаем смещение часового пояса
         # Функция не проверяет валидность часов (24), но datetime.time проверяет минуты
         # Часы проверяются неявно через % 24, поэтому 24:00 -> 17:00 (24-7 = 17)
         parse_time_from_string("24:00")  # Это должно работать (даст 17:00)
@@ -165,7 +166,7 @@ def test_parse_time_from_string_invalid_values():
 
 def test_convert_local_to_utc_valid():
     """Тестирует конвертацию валидной строки времени в UTC."""
-    with patch('utils.TIMEZONE_OFFSET', 7):  # Мокаем смещение часового пояса UTC+7
+    with patch('utils.get_config', lambda: SimpleNamespace(timezone_offset=7)):  # Мокаем смещение часового пояса UTC+7
         assert convert_local_to_utc("14:25") == datetime.time(7, 25)  # 14:25 - 7 = 7:25 UTC
         assert convert_local_to_utc("00:00") == datetime.time(17, 0)  # 00:00 - 7 = 17:00 UTC предыдущего дня (24-7=17)
         assert convert_local_to_utc("23:59") == datetime.time(16, 59)  # 23:59 - 7 = 16:59 UTC
@@ -111,7 +111,7 @@ def test_is_valid_file_invalid_extension(mock_logger, mock_access, mock_getsize,
 
 @patch('utils_autopost.os.path.exists')
 @patch('utils_autopost.open', new_callable=mock_open)
-@patch('utils_autopost.random.randint') # Мок нужен, т.к. используется randint
+@patch('utils_autopost._random.randint') # Мок нужен, т.к. используется randint
 @patch('utils_autopost.logger')
 def test_get_top_anecdote_success(mock_logger, mock_randint, mock_file, mock_exists):
     """Тест успешного получения и удаления анекдота."""
@@ -125,7 +125,7 @@ def test_get_top_anecdote_success(mock_logger, mock_randint, mock_file, mock_exi
     mock_randint.return_value = 1 # Выбираем второй анекдот (индекс 1)
     
     # Патчим путь к файлу анекдотов, чтобы использовать реальный путь из конфигурации
-    with patch('utils_autopost.config.ANECDOTES_FILE', Path('post_materials/anecdotes.txt')):
+    with patch('utils_autopost.get_config', return_value=MagicMock(anecdotes_file=Path('post_materials/anecdotes.txt'))):
         anecdote = get_top_anecdote_and_remove()
         
         assert anecdote == anec2
@@ -145,7 +145,7 @@ def test_get_top_anecdote_success(mock_logger, mock_randint, mock_file, mock_exi
 @patch('utils_autopost.logger')
 def test_get_top_anecdote_file_not_exists(mock_logger, mock_exists):
     # Патчим путь к файлу анекдотов
-    with patch('utils_autopost.config.ANECDOTES_FILE', Path('post_materials/anecdotes.txt')):
+    with patch('utils_autopost.get_config', return_value=MagicMock(anecdotes_file=Path('post_materials/anecdotes.txt'))):
         assert get_top_anecdote_and_remove() is None
         mock_exists.assert_called_once_with(Path('post_materials/anecdotes.txt'))
         mock_logger.warning.assert_called_once()
@@ -155,7 +155,7 @@ def test_get_top_anecdote_file_not_exists(mock_logger, mock_exists):
 @patch('utils_autopost.logger')
 def test_get_top_anecdote_empty_file(mock_logger, mock_file, mock_exists):
     # Патчим путь к файлу анекдотов
-    with patch('utils_autopost.config.ANECDOTES_FILE', Path('post_materials/anecdotes.txt')):
+    with patch('utils_autopost.get_config', return_value=MagicMock(anecdotes_file=Path('post_materials/anecdotes.txt'))):
         assert get_top_anecdote_and_remove() is None
         mock_file.assert_called_once_with(Path('post_materials/anecdotes.txt'), "r", encoding="utf-8")
         mock_logger.warning.assert_called_once()
@@ -170,7 +170,7 @@ def test_count_anecdotes_success(mock_file, mock_exists):
     mock_file.return_value.read.return_value = file_content
     
     # Патчим путь к файлу анекдотов
-    with patch('utils_autopost.config.ANECDOTES_FILE', Path('post_materials/anecdotes.txt')):
+    with patch('utils_autopost.get_config', return_value=MagicMock(anecdotes_file=Path('post_materials/anecdotes.txt'))):
         assert count_anecdotes() == 2
         mock_file.assert_called_once_with(Path('post_materials/anecdotes.txt'), "r", encoding="utf-8")
 
@@ -190,7 +190,7 @@ def test_count_anecdotes_empty_file(mock_file, mock_exists):
 @patch('utils_autopost.os.listdir')
 @patch('utils_autopost.os.path.isfile')
 @patch('utils_autopost.is_valid_file') # Мокаем нашу же функцию проверки
-@patch('utils_autopost.random.choice')
+@patch('utils_autopost._random.choice')
 def test_get_random_file_success(mock_choice, mock_is_valid, mock_isfile, mock_listdir, mock_isdir, mock_exists):
     folder = "/path/to/content"
     mock_exists.return_value = True
@@ -257,7 +257,7 @@ def test_move_file_to_archive_success(mock_logger, mock_time, mock_move, mock_ma
     mock_exists.side_effect = [True, False]
     
     # Патчим константы конфигурации
-    with patch('utils_autopost.config.ARCHIVE_STANDART_MEME_DIR', Path(archive_dir)):
+    with patch('utils_autopost.get_config', return_value=MagicMock(archive_dirs={'standart_meme': Path(archive_dir)})):
         result = move_file_to_archive(filepath, category)
         
         assert result is True
@@ -284,7 +284,7 @@ def test_move_file_to_archive_name_conflict(mock_logger, mock_time, mock_move, m
     mock_exists.side_effect = [True, True]
     
     # Патчим константы конфигурации
-    with patch('utils_autopost.config.ARCHIVE_VIDEO_MEME_DIR', Path(archive_dir)):
+    with patch('utils_autopost.get_config', return_value=MagicMock(archive_dirs={'video_meme': Path(archive_dir)})):
         result = move_file_to_archive(filepath, category)
         
         assert result is True
@@ -318,7 +318,7 @@ def test_move_file_to_archive_move_error(mock_logger, mock_move, mock_makedirs,
     mock_exists.side_effect = [True, False]
     
     # Патчим константы конфигурации
-    with patch('utils_autopost.config.ARCHIVE_STANDART_ART_DIR', Path(archive_dir)):
+    with patch('utils_autopost.get_config', return_value=MagicMock(archive_dirs={'standart_art': Path(archive_dir)})):
         result = move_file_to_archive(filepath, category)
         
         assert result is False
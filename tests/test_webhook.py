@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+import json
+import socket
+from unittest.mock import patch, MagicMock, AsyncMock
+
+try:
+    import config
+    import httpx
+    import webhook
+    from webhook import webhook_kwargs, run_webhook, send_canned_updates, SECRET_HEADER
+except ImportError as e:
+    pytest.skip(f"Пропуск тестов webhook: не удалось импортировать модуль ({e}).", allow_module_level=True)
+
+
+def _settings(**overrides):
+    return {
+        **config.DEFAULT_WEBHOOK_CONFIG,
+        'enabled': True,
+        'url': 'https://bot.example.com/',
+        'secret_token': 'secret_123',
+        **overrides,
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_webhook_kwargs():
+    kwargs = webhook_kwargs(_settings(path='/hook/', max_connections=10))
+
+    assert kwargs['webhook_url'] == 'https://bot.example.com/hook'
+    assert kwargs['url_path'] == 'hook'
+    assert kwargs['secret_token'] == 'secret_123'
+    assert kwargs['max_connections'] == 10
+    assert 'chat_member' in kwargs['allowed_updates']
+
+
+def test_run_webhook_requires_server():
+    app = MagicMock()
+
+    with patch('webhook.webhook_available', return_value=False):
+        with pytest.raises(RuntimeError):
+            run_webhook(app, _settings())
+    app.run_webhook.assert_not_called()
+
+    with patch('webhook.webhook_available', return_value=True):
+        run_webhook(app, _settings())
+    app.run_webhook.assert_called_once_with(**webhook_kwargs(_settings()))
+
+
+def test_webhook_config_validation():
+    assert config._validate_webhook(_settings()) == []
+
+    errors = config._validate_webhook({'enabled': True, 'secret_token': 'bad token!', 'max_connections': 500})
+    assert any("webhook.url" in error for error in errors)
+    assert any("webhook.secret_token" in error for error in errors)
+    assert any("webhook.max_connections" in error for error in errors)
+
+
+@pytest.mark.asyncio
+async def test_canned_updates_posted_with_secret():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    statuses = await send_canned_updates(
+        _settings(listen='0.0.0.0', port=8443), transport=httpx.MockTransport(handler)
+    )
+
+    assert statuses == [200] * len(webhook.CANNED_UPDATES)
+    assert str(requests[0].url) == 'http://127.0.0.1:8443/telegram'
+    assert requests[0].headers[SECRET_HEADER] == 'secret_123'
+    assert json.loads(requests[0].content)["message"]["text"] == "/start"
+
+
+@pytest.mark.asyncio
+async def test_live_server_checks_secret_token():
+    """Поднимает встроенный сервер PTB и отправляет на него заготовленные обновления."""
+    pytest.importorskip("tornado")
+    from telegram import Bot
+    from telegram.ext import Updater
+
+    settings = _settings(port=_free_port())
+    queue = asyncio.Queue()
+    updater = Updater(Bot("123:abc"), queue)
+
+    with patch.object(Bot, 'initialize', AsyncMock()), \
+         patch.object(Bot, 'shutdown', AsyncMock()), \
+         patch.object(Bot, 'set_webhook', AsyncMock(return_value=True)):
+        async with updater:
+            await updater.start_webhook(**webhook_kwargs(settings))
+            try:
+                assert await send_canned_updates(settings) == [200, 200]
+                assert await send_canned_updates(settings, secret_token='wrong') == [403, 403]
+            finally:
+                await updater.stop()
+
+    assert queue.qsize() == 2
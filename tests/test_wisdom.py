@@ -1,12 +1,13 @@
 import pytest
 import json
 import os
+from types import SimpleNamespace
 from unittest.mock import patch, mock_open, MagicMock, AsyncMock
 
 # Мокаем модуль config
 config_mock = MagicMock()
-config_mock.POST_CHAT_ID = 12345
-config_mock.MATERIALS_DIR = "post_materials"
+config_mock.get_config.return_value.post_chat_id = 12345
+config_mock.get_config.return_value.materials_dir = "post_materials"
 sys_modules_patcher = patch.dict('sys.modules', {'config': config_mock})
 sys_modules_patcher.start()
 
@@ -84,42 +85,38 @@ def test_save_wisdoms_write_error(mock_file_open):
 
 # --- Тесты для get_random_wisdom ---
 
-@patch('wisdom.load_wisdoms')
-@patch('wisdom.save_wisdoms')
-@patch('random.choice', return_value="Chosen Wisdom")
-def test_get_random_wisdom_success(mock_random_choice, mock_save_wisdoms, mock_load_wisdoms):
-    """Тестирует успешное получение и удаление мудрости."""
+def _make_pool(tmp_path, wisdoms):
+    source = tmp_path / "wisdom.json"
+    source.write_text(json.dumps(wisdoms, ensure_ascii=False), encoding="utf-8")
+    return wisdom.ConsumablePool(str(source), str(tmp_path / "state.json"), str(tmp_path / "used.log"))
+
+def test_get_random_wisdom_success(tmp_path):
+    """Тестирует получение мудростей без повторений и без перезаписи файла."""
     initial_wisdoms = ["Wisdom 1", "Chosen Wisdom", "Wisdom 3"]
-    mock_load_wisdoms.return_value = initial_wisdoms.copy() # Возвращаем копию, т.к. список изменяется
+    pool = _make_pool(tmp_path, initial_wisdoms)
     
-    chosen = get_random_wisdom()
+    with patch.object(wisdom, 'WISDOM_POOL', pool), patch('wisdom.save_wisdoms') as mock_save_wisdoms:
+        chosen = [get_random_wisdom() for _ in range(3)]
+        assert wisdom.count_wisdoms() == 0
+        assert get_random_wisdom() is None
     
-    assert chosen == "Chosen Wisdom"
-    mock_load_wisdoms.assert_called_once()
-    # Получаем копию списка без "Chosen Wisdom"
-    expected_list = initial_wisdoms.copy()
-    expected_list.remove("Chosen Wisdom")
-    # Проверяем, что сохраняется список без выбранной мудрости
-    mock_save_wisdoms.assert_called_once_with(expected_list)
-
-@patch('wisdom.load_wisdoms', return_value=[])
-@patch('wisdom.save_wisdoms')
-@patch('random.choice')
-def test_get_random_wisdom_empty_list(mock_random_choice, mock_save_wisdoms, mock_load_wisdoms):
+    assert sorted(chosen) == sorted(initial_wisdoms)
+    mock_save_wisdoms.assert_not_called()
+    assert json.loads((tmp_path / "wisdom.json").read_text(encoding="utf-8")) == initial_wisdoms
+
+def test_get_random_wisdom_empty_list(tmp_path):
     """Тестирует случай, когда список мудростей пуст."""
-    chosen = get_random_wisdom()
+    with patch.object(wisdom, 'WISDOM_POOL', _make_pool(tmp_path, [])):
+        chosen = get_random_wisdom()
     
     assert chosen is None
-    mock_load_wisdoms.assert_called_once()
-    mock_random_choice.assert_not_called()
-    mock_save_wisdoms.assert_not_called()
 
 # --- Тесты для wisdom_post_callback ---
 
 @pytest.mark.asyncio
 @patch('wisdom.state.wisdom_enabled', True)
 @patch('wisdom.get_random_wisdom', return_value="Today's Wisdom")
-@patch('wisdom.POST_CHAT_ID', 12345)
+@patch('wisdom.get_config', lambda: SimpleNamespace(post_chat_id=12345))
 async def test_wisdom_post_callback_enabled_with_wisdom(mock_get_wisdom):
     """Тестирует колбэк, когда функция включена и есть мудрость."""
     context = MagicMock()
@@ -137,7 +134,7 @@ async def test_wisdom_post_callback_enabled_with_wisdom(mock_get_wisdom):
 @pytest.mark.asyncio
 @patch('wisdom.state.wisdom_enabled', True)
 @patch('wisdom.get_random_wisdom', return_value=None) # Мудрости закончились
-@patch('wisdom.POST_CHAT_ID', 12345)
+@patch('wisdom.get_config', lambda: SimpleNamespace(post_chat_id=12345))
 async def test_wisdom_post_callback_enabled_no_wisdom(mock_get_wisdom):
     """Тестирует колбэк, когда функция включена, но мудрости закончились."""
     context = MagicMock()
@@ -21,7 +21,7 @@ def main():
     """
     Основная функция для обновления расписания ставок.
     """
-    from config import schedule_config
+    from config import get_config
     import state
     
     # Устанавливаем флаг ставок в True для гарантии планирования
@@ -30,7 +30,7 @@ def main():
     logging.info("Начинаю перепланирование расписания ставок...")
     
     # Получаем настройки из конфига
-    betting_config = schedule_config.get("betting", {})
+    betting_config = get_config().schedule.get("betting", {})
     logging.info(f"Текущие настройки ставок: {betting_config}")
     
     # Форсируем планирование на текущий день
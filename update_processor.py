@@ -0,0 +1,108 @@
+# update_processor.py
+"""
+Модуль параллельной обработки обновлений Telegram.
+Обеспечивает:
+- Одновременную обработку обновлений из разных чатов и от разных пользователей,
+  чтобы медленная отправка альбома или анимация казино не задерживала остальных
+- Сохранение порядка обновлений с одинаковым ключом (чат, пользователь)
+- Общий потолок одновременно выполняемых обработчиков
+- Метрики глубины очереди ожидающих обновлений
+"""
+
+import asyncio
+import logging
+from contextlib import nullcontext
+
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+# Сколько обновлений может ждать своей очереди, прежде чем PTB перестанет принимать новые
+MAX_PENDING_UPDATES = 1024
+
+
+def update_key(update):
+    """
+    Возвращает ключ упорядочивания обновления: (chat_id, user_id).
+    Обновления без чата и пользователя (например, изменение опроса) не упорядочиваются.
+    """
+    chat = getattr(update, 'effective_chat', None)
+    user = getattr(update, 'effective_user', None)
+    chat_id = chat.id if chat else None
+    user_id = user.id if user else None
+    if chat_id is None and user_id is None:
+        return None
+    return (chat_id, user_id)
+
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обработчик обновлений с упорядочиванием по ключу (чат, пользователь).
+
+    Обновления с одним ключом выполняются строго по очереди, с разными — параллельно,
+    но не более max_concurrent_updates одновременно. Лимит проверяется уже после
+    очереди по ключу, поэтому ожидающие обновления одного пользователя не занимают
+    места обработчиков других пользователей.
+    """
+
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int = MAX_PENDING_UPDATES):
+        super().__init__(max(max_pending_updates, max_concurrent_updates))
+        self._limit = max_concurrent_updates
+        self._slots = None
+        self._keys = {}
+        self.metrics = {
+            'running': 0,
+            'waiting': 0,
+            'max_waiting': 0,
+            'processed': 0,
+        }
+
+    @property
+    def concurrency_limit(self) -> int:
+        return self._limit
+
+    async def initialize(self) -> None:
+        self._slots = asyncio.Semaphore(self._limit)
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_process_update(self, update, coroutine) -> None:
+        if self._slots is None:
+            await self.initialize()
+        key = update_key(update)
+        entry = None
+        if key is not None:
+            entry = self._keys.setdefault(key, [asyncio.Lock(), 0])
+            entry[1] += 1
+        self._set_waiting(+1)
+        started = False
+        try:
+            async with (entry[0] if entry else nullcontext()), self._slots:
+                started = True
+                self._set_waiting(-1)
+                self.metrics['running'] += 1
+                try:
+                    await coroutine
+                finally:
+                    self.metrics['running'] -= 1
+                    self.metrics['processed'] += 1
+        finally:
+            if not started:
+                # Обработка отменена, пока обновление ждало очереди
+                self._set_waiting(-1)
+                if asyncio.iscoroutine(coroutine):
+                    coroutine.close()
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._keys[key]
+
+    def _set_waiting(self, delta):
+        self.metrics['waiting'] += delta
+        if self.metrics['waiting'] > self.metrics['max_waiting']:
+            self.metrics['max_waiting'] = self.metrics['waiting']
+
+    def active_keys(self) -> int:
+        """Количество ключей, у которых есть выполняемые или ожидающие обновления."""
+        return len(self._keys)
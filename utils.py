@@ -4,14 +4,17 @@
 Включает функции для проверки прав доступа, работы со временем и другие.
 """
 import logging
-import random
+from rng import rng
 import datetime
 from telegram import Update
 from telegram.ext import ContextTypes
-from config import ALLOWED_CHAT_IDS, TIMEZONE_OFFSET
+from config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('schedule')
+
 def is_allowed_chat(chat_id: int) -> bool:
     """
     Проверяет, разрешен ли чат для работы бота.
@@ -22,7 +25,7 @@ def is_allowed_chat(chat_id: int) -> bool:
     Returns:
         True если чат разрешен, False в противном случае
     """
-    return chat_id in ALLOWED_CHAT_IDS
+    return chat_id in get_config().allowed_chat_ids
 
 async def check_chat_and_execute(update: Update, context: ContextTypes.DEFAULT_TYPE, handler_func):
     """
@@ -59,7 +62,7 @@ def random_time_in_range(start: datetime.time, end: datetime.time) -> datetime.t
     """
     start_s = start.hour * 3600 + start.minute * 60 + start.second
     end_s = end.hour * 3600 + end.minute * 60 + end.second
-    r = random.randint(start_s, end_s)
+    r = _random.randint(start_s, end_s)
     hh = r // 3600
     mm = (r % 3600) // 60
     ss = r % 60
@@ -80,7 +83,7 @@ def parse_time_from_string(time_str: str) -> datetime.time:
     
     # Конвертируем из локального времени в UTC (вычитаем смещение часового пояса)
     # Например, если локальное время 14:00 в UTC+7, то UTC время будет 7:00
-    hours_utc = (hours - TIMEZONE_OFFSET) % 24
+    hours_utc = (hours - get_config().timezone_offset) % 24
     
     return datetime.time(hour=hours_utc, minute=minutes)
 
@@ -100,7 +103,7 @@ def convert_local_to_utc(time_str: str) -> datetime.time:
         hours, minutes = map(int, time_str.split(':'))
         
         # Конвертируем из локального времени в UTC (вычитаем смещение часового пояса)
-        hours_utc = (hours - TIMEZONE_OFFSET) % 24
+        hours_utc = (hours - get_config().timezone_offset) % 24
         
         return datetime.time(hour=hours_utc, minute=minutes)
     except Exception as e:
@@ -8,7 +8,7 @@
 - Статистику и предсказание возможного количества публикаций
 """
 import os
-import random
+from rng import rng
 import shutil
 import logging
 import time
@@ -16,29 +16,13 @@ from pathlib import Path
 
 SEPARATOR = "=================================================="
 
-import config
-from config import (
-    ANECDOTES_FILE,
-    ERO_ANIME_DIR,
-    ERO_REAL_DIR,
-    SINGLE_MEME_DIR,
-    STANDART_ART_DIR,
-    STANDART_MEME_DIR,
-    VIDEO_MEME_DIR,
-    VIDEO_ERO_DIR,
-    VIDEO_AUTO_DIR,
-    ARCHIVE_ERO_ANIME_DIR,
-    ARCHIVE_ERO_REAL_DIR,
-    ARCHIVE_SINGLE_MEME_DIR,
-    ARCHIVE_STANDART_ART_DIR,
-    ARCHIVE_STANDART_MEME_DIR,
-    ARCHIVE_VIDEO_MEME_DIR,
-    ARCHIVE_VIDEO_ERO_DIR,
-    ARCHIVE_VIDEO_AUTO_DIR,
-)
+from config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Поток случайных чисел подсистемы (см. rng.py)
+_random = rng.stream('content')
+
 def is_valid_file(file_path):
     """
     Проверяет, что файл подходит для отправки в Telegram.
@@ -103,31 +87,32 @@ def get_top_anecdote_and_remove():
     Returns:
         str|None: Текст анекдота или None, если анекдотов нет или произошла ошибка
     """
+    anecdotes_file = get_config().anecdotes_file
     try:
-        if not os.path.exists(ANECDOTES_FILE):
-            logger.warning(f"Файл анекдотов {ANECDOTES_FILE} не существует")
+        if not os.path.exists(anecdotes_file):
+            logger.warning(f"Файл анекдотов {anecdotes_file} не существует")
             return None
 
-        with open(ANECDOTES_FILE, "r", encoding="utf-8") as f:
+        with open(anecdotes_file, "r", encoding="utf-8") as f:
             content = f.read().strip()
 
         if not content:
-            logger.warning(f"Файл анекдотов {ANECDOTES_FILE} пуст")
+            logger.warning(f"Файл анекдотов {anecdotes_file} пуст")
             return None
 
         # Разбиваем контент на отдельные анекдоты по разделителю
         parts = [x.strip() for x in content.split(SEPARATOR) if x.strip()]
         if not parts:
-            logger.warning(f"В файле анекдотов {ANECDOTES_FILE} нет анекдотов")
+            logger.warning(f"В файле анекдотов {anecdotes_file} нет анекдотов")
             return None
 
         # Выбираем случайный индекс
-        idx = random.randint(0, len(parts) - 1)
+        idx = _random.randint(0, len(parts) - 1)
         anecdote = parts.pop(idx)
 
         # Сохраняем оставшиеся анекдоты обратно в файл
         remaining_str = f"\n{SEPARATOR}\n".join(parts)
-        with open(ANECDOTES_FILE, "w", encoding="utf-8") as f:
+        with open(anecdotes_file, "w", encoding="utf-8") as f:
             f.write(remaining_str.strip())
 
         return anecdote
@@ -143,10 +128,11 @@ def count_anecdotes():
     Returns:
         int: Количество анекдотов или 0, если файла нет или произошла ошибка
     """
+    anecdotes_file = get_config().anecdotes_file
     try:
-        if not os.path.exists(ANECDOTES_FILE):
+        if not os.path.exists(anecdotes_file):
             return 0
-        with open(ANECDOTES_FILE, "r", encoding="utf-8") as f:
+        with open(anecdotes_file, "r", encoding="utf-8") as f:
             content = f.read().strip()
         if not content:
             return 0
@@ -180,7 +166,7 @@ def get_random_file_from_folder(folder):
             logger.warning(f"В директории {folder} нет валидных файлов")
             return None
         
-        return random.choice(valid_files)
+        return _random.choice(valid_files)
     except Exception as e:
         logger.error(f"Ошибка при получении случайного файла из {folder}: {str(e)}")
         return None
@@ -202,24 +188,9 @@ def move_file_to_archive(filepath, category):
             return False
         
         # Определяем директорию архива в зависимости от категории
-        archive_dir = None
-        if category == "ero-anime":
-            archive_dir = ARCHIVE_ERO_ANIME_DIR
-        elif category == "ero-real":
-            archive_dir = ARCHIVE_ERO_REAL_DIR
-        elif category == "single-meme":
-            archive_dir = ARCHIVE_SINGLE_MEME_DIR
-        elif category == "standart-art":
-            archive_dir = ARCHIVE_STANDART_ART_DIR
-        elif category == "standart-meme":
-            archive_dir = ARCHIVE_STANDART_MEME_DIR
-        elif category == "video-meme":
-            archive_dir = ARCHIVE_VIDEO_MEME_DIR
-        elif category == "video-ero":
-            archive_dir = ARCHIVE_VIDEO_ERO_DIR
-        elif category == "video-auto":
-            archive_dir = ARCHIVE_VIDEO_AUTO_DIR
-        else:
+        # Категории пишутся через дефис, а ключи archive_dirs — через подчёркивание
+        archive_dir = get_config().archive_dirs.get(category.replace("-", "_"))
+        if archive_dir is None:
             logger.warning(f"Неизвестная категория: {category}")
             return False
         
@@ -267,16 +238,10 @@ def get_available_stats():
         dict: Словарь с количеством файлов каждого типа
     """
     result = {
-        'ero-anime': count_files_in_folder(ERO_ANIME_DIR),
-        'ero-real': count_files_in_folder(ERO_REAL_DIR),
-        'single-meme': count_files_in_folder(SINGLE_MEME_DIR),
-        'standart-art': count_files_in_folder(STANDART_ART_DIR),
-        'standart-meme': count_files_in_folder(STANDART_MEME_DIR),
-        'video-meme': count_files_in_folder(VIDEO_MEME_DIR),
-        'video-ero': count_files_in_folder(VIDEO_ERO_DIR),
-        'video-auto': count_files_in_folder(VIDEO_AUTO_DIR),
-        'anecdotes': count_anecdotes(),
+        category.replace("_", "-"): count_files_in_folder(folder)
+        for category, folder in get_config().content_dirs.items()
     }
+    result['anecdotes'] = count_anecdotes()
     return result
 
 def predict_10pics_posts(stats):
@@ -0,0 +1,144 @@
+# webhook.py
+"""
+Модуль режима вебхука.
+Обеспечивает:
+- Запуск бота через вебхук вместо long polling (раздел webhook в bot_config.json)
+- Проверку секретного токена в заголовке X-Telegram-Bot-Api-Secret-Token
+- Ограничение числа одновременных соединений от Telegram
+- Локальную проверку: отправку заготовленных обновлений на запущенный сервер
+
+Встроенный сервер вебхука входит в python-telegram-bot и требует дополнительной
+зависимости: pip install "python-telegram-bot[webhooks]".
+
+Запуск проверки: python webhook.py — отправит заготовленные обновления
+на адрес из bot_config.json (listen, port, path).
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import time
+
+import httpx
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+# Заголовок, в котором Telegram передаёт секретный токен вебхука
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Заготовленные обновления для локальной проверки
+CANNED_UPDATES = (
+    {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": 1, "type": "private", "first_name": "Тест"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Тест"},
+            "text": "/start",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+        },
+    },
+    {
+        "update_id": 2,
+        "message": {
+            "message_id": 2,
+            "date": 0,
+            "chat": {"id": 1, "type": "private", "first_name": "Тест"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Тест"},
+            "text": "/help",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 5}],
+        },
+    },
+)
+
+
+def webhook_available() -> bool:
+    """Установлен ли сервер вебхука (python-telegram-bot[webhooks])."""
+    return importlib.util.find_spec('tornado') is not None
+
+
+def webhook_url(settings) -> str:
+    """Публичный адрес вебхука: url + path."""
+    return f"{settings['url'].rstrip('/')}/{settings['path'].strip('/')}"
+
+
+def webhook_kwargs(settings) -> dict:
+    """
+    Собирает аргументы Application.run_webhook из раздела bot_config.webhook.
+
+    Args:
+        settings: get_config().webhook
+    """
+    return {
+        'listen': settings['listen'],
+        'port': settings['port'],
+        'url_path': settings['path'].strip('/'),
+        'webhook_url': webhook_url(settings),
+        'secret_token': settings['secret_token'],
+        'max_connections': settings['max_connections'],
+        'cert': settings['cert'],
+        'key': settings['key'],
+        # chat_member не приходит без явного запроса, а нужен справочнику участников
+        'allowed_updates': Update.ALL_TYPES,
+    }
+
+
+def run_webhook(app, settings) -> None:
+    """
+    Запускает бота в режиме вебхука. Блокирует до остановки, как run_polling.
+
+    Raises:
+        RuntimeError: Если сервер вебхука не установлен
+    """
+    if not webhook_available():
+        raise RuntimeError(
+            'Для режима вебхука установите python-telegram-bot[webhooks] '
+            'или выключите bot_config.webhook.enabled'
+        )
+    kwargs = webhook_kwargs(settings)
+    logger.info(
+        f"Запуск вебхука на {kwargs['listen']}:{kwargs['port']}/{kwargs['url_path']}, "
+        f"max_connections={kwargs['max_connections']}"
+    )
+    app.run_webhook(**kwargs)
+
+
+async def send_canned_updates(settings, updates=CANNED_UPDATES, secret_token=None, transport=None) -> list:
+    """
+    Отправляет заготовленные обновления на локальный сервер вебхука.
+
+    Args:
+        settings: get_config().webhook
+        updates: Обновления в формате Bot API
+        secret_token: Секрет для заголовка; по умолчанию — из настроек
+        transport: Транспорт httpx (для тестов)
+
+    Returns:
+        list: Коды ответов сервера по каждому обновлению
+    """
+    host = '127.0.0.1' if settings['listen'] in ('0.0.0.0', '::') else settings['listen']
+    scheme = 'https' if settings['cert'] else 'http'
+    url = f"{scheme}://{host}:{settings['port']}/{settings['path'].strip('/')}"
+    headers = {SECRET_HEADER: settings['secret_token'] if secret_token is None else secret_token}
+    statuses = []
+    async with httpx.AsyncClient(transport=transport, verify=False) as client:
+        for update in updates:
+            update = dict(update)
+            # Дата сообщения — текущая, иначе обработчики могут счесть его устаревшим
+            if "message" in update:
+                update["message"] = {**update["message"], "date": int(time.time())}
+            response = await client.post(url, content=json.dumps(update), headers={
+                **headers, "Content-Type": "application/json",
+            })
+            statuses.append(response.status_code)
+    return statuses
+
+
+if __name__ == "__main__":
+    from config import get_config
+    logging.basicConfig(level=logging.INFO)
+    for status in asyncio.run(send_canned_updates(get_config().webhook)):
+        logger.info(f"Ответ сервера вебхука: {status}")
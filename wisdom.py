@@ -3,7 +3,7 @@
 Модуль для публикации "Мудрости дня" в Telegram-чате.
 Обеспечивает:
 - Загрузку и сохранение списка мудрых фраз
-- Случайный выбор фраз без повторений
+- Случайный выбор фраз без повторений (через общий пул ConsumablePool)
 - Ежедневную публикацию мудрости по расписанию
 - Возможность включения/отключения функции
 """
@@ -11,14 +11,19 @@
 import os
 import datetime
 import json
-import random
 from telegram import Update
 from telegram.ext import ContextTypes
-from config import POST_CHAT_ID, MATERIALS_DIR
+from config import get_config
+from consumable_pool import ConsumablePool
 from utils import random_time_in_range
 import state  # используется для проверки включена ли публикация
 
-WISDOM_FILE = os.path.join(MATERIALS_DIR, "wisdom.json")
+WISDOM_FILE = os.path.join(get_config().materials_dir, "wisdom.json")
+WISDOM_POOL_STATE_FILE = "state_data/wisdom_pool_state.json"
+WISDOM_USED_LOG_FILE = "state_data/wisdom_used.log"
+
+# Пул мудростей: выдаёт каждую фразу из wisdom.json один раз, не перезаписывая файл
+WISDOM_POOL = ConsumablePool(WISDOM_FILE, WISDOM_POOL_STATE_FILE, WISDOM_USED_LOG_FILE)
 
 def load_wisdoms() -> list[str]:
     """
@@ -52,39 +57,37 @@ def save_wisdoms(wisdoms: list[str]):
 
 def count_wisdoms() -> int:
     """
-    Подсчитывает количество оставшихся мудрых фраз в файле.
+    Подсчитывает количество ещё не опубликованных мудрых фраз.
     
     Returns:
-        int: Количество мудрых фраз или 0, если файла нет или произошла ошибка
+        int: Количество мудрых фраз или 0, если произошла ошибка
     """
     try:
-        wisdoms = load_wisdoms()
-        return len(wisdoms)
+        return WISDOM_POOL.count()
     except Exception:
         return 0
 
 def get_random_wisdom() -> str | None:
     """
-    Выбирает случайную мудрую фразу из списка и удаляет её,
+    Выбирает случайную мудрую фразу из пула и отмечает её выданной,
     чтобы избежать повторений.
     
     Returns:
-        str|None: Случайная мудрая фраза или None, если список пуст
+        str|None: Случайная мудрая фраза или None, если фразы закончились
     """
-    ws = load_wisdoms()
-    if not ws:
-        return None
-    
-    # Выбираем случайную мудрость
-    w = random.choice(ws)
-    
-    # Удаляем выбранную мудрость из списка
-    ws.remove(w)
-    
-    # Сохраняем обновлённый список
-    save_wisdoms(ws)
+    return WISDOM_POOL.draw()
+
+def import_wisdoms(wisdoms: list[str]) -> int:
+    """
+    Добавляет новые мудрые фразы в wisdom.json, перемешивая их с ещё не опубликованными.
     
-    return w
+    Args:
+        wisdoms: Список новых фраз
+        
+    Returns:
+        int: Количество добавленных фраз
+    """
+    return WISDOM_POOL.extend(wisdoms)
 
 
 async def wisdom_post_callback(context: ContextTypes.DEFAULT_TYPE):
@@ -102,13 +105,13 @@ async def wisdom_post_callback(context: ContextTypes.DEFAULT_TYPE):
     text = get_random_wisdom()
     if not text:
         await context.bot.send_message(
-            chat_id=POST_CHAT_ID,
+            chat_id=get_config().post_chat_id,
             text="Мудрости дня закончились 😢"
         )
         return
 
     await context.bot.send_message(
-        chat_id=POST_CHAT_ID,
+        chat_id=get_config().post_chat_id,
         text=f"🦉 Мудрость дня:\n\n{text}"
     )
 